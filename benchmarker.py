@@ -1,15 +1,29 @@
 import time
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from models import ModelEvaluation
 from services.base_service import ModelService
-from utils.text_analysis import calculate_keyword_coverage, assess_length, calculate_confidence_score
-from utils.social_impact import evaluate_social_impact
+from utils.text_analysis import calculate_keyword_coverage, assess_length, calculate_confidence_score, extract_keywords
+from utils.social_impact import score_social_impact
+from utils.scoring_profile import CompiledScoringProfile, get_scoring_profile
+from utils.metrics import metrics_registry
+from utils.timing import GenerationTimer
+
+STAGE_DURATION = metrics_registry.histogram(
+    "benchmark_stage_duration_seconds",
+    "Time spent in each stage of benchmarking one model answer",
+    ["model", "stage"]
+)
+
+# Stages reported by the extractive QA services in their answer metadata
+ANSWER_DETAIL_STAGES = ("retrieval", "reader")
 
 def benchmark_models(
     question: str, 
     models: List[ModelService],
-    expected_keywords: Optional[List[str]] = None
+    expected_keywords: Optional[List[str]] = None,
+    use_cache: bool = True,
+    profile: Optional[CompiledScoringProfile] = None
 ) -> List[ModelEvaluation]:
     """
     Benchmark multiple models on a given question.
@@ -18,45 +32,155 @@ def benchmark_models(
         question: The question to answer
         models: List of model services to benchmark
         expected_keywords: Optional list of keywords expected in good answers
+        use_cache: Serve deterministic models from the response cache
+        profile: Scoring profile (default: the profile active when the call starts)
         
     Returns:
         List of model evaluations
     """
     results = []
-    
-    normalized_keywords = [k.lower() for k in expected_keywords] if expected_keywords else []
+    profile = profile or get_scoring_profile()
     
     for model in models:
-        start_time = time.time()
-        answer = model.get_answer(question)
-        end_time = time.time()
-        response_time_ms = int((end_time - start_time) * 1000)
-
-        if normalized_keywords:
-            keyword_coverage, keywords_found = calculate_keyword_coverage(answer, normalized_keywords)
-        else:
-            from utils.text_analysis import extract_keywords
-            potential_keywords = extract_keywords(question)
-            keyword_coverage, keywords_found = calculate_keyword_coverage(answer, potential_keywords)
-
-        length_category = assess_length(answer)
-
-        confidence_score = calculate_confidence_score(answer)
-
-        model_evaluation = ModelEvaluation(
-            model_name=model.name,
-            answer=answer,
-            keyword_coverage=keyword_coverage,
-            keywords_found=keywords_found,
-            length_category=length_category,
-            response_time_ms=response_time_ms,
-            confidence_score=confidence_score,
-            metadata=model.get_metadata()
-        )
-
-        social_impact_metrics = evaluate_social_impact(model_evaluation)
-        model_evaluation.social_impact_metrics = social_impact_metrics
+        timer = GenerationTimer().start()
+        answer, cache_hit, details = model.get_cached_answer_details(question, use_cache)
+        timer.finish()
+
+        results.append(score_answer(
+            question, model, answer, timer.elapsed_ms, expected_keywords, cache_hit, profile,
+            timer.as_fields(streamed=False), details
+        ))
+    
+    return results
+
+def score_answer(
+    question: str,
+    model: ModelService,
+    answer: str,
+    response_time_ms: int,
+    expected_keywords: Optional[List[str]] = None,
+    cache_hit: bool = False,
+    profile: Optional[CompiledScoringProfile] = None,
+    timing: Optional[Dict[str, Any]] = None,
+    answer_metadata: Optional[Dict[str, Any]] = None,
+    stage_timings: Optional[Dict[str, float]] = None,
+    scores: Optional[Tuple[Dict[str, Any], Dict[str, float]]] = None
+) -> ModelEvaluation:
+    """
+    Score a model's answer and build its evaluation.
+    
+    Args:
+        question: The question that was answered
+        model: Model service that produced the answer
+        answer: The model's answer
+        response_time_ms: Time the model took to answer
+        expected_keywords: Optional list of keywords expected in good answers
+        cache_hit: Whether the answer was served from the response cache
+        profile: Scoring profile (default: active profile)
+        timing: Timing fields from GenerationTimer.as_fields
+        answer_metadata: Per-answer details (e.g. retrieval and reader
+            timings), merged into the model's metadata
+        stage_timings: Durations in milliseconds of stages measured by the
+            caller, e.g. time spent queued in the executor
+        scores: Result of compute_scores when the answer was already scored
+            elsewhere, e.g. by the scoring process pool
         
-        results.append(model_evaluation)
+    Returns:
+        Model evaluation
+    """
+    profile = profile or get_scoring_profile()
+    stages = dict(stage_timings or {})
+    if timing and timing.get("started_at_ns") is not None and timing.get("finished_at_ns") is not None:
+        answer_ms = (timing["finished_at_ns"] - timing["started_at_ns"]) / 1_000_000
+    else:
+        answer_ms = float(response_time_ms)
+    # A cached answer's time is a cache lookup, not model latency
+    stages["cache" if cache_hit else "answer"] = answer_ms
+    for stage in ANSWER_DETAIL_STAGES:
+        if (answer_metadata or {}).get(f"{stage}_ms") is not None:
+            stages[stage] = float(answer_metadata[f"{stage}_ms"])
+
+    if scores is None:
+        fields, scoring_stages = compute_scores(question, answer, response_time_ms, expected_keywords, profile)
+    else:
+        fields, scoring_stages = scores
+    stages.update(scoring_stages)
+
+    started = time.perf_counter()
+    model_evaluation = ModelEvaluation(
+        model_name=model.name,
+        answer=answer,
+        response_time_ms=response_time_ms,
+        metadata={**model.get_metadata(), **(answer_metadata or {})},
+        cache_hit=cache_hit,
+        scoring_profile_version=profile.version,
+        scorer_versions=profile.scorer_versions(),
+        **fields,
+        **(timing or {})
+    )
+    _record_stage(stages, "evaluation", started)
+
+    model_evaluation.stage_timings_ms = {stage: round(ms, 3) for stage, ms in stages.items()}
+    for stage, ms in stages.items():
+        STAGE_DURATION.labels(model.name, stage).observe(ms / 1000)
     
-    return results
\ No newline at end of file
+    return model_evaluation
+
+def compute_scores(
+    question: str,
+    answer: str,
+    response_time_ms: float,
+    expected_keywords: Optional[Sequence[str]] = None,
+    profile: Optional[CompiledScoringProfile] = None
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Compute every score of an answer
+    
+    This is the CPU-bound part of score_answer. It needs no model service,
+    so it can run in a scoring worker process.
+    
+    Args:
+        question: The question that was answered
+        answer: The model's answer
+        response_time_ms: Time the model took to answer
+        expected_keywords: Optional list of keywords expected in good answers
+        profile: Scoring profile (default: active profile)
+        
+    Returns:
+        Tuple of (ModelEvaluation score fields, milliseconds per scoring stage)
+    """
+    profile = profile or get_scoring_profile()
+    stages: Dict[str, float] = {}
+    started = time.perf_counter()
+    normalized_keywords = [k.lower() for k in expected_keywords] if expected_keywords else []
+
+    if normalized_keywords:
+        keyword_coverage, keywords_found = calculate_keyword_coverage(answer, normalized_keywords)
+    else:
+        # Memoized per question, so only the first model scored on it pays for extraction
+        potential_keywords = extract_keywords(question)
+        keyword_coverage, keywords_found = calculate_keyword_coverage(answer, potential_keywords)
+    started = _record_stage(stages, "keyword_coverage", started)
+
+    length_category = assess_length(answer)
+    started = _record_stage(stages, "length", started)
+
+    confidence_score = calculate_confidence_score(answer, profile)
+    started = _record_stage(stages, "confidence", started)
+
+    social_impact = score_social_impact(answer, response_time_ms, profile=profile)
+    _record_stage(stages, "social_impact", started)
+
+    return {
+        "keyword_coverage": keyword_coverage,
+        "keywords_found": keywords_found,
+        "length_category": length_category,
+        "confidence_score": confidence_score,
+        "social_impact_metrics": social_impact,
+    }, stages
+
+def _record_stage(stages: Dict[str, float], stage: str, started: float) -> float:
+    """Store the milliseconds since started under stage and return the current time"""
+    now = time.perf_counter()
+    stages[stage] = (now - started) * 1000
+    return now
\ No newline at end of file
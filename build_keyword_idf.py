@@ -0,0 +1,64 @@
+"""
+Build the IDF table for tfidf keyword extraction (KEYWORD_EXTRACTION=tfidf).
+
+Document frequencies are counted over a question corpus: question set
+files in the offline runner's JSONL/CSV format and, unless --no-store is
+given, every question in the results store. Words from the active scoring
+profile's Indian legal terms lexicon are weighted up, so "fir" or "ipc"
+outrank generic words that happen to be rare.
+
+Usage:
+    python build_keyword_idf.py questions.jsonl more_questions.csv
+    python build_keyword_idf.py --no-store questions.jsonl --legal-term-weight 3
+"""
+import argparse
+import json
+import os
+from typing import Iterator, List, Optional
+
+from run_benchmarks import read_questions
+from utils.results_store import ResultsStore, get_results_store
+from utils.scoring_profile import get_scoring_profile
+from utils.text_analysis import KEYWORD_IDF_PATH, build_idf_table
+
+LEGAL_LEXICON_METRIC = "cultural_relevance"
+
+def corpus_questions(paths: List[str], store: Optional[ResultsStore] = None) -> Iterator[str]:
+    """Yield every question from the files and then from the store, each distinct question once"""
+    seen = set()
+    for path in paths:
+        for _, question, _, _ in read_questions(path):
+            if question not in seen:
+                seen.add(question)
+                yield question
+    if store is not None:
+        for entry in store.questions(limit=-1):
+            if entry["question"] not in seen:
+                seen.add(entry["question"])
+                yield entry["question"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the IDF table used by tfidf keyword extraction")
+    parser.add_argument("inputs", nargs="*", help="Question set files (.jsonl or .csv)")
+    parser.add_argument("--output", default=KEYWORD_IDF_PATH, help="IDF table file (default: KEYWORD_IDF_PATH)")
+    parser.add_argument("--no-store", action="store_true", help="Do not read questions from the results store")
+    parser.add_argument("--legal-term-weight", type=float, default=2.0, help="Multiplier for legal-domain words")
+    args = parser.parse_args()
+
+    legal_terms = [
+        term
+        for lexicon in get_scoring_profile().profile.lexicons if lexicon.metric == LEGAL_LEXICON_METRIC
+        for term in lexicon.terms
+    ]
+    store = None if args.no_store else get_results_store()
+    table = build_idf_table(corpus_questions(args.inputs, store), legal_terms, args.legal_term_weight)
+    if not table["documents"]:
+        parser.error("No questions found; pass question files or benchmark some questions first")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(table, f, indent=1)
+    print(f"Saved IDF table of {len(table['idf'])} words over {table['documents']} questions: {args.output}")
+
+if __name__ == "__main__":
+    main()
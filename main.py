@@ -1,25 +1,41 @@
-from fastapi import FastAPI, HTTPException, Depends, Request
-from fastapi.responses import HTMLResponse
+from utils.startup import lazy_import, startup_timings
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
 import asyncio
-from parallel_benchmarker import benchmark_models_parallel
+import hashlib
+import json
+import os
+import sys
+from parallel_benchmarker import background_executor, benchmark_executor, EXECUTION_MODES
+from scoring_pool import get_scoring_pool
 
 from models import (
     BenchmarkRequest,
     BenchmarkResponse,
     ModelEvaluation,
     ABTestConfig,
-    ABTestResult
+    ABTestResult,
+    JobStatus
 )
-from benchmarker import benchmark_models
-from services.huggingface_service import HuggingFaceService
-from services.openai_service import OpenAIService
 from services.ab_test_service import ABTestService
-from utils.csv_logger import log_benchmark_to_csv
-from services.llm_service import LegalLLMService 
+from services.benchmark_jobs import get_job_queue
+from services.job_queue import FINISHED_STATUSES, JOB_STATUSES
+from services.base_service import ModelService
+from services.model_registry import ModelLoadError, model_registry
+from utils.result_sink import result_sink
+from utils.results_store import LEADERBOARD_METRICS, TREND_BUCKETS, get_results_store, question_hash as hash_question
+from utils.cache import response_cache
+from utils.metrics import RequestMetricsMiddleware, metrics_registry
+from utils.scoring_profile import get_scoring_profile, reload_scoring_profile
+from utils.semantic_scoring import score_semantic_similarity
+from utils.text_analysis import keyword_extraction_stats as get_keyword_extraction_stats, load_keyword_extraction
+
+BATCH_QUESTION_CONCURRENCY = int(os.environ.get("BATCH_QUESTION_CONCURRENCY", "8"))
 
 app = FastAPI(
     title="Legal AI Model Benchmarker",
@@ -27,7 +43,6 @@ app = FastAPI(
     version="1.0.0",
 )
 
-import os
 templates_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
 static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
 
@@ -36,6 +51,37 @@ os.makedirs(static_dir, exist_ok=True)
 
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 templates = Jinja2Templates(directory=templates_dir)
+startup_timings.mark("app:import")
+
+@app.on_event("startup")
+async def warm_up_models():
+    """Load the configured models once at startup instead of on first request"""
+    warmup_models = os.environ.get("WARMUP_MODELS", "")
+    if warmup_models:
+        with startup_timings.timed("app:warmup"):
+            model_registry.warm_up([m.strip() for m in warmup_models.split(",") if m.strip()])
+    startup_timings.mark("app:ready")
+
+@app.on_event("startup")
+async def warm_up_keyword_extraction():
+    """Load the stopwords, tokenizer and IDF table used for questions without expected keywords"""
+    with startup_timings.timed("app:keyword_extraction"):
+        await asyncio.get_event_loop().run_in_executor(None, load_keyword_extraction)
+
+@app.on_event("startup")
+async def warm_up_scoring_pool():
+    """Start the scoring worker processes so the first answers do not pay for spawning them"""
+    pool = get_scoring_pool()
+    if pool is not None:
+        with startup_timings.timed("app:scoring_pool"):
+            await asyncio.get_event_loop().run_in_executor(None, pool.warm_up)
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Start the background job workers, resuming jobs a previous process left queued or running"""
+    requeued = get_job_queue().start()
+    if requeued:
+        print(f"Resuming {requeued} interrupted background jobs")
 
 app.add_middleware(
     CORSMiddleware,
@@ -44,45 +90,93 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestMetricsMiddleware)
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    """Release the shared benchmark thread pools, scoring processes and HTTP connections and flush pending results"""
+    # Running jobs are queued again and resume from their stored results on the next start
+    get_job_queue().stop()
+    benchmark_executor.shutdown()
+    background_executor.shutdown()
+    if get_scoring_pool() is not None:
+        get_scoring_pool().shutdown()
+    result_sink.close()
+    # Only close the HTTP pool if a provider ever loaded it
+    http_client = sys.modules.get("services.http_client")
+    if http_client is not None:
+        await http_client.http_pool.aclose()
+
+def _validate_benchmark_request(request: BenchmarkRequest, execution_mode: str, timeout_seconds: Optional[float]):
+    if not request.question or len(request.question.strip()) < 5:
+        raise HTTPException(status_code=400, detail="Question must contain at least 5 characters")
+    if execution_mode not in EXECUTION_MODES:
+        raise HTTPException(status_code=400, detail=f"execution_mode must be one of {list(EXECUTION_MODES)}")
+    if timeout_seconds is not None and timeout_seconds <= 0:
+        raise HTTPException(status_code=400, detail="timeout_seconds must be positive")
 
 @app.post("/benchmark", response_model=BenchmarkResponse)
-async def benchmark(request: BenchmarkRequest, save_to_csv: bool = False):
+async def benchmark(
+    request: BenchmarkRequest,
+    save_to_csv: bool = False,
+    execution_mode: str = "parallel",
+    timeout_seconds: Optional[float] = None,
+    use_cache: bool = True,
+    stream_tokens: bool = False
+):
     """
     Benchmark multiple AI models on a legal question.
-    """
-    if not request.question or len(request.question.strip()) < 5:
-        raise HTTPException(status_code=400, detail="Question must contain at least 5 characters")
 
-    models = []
+    Models run concurrently by default; use execution_mode=sequential to
+    measure latencies without contention. Models exceeding timeout_seconds
+    are reported with timed_out set. Deterministic models are served from
+    the response cache unless use_cache is false; cached answers are
+    flagged with cache_hit. With stream_tokens, generative models stream
+    their answers so time to first token and token rates are recorded.
+    With reference_answers, each evaluation gets the semantic similarity
+    of its answer to the closest reference.
+    """
+    _validate_benchmark_request(request, execution_mode, timeout_seconds)
 
-    try:
-        llm_service = LegalLLMService()
-        models.append(llm_service)
-    except Exception as e:
-        from services.simplified_service import SimplifiedModelService
-        models.append(SimplifiedModelService())
+    results = await _benchmark_question(request, execution_mode, timeout_seconds, use_cache, stream_tokens)
+    await _score_semantic_similarity([(results, request.reference_answers)])
+    return _finish_benchmark(request, results, save_to_csv)
 
-    try:
-        huggingface_service = HuggingFaceService()
-        models.append(huggingface_service)
-    except Exception as e:
-        pass
+async def _benchmark_question(
+    request: BenchmarkRequest,
+    execution_mode: str,
+    timeout_seconds: Optional[float],
+    use_cache: bool,
+    stream_tokens: bool = False
+) -> List[ModelEvaluation]:
+    loop = asyncio.get_event_loop()
+    models = await loop.run_in_executor(benchmark_executor.executor, model_registry.get_benchmark_models)
 
-    try:
-        openai_service = OpenAIService()
-        models.append(openai_service)
-    except Exception as e:
-        pass
+    return await benchmark_executor.benchmark(
+        request.question,
+        models,
+        request.expected_keywords,
+        mode=execution_mode,
+        timeout=timeout_seconds,
+        use_cache=use_cache,
+        stream=stream_tokens
+    )
 
-    results = benchmark_models(request.question, models, request.expected_keywords)
+async def _score_semantic_similarity(runs: List[Tuple[List[ModelEvaluation], Optional[List[str]]]]):
+    # Embedding is CPU work and may load the embedding model; keep it off the event loop
+    if any(references for _, references in runs):
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(benchmark_executor.executor, score_semantic_similarity, runs)
 
+def _finish_benchmark(request: BenchmarkRequest, results: List[ModelEvaluation], save_to_csv: bool) -> BenchmarkResponse:
     if save_to_csv:
-        log_benchmark_to_csv(request.question, results, request.expected_keywords)
-    
+        result_sink.submit(request.question, results, request.expected_keywords)
+
     return BenchmarkResponse(
         question=request.question,
         models=results,
-        expected_keywords=request.expected_keywords
+        expected_keywords=request.expected_keywords,
+        reference_answers=request.reference_answers
     )
 
 @app.get("/")
@@ -101,26 +195,570 @@ ab_test_service = ABTestService()
 async def run_ab_test(config: ABTestConfig, request: BenchmarkRequest):
     """
     Run an A/B test comparing different model configurations
+
+    Every variant answers the question set (config.questions, or the
+    request's question) for up to config.repetitions rounds. Results
+    include per-criterion means, percentiles, confidence intervals and
+    a paired t-test over questions against the runner-up.
     """
     if not request.question or len(request.question.strip()) < 5:
         raise HTTPException(status_code=400, detail="Question must contain at least 5 characters")
     
-    return await ab_test_service.run_ab_test(
-        config, 
-        request.question, 
-        request.expected_keywords or []
-    )
+    try:
+        return await ab_test_service.run_ab_test(
+            config, 
+            request.question, 
+            request.expected_keywords or []
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ModelLoadError as e:
+        raise HTTPException(status_code=503, detail=f"A model variant could not be loaded: {str(e)}")
 
 @app.post("/batch-benchmark", response_model=List[BenchmarkResponse])
-async def batch_benchmark(requests: List[BenchmarkRequest], save_to_csv: bool = False):
-    """Process multiple benchmark requests in a single call"""
-    results = []
+async def batch_benchmark(
+    requests: List[BenchmarkRequest],
+    save_to_csv: bool = False,
+    execution_mode: str = "parallel",
+    timeout_seconds: Optional[float] = None,
+    use_cache: bool = True
+):
+    """
+    Process multiple benchmark requests in a single call
+
+    Questions run concurrently (up to BATCH_QUESTION_CONCURRENCY at a time)
+    so local models can micro-batch them into shared forward passes. The
+    answers and reference answers of every question are embedded in one
+    batch for semantic similarity.
+    """
+    for request in requests:
+        _validate_benchmark_request(request, execution_mode, timeout_seconds)
+    semaphore = asyncio.Semaphore(BATCH_QUESTION_CONCURRENCY)
+
+    async def run_request(request: BenchmarkRequest) -> List[ModelEvaluation]:
+        async with semaphore:
+            return await _benchmark_question(request, execution_mode, timeout_seconds, use_cache)
+
+    all_results = await asyncio.gather(*[run_request(request) for request in requests])
+    await _score_semantic_similarity([
+        (results, request.reference_answers) for request, results in zip(requests, all_results)
+    ])
+    return [
+        _finish_benchmark(request, results, save_to_csv) for request, results in zip(requests, all_results)
+    ]
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+def _format_stream_event(event: str, payload: dict, stream_format: str) -> str:
+    data = json.dumps(payload)
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {data}\n\n"
+    return json.dumps({"event": event, **payload}) + "\n"
+
+async def _stream_batch_results(
+    requests: List[BenchmarkRequest],
+    stream_format: str,
+    save_to_csv: bool,
+    execution_mode: str,
+    timeout_seconds: Optional[float],
+    use_cache: bool
+) -> AsyncIterator[str]:
+    """
+    Run batch questions concurrently and yield each result as soon as it is ready
+
+    At most BATCH_QUESTION_CONCURRENCY questions are in flight and finished
+    results are not kept, so memory stays flat regardless of batch size.
+    """
+    pending_requests = iter(enumerate(requests))
+    in_flight = set()
+    completed = 0
+
+    async def run_request(index: int, request: BenchmarkRequest) -> dict:
+        try:
+            result = await benchmark(request, save_to_csv, execution_mode, timeout_seconds, use_cache)
+            return {"index": index, "result": json.loads(result.json())}
+        except HTTPException as e:
+            return {"index": index, "question": request.question, "error": e.detail}
+
+    def fill_window():
+        while len(in_flight) < BATCH_QUESTION_CONCURRENCY:
+            next_request = next(pending_requests, None)
+            if next_request is None:
+                return
+            in_flight.add(asyncio.ensure_future(run_request(*next_request)))
+
+    try:
+        fill_window()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                in_flight.discard(task)
+                completed += 1
+                payload = task.result()
+                payload["completed"] = completed
+                payload["total"] = len(requests)
+                yield _format_stream_event("error" if "error" in payload else "result", payload, stream_format)
+            fill_window()
+        yield _format_stream_event("done", {"completed": completed, "total": len(requests)}, stream_format)
+    finally:
+        # The client went away; stop work that nobody will read
+        for task in in_flight:
+            task.cancel()
+
+@app.post("/batch-benchmark/stream")
+async def batch_benchmark_stream(
+    requests: List[BenchmarkRequest],
+    stream_format: str = "ndjson",
+    save_to_csv: bool = False,
+    execution_mode: str = "parallel",
+    timeout_seconds: Optional[float] = None,
+    use_cache: bool = True
+):
+    """
+    Stream batch benchmark results as newline-delimited JSON or server-sent events
+
+    Each question's results are sent as soon as they are ready, tagged with
+    the question's index in the request; a final "done" event closes the stream.
+    """
+    if stream_format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"stream_format must be one of {list(STREAM_MEDIA_TYPES)}")
+    if execution_mode not in EXECUTION_MODES:
+        raise HTTPException(status_code=400, detail=f"execution_mode must be one of {list(EXECUTION_MODES)}")
+
+    return StreamingResponse(
+        _stream_batch_results(requests, stream_format, save_to_csv, execution_mode, timeout_seconds, use_cache),
+        media_type=STREAM_MEDIA_TYPES[stream_format]
+    )
+
+async def _stream_benchmark_answers(
+    request: BenchmarkRequest,
+    models: List[ModelService],
+    stream_format: str,
+    save_to_csv: bool,
+    execution_mode: str,
+    timeout_seconds: Optional[float],
+    use_cache: bool
+) -> AsyncIterator[str]:
+    """
+    Benchmark one question and yield answer chunks as the models produce them
+
+    Emits a "token" event per chunk, a "result" event with each model's
+    evaluation when it finishes and a final "done" event with the full
+    benchmark response.
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def on_token(model, text: str):
+        # Sync models stream from worker threads
+        loop.call_soon_threadsafe(events.put_nowait, ("token", {"model_name": model.name, "text": text}))
+
+    async def run(model) -> ModelEvaluation:
+        evaluation = await benchmark_executor.run_model(
+            request.question, model, request.expected_keywords, timeout_seconds, use_cache, profile,
+            stream=True, on_token=lambda text: on_token(model, text)
+        )
+        events.put_nowait(("result", {"model_name": model.name, "evaluation": json.loads(evaluation.json())}))
+        return evaluation
+
+    async def run_all() -> List[ModelEvaluation]:
+        if execution_mode == "sequential":
+            return [await run(model) for model in models]
+        return list(await asyncio.gather(*[run(model) for model in models]))
+
+    profile = get_scoring_profile()
+    task = asyncio.ensure_future(run_all())
+    task.add_done_callback(lambda _: events.put_nowait(None))
+    try:
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield _format_stream_event(*event, stream_format)
+
+        results = task.result()
+        await _score_semantic_similarity([(results, request.reference_answers)])
+        response = _finish_benchmark(request, results, save_to_csv)
+        yield _format_stream_event("done", json.loads(response.json()), stream_format)
+    finally:
+        task.cancel()
+
+@app.post("/benchmark/stream")
+async def benchmark_stream(
+    request: BenchmarkRequest,
+    stream_format: str = "sse",
+    save_to_csv: bool = False,
+    execution_mode: str = "parallel",
+    timeout_seconds: Optional[float] = None,
+    use_cache: bool = True
+):
+    """
+    Stream partial answers from every model as server-sent events or newline-delimited JSON
+
+    Evaluations include time to first token, token counts and tokens per
+    second for models that stream their output.
+    """
+    if stream_format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"stream_format must be one of {list(STREAM_MEDIA_TYPES)}")
+    _validate_benchmark_request(request, execution_mode, timeout_seconds)
+
+    loop = asyncio.get_event_loop()
+    models = await loop.run_in_executor(benchmark_executor.executor, model_registry.get_benchmark_models)
+
+    return StreamingResponse(
+        _stream_benchmark_answers(request, models, stream_format, save_to_csv, execution_mode, timeout_seconds, use_cache),
+        media_type=STREAM_MEDIA_TYPES[stream_format]
+    )
+
+def _job_status(job: dict) -> JobStatus:
+    return JobStatus(job_id=job["id"], **job)
+
+def _get_job_or_404(job_id: str) -> dict:
+    job = get_job_queue().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+@app.post("/jobs/benchmark", response_model=JobStatus, status_code=202)
+async def submit_benchmark_job(
+    requests: List[BenchmarkRequest],
+    priority: int = 0,
+    save_to_csv: bool = False,
+    execution_mode: str = "parallel",
+    timeout_seconds: Optional[float] = None,
+    use_cache: bool = True
+):
+    """
+    Queue a batch benchmark as a background job and return its id at once
+
+    Jobs run on their own workers and executor lane, so they do not hold
+    the request open or delay interactive /benchmark calls. Each question's
+    response is stored as it finishes; fetch them from /jobs/{job_id}/results.
+    """
+    if not requests:
+        raise HTTPException(status_code=400, detail="At least one question is required")
     for request in requests:
-        result = await benchmark(request, save_to_csv)
-        results.append(result)
-    return results
+        _validate_benchmark_request(request, execution_mode, timeout_seconds)
+
+    job = get_job_queue().submit("benchmark", {
+        "requests": [request.dict() for request in requests],
+        "execution_mode": execution_mode,
+        "timeout_seconds": timeout_seconds,
+        "use_cache": use_cache,
+        "save_to_csv": save_to_csv,
+    }, priority=priority, total=len(requests))
+    return _job_status(job)
+
+@app.post("/jobs/ab-test", response_model=JobStatus, status_code=202)
+async def submit_ab_test_job(config: ABTestConfig, request: BenchmarkRequest, priority: int = 0):
+    """Queue an A/B test as a background job; its result is the job's only result item"""
+    if not request.question or len(request.question.strip()) < 5:
+        raise HTTPException(status_code=400, detail="Question must contain at least 5 characters")
+    try:
+        ab_test_service.validate_config(config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job = get_job_queue().submit("ab_test", {
+        "config": config.dict(),
+        "question": request.question,
+        "expected_keywords": request.expected_keywords or [],
+    }, priority=priority, total=config.repetitions)
+    return _job_status(job)
+
+@app.get("/jobs", response_model=List[JobStatus])
+async def list_jobs(status: Optional[str] = None, limit: int = 50):
+    """List the most recently submitted jobs, optionally only those with a status"""
+    if status is not None and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {list(JOB_STATUSES)}")
+    return [_job_status(job) for job in get_job_queue().store.list(status, limit)]
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Get a job's status and progress"""
+    return _job_status(_get_job_or_404(job_id))
+
+@app.get("/jobs/{job_id}/results")
+async def get_job_results(job_id: str, offset: int = 0, limit: int = 100):
+    """
+    Page through a job's stored results in question order
+
+    Results are available as soon as each question finishes, so a running
+    job can be read incrementally.
+    """
+    job = _get_job_or_404(job_id)
+    return {
+        "job": _job_status(job),
+        "offset": offset,
+        "results": get_job_queue().store.results(job_id, offset, min(max(limit, 1), 1000)),
+    }
+
+async def _stream_job_events(job_id: str, stream_format: str) -> AsyncIterator[str]:
+    async for job in get_job_queue().watch(job_id):
+        event = "done" if job["status"] in FINISHED_STATUSES else "progress"
+        yield _format_stream_event(event, json.loads(_job_status(job).json()), stream_format)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, stream_format: str = "sse"):
+    """
+    Subscribe to a job's progress as server-sent events or newline-delimited JSON
+
+    Sends a "progress" event with the job's status now and after every
+    change, and a "done" event when it succeeds, fails or is cancelled.
+    """
+    if stream_format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"stream_format must be one of {list(STREAM_MEDIA_TYPES)}")
+    _get_job_or_404(job_id)
+    return StreamingResponse(_stream_job_events(job_id, stream_format), media_type=STREAM_MEDIA_TYPES[stream_format])
+
+@app.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    """
+    Cancel a job
+
+    Queued jobs are cancelled at once; running jobs stop shortly after and
+    keep the results stored so far. Finished jobs cannot be cancelled.
+    """
+    job = _get_job_or_404(job_id)
+    if job["status"] in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    return _job_status(get_job_queue().cancel(job_id))
+
+def _validate_day(name: str, value: Optional[str]):
+    if value is None:
+        return
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be a date formatted as YYYY-MM-DD")
+
+@app.get("/results/leaderboard")
+async def results_leaderboard(
+    scoring_profile_version: Optional[str] = None,
+    sort_by: str = "keyword_coverage",
+    limit: int = 50
+):
+    """
+    Rank models by a mean metric over every saved result
+
+    Reads aggregates maintained as results are saved (save_to_csv=true),
+    so the response time does not grow with the number of stored
+    evaluations. Pass scoring_profile_version to compare only scores from
+    the same profile.
+    """
+    if sort_by not in LEADERBOARD_METRICS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of {list(LEADERBOARD_METRICS)}")
+    return {
+        "scoring_profile_version": scoring_profile_version,
+        "sort_by": sort_by,
+        "models": get_results_store().leaderboard(scoring_profile_version, sort_by, min(max(limit, 1), 1000)),
+    }
+
+@app.get("/results/trend")
+async def results_trend(
+    model_name: Optional[str] = None,
+    scoring_profile_version: Optional[str] = None,
+    bucket: str = "day",
+    since: Optional[str] = None,
+    until: Optional[str] = None
+):
+    """Get each model's saved results summarized per day, week or month, optionally between two dates (YYYY-MM-DD)"""
+    if bucket not in TREND_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of {list(TREND_BUCKETS)}")
+    _validate_day("since", since)
+    _validate_day("until", until)
+    return {
+        "bucket": bucket,
+        "points": get_results_store().trend(model_name, scoring_profile_version, bucket, since, until),
+    }
+
+@app.get("/results/aggregates")
+async def results_aggregates(
+    request: Request,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    model_name: Optional[List[str]] = Query(None),
+    question: Optional[List[str]] = Query(None),
+    question_hash: Optional[List[str]] = Query(None),
+    scoring_profile_version: Optional[str] = None,
+    max_points: int = 200
+):
+    """
+    Get pre-bucketed chart data over saved results
+
+    Returns per-model latency percentiles, keyword coverage histograms and
+    social impact averages, plus a time series averaged into at most
+    max_points slots per model. Filter by days (YYYY-MM-DD), models and a
+    question set (question text or question_hash, repeatable). Responses
+    carry an ETag that changes when results are added, so polling clients
+    get 304 Not Modified until there is something new.
+    """
+    _validate_day("since", since)
+    _validate_day("until", until)
+    if not 1 <= max_points <= 5000:
+        raise HTTPException(status_code=400, detail="max_points must be between 1 and 5000")
+
+    store = get_results_store()
+    question_hashes = sorted(set(question_hash or []) | {hash_question(text) for text in question or []}) or None
+    params = [since, until, sorted(model_name or []), question_hashes, scoring_profile_version, max_points]
+    etag = '"' + hashlib.sha256(json.dumps([store.version(), params]).encode("utf-8")).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(
+        store.aggregate(since, until, model_name, question_hashes, scoring_profile_version, max_points), headers=headers
+    )
+
+@app.get("/results/questions")
+async def results_questions(limit: int = 50, contains: Optional[str] = None):
+    """List the most recently benchmarked questions with the hashes used by /results/questions/{question_hash}"""
+    return get_results_store().questions(min(max(limit, 1), 1000), contains)
+
+@app.get("/results/questions/{question_hash}")
+async def results_question_comparison(question_hash: str, scoring_profile_version: Optional[str] = None):
+    """Compare every model's saved results on one question, including each model's latest answer"""
+    comparison = get_results_store().compare_question(question_hash, scoring_profile_version)
+    if comparison is None:
+        raise HTTPException(status_code=404, detail=f"Unknown question: {question_hash}")
+    return comparison
 
 @app.get("/access-to-justice-demo", response_class=HTMLResponse)
 async def access_to_justice_demo(request: Request):
     """Demo showing how AI models can help with common legal issues faced by underserved populations"""
-    return templates.TemplateResponse("access_demo.html", {"request": request})
\ No newline at end of file
+    return templates.TemplateResponse("access_demo.html", {"request": request})
+
+@app.get("/admin/models")
+async def list_models():
+    """List loaded models with their load-time and memory-footprint stats"""
+    return {
+        "registered_types": model_registry.model_types,
+        "models": model_registry.stats()
+    }
+
+@app.post("/admin/models/{model_type}/warmup")
+async def warm_up_model(model_type: str):
+    """Load a model type ahead of the first request that needs it"""
+    if model_type not in model_registry.model_types:
+        raise HTTPException(status_code=404, detail=f"Unknown model type: {model_type}")
+    return await asyncio.get_event_loop().run_in_executor(
+        None, lambda: model_registry.warm_up([model_type])[model_type]
+    )
+
+@app.post("/admin/models/{model_type}/evict")
+async def evict_model(model_type: str):
+    """Unload every instance of a model type"""
+    if model_type not in model_registry.model_types:
+        raise HTTPException(status_code=404, detail=f"Unknown model type: {model_type}")
+    return {"model_type": model_type, "evicted": model_registry.evict(model_type)}
+
+@app.post("/admin/models/{model_type}/reload")
+async def reload_model(model_type: str):
+    """Unload a model type and load it again, retrying previously failed loads"""
+    if model_type not in model_registry.model_types:
+        raise HTTPException(status_code=404, detail=f"Unknown model type: {model_type}")
+    return await asyncio.get_event_loop().run_in_executor(
+        None, lambda: model_registry.reload(model_type)
+    )
+
+@app.get("/admin/cache")
+async def cache_stats():
+    """Get response cache size and hit-rate statistics"""
+    return response_cache.stats()
+
+@app.delete("/admin/cache")
+async def clear_cache():
+    """Drop every cached model answer"""
+    response_cache.clear()
+    return response_cache.stats()
+
+@app.get("/admin/batching")
+async def batching_stats():
+    """Get micro-batching batch-size and wait-time histograms for loaded models"""
+    return {
+        model.name: model.get_batching_stats()
+        for model in model_registry.loaded_models()
+        if model.get_batching_stats() is not None
+    }
+
+@app.get("/admin/scoring-pool")
+async def scoring_pool_stats():
+    """Get scoring process pool settings and batch-size and wait-time histograms"""
+    pool = get_scoring_pool()
+    return {"enabled": True, **pool.stats()} if pool is not None else {"enabled": False}
+
+@app.get("/admin/keyword-extraction")
+async def keyword_extraction_stats():
+    """Get the keyword extraction mode, tokenizer and memoization counters"""
+    return get_keyword_extraction_stats()
+
+@app.get("/admin/result-sink")
+async def result_sink_stats():
+    """Get result sink queue depth and write counters"""
+    return result_sink.stats()
+
+@app.get("/admin/results-store")
+async def results_store_stats():
+    """Get the number of evaluations, questions and models in the results store"""
+    return get_results_store().stats()
+
+@app.get("/admin/scoring-profile")
+async def scoring_profile():
+    """Get the version and weights of the active scoring profile"""
+    return get_scoring_profile().describe()
+
+@app.post("/admin/scoring-profile/reload")
+async def reload_profile(path: Optional[str] = None):
+    """
+    Load a scoring profile without restarting
+
+    Reloads the active profile's file, or loads the file at path. If the
+    file is invalid the current profile stays active.
+    """
+    try:
+        profile = reload_scoring_profile(path)
+    except (ValueError, OSError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid scoring profile: {e}")
+    return profile.describe()
+
+@app.get("/admin/startup")
+async def startup_stats():
+    """Get import and startup timings per component, including lazy imports done since"""
+    return startup_timings.snapshot()
+
+@app.get("/admin/http")
+async def http_pool_stats():
+    """Get request, retry and hedging counters of the shared HTTP connection pool"""
+    return lazy_import("services.http_client").http_pool.stats()
+
+@app.get("/admin/retrieval")
+async def retrieval_stats():
+    """Get query, cache and latency-budget counters of the legal-corpus retriever"""
+    # Only loaded with the extractive QA models; do not build it just to report on it
+    retriever = lazy_import("utils.retrieval").peek_legal_retriever()
+    return retriever.stats() if retriever is not None else {"loaded": False}
+
+@app.get("/admin/embeddings")
+async def embedding_store_stats():
+    """Get size and hit counters of the persistent embedding store"""
+    return lazy_import("utils.embedding_store").get_embedding_store().stats()
+
+@app.get("/admin/jobs")
+async def job_queue_stats():
+    """Get background job worker settings and job counts per status"""
+    return get_job_queue().stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Get metrics in the Prometheus text format
+
+    Includes per-model and per-stage latency histograms, HTTP request
+    durations and in-flight requests, cache hit counters, executor queue
+    depth, model load times and process memory.
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
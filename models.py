@@ -10,12 +10,20 @@ class BenchmarkRequest(BaseModel):
         default=None, 
         description="Optional list of keywords expected in a good answer"
     )
+    reference_answers: Optional[List[str]] = Field(
+        default=None,
+        description="Optional gold answers; each model answer is scored by its semantic similarity to the closest one"
+    )
     
     class Config:
         schema_extra = {
             "example": {
                 "question": "What is IPC 420?",
-                "expected_keywords": ["cheating", "fraud", "dishonesty", "section 420", "imprisonment"]
+                "expected_keywords": ["cheating", "fraud", "dishonesty", "section 420", "imprisonment"],
+                "reference_answers": [
+                    "Section 420 IPC punishes cheating and dishonestly inducing delivery of property "
+                    "with imprisonment of up to seven years and a fine."
+                ]
             }
         }
 
@@ -32,6 +40,20 @@ class ModelEvaluation(BaseModel):
     confidence_score: float = Field(default=0.0, description="Confidence score based on answer characteristics (0-100)")
     metadata: Dict[str, Any] = Field(default={}, description="Additional model-specific metadata")
     social_impact_metrics: Optional[Dict[str, float]] = None
+    cache_hit: bool = Field(default=False, description="True if the answer was served from the response cache, so response_time_ms is not a model latency")
+    timed_out: bool = Field(default=False, description="True if the model exceeded its timeout and the evaluation is partial")
+    scoring_profile_version: Optional[str] = Field(default=None, description="Version of the scoring profile used to score the answer")
+    scorer_versions: Optional[Dict[str, str]] = Field(default=None, description="Version of each scorer that produced the scores; stored results are re-scored by rescore.py when one changes")
+    ttft_ms: Optional[float] = Field(default=None, description="Time to first streamed token in milliseconds (streamed answers only)")
+    output_chunks: Optional[int] = Field(default=None, description="Number of streamed text chunks (streamed answers only)")
+    output_tokens: Optional[int] = Field(default=None, description="Number of generated tokens: token ids for the local LLM, usage.completion_tokens for OpenAI-compatible APIs; None if the service does not report them")
+    tokens_per_second: Optional[float] = Field(default=None, description="Generated tokens per second after the first chunk")
+    mean_inter_chunk_ms: Optional[float] = Field(default=None, description="Mean time between streamed chunks in milliseconds")
+    started_at_ns: Optional[int] = Field(default=None, description="perf_counter_ns when the model call started")
+    first_token_at_ns: Optional[int] = Field(default=None, description="perf_counter_ns when the first chunk arrived")
+    finished_at_ns: Optional[int] = Field(default=None, description="perf_counter_ns when the model call finished")
+    semantic_similarity: Optional[float] = Field(default=None, description="Cosine similarity (-1 to 1) between the answer and the closest reference answer")
+    stage_timings_ms: Optional[Dict[str, float]] = Field(default=None, description="Milliseconds per stage: queue (waiting for an executor slot), answer or cache (the model call, including retrieval and reader for extractive QA), keyword_coverage, length, confidence, evaluation and social_impact")
 
 class BenchmarkResponse(BaseModel):
     """
@@ -43,16 +65,47 @@ class BenchmarkResponse(BaseModel):
         default=None, 
         description="Keywords that were expected in the answer"
     )
+    reference_answers: Optional[List[str]] = Field(
+        default=None,
+        description="Gold answers the semantic similarity was measured against"
+    )
 
 class ABTestConfig(BaseModel):
     """Configuration for A/B testing different model settings"""
     test_name: str = Field(..., description="Name for this A/B test")
     model_variants: List[Dict[str, Any]] = Field(..., description="List of model configurations to test")
-    evaluation_criteria: List[str] = Field(..., description="Metrics to evaluate (e.g., response_time, keyword_match)")
+    evaluation_criteria: List[str] = Field(..., description="Metrics to evaluate (e.g., response_time, keyword_match); the first one picks the winner")
+    questions: Optional[List[str]] = Field(default=None, description="Question set every variant answers (default: the request's question)")
+    repetitions: int = Field(default=5, ge=1, le=100, description="Maximum number of times each variant answers the whole question set")
+    min_repetitions: int = Field(default=2, ge=1, description="Repetitions run before the test may stop early")
+    early_stopping: bool = Field(default=True, description="Stop once the winner on the primary metric is statistically significant")
+    confidence_level: float = Field(default=0.95, gt=0, lt=1, description="Confidence level of intervals and significance tests")
+    execution_mode: str = Field(default="parallel", description="'parallel' runs variants and questions concurrently; 'sequential' runs one answer at a time")
+    use_cache: bool = Field(default=False, description="Serve repeated answers from the response cache (cached trials have no model latency)")
     
 class ABTestResult(BaseModel):
     """Results from an A/B test"""
     test_name: str = Field(..., description="Name of the test")
     variant_results: Dict[str, Dict[str, Any]] = Field(..., description="Results for each variant")
     winning_variant: str = Field(..., description="Name of the variant that performed best")
-    performance_difference: float = Field(..., description="Performance difference vs. runner-up (percentage)")
\ No newline at end of file
+    performance_difference: float = Field(..., description="Performance difference vs. runner-up (percentage)")
+    primary_metric: Optional[str] = Field(default=None, description="Criterion that decided the winner")
+    comparisons: Dict[str, Dict[str, Any]] = Field(default={}, description="Best vs. runner-up comparison and significance test per criterion")
+    significant: bool = Field(default=False, description="True if the winner is significantly better on the primary metric")
+    p_value: Optional[float] = Field(default=None, description="p-value of the winner vs. runner-up on the primary metric")
+    repetitions_completed: int = Field(default=0, description="Repetitions of the question set that were run")
+    stopped_early: bool = Field(default=False, description="True if the test stopped before all repetitions because the winner was clear")
+
+class JobStatus(BaseModel):
+    """State and progress of a background job"""
+    job_id: str = Field(..., description="Id used to poll, subscribe to, fetch or cancel the job")
+    kind: str = Field(..., description="'benchmark' or 'ab_test'")
+    status: str = Field(..., description="'queued', 'running', 'succeeded', 'failed' or 'cancelled'")
+    priority: int = Field(default=0, description="Higher priorities run first")
+    completed: int = Field(default=0, description="Questions (benchmark jobs) or repetitions (A/B tests) finished")
+    total: int = Field(default=0, description="Questions or maximum repetitions the job will run")
+    error: Optional[str] = Field(default=None, description="Why the job failed")
+    cancel_requested: bool = Field(default=False, description="True once cancellation was requested")
+    created_at: float = Field(..., description="Submission time (Unix seconds)")
+    started_at: Optional[float] = Field(default=None, description="Time the current run started (Unix seconds)")
+    finished_at: Optional[float] = Field(default=None, description="Time the job finished (Unix seconds)")
@@ -1,86 +1,544 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Optional
+import os
+import threading
 import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 from models import ModelEvaluation
 from services.base_service import ModelService
-from utils.text_analysis import calculate_keyword_coverage, assess_length, calculate_confidence_score
-from utils.social_impact import evaluate_social_impact
+from benchmarker import score_answer
+from scoring_pool import get_scoring_pool
+from services.batching import MICRO_BATCH_MAX_SIZE
+from utils.metrics import metrics_registry
+from utils.scoring_profile import CompiledScoringProfile, get_scoring_profile
+from utils.timing import GenerationTimer
+
+EXECUTION_MODES = ("parallel", "sequential")
+
+# Local torch models already use every core for a single forward pass, so
+# they must never run several passes at once. Their micro-batcher runs one
+# pass at a time, so up to a batch worth of callers may wait on it; without
+# batching only one call may be in flight. Remote APIs spend their time
+# waiting on the network and can fan out wide.
+LOCAL_MODEL_CONCURRENCY = int(os.environ.get("LOCAL_MODEL_CONCURRENCY", str(MICRO_BATCH_MAX_SIZE)))
+REMOTE_MODEL_CONCURRENCY = int(os.environ.get("REMOTE_MODEL_CONCURRENCY", "16"))
+DEFAULT_MODEL_TIMEOUT_SECONDS = float(os.environ.get("MODEL_TIMEOUT_SECONDS", "60"))
+
+DEFAULT_PROVIDER_LIMITS = {
+    "llm": LOCAL_MODEL_CONCURRENCY,
+    "huggingface": LOCAL_MODEL_CONCURRENCY,
+    "optimized_huggingface": LOCAL_MODEL_CONCURRENCY,
+    "openai": REMOTE_MODEL_CONCURRENCY,
+    "simplified": os.cpu_count() or 4,
+    # HTTP providers cap their own upstream calls (max_in_flight) and share
+    # identical in-flight requests, so waiting callers are cheap
+    "http": int(os.environ.get("HTTP_PROVIDER_CONCURRENCY", "256")),
+}
+
+class _CountingThreadPool(ThreadPoolExecutor):
+    """Thread pool that counts submitted calls no thread has started yet"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._queued = 0
+        self._queued_lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def _count_queued(self, delta: int):
+        with self._queued_lock:
+            self._queued += delta
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        def run():
+            self._count_queued(-1)
+            return fn(*args, **kwargs)
+
+        self._count_queued(1)
+        try:
+            future = super().submit(run)
+        except BaseException:
+            self._count_queued(-1)
+            raise
+        # Calls cancelled before a thread picked them up never run
+        future.add_done_callback(lambda done: done.cancelled() and self._count_queued(-1))
+        return future
+
+class BenchmarkExecutor:
+    """
+    Long-lived execution engine for benchmark runs.
+
+    Keeps a single thread pool for the lifetime of the process and limits
+    how many calls each provider may have in flight at once.
+
+    A timeout stops waiting for a model but cannot cancel a call that a
+    thread has already started: the call keeps its thread and its provider
+    slot until it returns, and is counted as abandoned until then.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        provider_limits: Optional[Dict[str, int]] = None,
+        default_timeout: float = DEFAULT_MODEL_TIMEOUT_SECONDS,
+        thread_name_prefix: str = "benchmark"
+    ):
+        """
+        Initialize the executor
+
+        Args:
+            max_workers: Size of the shared thread pool
+            provider_limits: Maximum concurrent calls per provider (model_type)
+            default_timeout: Per-model timeout in seconds
+            thread_name_prefix: Name prefix of the pool's threads
+        """
+        self._provider_limits = dict(DEFAULT_PROVIDER_LIMITS)
+        self._provider_limits.update(provider_limits or {})
+        self._default_timeout = default_timeout
+        self._max_workers = max_workers or int(os.environ.get("BENCHMARK_MAX_WORKERS", "32"))
+        self._executor = _CountingThreadPool(
+            max_workers=self._max_workers,
+            thread_name_prefix=thread_name_prefix
+        )
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._semaphores_lock = threading.Lock()
+        # asyncio semaphores belong to one event loop, so async providers get one set per loop
+        self._async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+        self._in_flight: Dict[str, int] = {}
+        self._abandoned: Dict[str, int] = {}
+        self._abandoned_calls: Set[Future] = set()
+        self._in_flight_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        return self._executor
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def queue_depth(self) -> int:
+        """Calls submitted to the thread pool that no thread has picked up yet"""
+        return self._executor.queued
+
+    def in_flight(self) -> Dict[str, int]:
+        """Model calls started and not yet finished (including those queued and abandoned), per provider"""
+        with self._in_flight_lock:
+            return dict(self._in_flight)
+
+    def abandoned(self) -> Dict[str, int]:
+        """Model calls still running on a thread after their timeout expired, per provider"""
+        with self._in_flight_lock:
+            return dict(self._abandoned)
+
+    def _track_in_flight(self, provider: str, delta: int):
+        with self._in_flight_lock:
+            self._in_flight[provider] = self._in_flight.get(provider, 0) + delta
+
+    def _submit_model_call(self, provider: str, fn: Callable, *args) -> Future:
+        """
+        Run a model call on the pool within the provider's concurrency limit
+
+        The provider slot is taken by the thread that runs the call and
+        given back when the call's future finishes, so a call abandoned by
+        its caller still holds the slot for as long as it runs.
+        """
+        semaphore = self._semaphore_for(provider)
+        acquired = threading.Event()
+
+        def call(submitted_at: float):
+            semaphore.acquire()
+            acquired.set()
+            # Time waiting for a pool thread and then for a provider slot
+            return fn(*args, (time.perf_counter() - submitted_at) * 1000)
+
+        def finished(future: Future):
+            if acquired.is_set():
+                semaphore.release()
+            with self._in_flight_lock:
+                self._in_flight[provider] -= 1
+                if future in self._abandoned_calls:
+                    self._abandoned_calls.discard(future)
+                    self._abandoned[provider] -= 1
+
+        self._track_in_flight(provider, 1)
+        future = self._executor.submit(call, time.perf_counter())
+        future.add_done_callback(finished)
+        return future
+
+    def _abandon(self, provider: str, future: Future):
+        """Count a timed-out call as abandoned until its thread finishes it"""
+        with self._in_flight_lock:
+            # The done callback takes this lock too, so a finished call is not counted
+            if not future.done():
+                self._abandoned_calls.add(future)
+                self._abandoned[provider] = self._abandoned.get(provider, 0) + 1
+
+    def _semaphore_for(self, provider: str) -> threading.BoundedSemaphore:
+        with self._semaphores_lock:
+            if provider not in self._semaphores:
+                limit = self._provider_limits.get(provider, 4)
+                self._semaphores[provider] = threading.BoundedSemaphore(max(1, limit))
+            return self._semaphores[provider]
+
+    def _async_semaphore_for(self, provider: str) -> asyncio.Semaphore:
+        semaphores = self._async_semaphores.setdefault(asyncio.get_running_loop(), {})
+        if provider not in semaphores:
+            semaphores[provider] = asyncio.Semaphore(max(1, self._provider_limits.get(provider, 4)))
+        return semaphores[provider]
+
+    async def _run_async_limited(
+        self,
+        question: str,
+        model: ModelService,
+        expected_keywords: Optional[List[str]],
+        use_cache: bool,
+        profile: Optional[CompiledScoringProfile],
+        stream: bool,
+        on_token: Optional[Callable[[str], None]]
+    ) -> ModelEvaluation:
+        provider = model.get_metadata().get("model_type", "unknown")
+        timer = GenerationTimer()
+        queued_at = time.perf_counter()
+        async with self._async_semaphore_for(provider):
+            queue_ms = (time.perf_counter() - queued_at) * 1000
+            timer.start()
+            answer, cache_hit, details = await model.aget_cached_answer_details(
+                question, use_cache, _chunk_recorder(timer, on_token) if stream else None
+            )
+            timer.finish()
+
+        return await self._score(
+            question, model, answer, cache_hit, details, timer, expected_keywords, profile, stream, {"queue": queue_ms}
+        )
+
+    async def _score(
+        self,
+        question: str,
+        model: ModelService,
+        answer: str,
+        cache_hit: bool,
+        details: Dict,
+        timer: GenerationTimer,
+        expected_keywords: Optional[List[str]],
+        profile: Optional[CompiledScoringProfile],
+        stream: bool,
+        stage_timings: Dict[str, float]
+    ) -> ModelEvaluation:
+        """Score an answer on the scoring pool if there is one, else on this executor's threads"""
+        timing = timer.as_fields(streamed=stream and not cache_hit and model.supports_streaming())
+        pool = get_scoring_pool()
+        loop = asyncio.get_running_loop()
+        if pool is None:
+            # Scoring is CPU work; keep it off the event loop
+            return await loop.run_in_executor(
+                self._executor, score_answer,
+                question, model, answer, timer.elapsed_ms, expected_keywords, cache_hit, profile,
+                timing, details, stage_timings
+            )
+
+        submitted_at = time.perf_counter()
+        scores = await asyncio.wrap_future(pool.score(question, answer, timer.elapsed_ms, expected_keywords, profile))
+        # Time waiting for a batch and a worker process, and for the results to come back
+        stage_timings["scoring_wait"] = max(
+            0.0, (time.perf_counter() - submitted_at) * 1000 - sum(scores[1].values())
+        )
+        # Building the evaluation from finished scores is cheap enough for the event loop
+        return score_answer(
+            question, model, answer, timer.elapsed_ms, expected_keywords, cache_hit, profile,
+            timing, details, stage_timings, scores
+        )
+
+    @staticmethod
+    def _answer(
+        question: str,
+        model: ModelService,
+        use_cache: bool,
+        stream: bool,
+        on_token: Optional[Callable[[str], None]],
+        queue_ms: float
+    ) -> Tuple[str, bool, Dict, GenerationTimer, float]:
+        timer = GenerationTimer().start()
+        answer, cache_hit, details = model.get_cached_answer_details(
+            question, use_cache, _chunk_recorder(timer, on_token) if stream else None
+        )
+        timer.finish()
+        return answer, cache_hit, details, timer, queue_ms
+
+    async def _score_pooled(
+        self,
+        call: Future,
+        question: str,
+        model: ModelService,
+        expected_keywords: Optional[List[str]],
+        profile: Optional[CompiledScoringProfile],
+        stream: bool
+    ) -> ModelEvaluation:
+        # The thread only waits on the model; scoring happens in the scoring processes
+        answer, cache_hit, details, timer, queue_ms = await asyncio.wrap_future(call)
+        return await self._score(
+            question, model, answer, cache_hit, details, timer, expected_keywords, profile, stream, {"queue": queue_ms}
+        )
+
+    @staticmethod
+    def _benchmark(
+        question: str,
+        model: ModelService,
+        expected_keywords: Optional[List[str]],
+        use_cache: bool,
+        profile: Optional[CompiledScoringProfile],
+        stream: bool,
+        on_token: Optional[Callable[[str], None]],
+        queue_ms: float
+    ) -> ModelEvaluation:
+        return benchmark_single_model(
+            question, model, expected_keywords, use_cache, profile, stream, on_token, {"queue": queue_ms}
+        )
+
+    async def run_model(
+        self,
+        question: str,
+        model: ModelService,
+        expected_keywords: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+        profile: Optional[CompiledScoringProfile] = None,
+        stream: bool = False,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> ModelEvaluation:
+        """
+        Benchmark one model, enforcing its timeout
+
+        Synchronous services run on the shared pool; async-native services
+        are awaited directly and only their scoring uses the pool. With a
+        scoring pool configured (SCORING_PROCESSES), answers are scored in
+        its worker processes instead of on the pool's threads. With
+        stream set, the answer is streamed so time to first token and token
+        rates are measured, and on_token receives each chunk (possibly from
+        a worker thread).
+
+        The timeout does not cancel a synchronous model call that a thread
+        has already started. The call runs to completion in the background,
+        keeping its thread and provider slot, and is reported by abandoned()
+        until it returns.
+
+        Returns:
+            The model evaluation, or a partial evaluation marked as timed out
+        """
+        timeout = timeout or self._default_timeout
+        provider = model.get_metadata().get("model_type", "unknown")
+        if model.is_async_native():
+            # Network-bound services wait on the event loop instead of holding
+            # a thread, and the timeout does cancel them
+            self._track_in_flight(provider, 1)
+            try:
+                return await asyncio.wait_for(
+                    self._run_async_limited(question, model, expected_keywords, use_cache, profile, stream, on_token),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                return timed_out_evaluation(model, timeout)
+            finally:
+                self._track_in_flight(provider, -1)
+
+        if get_scoring_pool() is not None:
+            call = self._submit_model_call(provider, self._answer, question, model, use_cache, stream, on_token)
+            run = self._score_pooled(call, question, model, expected_keywords, profile, stream)
+        else:
+            call = self._submit_model_call(
+                provider, self._benchmark, question, model, expected_keywords, use_cache, profile, stream, on_token
+            )
+            run = asyncio.wrap_future(call)
+        try:
+            return await asyncio.wait_for(run, timeout)
+        except asyncio.TimeoutError:
+            self._abandon(provider, call)
+            return timed_out_evaluation(model, timeout)
+
+    async def benchmark(
+        self,
+        question: str,
+        models: List[ModelService],
+        expected_keywords: Optional[List[str]] = None,
+        mode: str = "parallel",
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+        profile: Optional[CompiledScoringProfile] = None,
+        stream: bool = False,
+        on_token: Optional[Callable[[ModelService, str], None]] = None
+    ) -> List[ModelEvaluation]:
+        """
+        Benchmark models on a question in parallel or sequential mode
+
+        Sequential mode runs one model at a time so latency numbers are
+        measured without contention between models.
+
+        Args:
+            question: The question to answer
+            models: List of model services to benchmark
+            expected_keywords: Optional list of keywords expected in good answers
+            mode: "parallel" or "sequential"
+            timeout: Per-model timeout in seconds
+            use_cache: Serve deterministic models from the response cache
+            profile: Scoring profile; captured once so every model in the
+                response is scored with the same version
+            stream: Stream answers to measure time to first token and token rates
+            on_token: Called with (model, chunk) for every streamed chunk
+
+        Returns:
+            List of model evaluations, in the same order as models
+        """
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unsupported execution mode: {mode}")
+        profile = profile or get_scoring_profile()
+
+        def run(model: ModelService):
+            model_on_token = (lambda chunk: on_token(model, chunk)) if on_token else None
+            return self.run_model(
+                question, model, expected_keywords, timeout, use_cache, profile,
+                stream=stream or on_token is not None, on_token=model_on_token
+            )
+
+        if mode == "sequential":
+            results = []
+            for model in models:
+                results.append(await run(model))
+            return results
+
+        return list(await asyncio.gather(*[run(model) for model in models]))
+
+    def shutdown(self):
+        """Stop accepting work and release the thread pool"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+benchmark_executor = BenchmarkExecutor()
+
+# Background jobs get their own pool and half of each provider's slots, so
+# interactive requests never wait behind a long suite's queued calls; at
+# most they share a local model's forward pass with it
+background_executor = BenchmarkExecutor(
+    max_workers=int(os.environ.get("BACKGROUND_MAX_WORKERS", "8")),
+    provider_limits={provider: max(1, limit // 2) for provider, limit in DEFAULT_PROVIDER_LIMITS.items()},
+    thread_name_prefix="background"
+)
+
+_EXECUTORS = {"interactive": benchmark_executor, "background": background_executor}
+
+metrics_registry.callback(
+    "benchmark_executor_queue_depth", "Model calls waiting for a thread in each benchmark thread pool",
+    lambda: [({"executor": name}, executor.queue_depth()) for name, executor in _EXECUTORS.items()]
+)
+metrics_registry.callback(
+    "benchmark_executor_threads", "Size of each benchmark thread pool",
+    lambda: [({"executor": name}, executor.max_workers) for name, executor in _EXECUTORS.items()]
+)
+metrics_registry.callback(
+    "benchmark_model_calls_abandoned", "Model calls still running on a thread after their timeout expired",
+    lambda: [
+        ({"executor": name, "provider": provider}, count)
+        for name, executor in _EXECUTORS.items()
+        for provider, count in executor.abandoned().items()
+    ]
+)
+metrics_registry.callback(
+    "benchmark_model_calls_in_flight", "Model calls started and not yet finished, including queued and abandoned calls",
+    lambda: [
+        ({"executor": name, "provider": provider}, count)
+        for name, executor in _EXECUTORS.items()
+        for provider, count in executor.in_flight().items()
+    ]
+)
 
 async def benchmark_models_parallel(
-    question: str, 
+    question: str,
     models: List[ModelService],
     expected_keywords: Optional[List[str]] = None
 ) -> List[ModelEvaluation]:
     """
     Benchmark multiple models in parallel on a given question.
-    
+
     Args:
         question: The question to answer
         models: List of model services to benchmark
         expected_keywords: Optional list of keywords expected in good answers
-        
+
     Returns:
         List of model evaluations
     """
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as executor:
-        tasks = [
-            loop.run_in_executor(
-                executor,
-                lambda m=model: benchmark_single_model(question, m, expected_keywords)
-            )
-            for model in models
-        ]
-        results = await asyncio.gather(*tasks)
-    return results
+    return await benchmark_executor.benchmark(question, models, expected_keywords)
+
+def timed_out_evaluation(model: ModelService, timeout: float) -> ModelEvaluation:
+    """
+    Build the partial evaluation reported for a model that exceeded its timeout
+
+    Args:
+        model: Model service that timed out
+        timeout: The timeout that was exceeded, in seconds
+
+    Returns:
+        Model evaluation with an empty answer and the timeout marker set
+    """
+    metadata = dict(model.get_metadata())
+    metadata["timeout_seconds"] = timeout
+    return ModelEvaluation(
+        model_name=model.name,
+        answer="",
+        keyword_coverage=0.0,
+        keywords_found=[],
+        length_category="too_short",
+        response_time_ms=int(timeout * 1000),
+        confidence_score=0.0,
+        metadata=metadata,
+        timed_out=True
+    )
 
 def benchmark_single_model(
-    question: str, 
+    question: str,
     model: ModelService,
-    expected_keywords: Optional[List[str]] = None
+    expected_keywords: Optional[List[str]] = None,
+    use_cache: bool = True,
+    profile: Optional[CompiledScoringProfile] = None,
+    stream: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+    stage_timings: Optional[Dict[str, float]] = None
 ) -> ModelEvaluation:
     """
     Benchmark a single model on a question
-    
+
     Args:
         question: The question to answer
         model: Model service to benchmark
         expected_keywords: Optional list of keywords expected in good answers
-        
+        use_cache: Serve deterministic models from the response cache
+        profile: Scoring profile (default: active profile)
+        stream: Stream the answer to measure time to first token and token rates
+        on_token: Called with each streamed chunk
+        stage_timings: Durations in milliseconds of stages before the call,
+            added to the evaluation's stage breakdown
+
     Returns:
         Model evaluation
     """
-    normalized_keywords = [k.lower() for k in expected_keywords] if expected_keywords else []
-    
-    start_time = time.time()
-    answer = model.get_answer(question)
-    end_time = time.time()
-    response_time_ms = int((end_time - start_time) * 1000)
-    
-    if normalized_keywords:
-        keyword_coverage, keywords_found = calculate_keyword_coverage(answer, normalized_keywords)
-    else:
-        from utils.text_analysis import extract_keywords
-        potential_keywords = extract_keywords(question)
-        keyword_coverage, keywords_found = calculate_keyword_coverage(answer, potential_keywords)
-    
-    length_category = assess_length(answer)
-    
-    confidence_score = calculate_confidence_score(answer)
-    
-    result = ModelEvaluation(
-        model_name=model.name,
-        answer=answer,
-        keyword_coverage=keyword_coverage,
-        keywords_found=keywords_found,
-        length_category=length_category,
-        response_time_ms=response_time_ms,
-        confidence_score=confidence_score,
-        metadata=model.get_metadata()
+    timer = GenerationTimer().start()
+    answer, cache_hit, details = model.get_cached_answer_details(
+        question, use_cache, _chunk_recorder(timer, on_token) if stream else None
+    )
+    timer.finish()
+
+    return score_answer(
+        question, model, answer, timer.elapsed_ms, expected_keywords, cache_hit, profile,
+        timer.as_fields(streamed=stream and not cache_hit and model.supports_streaming()), details,
+        stage_timings
     )
-    
-    result.social_impact_metrics = evaluate_social_impact(result)
-    
-    return result
\ No newline at end of file
+
+def _chunk_recorder(timer: GenerationTimer, on_token: Optional[Callable[[str], None]]) -> Callable[[str], None]:
+    def record(chunk: str):
+        timer.chunk(chunk)
+        # Empty chunks only carry token counts
+        if on_token is not None and chunk:
+            on_token(chunk)
+    return record
\ No newline at end of file
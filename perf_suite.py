@@ -0,0 +1,300 @@
+"""
+Performance suite for the benchmarker's own overhead.
+
+Times the scoring functions, ModelEvaluation construction and
+serialization, and end-to-end /benchmark and /batch-benchmark throughput
+with the rule-based model and a model with injected latency. Results are
+written as a JSON baseline; a later run can be compared against it and
+fails when any case is slower by more than the threshold.
+
+Usage:
+    python perf_suite.py --save logs/perf/baseline.json
+    python perf_suite.py --compare logs/perf/baseline.json --threshold 0.15
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from benchmarker import score_answer
+from models import ModelEvaluation
+from services.base_service import ModelService
+from services.model_registry import model_registry
+from services.simplified_service import SimplifiedModelService
+from utils.scoring_profile import get_scoring_profile
+from utils.social_impact import evaluate_social_impact
+from utils.text_analysis import (
+    KEYWORD_EXTRACTION, KEYWORD_TOKENIZER, _extract_keywords, calculate_confidence_score, calculate_keyword_coverage,
+    extract_keywords
+)
+
+QUESTION = "What is the punishment for cheating under Section 420 of the Indian Penal Code?"
+ANSWER = (
+    "Section 420 of the Indian Penal Code deals with cheating and dishonestly inducing delivery of property. "
+    "The punishment is imprisonment of up to seven years and a fine. You should file an FIR at the nearest "
+    "police station and keep copies of all documents. Contact the District Legal Services Authority for free "
+    "legal aid if you cannot afford a lawyer."
+)
+KEYWORDS = ["cheating", "fraud", "dishonesty", "section 420", "imprisonment", "fine", "fir"]
+BATCH_QUESTIONS = [
+    "What is IPC 420?", "What is IPC 302?", "How do I file an FIR?", "What is anticipatory bail?",
+    "How do I file an RTI application?", "What are my rights as a tenant?", "Is dowry a crime?",
+    "What is section 34 of IPC?",
+]
+
+class LatencyInjectingService(ModelService):
+    """Model stand-in that answers after a fixed delay, so harness overhead can be measured against real waits"""
+
+    def __init__(self, latency_ms: float = 20.0, answer: str = ANSWER):
+        self.latency_ms = latency_ms
+        self._answer = answer
+
+    @property
+    def name(self) -> str:
+        return f"Latency stub ({self.latency_ms:g}ms)"
+
+    def get_answer(self, question: str) -> str:
+        time.sleep(self.latency_ms / 1000)
+        return self._answer
+
+    def get_metadata(self) -> Dict[str, Any]:
+        return {"model_type": "latency_stub", "latency_ms": self.latency_ms}
+
+def measure(func: Callable[[], Any], repeats: int = 5, min_time: float = 0.2, ops_per_call: int = 1) -> Dict[str, Any]:
+    """
+    Time a function the way timeit does
+
+    The number of calls per repeat is doubled until a repeat takes at least
+    min_time, so fast functions are not dominated by timer resolution.
+
+    Args:
+        func: Function to time; called with no arguments
+        repeats: Timed repeats; the median is the headline number
+        min_time: Minimum duration of one repeat in seconds
+        ops_per_call: Operations done by one call (e.g. questions in a batch)
+
+    Returns:
+        Dictionary with seconds per operation (median, min, mean), ops_per_sec and loop counts
+    """
+    func()  # warm up caches and lazy imports
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    per_op = [elapsed / (loops * ops_per_call)]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        per_op.append((time.perf_counter() - start) / (loops * ops_per_call))
+
+    median = statistics.median(per_op)
+    return {
+        "median_s": median,
+        "min_s": min(per_op),
+        "mean_s": statistics.mean(per_op),
+        "ops_per_sec": 1.0 / median if median else None,
+        "loops": loops,
+        "repeats": repeats,
+    }
+
+@contextlib.contextmanager
+def benchmark_models_overridden(models: List[ModelService]) -> Iterator[None]:
+    """Make the benchmark endpoints use the given models instead of the registry's default set"""
+    model_registry.get_benchmark_models = lambda: models
+    try:
+        yield
+    finally:
+        # Uncover the class's method again
+        del model_registry.get_benchmark_models
+
+def _endpoint_case(path: str, body: Any, concurrency: int) -> Callable[[], None]:
+    from main import app
+
+    async def send_all():
+        async with httpx.AsyncClient(app=app, base_url="http://perf") as client:
+            responses = await asyncio.gather(*[
+                client.post(path, params={"use_cache": "false"}, json=body) for _ in range(concurrency)
+            ])
+        for response in responses:
+            response.raise_for_status()
+
+    return lambda: asyncio.run(send_all())
+
+def build_cases() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the suite's cases
+
+    Returns:
+        Case name -> {"func": callable, "ops_per_call": int, "models": models
+        used by the endpoints, or None}
+    """
+    profile = get_scoring_profile()
+    rules = SimplifiedModelService()
+    stub = LatencyInjectingService()
+    evaluation = score_answer(QUESTION, rules, ANSWER, 120, KEYWORDS, profile=profile)
+    fields = evaluation.dict()
+    batch = [{"question": question, "expected_keywords": KEYWORDS[:3]} for question in BATCH_QUESTIONS]
+
+    return {
+        "keyword_coverage": {"func": lambda: calculate_keyword_coverage(ANSWER, KEYWORDS)},
+        "extract_keywords": {"func": lambda: extract_keywords(QUESTION)},
+        # The memoized path above is what scoring uses; this one times the extraction itself
+        "extract_keywords_uncached": {
+            "func": lambda: _extract_keywords.__wrapped__(QUESTION, 5, KEYWORD_EXTRACTION, KEYWORD_TOKENIZER)
+        },
+        "confidence_score": {"func": lambda: calculate_confidence_score(ANSWER, profile)},
+        "social_impact": {"func": lambda: evaluate_social_impact(evaluation, profile)},
+        "evaluation_construct": {"func": lambda: ModelEvaluation(**fields)},
+        "evaluation_serialize": {"func": evaluation.json},
+        "score_answer": {"func": lambda: score_answer(QUESTION, rules, ANSWER, 120, KEYWORDS, profile=profile)},
+        "benchmark_endpoint_simplified": {
+            "func": _endpoint_case("/benchmark", {"question": QUESTION, "expected_keywords": KEYWORDS}, 8),
+            "ops_per_call": 8,
+            "models": [rules],
+        },
+        "benchmark_endpoint_latency_stub": {
+            "func": _endpoint_case("/benchmark", {"question": QUESTION, "expected_keywords": KEYWORDS}, 8),
+            "ops_per_call": 8,
+            "models": [rules, stub],
+        },
+        "batch_benchmark_endpoint": {
+            "func": _endpoint_case("/batch-benchmark", batch, 1),
+            "ops_per_call": len(batch),
+            "models": [rules, stub],
+        },
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_suite(only: Optional[List[str]] = None, repeats: int = 5, min_time: float = 0.2) -> Dict[str, Any]:
+    """
+    Run the suite
+
+    Args:
+        only: Case names to run (default: all)
+        repeats: Timed repeats per case
+        min_time: Minimum duration of one repeat in seconds
+
+    Returns:
+        Baseline document: environment details and per-case timings
+
+    Raises:
+        ValueError: If only names an unknown case
+    """
+    cases = build_cases()
+    unknown = sorted(set(only or []) - set(cases))
+    if unknown:
+        raise ValueError(f"Unknown cases {unknown}; choose from {list(cases)}")
+
+    results = {}
+    for name, case in cases.items():
+        if only and name not in only:
+            continue
+        models = case.get("models")
+        with benchmark_models_overridden(models) if models else contextlib.nullcontext():
+            results[name] = measure(case["func"], repeats, min_time, case.get("ops_per_call", 1))
+
+    return {
+        "created_at": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Compare a run with a baseline
+
+    Args:
+        current: Document returned by run_suite
+        baseline: Earlier document
+        threshold: Relative slowdown of the median beyond which a case regressed (0.1 = 10%)
+
+    Returns:
+        One entry per case present in both, with the baseline and current
+        medians, the relative change (positive is slower) and a regressed flag
+    """
+    comparison = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        change = result["median_s"] / before["median_s"] - 1.0 if before["median_s"] else 0.0
+        comparison.append({
+            "case": name,
+            "baseline_s": before["median_s"],
+            "current_s": result["median_s"],
+            "change": change,
+            "regressed": change > threshold,
+        })
+    return comparison
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds * 1e6:.1f}us"
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the benchmarker's own overhead and compare with a baseline")
+    parser.add_argument("--save", help="Write the results to this JSON baseline file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against; exits with 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown counted as a regression (default: 0.1)")
+    parser.add_argument("--only", help="Comma-separated case names")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed repeats per case")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per repeat")
+    args = parser.parse_args()
+
+    only = [name.strip() for name in args.only.split(",")] if args.only else None
+    current = run_suite(only, args.repeats, args.min_time)
+
+    for name, result in current["results"].items():
+        print(f"{name:32} {_format_seconds(result['median_s']):>10}/op  {result['ops_per_sec']:>12.1f} ops/sec")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Saved: {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        comparison = compare(current, baseline, args.threshold)
+        print(f"\nCompared with {args.compare} (commit {baseline.get('git_commit')}), threshold {args.threshold:.0%}:")
+        for entry in comparison:
+            flag = "REGRESSION" if entry["regressed"] else ""
+            print(f"{entry['case']:32} {_format_seconds(entry['baseline_s']):>10} -> "
+                  f"{_format_seconds(entry['current_s']):>10}  {entry['change']:+7.1%}  {flag}")
+        if any(entry["regressed"] for entry in comparison):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Re-score stored answers after a scorer changes, without calling any model.
+
+Answer generation and scoring are separate steps: benchmark results saved
+to the results store keep each answer once (by content hash) and the
+scorer versions it was scored with. This command finds the evaluations
+whose version of a scorer is out of date, scores each distinct input once
+on a pool of worker processes, and stores the new values per scorer
+version next to the original scores.
+
+Bump a scorer's entry in utils.scoring_profile.SCORER_CODE_VERSIONS when
+its code changes; lexicon, weight, confidence-rule, keyword match mode and
+keyword extraction (mode, tokenizer, IDF table) changes are picked up
+automatically.
+
+Usage:
+    python rescore.py --processes 8
+    python rescore.py --only confidence_score,social_impact --dry-run
+"""
+import argparse
+import os
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.results_store import ResultsStore, get_results_store
+from utils.scoring_profile import CompiledScoringProfile, ScoringProfile, get_scoring_profile
+from utils.text_analysis import KEYWORD_EXTRACTION, get_idf_table, set_idf_table
+
+# Metrics each scorer writes, in the order scorers run; social_impact runs
+# after language_simplicity so it can reuse the new simplicity values
+SCORER_METRICS = {
+    "keyword_coverage": ("keyword_coverage", "keywords_found"),
+    "length_category": ("length_category",),
+    "confidence_score": ("confidence_score",),
+    "language_simplicity": ("language_simplicity",),
+    "social_impact": ("actionable_guidance", "cultural_relevance", "accessibility", "overall_social_impact"),
+}
+
+@lru_cache(maxsize=4)
+def _compiled_profile(profile_json: str) -> CompiledScoringProfile:
+    # Compiled once per worker process rather than once per batch
+    return CompiledScoringProfile(ScoringProfile.parse_raw(profile_json))
+
+def _input_key(scorer: str, evaluation: Dict[str, Any]) -> Tuple[Any, ...]:
+    """What a scorer's output depends on; evaluations with the same key are scored once"""
+    if scorer == "keyword_coverage":
+        return evaluation["answer_hash"], evaluation["expected_keywords"] or evaluation["question_hash"]
+    if scorer == "social_impact":
+        return evaluation["answer_hash"], evaluation["response_time_ms"], evaluation["language_simplicity"]
+    return (evaluation["answer_hash"],)
+
+def score_batch(
+    scorer: str,
+    inputs: Sequence[Dict[str, Any]],
+    profile_json: str,
+    keyword_match_mode: Optional[str] = None,
+    keyword_extraction: Optional[str] = None,
+    keyword_tokenizer: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Score a batch of stored answers with one scorer
+
+    Runs in the worker processes, so it takes and returns only plain data.
+
+    Args:
+        scorer: One of SCORER_METRICS
+        inputs: Dicts with answer, question, expected_keywords,
+            response_time_ms and language_simplicity (None if unknown)
+        profile_json: Scoring profile definition as JSON
+        keyword_match_mode: Keyword match mode (default: KEYWORD_MATCH_MODE)
+        keyword_extraction: Keyword extraction mode (default: KEYWORD_EXTRACTION)
+        keyword_tokenizer: Keyword extraction tokenizer (default: KEYWORD_TOKENIZER)
+
+    Returns:
+        Metric -> value for each input, in order
+    """
+    from utils.social_impact import calculate_simplicity_score, score_social_impact_batch
+    from utils.text_analysis import assess_length, calculate_confidence_score, calculate_keyword_coverage, extract_keywords
+
+    profile = _compiled_profile(profile_json)
+    answers = [item["answer"] for item in inputs]
+
+    if scorer == "keyword_coverage":
+        results = []
+        for item in inputs:
+            # Same keywords as score_answer: the expected ones, else the question's own
+            keywords = [k.strip().lower() for k in (item["expected_keywords"] or "").split(",") if k.strip()]
+            coverage, found = calculate_keyword_coverage(
+                item["answer"],
+                keywords or extract_keywords(item["question"], mode=keyword_extraction, tokenizer=keyword_tokenizer),
+                keyword_match_mode
+            )
+            results.append({"keyword_coverage": coverage, "keywords_found": ",".join(found)})
+        return results
+    if scorer == "length_category":
+        return [{"length_category": assess_length(answer)} for answer in answers]
+    if scorer == "confidence_score":
+        return [{"confidence_score": calculate_confidence_score(answer, profile)} for answer in answers]
+    if scorer == "language_simplicity":
+        return [{"language_simplicity": calculate_simplicity_score(answer)} for answer in answers]
+    if scorer == "social_impact":
+        simplicity = [
+            item["language_simplicity"] if item["language_simplicity"] is not None
+            else calculate_simplicity_score(item["answer"])
+            for item in inputs
+        ]
+        metrics = score_social_impact_batch(answers, [item["response_time_ms"] for item in inputs], simplicity, profile)
+        return [
+            {metric: float(metrics[metric][i]) for metric in SCORER_METRICS["social_impact"]}
+            for i in range(len(inputs))
+        ]
+    raise ValueError(f"Unknown scorer: {scorer}")
+
+class _InlineExecutor(Executor):
+    """Runs submitted calls immediately, for processes=1"""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+def rescore(
+    store: Optional[ResultsStore] = None,
+    scorers: Optional[Sequence[str]] = None,
+    processes: Optional[int] = None,
+    batch_size: int = 256,
+    page_size: int = 10000,
+    profile: Optional[CompiledScoringProfile] = None,
+    keyword_match_mode: Optional[str] = None,
+    keyword_extraction: Optional[str] = None,
+    keyword_tokenizer: Optional[str] = None,
+    dry_run: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Re-score every evaluation whose scorer versions are out of date
+
+    Args:
+        store: Results store (default: the process-wide one)
+        scorers: Scorers to run (default: all of SCORER_METRICS)
+        processes: Worker processes (default: CPU count); 1 scores in this process
+        batch_size: Distinct inputs sent to a worker at once
+        page_size: Stale evaluations read from the store at once
+        profile: Scoring profile (default: active profile)
+        keyword_match_mode: Keyword match mode (default: KEYWORD_MATCH_MODE)
+        keyword_extraction: Keyword extraction mode (default: KEYWORD_EXTRACTION)
+        keyword_tokenizer: Keyword extraction tokenizer (default: KEYWORD_TOKENIZER)
+        dry_run: Only count stale evaluations
+
+    Returns:
+        Per scorer: its version, the stale evaluations found, the distinct
+        inputs scored and the seconds taken
+
+    Raises:
+        ValueError: If scorers names an unknown scorer
+    """
+    unknown = sorted(set(scorers or []) - set(SCORER_METRICS))
+    if unknown:
+        raise ValueError(f"Unknown scorers {unknown}; choose from {list(SCORER_METRICS)}")
+    store = store or get_results_store()
+    profile = profile or get_scoring_profile()
+    versions = profile.scorer_versions(keyword_match_mode, keyword_extraction, keyword_tokenizer)
+    profile_json = profile.profile.json()
+    processes = processes or os.cpu_count() or 1
+
+    summary = {}
+    if processes == 1:
+        executor = _InlineExecutor()
+    else:
+        # Workers extract keywords with the IDF table the version was computed from
+        idf_table = get_idf_table() if (keyword_extraction or KEYWORD_EXTRACTION) == "tfidf" else None
+        executor = ProcessPoolExecutor(max_workers=processes, initializer=set_idf_table, initargs=(idf_table,))
+    with executor:
+        for scorer, metrics in SCORER_METRICS.items():
+            if scorers and scorer not in scorers:
+                continue
+            started = time.perf_counter()
+            stale = scored = 0
+            after_id = 0
+            while True:
+                page = store.stale_evaluations(
+                    scorer, versions[scorer], metrics[0], versions["language_simplicity"], after_id, page_size
+                )
+                if not page:
+                    break
+                after_id = page[-1]["id"]
+                stale += len(page)
+                if dry_run:
+                    continue
+
+                # Score each distinct input once and fan the values out to its evaluations
+                groups: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+                for evaluation in page:
+                    groups.setdefault(_input_key(scorer, evaluation), []).append(evaluation)
+                distinct = list(groups.values())
+                futures = [
+                    (batch, executor.submit(
+                        score_batch, scorer, [group[0] for group in batch], profile_json,
+                        keyword_match_mode, keyword_extraction, keyword_tokenizer
+                    ))
+                    for batch in (distinct[i:i + batch_size] for i in range(0, len(distinct), batch_size))
+                ]
+                for batch, future in futures:
+                    store.save_scores(
+                        (evaluation["id"], metric, versions[scorer], value)
+                        for group, values in zip(batch, future.result())
+                        for evaluation in group
+                        for metric, value in values.items()
+                    )
+                scored += len(distinct)
+            summary[scorer] = {
+                "version": versions[scorer],
+                "stale_evaluations": stale,
+                "inputs_scored": scored,
+                "seconds": round(time.perf_counter() - started, 3),
+            }
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored answers whose scorer versions changed")
+    parser.add_argument("--store", help="Results store SQLite file (default: RESULTS_STORE_PATH)")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--only", help=f"Comma-separated scorers: {','.join(SCORER_METRICS)}")
+    parser.add_argument("--batch-size", type=int, default=256, help="Distinct answers per worker batch")
+    parser.add_argument("--dry-run", action="store_true", help="Only count stale evaluations")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.store) if args.store else None
+    only = [name.strip() for name in args.only.split(",")] if args.only else None
+    summary = rescore(store, only, args.processes, args.batch_size, dry_run=args.dry_run)
+    for scorer, result in summary.items():
+        print(f"{scorer:20} {result['version']:24} {result['stale_evaluations']:>9} stale  "
+              f"{result['inputs_scored']:>9} scored  {result['seconds']:>8.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Command-line runner for large benchmark suites.
+
+Reads a question set (JSONL or CSV with `question`, `expected_keywords` and
+optionally `reference_answers`),
+benchmarks every question with a worker pool and appends one JSON line per
+question to the results file as soon as it finishes. The results file is the
+checkpoint: rerunning the same command skips every question already in it,
+so a crashed run resumes where it stopped.
+
+Usage:
+    python run_benchmarks.py questions.jsonl --output logs/runs/results.jsonl --workers 8
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from benchmarker import benchmark_models
+from services.base_service import ModelService
+from services.model_registry import model_registry
+from utils.semantic_scoring import score_semantic_similarity
+
+def read_questions(input_path: str) -> Iterator[Tuple[int, str, Optional[List[str]], Optional[List[str]]]]:
+    """
+    Read a question set from a JSONL or CSV file
+
+    CSV files give several reference answers separated by "|".
+
+    Args:
+        input_path: Path to a .jsonl or .csv file
+
+    Yields:
+        Tuples of (index, question, expected keywords, reference answers)
+    """
+    if input_path.endswith(".csv"):
+        with open(input_path, newline="", encoding="utf-8") as file:
+            for index, row in enumerate(csv.DictReader(file)):
+                keywords = row.get("expected_keywords") or ""
+                expected_keywords = [k.strip() for k in keywords.split(",") if k.strip()]
+                references = [r.strip() for r in (row.get("reference_answers") or "").split("|") if r.strip()]
+                yield index, row["question"], expected_keywords or None, references or None
+        return
+
+    with open(input_path, encoding="utf-8") as file:
+        index = 0
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield index, record["question"], record.get("expected_keywords"), record.get("reference_answers")
+            index += 1
+
+def load_checkpoint(output_path: str) -> Set[int]:
+    """
+    Find which questions are already in the results file
+
+    A partially written last line (from a crash mid-write) is truncated so
+    the file can be appended to again.
+
+    Returns:
+        Indices of the questions that were already benchmarked
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    valid_bytes = 0
+    with open(output_path, "rb") as file:
+        for line in file:
+            try:
+                completed.add(json.loads(line)["index"])
+            except (ValueError, KeyError):
+                break
+            valid_bytes += len(line)
+
+    if valid_bytes < os.path.getsize(output_path):
+        with open(output_path, "r+b") as file:
+            file.truncate(valid_bytes)
+    return completed
+
+def summarize_results(output_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute per-model latency percentiles over every result in the file
+
+    Cached and timed-out answers are counted but excluded from the latency
+    percentiles, since they are not model latencies.
+
+    Returns:
+        Mapping of model name to its latency summary
+    """
+    latencies: Dict[str, List[int]] = {}
+    counts: Dict[str, Dict[str, int]] = {}
+    with open(output_path, encoding="utf-8") as file:
+        for line in file:
+            for evaluation in json.loads(line)["models"]:
+                name = evaluation["model_name"]
+                model_counts = counts.setdefault(name, {"answers": 0, "cache_hits": 0, "timeouts": 0})
+                model_counts["answers"] += 1
+                if evaluation.get("cache_hit"):
+                    model_counts["cache_hits"] += 1
+                elif evaluation.get("timed_out"):
+                    model_counts["timeouts"] += 1
+                else:
+                    latencies.setdefault(name, []).append(evaluation["response_time_ms"])
+
+    summary = {}
+    for name, model_counts in counts.items():
+        values = np.array(latencies.get(name, []), dtype=float)
+        summary[name] = dict(
+            model_counts,
+            p50_ms=float(np.percentile(values, 50)) if values.size else None,
+            p95_ms=float(np.percentile(values, 95)) if values.size else None,
+        )
+    return summary
+
+def run_benchmark_suite(
+    input_path: str,
+    output_path: str,
+    models: List[ModelService],
+    workers: int = 4,
+    use_cache: bool = True,
+    progress_every: int = 100
+) -> Dict[str, Any]:
+    """
+    Benchmark every question in a file, resuming from previous results
+
+    Args:
+        input_path: JSONL or CSV question set
+        output_path: JSONL results file, also used as the checkpoint
+        models: Model services to benchmark
+        workers: Number of questions benchmarked concurrently
+        use_cache: Serve deterministic models from the response cache
+        progress_every: Print progress after this many questions
+
+    Returns:
+        Run summary with throughput and per-model latency percentiles
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    completed = load_checkpoint(output_path)
+    skipped = len(completed)
+    processed = 0
+    start_time = time.perf_counter()
+
+    def run_question(
+        index: int,
+        question: str,
+        expected_keywords: Optional[List[str]],
+        reference_answers: Optional[List[str]]
+    ) -> str:
+        evaluations = benchmark_models(question, models, expected_keywords, use_cache)
+        if reference_answers:
+            score_semantic_similarity([(evaluations, reference_answers)])
+        return json.dumps({
+            "index": index,
+            "question": question,
+            "expected_keywords": expected_keywords,
+            "reference_answers": reference_answers,
+            "models": [json.loads(evaluation.json()) for evaluation in evaluations],
+        })
+
+    pending_questions = (q for q in read_questions(input_path) if q[0] not in completed)
+    with ThreadPoolExecutor(max_workers=workers) as executor, \
+            open(output_path, "a", encoding="utf-8") as output:
+        in_flight = set()
+        while True:
+            # Keep a bounded window of submitted questions so memory stays flat
+            while len(in_flight) < workers * 2:
+                next_question = next(pending_questions, None)
+                if next_question is None:
+                    break
+                in_flight.add(executor.submit(run_question, *next_question))
+            if not in_flight:
+                break
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                output.write(future.result() + "\n")
+                processed += 1
+                if progress_every and processed % progress_every == 0:
+                    print(f"{skipped + processed} questions completed")
+            output.flush()
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "questions_processed": processed,
+        "questions_resumed": skipped,
+        "elapsed_seconds": elapsed,
+        "questions_per_second": processed / elapsed if elapsed > 0 else 0.0,
+        "models": summarize_results(output_path) if os.path.exists(output_path) else {},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a benchmark suite from a JSONL/CSV question set")
+    parser.add_argument("input", help="JSONL or CSV file with question, expected_keywords and optional reference_answers")
+    parser.add_argument("--output", help="JSONL results file (default: logs/runs/<input name>.results.jsonl)")
+    parser.add_argument("--models", help="Comma-separated model types (default: the /benchmark model set)")
+    parser.add_argument("--workers", type=int, default=4, help="Questions benchmarked concurrently")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the models")
+    parser.add_argument("--restart", action="store_true", help="Discard previous results instead of resuming")
+    args = parser.parse_args()
+
+    output_path = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "logs", "runs",
+        os.path.splitext(os.path.basename(args.input))[0] + ".results.jsonl"
+    )
+    if args.restart and os.path.exists(output_path):
+        os.remove(output_path)
+
+    if args.models:
+        models = [model_registry.get(model_type.strip()) for model_type in args.models.split(",")]
+    else:
+        models = model_registry.get_benchmark_models()
+
+    summary = run_benchmark_suite(args.input, output_path, models, args.workers, not args.no_cache)
+
+    print(f"Results: {output_path}")
+    print(f"Processed {summary['questions_processed']} questions "
+          f"({summary['questions_resumed']} resumed from checkpoint) "
+          f"in {summary['elapsed_seconds']:.1f}s: {summary['questions_per_second']:.2f} questions/sec")
+    for name, stats in summary["models"].items():
+        print(f"  {name}: p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms "
+              f"answers={stats['answers']} cache_hits={stats['cache_hits']} timeouts={stats['timeouts']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Process pool for the CPU-bound scoring stage.
+
+Readability, tokenization and the lexicon and confidence regexes hold the
+GIL, so scoring on the benchmark threads makes concurrent answers queue
+behind each other. With SCORING_PROCESSES set, answers are collected into
+micro-batches and scored in worker processes that load NLTK, textstat and
+the scoring profile once when they start, while the threads go back to
+waiting on models.
+
+Batches are sent as tuples rather than evaluations: only the answer,
+response time, expected keywords (or the question when there are none) and
+the profile definition cross the process boundary, and scores come back as
+tuples in a fixed field order.
+"""
+import multiprocessing
+import os
+import time
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from services.batching import MicroBatcher
+from utils.metrics import metrics_registry
+from utils.scoring_profile import CompiledScoringProfile, ScoringProfile, get_scoring_profile
+from utils.text_analysis import KEYWORD_EXTRACTION, get_idf_table
+
+# 0 scores on the benchmark threads, as before the pool existed
+SCORING_PROCESSES = int(os.environ.get("SCORING_PROCESSES", "0"))
+SCORING_BATCH_SIZE = int(os.environ.get("SCORING_BATCH_SIZE", "32"))
+SCORING_BATCH_WAIT_MS = float(os.environ.get("SCORING_BATCH_WAIT_MS", "2"))
+# Forking a process that already runs threads can copy held locks, so workers are spawned
+SCORING_START_METHOD = os.environ.get("SCORING_START_METHOD", "spawn")
+
+# Field order of the tuples returned by workers
+SCORE_FIELDS = ("keyword_coverage", "keywords_found", "length_category", "confidence_score")
+SOCIAL_IMPACT_FIELDS = ("language_simplicity", "actionable_guidance", "cultural_relevance", "accessibility", "overall_social_impact")
+SCORING_STAGES = ("keyword_coverage", "length", "confidence", "social_impact")
+
+WARM_UP_ANSWER = (
+    "Section 420 of the Indian Penal Code deals with cheating. You should file an FIR at the "
+    "nearest police station and contact the District Legal Services Authority for free legal aid."
+)
+
+@lru_cache(maxsize=4)
+def _compiled_profile(profile_json: str) -> CompiledScoringProfile:
+    return CompiledScoringProfile(ScoringProfile.parse_raw(profile_json))
+
+def _warm_worker(profile_json: str, idf_table: Optional[Dict[str, Any]] = None):
+    """Worker initializer: load the scorers' dependencies and the profile before the first batch"""
+    from benchmarker import compute_scores
+    from utils.text_analysis import load_keyword_extraction, set_idf_table
+
+    # Extract keywords with the IDF table the scorer versions were computed from
+    set_idf_table(idf_table)
+    load_keyword_extraction()
+    compute_scores("What is IPC 420?", WARM_UP_ANSWER, 100, None, _compiled_profile(profile_json))
+
+def _worker_pid(hold_seconds: float) -> int:
+    # A worker held busy leaves the other warm-up calls to the other workers
+    time.sleep(hold_seconds)
+    return os.getpid()
+
+def score_batch(profile_json: str, items: Sequence[Tuple[str, str, float, Optional[Tuple[str, ...]]]]) -> List[Tuple]:
+    """
+    Score a batch of answers in a worker process
+
+    Args:
+        profile_json: Scoring profile definition as JSON
+        items: (question, answer, response_time_ms, expected_keywords)
+            tuples; the question is only sent when there are no expected
+            keywords
+
+    Returns:
+        (*SCORE_FIELDS, social impact values in SOCIAL_IMPACT_FIELDS order,
+        stage milliseconds in SCORING_STAGES order) for each item
+    """
+    from benchmarker import compute_scores
+
+    profile = _compiled_profile(profile_json)
+    results = []
+    for question, answer, response_time_ms, expected_keywords in items:
+        fields, stages = compute_scores(question, answer, response_time_ms, expected_keywords, profile)
+        results.append(
+            tuple(fields[name] for name in SCORE_FIELDS)
+            + (tuple(fields["social_impact_metrics"][name] for name in SOCIAL_IMPACT_FIELDS),
+               tuple(stages[stage] for stage in SCORING_STAGES))
+        )
+    return results
+
+def _unpack_scores(packed: Tuple) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    *values, social_impact, stages = packed
+    fields = dict(zip(SCORE_FIELDS, values))
+    fields["social_impact_metrics"] = dict(zip(SOCIAL_IMPACT_FIELDS, social_impact))
+    return fields, dict(zip(SCORING_STAGES, stages))
+
+class ScoringPool(MicroBatcher):
+    """
+    Scores answers in micro-batches on a pool of worker processes.
+
+    Unlike a plain MicroBatcher, the collecting thread does not wait for a
+    batch to be scored: it hands the batch to the process pool and goes
+    back to collecting, so every worker can be busy at once.
+    """
+
+    def __init__(
+        self,
+        processes: int = SCORING_PROCESSES,
+        max_batch_size: int = SCORING_BATCH_SIZE,
+        max_wait_ms: float = SCORING_BATCH_WAIT_MS,
+        start_method: str = SCORING_START_METHOD
+    ):
+        """
+        Initialize the pool; worker processes are started on first use or by warm_up()
+
+        Args:
+            processes: Number of worker processes
+            max_batch_size: Maximum answers per batch
+            max_wait_ms: How long to wait for a batch to fill up
+            start_method: multiprocessing start method of the workers
+        """
+        # No batch function: _run hands batches to the process pool itself
+        super().__init__(None, name="scoring", max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.processes = max(1, processes)
+        self._start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Profile definitions, serialized once per compiled profile
+        self._profile_json: "weakref.WeakKeyDictionary[CompiledScoringProfile, str]" = weakref.WeakKeyDictionary()
+        self._batches_in_flight = 0
+        self._errors = 0
+        self._restarts = 0
+        self._inline_batches = 0
+        self._last_error: Optional[str] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._worker_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context(self._start_method),
+                    initializer=_warm_worker,
+                    initargs=(
+                        self._serialize_profile(get_scoring_profile()),
+                        get_idf_table() if KEYWORD_EXTRACTION == "tfidf" else None
+                    )
+                )
+            return self._executor
+
+    def _serialize_profile(self, profile: CompiledScoringProfile) -> str:
+        profile_json = self._profile_json.get(profile)
+        if profile_json is None:
+            profile_json = self._profile_json.setdefault(profile, profile.profile.json())
+        return profile_json
+
+    def warm_up(self, timeout: float = 120.0) -> int:
+        """
+        Start every worker process and wait until each has loaded the scorers
+
+        Args:
+            timeout: Seconds to wait for every worker to answer
+
+        Returns:
+            Number of distinct worker processes that answered
+        """
+        executor = self._get_executor()
+        deadline = time.monotonic() + timeout
+        pids = set()
+        # The pool spawns a process per submitted call while none is idle,
+        # and a call only runs once its worker's initializer is done; a
+        # worker that initialized first may answer a round on its own
+        while len(pids) < self.processes and time.monotonic() < deadline:
+            pids.update(executor.map(_worker_pid, [0.05] * self.processes))
+        return len(pids)
+
+    def score(
+        self,
+        question: str,
+        answer: str,
+        response_time_ms: float,
+        expected_keywords: Optional[Sequence[str]] = None,
+        profile: Optional[CompiledScoringProfile] = None
+    ) -> Future:
+        """
+        Queue an answer for scoring
+
+        Args:
+            question: The question that was answered
+            answer: The model's answer
+            response_time_ms: Time the model took to answer
+            expected_keywords: Optional list of keywords expected in good answers
+            profile: Scoring profile (default: active profile)
+
+        Returns:
+            Future resolved with the compute_scores result
+        """
+        keywords = tuple(expected_keywords) if expected_keywords else None
+        return self.submit((
+            profile or get_scoring_profile(),
+            ("" if keywords else question, answer, response_time_ms, keywords)
+        ))
+
+    def _run(self):
+        while not self._stopping:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            dispatched_at = time.perf_counter()
+            self.batch_sizes.observe(len(batch))
+            for _, _, enqueued_at in batch:
+                self.wait_times_ms.observe((dispatched_at - enqueued_at) * 1000)
+
+            # A batch is scored under one profile; answers captured under another go separately
+            by_profile: Dict[int, List[Tuple[Any, Future, float]]] = {}
+            for entry in batch:
+                by_profile.setdefault(id(entry[0][0]), []).append(entry)
+            for entries in by_profile.values():
+                self._dispatch(entries)
+
+    def _dispatch(self, entries: List[Tuple[Any, Future, float]], retried: bool = False):
+        """Hand a batch to the process pool; a batch that already met a broken pool once is scored here instead"""
+        try:
+            executor = self._get_executor()
+            future = executor.submit(
+                score_batch, self._serialize_profile(entries[0][0][0]), [item for (_, item), _, _ in entries]
+            )
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            if retried:
+                self._score_inline(entries)
+            else:
+                self._dispatch(entries, retried=True)
+            return
+        except Exception as e:
+            self._fail(entries, e)
+            return
+        with self._worker_lock:
+            self._batches_in_flight += 1
+        future.add_done_callback(partial(self._scatter, entries, executor, retried))
+
+    def _scatter(self, entries: List[Tuple[Any, Future, float]], executor: ProcessPoolExecutor, retried: bool, future: Future):
+        with self._worker_lock:
+            self._batches_in_flight -= 1
+        try:
+            results = future.result()
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault); start a fresh pool and try the batch once more
+            self._replace_broken(executor)
+            if retried:
+                self._score_inline(entries)
+            else:
+                self._dispatch(entries, retried=True)
+            return
+        except Exception as e:
+            self._fail(entries, e)
+            return
+        for (_, waiter, _), packed in zip(entries, results):
+            waiter.set_result(_unpack_scores(packed))
+
+    def _replace_broken(self, executor: ProcessPoolExecutor):
+        """Drop a broken executor so the next batch starts a new one; other batches may have dropped it already"""
+        with self._worker_lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._restarts += 1
+            self._last_error = "A scoring worker process died; the pool was restarted"
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _score_inline(self, entries: List[Tuple[Any, Future, float]]):
+        """Score a batch in this process, so answers are still scored while the pool keeps failing"""
+        from benchmarker import compute_scores
+
+        with self._worker_lock:
+            self._inline_batches += 1
+        for (profile, (question, answer, response_time_ms, keywords)), waiter, _ in entries:
+            try:
+                waiter.set_result(compute_scores(question, answer, response_time_ms, keywords, profile))
+            except Exception as e:
+                self._fail([(None, waiter, 0.0)], e)
+
+    def _fail(self, entries: List[Tuple[Any, Future, float]], error: Exception):
+        with self._worker_lock:
+            self._errors += len(entries)
+            self._last_error = f"Error scoring answers: {str(error)}"
+        for _, waiter, _ in entries:
+            waiter.set_exception(error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the pool size, batches being scored and batch-size and wait-time histograms"""
+        with self._worker_lock:
+            batches_in_flight = self._batches_in_flight
+        return {
+            **super().stats(),
+            "processes": self.processes,
+            "started": self._executor is not None,
+            "batches_in_flight": batches_in_flight,
+            "errors": self._errors,
+            "restarts": self._restarts,
+            "inline_batches": self._inline_batches,
+            "last_error": self._last_error,
+        }
+
+    def shutdown(self):
+        """Stop the worker processes; answers queued afterwards start a new pool"""
+        with self._worker_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+_scoring_pool: Optional[ScoringPool] = ScoringPool() if SCORING_PROCESSES > 0 else None
+
+def get_scoring_pool() -> Optional[ScoringPool]:
+    """Get the scoring pool, or None when answers are scored on the benchmark threads"""
+    return _scoring_pool
+
+def set_scoring_pool(pool: Optional[ScoringPool]):
+    """Replace the scoring pool; None scores on the benchmark threads"""
+    global _scoring_pool
+    _scoring_pool = pool
+
+metrics_registry.callback(
+    "scoring_pool_queue_depth", "Answers waiting to be batched for the scoring processes",
+    lambda: [({}, _scoring_pool.stats()["queue_depth"])] if _scoring_pool is not None else []
+)
+metrics_registry.callback(
+    "scoring_pool_batches_in_flight", "Answer batches being scored in worker processes",
+    lambda: [({}, _scoring_pool.stats()["batches_in_flight"])] if _scoring_pool is not None else []
+)
+metrics_registry.callback(
+    "scoring_pool_errors_total", "Answers the scoring pool failed to score",
+    lambda: [({}, _scoring_pool.stats()["errors"])] if _scoring_pool is not None else [], "counter"
+)
+metrics_registry.callback(
+    "scoring_pool_restarts_total", "Times the scoring pool was restarted after a worker process died",
+    lambda: [({}, _scoring_pool.stats()["restarts"])] if _scoring_pool is not None else [], "counter"
+)
@@ -1,80 +1,282 @@
-from typing import List, Dict, Any
-from models import ABTestConfig, ABTestResult, BenchmarkRequest
-from services.huggingface_service import HuggingFaceService
-from services.openai_service import OpenAIService
-from parallel_benchmarker import benchmark_single_model
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from models import ABTestConfig, ABTestResult, ModelEvaluation
+from services.base_service import ModelService
+from services.model_registry import model_registry
+from parallel_benchmarker import EXECUTION_MODES, BenchmarkExecutor, benchmark_executor
+from utils.scoring_profile import CompiledScoringProfile, get_scoring_profile
+from utils.significance import paired_t_test, summarize, welch_t_test
+
+# Criterion -> (value taken from an evaluation, whether higher values win)
+AB_TEST_METRICS: Dict[str, Tuple[Callable[[ModelEvaluation], Optional[float]], bool]] = {
+    "response_time": (lambda e: e.response_time_ms, False),
+    "keyword_match": (lambda e: e.keyword_coverage, True),
+    "confidence": (lambda e: e.confidence_score, True),
+    "social_impact": (lambda e: (e.social_impact_metrics or {}).get("overall_social_impact"), True),
+}
 
 class ABTestService:
-    def __init__(self):
-        pass
+    """
+    Runs model variants over a question set for repeated trials and
+    compares them per criterion with confidence intervals and a paired
+    t-test over questions.
+    """
+
+    def __init__(self, executor: BenchmarkExecutor = benchmark_executor):
+        """
+        Initialize the service
+
+        Args:
+            executor: Executor the trials run on
+        """
+        self.executor = executor
     
-    async def run_ab_test(self, config: ABTestConfig, question: str, expected_keywords: List[str]) -> ABTestResult:
-        """Run an A/B test comparing multiple model variants"""
-        variant_results = {}
+    async def run_ab_test(
+        self,
+        config: ABTestConfig,
+        question: str,
+        expected_keywords: List[str],
+        on_repetition: Optional[Callable[[int, int], None]] = None
+    ) -> ABTestResult:
+        """
+        Run an A/B test comparing multiple model variants
+        
+        Every repetition answers the whole question set with every variant;
+        in parallel mode all of those answers run at once, limited by the
+        benchmark executor's per-provider concurrency. Models are shared
+        through the model registry. Timed-out and failed trials are counted
+        but left out of the statistics.
+        
+        Repetitions of a question are averaged, and variants are compared
+        with a paired t-test on the per-question means, so a deterministic
+        or cached model repeating the same value does not inflate the
+        sample. With a single question, the repetitions themselves are
+        compared with Welch's t-test. After min_repetitions, the test stops
+        as soon as the primary metric's winner is significant. Each of
+        these interim looks is tested at alpha divided by the number of
+        possible looks (Bonferroni), so stopping early does not inflate
+        the false-positive rate.
         
-        # Test each variant
-        for variant in config.model_variants:
-            variant_name = variant.get("name", "Unnamed variant")
-            model = self._create_model_from_config(variant)
-            benchmark_result = benchmark_single_model(question, model, expected_keywords)
+        Args:
+            config: Variants, criteria and trial settings
+            question: Question used when config.questions is not set
+            expected_keywords: Keywords expected in good answers
+            on_repetition: Called with (completed, maximum) repetitions after each one
             
-            # Collect metrics we care about
-            metrics = {}
-            for criterion in config.evaluation_criteria:
-                if criterion == "response_time":
-                    metrics["response_time"] = benchmark_result.response_time_ms
-                elif criterion == "keyword_match":
-                    metrics["keyword_match"] = benchmark_result.keyword_coverage
-                elif criterion == "confidence":
-                    metrics["confidence"] = benchmark_result.confidence_score
-                    
-            variant_results[variant_name] = {
-                "benchmark_result": benchmark_result,
-                "metrics": metrics
-            }
+        Returns:
+            Per-variant statistics, per-criterion comparisons and the winner
+            
+        Raises:
+            ValueError: If the configuration is invalid
+            ModelLoadError: If a variant's model cannot be loaded
+        """
+        criteria = self.validate_config(config)
+        questions = config.questions or [question]
+        variants = [
+            (name, self._create_model_from_config(variant))
+            for name, variant in zip(self._variant_names(config), config.model_variants)
+        ]
+        names = [name for name, _ in variants]
         
-        # Determine winner based on primary metric (first in evaluation_criteria)
-        primary_metric = config.evaluation_criteria[0]
-        winning_variant = max(
-            variant_results.keys(),
-            key=lambda k: variant_results[k]["metrics"].get(primary_metric, 0)
-        )
+        alpha = 1.0 - config.confidence_level
+        min_repetitions = min(config.min_repetitions, config.repetitions)
+        looks = config.repetitions - min_repetitions + 1 if config.early_stopping else 1
+        test_alpha = alpha / looks
         
-        # Calculate performance difference
-        variants = list(variant_results.keys())
-        if len(variants) >= 2:
-            winner_value = variant_results[winning_variant]["metrics"].get(primary_metric, 0)
-            runner_up = max(
-                [v for v in variants if v != winning_variant],
-                key=lambda k: variant_results[k]["metrics"].get(primary_metric, 0)
-            )
-            runner_up_value = variant_results[runner_up]["metrics"].get(primary_metric, 0)
+        # Captured once so every trial is scored with the same profile version
+        profile = get_scoring_profile()
+        models = dict(variants)
+        # Variant -> criterion -> values of each question's valid trials
+        samples: Dict[str, Dict[str, List[List[float]]]] = {
+            name: {c: [[] for _ in questions] for c in criteria} for name in names
+        }
+        timeouts = {name: 0 for name in names}
+        errors = {name: 0 for name in names}
+        repetitions_completed = 0
+        stopped_early = False
+        
+        for repetition in range(config.repetitions):
+            evaluations = await self._run_repetition(variants, questions, expected_keywords, config, profile)
+            for name, question_index, evaluation in evaluations:
+                if evaluation.timed_out:
+                    timeouts[name] += 1
+                    continue
+                if not models[name].is_cacheable_answer(evaluation.answer):
+                    errors[name] += 1
+                    continue
+                for criterion in criteria:
+                    value = AB_TEST_METRICS[criterion][0](evaluation)
+                    if value is not None:
+                        samples[name][criterion][question_index].append(float(value))
+            repetitions_completed += 1
+            if on_repetition is not None:
+                on_repetition(repetitions_completed, config.repetitions)
             
-            if runner_up_value > 0:
-                performance_difference = (winner_value - runner_up_value) / runner_up_value * 100
-            else:
-                performance_difference = 100.0
-        else:
-            performance_difference = 0.0
+            if config.early_stopping and repetitions_completed >= min_repetitions and repetition < config.repetitions - 1:
+                p_value = self._compare(samples, criteria[0], test_alpha)["p_value"]
+                if p_value is not None and p_value < test_alpha:
+                    stopped_early = True
+                    break
+        
+        comparisons = {criterion: self._compare(samples, criterion, test_alpha) for criterion in criteria}
+        primary = comparisons[criteria[0]]
         
         return ABTestResult(
             test_name=config.test_name,
-            variant_results=variant_results,
-            winning_variant=winning_variant,
-            performance_difference=performance_difference
+            variant_results={
+                name: {
+                    "model_name": model.name,
+                    "trials": repetitions_completed * len(questions),
+                    "timeouts": timeouts[name],
+                    "errors": errors[name],
+                    "metrics": {
+                        criterion: summarize(
+                            [value for values in samples[name][criterion] for value in values],
+                            config.confidence_level
+                        )
+                        for criterion in criteria
+                    },
+                }
+                for name, model in variants
+            },
+            winning_variant=primary["winner"],
+            performance_difference=primary["difference_percent"],
+            primary_metric=criteria[0],
+            comparisons=comparisons,
+            significant=primary["significant"],
+            p_value=primary["p_value"],
+            repetitions_completed=repetitions_completed,
+            stopped_early=stopped_early
         )
     
+    def validate_config(self, config: ABTestConfig) -> List[str]:
+        """
+        Check an A/B test configuration without running it
+
+        Checks everything that does not need a model to be loaded, so a
+        queued test fails on submission rather than in the background.
+
+        Returns:
+            The evaluation criteria, without duplicates
+
+        Raises:
+            ValueError: If the configuration is invalid
+        """
+        if not config.model_variants:
+            raise ValueError("At least one model variant is required")
+        unknown_types = [v.get("type") for v in config.model_variants if v.get("type") not in model_registry.model_types]
+        if unknown_types:
+            raise ValueError(f"Unsupported model types {unknown_types}; use {model_registry.model_types}")
+        names = self._variant_names(config)
+        if len(set(names)) != len(names):
+            raise ValueError("Variant names must be unique")
+        if not config.evaluation_criteria:
+            raise ValueError("At least one evaluation criterion is required")
+        unknown = [c for c in config.evaluation_criteria if c not in AB_TEST_METRICS]
+        if unknown:
+            raise ValueError(f"Unsupported evaluation criteria {unknown}; use {list(AB_TEST_METRICS)}")
+        if config.execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"execution_mode must be one of {list(EXECUTION_MODES)}")
+        if config.questions is not None and not config.questions:
+            raise ValueError("questions must not be empty")
+        return list(dict.fromkeys(config.evaluation_criteria))
+    
+    @staticmethod
+    def _variant_names(config: ABTestConfig) -> List[str]:
+        return [variant.get("name", f"Variant {index + 1}") for index, variant in enumerate(config.model_variants)]
+    
+    async def _run_repetition(
+        self,
+        variants: List[Tuple[str, ModelService]],
+        questions: List[str],
+        expected_keywords: List[str],
+        config: ABTestConfig,
+        profile: CompiledScoringProfile
+    ) -> List[Tuple[str, int, ModelEvaluation]]:
+        async def run(name: str, model: ModelService, question_index: int) -> Tuple[str, int, ModelEvaluation]:
+            evaluation = await self.executor.run_model(
+                questions[question_index], model, expected_keywords, use_cache=config.use_cache, profile=profile
+            )
+            return name, question_index, evaluation
+        
+        trials = [(name, model, index) for index in range(len(questions)) for name, model in variants]
+        if config.execution_mode == "sequential":
+            return [await run(*trial) for trial in trials]
+        return list(await asyncio.gather(*[run(*trial) for trial in trials]))
+    
+    def _compare(self, samples: Dict[str, Dict[str, List[List[float]]]], criterion: str, alpha: float) -> Dict[str, Any]:
+        """Compare the best variant on a criterion with the runner-up"""
+        higher_is_better = AB_TEST_METRICS[criterion][1]
+        # Mean of each question's trials, None for questions without a valid trial
+        question_means = {
+            name: [sum(values) / len(values) if values else None for values in per_question[criterion]]
+            for name, per_question in samples.items()
+        }
+        means = {}
+        for name, per_question in question_means.items():
+            answered = [mean for mean in per_question if mean is not None]
+            if answered:
+                means[name] = sum(answered) / len(answered)
+        ranked = sorted(means, key=lambda name: means[name], reverse=higher_is_better)
+        comparison = {
+            "winner": ranked[0] if ranked else next(iter(samples)),
+            "runner_up": ranked[1] if len(ranked) > 1 else None,
+            "higher_is_better": higher_is_better,
+            "difference_percent": 0.0,
+            "test": None,
+            "p_value": None,
+            "alpha": alpha,
+            "significant": False,
+        }
+        if comparison["runner_up"] is None:
+            return comparison
+        
+        winner, runner_up = means[ranked[0]], means[ranked[1]]
+        # Positive means the winner is better, whichever direction wins
+        improvement = (winner - runner_up) if higher_is_better else (runner_up - winner)
+        comparison["difference_percent"] = improvement / abs(runner_up) * 100 if runner_up else (100.0 if improvement else 0.0)
+        pairs = [
+            (first, second)
+            for first, second in zip(question_means[ranked[0]], question_means[ranked[1]])
+            if first is not None and second is not None
+        ]
+        if len(pairs) > 1:
+            comparison["test"] = "paired"
+            p_value = paired_t_test(*zip(*pairs))["p_value"]
+        else:
+            # One question: its repetitions are the only samples there are
+            comparison["test"] = "welch"
+            p_value = welch_t_test(
+                [value for values in samples[ranked[0]][criterion] for value in values],
+                [value for values in samples[ranked[1]][criterion] for value in values]
+            )["p_value"]
+        comparison["p_value"] = p_value
+        comparison["significant"] = p_value is not None and p_value < alpha and improvement > 0
+        return comparison
+    
     def _create_model_from_config(self, config: Dict[str, Any]):
-        """Create model instance based on configuration"""
+        """Resolve the shared model instance for a variant configuration"""
         model_type = config.get("type", "")
         
         if model_type == "openai":
-            return OpenAIService(
+            return model_registry.get(
+                "openai",
                 model_name=config.get("model_name", "gpt-3.5-turbo")
             )
         elif model_type == "huggingface":
-            return HuggingFaceService(
+            return model_registry.get(
+                "huggingface",
                 model_name=config.get("model_name", "deepset/roberta-base-squad2")
             )
+        elif model_type == "http":
+            # Any OpenAI-compatible server; every key except name/type configures the provider
+            return model_registry.get(
+                "http",
+                **{k: v for k, v in config.items() if k not in ("name", "type")}
+            )
+        elif model_type in model_registry.model_types:
+            # Providers registered by name, e.g. from the HTTP providers file
+            return model_registry.get(model_type)
         
         raise ValueError(f"Unsupported model type: {model_type}")
\ No newline at end of file
@@ -1,11 +1,32 @@
+import asyncio
+import os
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Any
-from utils.cache import get_cached_response
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Any, Iterator, List, Optional, Tuple
+from utils.cache import response_cache, make_cache_key
+
+SYNC_SERVICE_MAX_WORKERS = int(os.environ.get("SYNC_SERVICE_MAX_WORKERS", "32"))
+
+_sync_executor: Optional[ThreadPoolExecutor] = None
+_sync_executor_lock = threading.Lock()
+
+def get_sync_executor() -> ThreadPoolExecutor:
+    """Get the thread pool that runs synchronous services for async callers"""
+    global _sync_executor
+    with _sync_executor_lock:
+        if _sync_executor is None:
+            _sync_executor = ThreadPoolExecutor(max_workers=SYNC_SERVICE_MAX_WORKERS, thread_name_prefix="sync-service")
+        return _sync_executor
 
 class ModelService(ABC):
     """
     Abstract base class for all model services
     """
+
+    # Populated by the model registry when the service is loaded
+    load_time_ms: Optional[float] = None
+    loaded_at: Optional[float] = None
     
     @property
     @abstractmethod
@@ -26,6 +47,146 @@ class ModelService(ABC):
         """
         pass
     
+    async def aget_answer(self, question: str) -> str:
+        """
+        Get an answer without blocking the event loop
+        
+        Services backed by a network API override this with a native async
+        implementation; otherwise get_answer runs on a shared thread pool.
+        
+        Args:
+            question: The question to answer
+            
+        Returns:
+            The model's answer as a string
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_sync_executor(), self.get_answer, question)
+    
+    def get_answer_details(self, question: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Get an answer together with details of how it was produced
+        
+        Services with several stages (e.g. retrieval then reading) override
+        this to report per-answer timings, which are added to the
+        evaluation's metadata.
+        
+        Args:
+            question: The question to answer
+            
+        Returns:
+            Tuple of (answer, per-answer metadata)
+        """
+        return self.get_answer(question), {}
+    
+    async def aget_answer_details(self, question: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Async variant of get_answer_details
+        
+        Args:
+            question: The question to answer
+            
+        Returns:
+            Tuple of (answer, per-answer metadata)
+        """
+        if self.is_async_native():
+            return await self.aget_answer(question), {}
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_sync_executor(), self.get_answer_details, question)
+    
+    def stream_answer(self, question: str) -> Iterator[str]:
+        """
+        Stream the answer as it is generated
+        
+        Generative services override this to yield text chunks as they are
+        produced; by default the whole answer is yielded as one chunk.
+        
+        Args:
+            question: The question to answer
+            
+        Yields:
+            Text chunks that concatenate to the answer
+        """
+        yield self.get_answer(question)
+    
+    async def astream_answer(self, question: str) -> AsyncIterator[str]:
+        """
+        Stream the answer without blocking the event loop
+        
+        By default stream_answer runs on the shared thread pool and its
+        chunks are handed to the event loop as they arrive.
+        
+        Args:
+            question: The question to answer
+            
+        Yields:
+            Text chunks that concatenate to the answer
+        """
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        done = object()
+        
+        def produce():
+            try:
+                for chunk in self.stream_answer(question):
+                    loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+            finally:
+                loop.call_soon_threadsafe(chunks.put_nowait, done)
+        
+        producer = loop.run_in_executor(get_sync_executor(), produce)
+        while True:
+            chunk = await chunks.get()
+            if chunk is done:
+                break
+            yield chunk
+        # Surface any exception raised while generating
+        await producer
+    
+    def supports_streaming(self) -> bool:
+        """Whether the service streams real partial output rather than one final chunk"""
+        return (
+            type(self).stream_answer is not ModelService.stream_answer
+            or type(self).astream_answer is not ModelService.astream_answer
+        )
+    
+    def is_async_native(self) -> bool:
+        """Whether the service implements aget_answer without occupying a thread"""
+        return type(self).aget_answer is not ModelService.aget_answer
+    
+    def get_answers(self, questions: List[str]) -> List[str]:
+        """
+        Get answers for several questions at once
+        
+        Services that support batched inference override this to run a
+        single forward pass over all questions.
+        
+        Args:
+            questions: The questions to answer
+            
+        Returns:
+            The model's answers, in the same order as the questions
+        """
+        return [self.get_answer(question) for question in questions]
+    
+    def get_batching_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Get micro-batching histograms for services that batch requests
+        
+        Returns:
+            Batch-size and wait-time statistics, or None if not batched
+        """
+        return None
+    
+    def close(self):
+        """
+        Release background resources such as micro-batcher threads
+        
+        Called when the model registry evicts or reloads the service. The
+        service may still be called afterwards by requests already holding
+        it, so implementations fall back to unbatched calls.
+        """
+        pass
+    
     def get_metadata(self) -> Dict[str, Any]:
         """
         Get additional metadata about the model
@@ -34,20 +195,164 @@ class ModelService(ABC):
             Dictionary of model metadata
         """
         return {}
+
+    def get_memory_footprint(self) -> Optional[int]:
+        """
+        Get the memory used by the loaded model weights
+
+        Returns:
+            Size in bytes, or None for services without local weights
+        """
+        return None
+
+    def get_load_stats(self) -> Dict[str, Any]:
+        """
+        Get load-time and memory-footprint stats for the service
+
+        Returns:
+            Dictionary of load statistics
+        """
+        return {
+            "model_name": self.name,
+            "load_time_ms": self.load_time_ms,
+            "loaded_at": self.loaded_at,
+            "memory_footprint_bytes": self.get_memory_footprint(),
+        }
+    
+    def get_generation_params(self) -> Dict[str, Any]:
+        """
+        Get the parameters that influence the generated answer
+        
+        Returns:
+            Dictionary of generation parameters, used in the cache key
+        """
+        return {}
+    
+    def is_deterministic(self) -> bool:
+        """Whether the same question always produces the same answer (and may be cached)"""
+        return False
+    
+    def is_cacheable_answer(self, answer: str) -> bool:
+        """Whether an answer is worth caching (e.g. not an error message)"""
+        return bool(answer)
+    
+    def _generate(self, question: str, on_token: Optional[Callable[[str], None]]) -> Tuple[str, Dict[str, Any]]:
+        if on_token is None:
+            return self.get_answer_details(question)
+        chunks = []
+        for chunk in self.stream_answer(question):
+            chunks.append(chunk)
+            on_token(chunk)
+        return "".join(chunks).strip(), {}
+    
+    async def _agenerate(self, question: str, on_token: Optional[Callable[[str], None]]) -> Tuple[str, Dict[str, Any]]:
+        if on_token is None:
+            return await self.aget_answer_details(question)
+        chunks = []
+        async for chunk in self.astream_answer(question):
+            chunks.append(chunk)
+            on_token(chunk)
+        return "".join(chunks).strip(), {}
+    
+    def get_cached_answer(
+        self,
+        question: str,
+        use_cache: bool = True,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Tuple[str, bool]:
+        """
+        Get an answer, serving deterministic models from the response cache
+        
+        Args:
+            question: The question to answer
+            use_cache: Set to False to always call the model
+            on_token: Called with each chunk as the answer is streamed; a
+                cached answer is passed as a single chunk
+            
+        Returns:
+            Tuple of (answer, whether it came from the cache)
+        """
+        answer, cache_hit, _ = self.get_cached_answer_details(question, use_cache, on_token)
+        return answer, cache_hit
+    
+    def get_cached_answer_details(
+        self,
+        question: str,
+        use_cache: bool = True,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Tuple[str, bool, Dict[str, Any]]:
+        """
+        Variant of get_cached_answer that also returns the answer's details
+        
+        Returns:
+            Tuple of (answer, whether it came from the cache, per-answer
+            metadata from get_answer_details); cached answers have no details
+        """
+        if not use_cache or not self.is_deterministic():
+            answer, details = self._generate(question, on_token)
+            return answer, False, details
+        
+        cache_key = make_cache_key(self.name, self.get_metadata(), question, self.get_generation_params())
+        cached_answer = response_cache.get(cache_key)
+        if cached_answer is not None:
+            if on_token is not None:
+                on_token(cached_answer)
+            return cached_answer, True, {}
+        
+        answer, details = self._generate(question, on_token)
+        if self.is_cacheable_answer(answer):
+            response_cache.set(cache_key, answer)
+        return answer, False, details
+    
+    async def aget_cached_answer(
+        self,
+        question: str,
+        use_cache: bool = True,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Tuple[str, bool]:
+        """
+        Async variant of get_cached_answer that calls aget_answer on a miss
+        
+        Args:
+            question: The question to answer
+            use_cache: Set to False to always call the model
+            on_token: Called with each chunk as the answer is streamed; a
+                cached answer is passed as a single chunk
+            
+        Returns:
+            Tuple of (answer, whether it came from the cache)
+        """
+        answer, cache_hit, _ = await self.aget_cached_answer_details(question, use_cache, on_token)
+        return answer, cache_hit
+    
+    async def aget_cached_answer_details(
+        self,
+        question: str,
+        use_cache: bool = True,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Tuple[str, bool, Dict[str, Any]]:
+        """
+        Async variant of get_cached_answer_details
+        
+        Returns:
+            Tuple of (answer, whether it came from the cache, per-answer metadata)
+        """
+        if not use_cache or not self.is_deterministic():
+            answer, details = await self._agenerate(question, on_token)
+            return answer, False, details
+        
+        cache_key = make_cache_key(self.name, self.get_metadata(), question, self.get_generation_params())
+        cached_answer = response_cache.get(cache_key)
+        if cached_answer is not None:
+            if on_token is not None:
+                on_token(cached_answer)
+            return cached_answer, True, {}
+        
+        answer, details = await self._agenerate(question, on_token)
+        if self.is_cacheable_answer(answer):
+            response_cache.set(cache_key, answer)
+        return answer, False, details
     
     def get_response(self, question: str) -> str:
         """Get response from model with caching"""
-        # Try to get from cache first
-        cached_result = get_cached_response(self._name, question)
-        if cached_result is not None:
-            return cached_result
-            
-        # If not in cache, get from model and store in cache
-        response = self._get_model_response(question)
-        get_cached_response.cache_clear()  # Need to clear to update
-        get_cached_response(self._name, question)  # Store in cache
-        return response
-    
-    def _get_model_response(self, question: str) -> str:
-        """Internal method to be implemented by subclasses"""
-        raise NotImplementedError
\ No newline at end of file
+        return self.get_cached_answer(question)[0]
\ No newline at end of file
@@ -0,0 +1,179 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.metrics import Histogram
+
+MICRO_BATCH_MAX_SIZE = int(os.environ.get("MICRO_BATCH_MAX_SIZE", "8"))
+MICRO_BATCH_WAIT_MS = float(os.environ.get("MICRO_BATCH_WAIT_MS", "5"))
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+WAIT_TIME_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250)
+
+class MicroBatcher:
+    """
+    Collects concurrent requests into batches for a single batched call.
+
+    Callers submit one item and block on its future. A worker thread waits
+    up to max_wait_ms after the first queued item for more to arrive, runs
+    batch_fn once over up to max_batch_size items, and scatters the results
+    back to the waiting callers.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        name: str = "batcher",
+        max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+        max_wait_ms: float = MICRO_BATCH_WAIT_MS
+    ):
+        """
+        Initialize the batcher
+
+        Args:
+            batch_fn: Function mapping a list of items to a list of results
+            name: Name used for the worker thread and stats
+            max_batch_size: Maximum number of items per batch
+            max_wait_ms: How long to wait for a batch to fill up
+        """
+        self._batch_fn = batch_fn
+        self._name = name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        # None is the sentinel that stops the worker
+        self._queue: "queue.Queue[Optional[Tuple[Any, Future, float]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._closed = False
+        self._stopping = False
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.wait_times_ms = Histogram(WAIT_TIME_BUCKETS_MS)
+
+    def submit(self, item: Any) -> Future:
+        """
+        Queue an item for the next batch
+
+        Returns:
+            Future resolved with the item's result
+        """
+        future: Future = Future()
+        with self._worker_lock:
+            if self._closed:
+                future.set_exception(RuntimeError(f"Micro-batcher {self._name} is closed"))
+                return future
+            self._ensure_worker_locked()
+            self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def __call__(self, item: Any) -> Any:
+        """Submit an item and wait for its result"""
+        return self.submit(item).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get batch-size and wait-time histograms"""
+        return {
+            "name": self._name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self._queue.qsize(),
+            "batch_size": self.batch_sizes.snapshot(),
+            "wait_time_ms": self.wait_times_ms.snapshot(),
+        }
+
+    def close(self, timeout: float = 5.0):
+        """
+        Stop the worker thread and fail requests that were never batched
+
+        The worker finishes the batch it is running first. Items submitted
+        after closing fail immediately.
+
+        Args:
+            timeout: Seconds to wait for the worker to finish
+        """
+        with self._worker_lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+            if worker is not None:
+                self._queue.put(None)
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout)
+
+        error = RuntimeError(f"Micro-batcher {self._name} was closed before the request was batched")
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not None and not entry[1].done():
+                entry[1].set_exception(error)
+        # A worker still busy with its last batch stops when it finishes it
+        self._stopping = True
+        if worker is not None:
+            self._queue.put(None)
+        # Drop the batch function, which usually holds the model
+        self._batch_fn = None
+
+    def _ensure_worker_locked(self):
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run,
+                name=f"micro-batcher-{self._name}",
+                daemon=True
+            )
+            self._worker.start()
+
+    def _collect_batch(self) -> List[Tuple[Any, Future, float]]:
+        # Sets _stopping when the close sentinel is reached; the batch may then be empty
+        first = self._queue.get()
+        if first is None:
+            self._stopping = True
+            return []
+        batch = [first]
+        deadline = first[2] + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    entry = self._queue.get_nowait()
+                else:
+                    entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is None:
+                self._stopping = True
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while not self._stopping:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            dispatched_at = time.perf_counter()
+            self.batch_sizes.observe(len(batch))
+            for _, _, enqueued_at in batch:
+                self.wait_times_ms.observe((dispatched_at - enqueued_at) * 1000)
+
+            items = [item for item, _, _ in batch]
+            try:
+                results = list(self._batch_fn(items))
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+            if len(results) != len(batch):
+                # Callers past the end of a short result list would otherwise wait forever
+                error = RuntimeError(
+                    f"Micro-batcher {self._name}: batch function returned {len(results)} results for {len(batch)} items"
+                )
+                for _, future, _ in batch[len(results):]:
+                    future.set_exception(error)
@@ -0,0 +1,116 @@
+"""
+Background job handlers for benchmark suites and A/B tests.
+
+Jobs run on the background executor, so a long suite only ever uses its
+own share of each provider and never delays interactive requests.
+"""
+import asyncio
+import json
+import os
+import threading
+from typing import Optional
+
+from models import ABTestConfig, BenchmarkRequest, BenchmarkResponse
+from parallel_benchmarker import background_executor
+from services.ab_test_service import ABTestService
+from services.job_queue import JobContext, JobQueue, JobStore
+from services.model_registry import model_registry
+from utils.metrics import metrics_registry
+from utils.result_sink import result_sink
+from utils.scoring_profile import get_scoring_profile
+from utils.semantic_scoring import score_semantic_similarity
+
+# Questions of one benchmark job in flight at once
+JOB_QUESTION_CONCURRENCY = int(os.environ.get("JOB_QUESTION_CONCURRENCY", "4"))
+
+async def run_benchmark_job(context: JobContext):
+    """
+    Benchmark every question of a job, storing each question's response as it finishes
+
+    Questions finished before a restart are skipped. Payload keys:
+    requests, execution_mode, timeout_seconds, use_cache and save_to_csv.
+    """
+    payload = context.payload
+    done = context.completed_items()
+    pending = iter([
+        (index, BenchmarkRequest(**request))
+        for index, request in enumerate(payload["requests"]) if index not in done
+    ])
+    loop = asyncio.get_running_loop()
+    models = await loop.run_in_executor(background_executor.executor, model_registry.get_benchmark_models)
+    # Captured once so the whole suite is scored with the same profile version
+    profile = get_scoring_profile()
+
+    async def run_questions():
+        # Each runner takes the next question when it finishes one, so only
+        # JOB_QUESTION_CONCURRENCY questions exist as tasks at any time
+        for index, request in pending:
+            results = await background_executor.benchmark(
+                request.question,
+                models,
+                request.expected_keywords,
+                mode=payload["execution_mode"],
+                timeout=payload["timeout_seconds"],
+                use_cache=payload["use_cache"],
+                profile=profile
+            )
+            if request.reference_answers:
+                await loop.run_in_executor(
+                    background_executor.executor, score_semantic_similarity, [(results, request.reference_answers)]
+                )
+            if payload["save_to_csv"]:
+                result_sink.submit(request.question, results, request.expected_keywords)
+            response = BenchmarkResponse(
+                question=request.question,
+                models=results,
+                expected_keywords=request.expected_keywords,
+                reference_answers=request.reference_answers
+            )
+            context.save_result(index, json.loads(response.json()))
+
+    await asyncio.gather(*[run_questions() for _ in range(JOB_QUESTION_CONCURRENCY)])
+
+async def run_ab_test_job(context: JobContext):
+    """
+    Run an A/B test and store its result as the job's only item
+
+    Progress counts repetitions; an interrupted test starts over. Payload
+    keys: config, question and expected_keywords.
+    """
+    payload = context.payload
+    result = await ABTestService(background_executor).run_ab_test(
+        ABTestConfig(**payload["config"]),
+        payload["question"],
+        payload["expected_keywords"],
+        on_repetition=context.progress
+    )
+    context.save_result(0, json.loads(result.json()), counts_progress=False)
+
+JOB_HANDLERS = {
+    "benchmark": run_benchmark_job,
+    "ab_test": run_ab_test_job,
+}
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """Get the process-wide job queue; its workers start with the app or on the first submission"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(JobStore(), JOB_HANDLERS)
+        return _job_queue
+
+def set_job_queue(queue: Optional[JobQueue]):
+    """Replace the process-wide job queue, e.g. with one using a different store"""
+    global _job_queue
+    with _job_queue_lock:
+        _job_queue = queue
+
+def _job_counts():
+    # Report on the queue without creating its store
+    queue = _job_queue
+    return [({"status": status}, count) for status, count in queue.store.status_counts().items()] if queue else []
+
+metrics_registry.callback("background_jobs", "Background jobs per status", _job_counts)
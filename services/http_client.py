@@ -0,0 +1,406 @@
+"""
+Shared, connection-pooled async HTTP client for remote model providers.
+
+Every HTTP provider sends its requests through one pool so connections are
+kept alive and reused across requests. Requests that fail with a transport
+error or a 429/5xx status are retried with jittered exponential backoff, and
+slow requests can be hedged by sending a duplicate after a delay.
+"""
+import asyncio
+import os
+import queue
+import random
+import threading
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterator, Optional, TypeVar
+
+import httpx
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+T = TypeVar("T")
+
+class AsyncHTTPPool:
+    """
+    Pooled httpx.AsyncClient with retries and request hedging.
+
+    httpx clients are bound to the event loop they are used on, so the pool
+    keeps one client per running loop; a server process normally has one.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 60.0,
+        max_retries: int = 3,
+        backoff_base_ms: float = 200,
+        backoff_max_ms: float = 5000,
+        hedge_after_ms: float = 0
+    ):
+        """
+        Initialize the pool
+
+        Args:
+            max_connections: Maximum open connections across all hosts
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept open
+            timeout: Request timeout in seconds
+            max_retries: Retries after the first attempt on 429/5xx or transport errors
+            backoff_base_ms: Backoff before the first retry; doubles on each retry
+            backoff_max_ms: Upper bound of the backoff
+            hedge_after_ms: Send a duplicate request if no response arrives
+                within this many milliseconds; 0 disables hedging
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base_ms = backoff_base_ms
+        self.backoff_max_ms = backoff_max_ms
+        self.hedge_after_ms = hedge_after_ms
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._background_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._counters = {
+            "requests": 0,
+            "retries": 0,
+            "transport_errors": 0,
+            "hedged_requests": 0,
+            "hedge_wins": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "AsyncHTTPPool":
+        """Create a pool configured by the HTTP_* environment variables"""
+        return cls(
+            max_connections=int(os.environ.get("HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            keepalive_expiry=float(os.environ.get("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30")),
+            timeout=float(os.environ.get("HTTP_TIMEOUT_SECONDS", "60")),
+            max_retries=int(os.environ.get("HTTP_MAX_RETRIES", "3")),
+            backoff_base_ms=float(os.environ.get("HTTP_BACKOFF_BASE_MS", "200")),
+            backoff_max_ms=float(os.environ.get("HTTP_BACKOFF_MAX_MS", "5000")),
+            hedge_after_ms=float(os.environ.get("HTTP_HEDGE_AFTER_MS", "0")),
+        )
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def get_client(self) -> httpx.AsyncClient:
+        """Get the pooled client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+                self._clients[loop] = client
+            return client
+
+    def _backoff_seconds(self, attempt: int) -> float:
+        # Full jitter: spreads retries from many callers across the window
+        ceiling = min(self.backoff_max_ms, self.backoff_base_ms * (2 ** attempt))
+        return random.uniform(0, ceiling) / 1000
+
+    def _retry_after_seconds(self, response: httpx.Response) -> Optional[float]:
+        retry_after = response.headers.get("retry-after")
+        try:
+            return min(float(retry_after), self.backoff_max_ms / 1000) if retry_after else None
+        except ValueError:
+            return None
+
+    async def _send(self, client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+        if not self.hedge_after_ms:
+            return await client.request(method, url, **kwargs)
+
+        first = asyncio.ensure_future(client.request(method, url, **kwargs))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after_ms / 1000)
+        if done:
+            return first.result()
+
+        self._count("hedged_requests")
+        hedge = asyncio.ensure_future(client.request(method, url, **kwargs))
+        pending = {first, hedge}
+        try:
+            # Take the first usable response; a failed attempt waits for the other
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    last = task
+                    if task.exception() is None and task.result().status_code not in RETRYABLE_STATUS_CODES:
+                        if task is hedge:
+                            self._count("hedge_wins")
+                        return task.result()
+            return last.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        json: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> httpx.Response:
+        """
+        Send a request, retrying 429/5xx responses and transport errors
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            json: Optional JSON body
+            headers: Optional request headers
+            timeout: Per-attempt timeout in seconds (default: the pool timeout)
+
+        Returns:
+            The final response; its status may still be an error once
+            retries are exhausted
+
+        Raises:
+            httpx.TransportError: If the last attempt failed to get a response
+        """
+        client = self.get_client()
+        self._count("requests")
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self._send(
+                    client, method, url, json=json, headers=headers, timeout=timeout or self.timeout
+                )
+            except httpx.TransportError:
+                self._count("transport_errors")
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_seconds(attempt)
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                    return response
+                delay = self._retry_after_seconds(response) or self._backoff_seconds(attempt)
+
+            self._count("retries")
+            await asyncio.sleep(delay)
+
+    async def post_json(
+        self,
+        url: str,
+        payload: Any,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        POST a JSON body and decode the JSON response
+
+        Raises:
+            httpx.HTTPStatusError: If the final response is an error status
+            httpx.TransportError: If no response could be received
+        """
+        response = await self.request("POST", url, json=payload, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    async def stream_lines(
+        self,
+        method: str,
+        url: str,
+        json: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Send a request and yield the response body line by line
+
+        Failures before the first line arrives are retried like request();
+        a stream that breaks after output has been yielded is not retried.
+        Streams are never hedged.
+
+        Raises:
+            httpx.HTTPStatusError: If the final response is an error status
+            httpx.TransportError: If no response could be received
+        """
+        client = self.get_client()
+        self._count("requests")
+        for attempt in range(self.max_retries + 1):
+            started = False
+            try:
+                async with client.stream(
+                    method, url, json=json, headers=headers, timeout=timeout or self.timeout
+                ) as response:
+                    if response.status_code in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                        delay = self._retry_after_seconds(response) or self._backoff_seconds(attempt)
+                    else:
+                        if response.is_error:
+                            await response.aread()
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            started = True
+                            yield line
+                        return
+            except httpx.TransportError:
+                self._count("transport_errors")
+                if started or attempt == self.max_retries:
+                    raise
+                delay = self._backoff_seconds(attempt)
+
+            self._count("retries")
+            await asyncio.sleep(delay)
+
+    def run_sync(self, coro: Awaitable[T]) -> T:
+        """
+        Run a coroutine on the pool's background event loop and wait for it
+
+        Lets synchronous callers (worker threads, the offline runner) share
+        the pooled connections and any in-flight request coalescing.
+        """
+        self._ensure_background_loop()
+        return asyncio.run_coroutine_threadsafe(coro, self._background_loop).result()
+
+    async def run_on_loop(self, coro: Awaitable[T]) -> T:
+        """
+        Await a coroutine on the pool's background event loop from any event loop
+
+        State that must be shared by every caller in the process, such as a
+        provider's in-flight limit and request coalescing, lives on that one
+        loop. Cancelling the caller cancels the coroutine.
+        """
+        self._ensure_background_loop()
+        if asyncio.get_running_loop() is self._background_loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._background_loop))
+
+    async def iterate_on_loop(self, iterator: AsyncIterator[T]) -> AsyncIterator[T]:
+        """
+        Consume an async iterator on the background event loop from any event loop
+
+        Items are handed over as soon as they are produced.
+        """
+        self._ensure_background_loop()
+        loop = asyncio.get_running_loop()
+        if loop is self._background_loop:
+            async for item in iterator:
+                yield item
+            return
+
+        items: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                async for item in iterator:
+                    loop.call_soon_threadsafe(items.put_nowait, item)
+            finally:
+                loop.call_soon_threadsafe(items.put_nowait, done)
+
+        pumping = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(pump(), self._background_loop))
+        try:
+            while True:
+                item = await items.get()
+                if item is done:
+                    break
+                yield item
+            # Re-raise anything the iterator raised
+            await pumping
+        finally:
+            # Stop producing if the caller stopped consuming
+            pumping.cancel()
+
+    def _ensure_background_loop(self):
+        with self._lock:
+            if self._background_loop is None:
+                self._background_loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._background_loop.run_forever, name="http-pool", daemon=True
+                ).start()
+
+    def iterate_sync(self, iterator: AsyncIterator[T]) -> Iterator[T]:
+        """
+        Consume an async iterator on the background event loop from synchronous code
+
+        Items are handed over as soon as they are produced.
+        """
+        items: "queue.Queue" = queue.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                async for item in iterator:
+                    items.put(item)
+            finally:
+                items.put(done)
+
+        self._ensure_background_loop()
+        future = asyncio.run_coroutine_threadsafe(pump(), self._background_loop)
+        while True:
+            item = items.get()
+            if item is done:
+                break
+            yield item
+        # Re-raise anything the iterator raised
+        future.result()
+
+    async def aclose(self):
+        """Close the client of the running event loop"""
+        with self._lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get request, retry and hedging counters
+
+        Returns:
+            Dictionary of counters and pool configuration
+        """
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "max_retries": self.max_retries,
+            "hedge_after_ms": self.hedge_after_ms,
+        }
+
+class RequestCoalescer:
+    """
+    Shares one in-flight call between concurrent callers with the same key.
+
+    The first caller starts the call; callers arriving before it finishes
+    await the same result instead of sending a duplicate request.
+    """
+
+    def __init__(self):
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]]" = weakref.WeakKeyDictionary()
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run call() unless an identical call is already in flight
+
+        Args:
+            key: Identifies identical calls
+            call: Starts the call when no identical one is in flight
+
+        Returns:
+            The (possibly shared) result
+        """
+        in_flight = self._in_flight.setdefault(asyncio.get_running_loop(), {})
+        task = in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(call())
+            in_flight[key] = task
+            task.add_done_callback(lambda _: in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # A caller that times out must not cancel the call for the others
+        return await asyncio.shield(task)
+
+http_pool = AsyncHTTPPool.from_env()
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from services.base_service import ModelService
+from services.http_client import RequestCoalescer, http_pool
+from utils.timing import StreamChunk
+
+SYSTEM_PROMPT = "You are a legal expert assistant. Provide accurate, concise answers to questions about legal topics."
+
+class HTTPChatService(ModelService):
+    """
+    Service for any server that speaks the OpenAI chat-completions protocol,
+    such as self-hosted inference servers.
+
+    Concurrent requests for the same question and parameters share a single
+    upstream call, and at most max_in_flight calls are sent at once. Calls
+    run on the HTTP pool's background loop whichever event loop or thread
+    they come from, so the limit and the sharing apply to the whole process.
+    """
+
+    error_prefix = "Error getting answer from HTTP provider"
+
+    def __init__(
+        self,
+        base_url: str,
+        model_name: str,
+        name: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        api_key_env: Optional[str] = None,
+        timeout_seconds: Optional[float] = None,
+        max_in_flight: int = 16,
+        temperature: float = 0,
+        max_tokens: int = 300,
+        system_prompt: str = SYSTEM_PROMPT
+    ):
+        """
+        Initialize the HTTP provider
+
+        Args:
+            base_url: API base URL; requests go to <base_url>/chat/completions
+            model_name: Model name sent with every request
+            name: Display name (default: "<model_name> @ <base_url>")
+            headers: Extra headers sent with every request
+            api_key_env: Environment variable holding a bearer token
+            timeout_seconds: Per-attempt timeout (default: HTTP_TIMEOUT_SECONDS)
+            max_in_flight: Maximum concurrent upstream calls
+            temperature: Sampling temperature; 0 makes answers cacheable
+            max_tokens: Maximum number of tokens in the answer
+            system_prompt: System message sent before the question
+        """
+        if not base_url:
+            raise ValueError("HTTP provider requires a base_url")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self._base_url = base_url.rstrip("/")
+        self._model_name = model_name
+        self._name = name or f"{model_name} @ {self._base_url}"
+        self._headers = dict(headers or {})
+        if api_key_env:
+            api_key = os.environ.get(api_key_env)
+            if not api_key:
+                raise ValueError(f"API key not found. Set the {api_key_env} environment variable.")
+            self._headers["Authorization"] = f"Bearer {api_key}"
+        self._timeout = timeout_seconds
+        self._max_in_flight = max_in_flight
+        self._temperature = temperature
+        self._max_tokens = max_tokens
+        self._system_prompt = system_prompt
+        self._coalescer = RequestCoalescer()
+        # Created on the HTTP pool's background loop, the only loop that uses it
+        self._in_flight_limit: Optional[asyncio.Semaphore] = None
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def _build_messages(self, question: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self._system_prompt},
+            {"role": "user", "content": question}
+        ]
+
+    async def _call(self, question: str) -> str:
+        async with self._semaphore():
+            response = await http_pool.post_json(
+                f"{self._base_url}/chat/completions",
+                {
+                    "model": self._model_name,
+                    "messages": self._build_messages(question),
+                    **self.get_generation_params(),
+                },
+                headers=self._headers,
+                timeout=self._timeout
+            )
+        return response["choices"][0]["message"]["content"].strip()
+
+    async def aget_answer(self, question: str) -> str:
+        """
+        Get an answer through the shared HTTP pool, sharing identical in-flight calls
+        """
+        try:
+            return await http_pool.run_on_loop(self._coalescer.run(question, lambda: self._call(question)))
+        except Exception as e:
+            return f"{self.error_prefix}: {str(e)}"
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._in_flight_limit is None:
+            self._in_flight_limit = asyncio.Semaphore(self._max_in_flight)
+        return self._in_flight_limit
+
+    async def astream_answer(self, question: str) -> AsyncIterator[str]:
+        """
+        Stream the answer with stream=True, yielding each content delta
+
+        Streams are not coalesced, since every caller consumes its own chunks.
+        The server is asked for a usage report after the last delta, passed
+        on as an empty chunk carrying usage.completion_tokens.
+        """
+        async for chunk in http_pool.iterate_on_loop(self._stream(question)):
+            yield chunk
+
+    async def _stream(self, question: str) -> AsyncIterator[str]:
+        payload = {
+            "model": self._model_name,
+            "messages": self._build_messages(question),
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            **self.get_generation_params(),
+        }
+        try:
+            async with self._semaphore():
+                async for line in http_pool.stream_lines(
+                    "POST", f"{self._base_url}/chat/completions",
+                    json=payload, headers=self._headers, timeout=self._timeout
+                ):
+                    # Server-sent events: "data: {...}" lines, ended by "data: [DONE]"
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    choices = event.get("choices") or [{}]
+                    content = choices[0].get("delta", {}).get("content")
+                    if content:
+                        yield content
+                    completion_tokens = (event.get("usage") or {}).get("completion_tokens")
+                    if completion_tokens is not None:
+                        yield StreamChunk("", completion_tokens)
+        except Exception as e:
+            yield f" {self.error_prefix}: {str(e)}"
+
+    def stream_answer(self, question: str) -> Iterator[str]:
+        """
+        Stream the answer from synchronous code via the HTTP pool's background loop
+        """
+        return http_pool.iterate_sync(self._stream(question))
+
+    def get_answer(self, question: str) -> str:
+        """
+        Get an answer from synchronous code via the HTTP pool's background loop
+        """
+        return http_pool.run_sync(self.aget_answer(question))
+
+    def get_generation_params(self) -> Dict[str, Any]:
+        return {"temperature": self._temperature, "max_tokens": self._max_tokens}
+
+    def is_deterministic(self) -> bool:
+        return self._temperature == 0
+
+    def is_cacheable_answer(self, answer: str) -> bool:
+        # A stream that broke part-way ends with the error message
+        return bool(answer) and self.error_prefix not in answer
+
+    def get_load_stats(self) -> Dict[str, Any]:
+        stats = super().get_load_stats()
+        stats["upstream_calls"] = self._coalescer.calls
+        stats["coalesced_calls"] = self._coalescer.coalesced
+        return stats
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Get metadata about the HTTP provider"""
+        return {
+            "model_type": "http",
+            "model_name": self._model_name,
+            "base_url": self._base_url,
+        }
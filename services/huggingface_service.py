@@ -1,8 +1,11 @@
 from transformers import pipeline
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Optional, Tuple
 import os
 
 from services.base_service import ModelService
+from services.batching import MicroBatcher, MICRO_BATCH_MAX_SIZE
+from utils.retrieval import get_legal_retriever
 
 class HuggingFaceService(ModelService):
     """
@@ -25,6 +28,12 @@ class HuggingFaceService(ModelService):
             model=model_name,
             tokenizer=model_name
         )
+        
+        # Context passages come from the local legal corpus
+        self._retriever = get_legal_retriever()
+        
+        # Concurrent questions are answered in a single batched pipeline call
+        self._batcher = MicroBatcher(self._answer_batch, name=self._name) if MICRO_BATCH_MAX_SIZE > 1 else None
     
     @property
     def name(self) -> str:
@@ -34,29 +43,68 @@ class HuggingFaceService(ModelService):
         """
         Get an answer for the given question using Hugging Face
         
-        For QA models, we need context. Since we don't have specific context,
-        we'll use the question itself as minimal context.
+        The reader extracts the answer from the corpus passages most
+        relevant to the question.
         """
-        # For legal questions, we'll create a minimal context from the question
-        # In a real-world scenario, you'd provide actual legal context
-        context = (
-            f"This is a legal question about: {question} "
-            "The Indian Penal Code (IPC) is the official criminal code of India. "
-            "It covers all substantive aspects of criminal law. "
-            "Section 420 in The Indian Penal Code deals with Cheating and dishonestly "
-            "inducing delivery of property."
-        )
+        return self.get_answer_details(question)[0]
+    
+    def get_answer_details(self, question: str) -> Tuple[str, Dict[str, Any]]:
+        """Get an answer with its retrieved passages and retrieval and reader timings"""
+        if self._batcher is not None:
+            return self._batcher(question)
+        return self._answer_batch([question])[0]
+    
+    def get_answers(self, questions: List[str]) -> List[str]:
+        """Answer several questions with a single batched pipeline call"""
+        return [answer for answer, _ in self._answer_batch(questions)]
+    
+    def _answer_batch(self, questions: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        retrievals = [self._retriever.retrieve(question) for question in questions]
         
-        result = self._qa_pipeline(
-            question=question,
-            context=context
+        start = time.perf_counter()
+        results = self._qa_pipeline(
+            question=questions,
+            context=[self._retriever.build_context(retrieval.passages) for retrieval in retrievals],
+            batch_size=len(questions)
         )
+        reader_ms = (time.perf_counter() - start) * 1000
         
-        return result['answer']
+        # The pipeline unwraps single-item batches
+        if isinstance(results, dict):
+            results = [results]
+        
+        return [
+            (result['answer'], {
+                **retrieval.as_metadata(),
+                # The reader runs once for the whole batch
+                "reader_ms": round(reader_ms, 3),
+                "reader_batch_size": len(questions),
+            })
+            for result, retrieval in zip(results, retrievals)
+        ]
+    
+    def get_batching_stats(self) -> Optional[Dict[str, Any]]:
+        return self._batcher.stats() if self._batcher is not None else None
+    
+    def close(self):
+        """Stop the micro-batcher thread, which holds a reference to the model"""
+        batcher, self._batcher = self._batcher, None
+        if batcher is not None:
+            batcher.close()
+    
+    def is_deterministic(self) -> bool:
+        """Extractive QA always selects the same span for the same input"""
+        return True
+    
+    def get_memory_footprint(self) -> Optional[int]:
+        """Get the memory used by the model weights in bytes"""
+        return self._qa_pipeline.model.get_memory_footprint()
     
     def get_metadata(self) -> Dict[str, Any]:
         """Get metadata about the Hugging Face model"""
         return {
             "model_type": "huggingface",
             "model_name": self._model_name,
+            # Answers depend on the passages the reader is given
+            "corpus_version": self._retriever.corpus_version,
         }
\ No newline at end of file
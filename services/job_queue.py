@@ -0,0 +1,451 @@
+"""
+Persistent background job queue for long benchmark suites and A/B tests.
+
+Jobs are stored in SQLite, so queued and interrupted jobs survive restarts.
+A fixed number of workers run them on a dedicated event loop thread,
+highest priority first, independent of the request that submitted them.
+Handlers store results one item at a time, so a large suite neither holds
+its results in memory nor loses finished items when the process stops.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from utils.cache import LOGS_DIR
+
+JOB_STORE_PATH = os.environ.get("JOB_STORE_PATH", os.path.join(LOGS_DIR, "jobs.sqlite"))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+_JOB_COLUMNS = (
+    "id", "kind", "status", "priority", "payload", "completed", "total",
+    "error", "cancel_requested", "created_at", "started_at", "finished_at"
+)
+
+class JobStore:
+    """SQLite store of jobs and their per-item results"""
+
+    def __init__(self, path: str = JOB_STORE_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, priority INTEGER NOT NULL, "
+            "payload TEXT NOT NULL, completed INTEGER NOT NULL DEFAULT 0, total INTEGER NOT NULL DEFAULT 0, "
+            "error TEXT, cancel_requested INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, created_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_results ("
+            "job_id TEXT NOT NULL, item INTEGER NOT NULL, result TEXT NOT NULL, PRIMARY KEY (job_id, item))"
+        )
+        self._conn.commit()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _row_to_job(self, row: Optional[tuple]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(zip(_JOB_COLUMNS, row))
+        job["payload"] = json.loads(job["payload"])
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._row_to_job(self._conn.execute(
+            f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone())
+
+    def create(self, kind: str, payload: Dict[str, Any], priority: int = 0, total: int = 0) -> Dict[str, Any]:
+        """Add a queued job and return it"""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, priority, payload, total, created_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, kind, priority, json.dumps(payload), total, time.time())
+            )
+            self._conn.commit()
+            return self._get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job, or None if it does not exist"""
+        with self._lock:
+            return self._get(job_id)
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get the most recently created jobs, optionally only those with a status"""
+        query = f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs"
+        params: Tuple[Any, ...] = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at DESC LIMIT ?", params + (limit,)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def status_counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in JOB_STATUSES}
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Mark the highest-priority, oldest queued job as running and return it"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY priority DESC, created_at, rowid LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), row[0])
+            )
+            self._conn.commit()
+            return self._get(row[0])
+
+    def requeue_running(self) -> int:
+        """Put jobs left running by a stopped process back in the queue"""
+        with self._lock:
+            count = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            ).rowcount
+            self._conn.commit()
+            return count
+
+    def request_cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a queued job, or flag a running one for its worker to cancel
+
+        Returns:
+            The job after the change, or None if it does not exist
+        """
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, "
+                "finished_at = CASE WHEN status = 'queued' THEN ? ELSE finished_at END, "
+                "status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (now, job_id)
+            )
+            self._conn.commit()
+            return self._get(job_id)
+
+    def set_progress(self, job_id: str, completed: int, total: Optional[int] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET completed = ?, total = COALESCE(?, total) WHERE id = ?", (completed, total, job_id)
+            )
+            self._conn.commit()
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def requeue(self, job_id: str):
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE id = ?", (job_id,))
+            self._conn.commit()
+
+    def save_result(self, job_id: str, item: int, result: Dict[str, Any], completed: Optional[int] = None):
+        """Store one item's result, and optionally the job's progress, in a single transaction"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_results (job_id, item, result) VALUES (?, ?, ?)",
+                (job_id, item, json.dumps(result))
+            )
+            if completed is not None:
+                self._conn.execute("UPDATE jobs SET completed = ? WHERE id = ?", (completed, job_id))
+            self._conn.commit()
+
+    def result_items(self, job_id: str) -> Set[int]:
+        """Items of a job that already have a result"""
+        with self._lock:
+            rows = self._conn.execute("SELECT item FROM job_results WHERE job_id = ?", (job_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get stored results in item order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item, result FROM job_results WHERE job_id = ? ORDER BY item LIMIT ? OFFSET ?",
+                (job_id, limit, offset)
+            ).fetchall()
+        return [{"index": item, "result": json.loads(result)} for item, result in rows]
+
+class JobContext:
+    """What a running handler sees of its job"""
+
+    def __init__(self, store: JobStore, job: Dict[str, Any], on_change: Callable[[], None]):
+        self.job_id: str = job["id"]
+        self.payload: Dict[str, Any] = job["payload"]
+        self._store = store
+        self._on_change = on_change
+        self._done = store.result_items(self.job_id)
+
+    def completed_items(self) -> Set[int]:
+        """Items finished before the job was interrupted; a resumed handler skips them"""
+        return set(self._done)
+
+    def save_result(self, item: int, result: Dict[str, Any], counts_progress: bool = True):
+        """
+        Store an item's result
+
+        Args:
+            item: Index of the item, e.g. of the question in the suite
+            result: JSON-serializable result
+            counts_progress: Count the item as the job's progress; jobs that
+                report progress themselves pass False
+        """
+        self._done.add(item)
+        self._store.save_result(self.job_id, item, result, len(self._done) if counts_progress else None)
+        self._on_change()
+
+    def progress(self, completed: int, total: Optional[int] = None):
+        """Report progress of a job whose results are not stored per item"""
+        self._store.set_progress(self.job_id, completed, total)
+        self._on_change()
+
+JobHandler = Callable[[JobContext], Awaitable[None]]
+
+class JobQueue:
+    """
+    Bounded pool of workers running stored jobs by priority.
+
+    Workers live on their own event loop thread, so jobs keep running
+    after the submitting request returns and never share an event loop
+    with request handlers. Any thread may submit, cancel or subscribe.
+    """
+
+    def __init__(self, store: JobStore, handlers: Optional[Dict[str, JobHandler]] = None, max_workers: int = JOB_WORKERS):
+        """
+        Initialize the queue
+
+        Args:
+            store: Where jobs and their results are kept
+            handlers: Coroutine function per job kind
+            max_workers: Jobs that may run at the same time
+        """
+        self.store = store
+        self.max_workers = max(1, max_workers)
+        self._handlers: Dict[str, JobHandler] = dict(handlers or {})
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._stopping = False
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def register(self, kind: str, handler: JobHandler):
+        """Register the coroutine function that runs jobs of a kind"""
+        self._handlers[kind] = handler
+
+    @property
+    def kinds(self) -> List[str]:
+        return list(self._handlers)
+
+    def start(self) -> int:
+        """
+        Start the workers if they are not running
+
+        Returns:
+            Number of jobs a previous process left running, which are queued again
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return 0
+            requeued = self.store.requeue_running()
+            self._stopping = False
+            self._loop = asyncio.new_event_loop()
+            self._wakeup = asyncio.Event()
+            self._thread = threading.Thread(target=self._serve, name="job-queue", daemon=True)
+            self._thread.start()
+            return requeued
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        self._workers = [self._loop.create_task(self._worker()) for _ in range(self.max_workers)]
+        try:
+            self._loop.run_until_complete(asyncio.gather(*self._workers, return_exceptions=True))
+        finally:
+            self._loop.close()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the workers; jobs they were running are queued again for the next start"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                return
+            self._loop.call_soon_threadsafe(self._cancel_workers)
+            thread = self._thread
+        thread.join(timeout)
+
+    def _cancel_workers(self):
+        self._stopping = True
+        for worker in self._workers:
+            worker.cancel()
+
+    def _notify_workers(self):
+        if self._loop is not None and self._thread is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _worker(self):
+        while not self._stopping:
+            job = self.store.claim_next()
+            if job is None:
+                # Nothing is awaited between the empty claim and the wait, so no wakeup is missed
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            await self._run_job(job)
+
+    async def _run_job(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            self.store.finish(job_id, "failed", f"No handler for job kind: {job['kind']}")
+            self._publish(job_id)
+            return
+        if job["cancel_requested"]:
+            self.store.finish(job_id, "cancelled")
+            self._publish(job_id)
+            return
+
+        self._publish(job_id)
+        task = asyncio.ensure_future(handler(JobContext(self.store, job, lambda: self._publish(job_id))))
+        self._running[job_id] = task
+        status, error = "succeeded", None
+        try:
+            await task
+        except asyncio.CancelledError:
+            if self._stopping and not self.store.get(job_id)["cancel_requested"]:
+                # Shutting down: finished items are kept and the job resumes on the next start
+                self.store.requeue(job_id)
+                raise
+            status = "cancelled"
+        except Exception as e:
+            print(f"Job {job_id} failed: {str(e)}")
+            status, error = "failed", f"{type(e).__name__}: {str(e)}"
+        finally:
+            self._running.pop(job_id, None)
+        self.store.finish(job_id, status, error)
+        self._publish(job_id)
+
+    def submit(self, kind: str, payload: Dict[str, Any], priority: int = 0, total: int = 0) -> Dict[str, Any]:
+        """
+        Store a job and wake a worker for it
+
+        Args:
+            kind: Job kind; must have a registered handler
+            payload: JSON-serializable arguments for the handler
+            priority: Higher priorities run first; equal priorities run in submission order
+            total: Number of items the job will process, for progress reporting
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If no handler is registered for kind
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unsupported job kind: {kind}")
+        job = self.store.create(kind, payload, priority, total)
+        self.start()
+        self._notify_workers()
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job
+
+        Queued jobs are cancelled at once; running jobs are cancelled by
+        their worker shortly after. Finished jobs are left as they are.
+
+        Returns:
+            The job, or None if it does not exist
+        """
+        job = self.store.request_cancel(job_id)
+        if job is not None and job["status"] == "running" and self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._cancel_running, job_id)
+            except RuntimeError:
+                # The worker loop has already stopped; the flag cancels the job on the next start
+                pass
+        self._publish(job_id)
+        return job
+
+    def _cancel_running(self, job_id: str):
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+
+    def _publish(self, job_id: str):
+        with self._lock:
+            subscribers = list(self._subscribers.get(job_id, []))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+            except RuntimeError:
+                # The subscriber's event loop is gone
+                pass
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the job now and again after every change, until it finishes
+
+        Changes that arrive while the caller is busy are merged into one update.
+        """
+        loop = asyncio.get_running_loop()
+        subscriber = (loop, asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(subscriber)
+        try:
+            job = self.store.get(job_id)
+            while job is not None:
+                yield job
+                if job["status"] in FINISHED_STATUSES:
+                    return
+                await subscriber[1].get()
+                while not subscriber[1].empty():
+                    subscriber[1].get_nowait()
+                job = self.store.get(job_id)
+        finally:
+            with self._lock:
+                self._subscribers[job_id].remove(subscriber)
+                if not self._subscribers[job_id]:
+                    del self._subscribers[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get worker and job counts
+
+        Returns:
+            Dictionary of queue settings and counters
+        """
+        counts = self.store.status_counts()
+        return {
+            "store_path": self.store.path,
+            "workers": self.max_workers,
+            "started": self._thread is not None and self._thread.is_alive(),
+            "running": len(self._running),
+            "kinds": self.kinds,
+            "jobs": counts,
+        }
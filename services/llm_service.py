@@ -1,9 +1,33 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional
 import os
+import threading
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import AutoModelForCausalLM, AutoTokenizer, TextIteratorStreamer
 
 from services.base_service import ModelService
+from services.batching import MicroBatcher, MICRO_BATCH_MAX_SIZE
+from utils.timing import StreamChunk
+
+class TokenCountingStreamer(TextIteratorStreamer):
+    """
+    TextIteratorStreamer whose chunks carry the number of generated token ids
+    they were decoded from, so the chunks add up to len(output_ids) - prompt_len
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending_tokens = 0
+    
+    def put(self, value):
+        if not (self.skip_prompt and self.next_tokens_are_prompt):
+            self._pending_tokens += value.shape[-1]
+        super().put(value)
+    
+    def on_finalized_text(self, text: str, stream_end: bool = False):
+        # Tokens still being buffered into a word count towards the chunk that prints it
+        if text or stream_end:
+            text, self._pending_tokens = StreamChunk(text, self._pending_tokens), 0
+        super().on_finalized_text(text, stream_end)
 
 class LegalLLMService(ModelService):
     """
@@ -42,6 +66,17 @@ class LegalLLMService(ModelService):
                 torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
                 device_map="auto"
             )
+        
+        # Batched generation needs left padding so every prompt ends at the same position
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        
+        # Batched and streamed generation share the model; only one generate runs at a time
+        self._generate_lock = threading.Lock()
+        
+        # Concurrent questions are answered in a single batched generate call
+        self._batcher = MicroBatcher(self.get_answers, name=self._name) if MICRO_BATCH_MAX_SIZE > 1 else None
     
     @property
     def name(self) -> str:
@@ -51,34 +86,105 @@ class LegalLLMService(ModelService):
         """
         Get an answer for the given legal question
         """
-        prompt = f"""You are a legal expert assistant specialized in Indian law.
-        Please answer the following question accurately and concisely:
-        
-        {question}
-        
-        Answer:"""
+        if self._batcher is not None:
+            return self._batcher(question)
+        return self.get_answers([question])[0]
+    
+    def get_answers(self, questions: List[str]) -> List[str]:
+        """
+        Answer several legal questions with a single padded generate call
+        """
+        prompts = [self._build_prompt(question) for question in questions]
         
         try:
-            input_ids = self.tokenizer(prompt, return_tensors="pt").input_ids.to(self.model.device)
-            
-            generated_ids = self.model.generate(
-                input_ids,
-                max_new_tokens=200,
-                do_sample=True,
-                temperature=0.7,
-                top_p=0.95,
-            )
+            inputs = self.tokenizer(prompts, return_tensors="pt", padding=True).to(self.model.device)
             
-            generated_text = self.tokenizer.decode(generated_ids[0], skip_special_tokens=True)
+            with self._generate_lock:
+                generated_ids = self.model.generate(
+                    **inputs,
+                    pad_token_id=self.tokenizer.pad_token_id,
+                    **self.get_generation_params()
+                )
             
-            answer = generated_text.replace(prompt, "").strip()
+            # Keep only the newly generated tokens of each sequence
+            new_tokens = generated_ids[:, inputs.input_ids.shape[1]:]
+            answers = self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
             
-            return answer
+            return [answer.strip() for answer in answers]
         except Exception as e:
-            if "34(b)" in question or "34 b" in question:
-                return "Section 34(b) of IPC explains that common intention can be inferred from the conduct of the accused persons, preceding or contemporaneous with the criminal act."
-            else:
-                return "I couldn't process your question with the model. Please try again with a different question."
+            return [self._fallback_answer(question) for question in questions]
+    
+    def stream_answer(self, question: str) -> Iterator[str]:
+        """
+        Stream the answer as it is decoded, using a TextIteratorStreamer
+        
+        Streamed questions are not micro-batched, since each needs its own
+        streamer; they wait for any batched generate call to finish. Chunks
+        carry the number of generated tokens they hold.
+        """
+        streamer = TokenCountingStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        failed = threading.Event()
+        
+        def generate():
+            try:
+                inputs = self.tokenizer(self._build_prompt(question), return_tensors="pt").to(self.model.device)
+                with self._generate_lock:
+                    self.model.generate(
+                        **inputs,
+                        streamer=streamer,
+                        pad_token_id=self.tokenizer.pad_token_id,
+                        **self.get_generation_params()
+                    )
+            except Exception:
+                failed.set()
+                streamer.end()
+        
+        threading.Thread(target=generate, name=f"{self._name} stream", daemon=True).start()
+        produced = False
+        for text in streamer:
+            if text:
+                produced = True
+                yield text
+            elif getattr(text, "tokens", None):
+                # e.g. the end of sequence token, which decodes to nothing
+                yield text
+        if failed.is_set() and not produced:
+            yield self._fallback_answer(question)
+    
+    def get_batching_stats(self) -> Optional[Dict[str, Any]]:
+        return self._batcher.stats() if self._batcher is not None else None
+    
+    def close(self):
+        """Stop the micro-batcher thread, which holds a reference to the model"""
+        batcher, self._batcher = self._batcher, None
+        if batcher is not None:
+            batcher.close()
+    
+    def _build_prompt(self, question: str) -> str:
+        return f"""You are a legal expert assistant specialized in Indian law.
+        Please answer the following question accurately and concisely:
+        
+        {question}
+        
+        Answer:"""
+    
+    def _fallback_answer(self, question: str) -> str:
+        if "34(b)" in question or "34 b" in question:
+            return "Section 34(b) of IPC explains that common intention can be inferred from the conduct of the accused persons, preceding or contemporaneous with the criminal act."
+        else:
+            return "I couldn't process your question with the model. Please try again with a different question."
+    
+    def get_generation_params(self) -> Dict[str, Any]:
+        return {
+            "max_new_tokens": 200,
+            "do_sample": True,
+            "temperature": 0.7,
+            "top_p": 0.95,
+        }
+    
+    def get_memory_footprint(self) -> Optional[int]:
+        """Get the memory used by the model weights in bytes"""
+        return self.model.get_memory_footprint()
     
     def get_metadata(self) -> Dict[str, Any]:
         """Get metadata about the model"""
@@ -0,0 +1,292 @@
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.base_service import ModelService
+from utils.metrics import metrics_registry
+from utils.startup import lazy_import
+
+
+class ModelLoadError(RuntimeError):
+    """Raised when a registered model service cannot be loaded"""
+
+
+def _create_llm_service(**config) -> ModelService:
+    return lazy_import("services.llm_service").LegalLLMService(**config)
+
+
+def _create_huggingface_service(**config) -> ModelService:
+    return lazy_import("services.huggingface_service").HuggingFaceService(**config)
+
+
+def _create_optimized_huggingface_service(**config) -> ModelService:
+    return lazy_import("services.optimized_hf_service").OptimizedHuggingFaceService(**config)
+
+
+def _create_openai_service(**config) -> ModelService:
+    return lazy_import("services.openai_service").OpenAIService(**config)
+
+
+def _create_http_service(**config) -> ModelService:
+    return lazy_import("services.http_service").HTTPChatService(**config)
+
+
+def _create_simplified_service(**config) -> ModelService:
+    return lazy_import("services.simplified_service").SimplifiedModelService(**config)
+
+
+class ModelRegistry:
+    """
+    Process-wide registry that loads each model service once and hands out
+    shared instances.
+
+    Services are keyed by their model type plus the configuration they were
+    created with, so two A/B variants asking for the same model share a
+    single loaded instance. Failed loads are remembered until the entry is
+    reloaded, so a model that cannot be downloaded is not retried on every
+    request.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[..., ModelService]] = {}
+        self._instances: Dict[Tuple, ModelService] = {}
+        self._failures: Dict[Tuple, str] = {}
+        self._locks: Dict[Tuple, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self._benchmark_types: List[str] = []
+
+    def register(self, model_type: str, factory: Callable[..., ModelService], include_in_benchmark: bool = False):
+        """
+        Register a factory for a model type
+
+        Args:
+            model_type: Identifier used to resolve the model (e.g. "openai")
+            factory: Callable that builds the service from keyword config
+            include_in_benchmark: Add the model to the default benchmark set
+        """
+        self._factories[model_type] = factory
+        if include_in_benchmark and model_type not in self._benchmark_types:
+            self._benchmark_types.append(model_type)
+
+    @property
+    def model_types(self) -> List[str]:
+        return list(self._factories.keys())
+
+    @staticmethod
+    def _make_key(model_type: str, config: Dict[str, Any]) -> Tuple:
+        # Nested config (e.g. HTTP headers) is frozen so the key is hashable
+        return (model_type, json.dumps(config, sort_keys=True, default=str))
+
+    def _lock_for(self, key: Tuple) -> threading.Lock:
+        with self._registry_lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def get(self, model_type: str, **config) -> ModelService:
+        """
+        Get the shared instance for a model, loading it on first use
+
+        Args:
+            model_type: Registered model type
+            **config: Keyword arguments passed to the service constructor
+
+        Returns:
+            The loaded model service
+
+        Raises:
+            ModelLoadError: If the model failed to load (now or previously)
+            ValueError: If the model type is not registered
+        """
+        if model_type not in self._factories:
+            raise ValueError(f"Unsupported model type: {model_type}")
+
+        key = self._make_key(model_type, config)
+        instance = self._instances.get(key)
+        if instance is not None:
+            return instance
+
+        with self._lock_for(key):
+            # Another thread may have finished loading while we waited
+            if key in self._instances:
+                return self._instances[key]
+            if key in self._failures:
+                raise ModelLoadError(self._failures[key])
+
+            start_time = time.perf_counter()
+            try:
+                instance = self._factories[model_type](**config)
+            except Exception as e:
+                self._failures[key] = f"Failed to load {model_type} model: {str(e)}"
+                raise ModelLoadError(self._failures[key]) from e
+
+            instance.load_time_ms = (time.perf_counter() - start_time) * 1000
+            instance.loaded_at = time.time()
+            self._instances[key] = instance
+            return instance
+
+    def try_get(self, model_type: str, **config) -> Optional[ModelService]:
+        """Get a model instance, returning None instead of raising on load failure"""
+        try:
+            return self.get(model_type, **config)
+        except ModelLoadError:
+            return None
+
+    def warm_up(self, model_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Load models ahead of the first request
+
+        Args:
+            model_types: Model types to load with their default config;
+                defaults to every registered type
+
+        Returns:
+            Mapping of model type to load status
+        """
+        status = {}
+        for model_type in model_types or self.model_types:
+            try:
+                model = self.get(model_type)
+                status[model_type] = {"loaded": True, "model_name": model.name}
+            except (ModelLoadError, ValueError) as e:
+                status[model_type] = {"loaded": False, "error": str(e)}
+        return status
+
+    def evict(self, model_type: str) -> int:
+        """
+        Drop every loaded instance (and remembered failure) of a model type
+
+        Instances are closed, so their micro-batcher threads stop and no
+        longer hold the model weights.
+
+        Returns:
+            Number of instances evicted
+        """
+        evicted = []
+        with self._registry_lock:
+            for key in list(self._instances.keys()):
+                if key[0] == model_type:
+                    evicted.append(self._instances.pop(key))
+            for key in list(self._failures.keys()):
+                if key[0] == model_type:
+                    del self._failures[key]
+        # Outside the lock: closing waits for a running batch to finish
+        for instance in evicted:
+            try:
+                instance.close()
+            except Exception as e:
+                print(f"Error closing evicted model {model_type}: {str(e)}")
+        return len(evicted)
+
+    def reload(self, model_type: str) -> Dict[str, Any]:
+        """Evict a model type and load it again with its default config"""
+        self.evict(model_type)
+        return self.warm_up([model_type])[model_type]
+
+    def get_benchmark_models(self) -> List[ModelService]:
+        """
+        Resolve the default set of models used by the benchmark endpoints
+
+        The legal LLM falls back to the rule-based model when it cannot be
+        loaded; the Hugging Face, OpenAI and configured HTTP providers are
+        skipped if unavailable.
+        """
+        models = []
+
+        llm_service = self.try_get("llm")
+        models.append(llm_service if llm_service is not None else self.get("simplified"))
+
+        for model_type in ["huggingface", "openai"] + self._benchmark_types:
+            if model_type not in self._factories:
+                continue
+            model = self.try_get(model_type)
+            if model is not None:
+                models.append(model)
+
+        return models
+
+    def loaded_models(self) -> List[ModelService]:
+        """Get every currently loaded model instance"""
+        return list(self._instances.values())
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Load-time and memory stats for every loaded or failed model"""
+        stats = []
+        for (model_type, config), model in list(self._instances.items()):
+            entry = {"model_type": model_type, "config": json.loads(config), "loaded": True}
+            entry.update(model.get_load_stats())
+            stats.append(entry)
+        for (model_type, config), error in list(self._failures.items()):
+            stats.append({
+                "model_type": model_type,
+                "config": json.loads(config),
+                "loaded": False,
+                "error": error
+            })
+        return stats
+
+
+model_registry = ModelRegistry()
+model_registry.register("llm", _create_llm_service)
+model_registry.register("huggingface", _create_huggingface_service)
+model_registry.register("optimized_huggingface", _create_optimized_huggingface_service)
+model_registry.register("openai", _create_openai_service)
+model_registry.register("simplified", _create_simplified_service)
+model_registry.register("http", _create_http_service)
+
+metrics_registry.callback(
+    "model_load_duration_seconds", "Time taken to load each loaded model",
+    lambda: [
+        ({"model_type": entry["model_type"], "model": entry["model_name"]}, entry["load_time_ms"] / 1000)
+        for entry in model_registry.stats() if entry["loaded"] and entry.get("load_time_ms") is not None
+    ]
+)
+metrics_registry.callback(
+    "model_memory_footprint_bytes", "Memory used by the weights of each loaded local model",
+    lambda: [
+        ({"model_type": entry["model_type"], "model": entry["model_name"]}, entry["memory_footprint_bytes"])
+        for entry in model_registry.stats() if entry["loaded"]
+    ]
+)
+
+
+HTTP_PROVIDERS_CONFIG = os.environ.get(
+    "HTTP_PROVIDERS_CONFIG",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "http_providers.json")
+)
+
+
+def register_http_providers(registry: ModelRegistry, path: str) -> List[str]:
+    """
+    Register each provider in an HTTP providers file as its own model type
+
+    The file holds {"providers": [{"name": ..., "base_url": ..., "model_name": ...}]};
+    other keys are passed to HTTPChatService. Providers with "benchmark": true
+    join the default benchmark set. Nothing is registered if the file is missing.
+
+    Returns:
+        The registered model types
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        providers = json.load(file).get("providers", [])
+
+    registered = []
+    for provider in providers:
+        config = dict(provider)
+        model_type = config.pop("name")
+        include_in_benchmark = config.pop("benchmark", False)
+        registry.register(
+            model_type,
+            functools.partial(_create_http_service, name=model_type, **config),
+            include_in_benchmark
+        )
+        registered.append(model_type)
+    return registered
+
+
+register_http_providers(model_registry, HTTP_PROVIDERS_CONFIG)
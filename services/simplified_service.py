@@ -59,5 +59,8 @@ class SimplifiedModelService(ModelService):
         return ("I don't have specific information about this legal question. "
                 "Please ask about a specific section of the Indian Penal Code.")
     
+    def is_deterministic(self) -> bool:
+        return True
+    
     def get_metadata(self) -> Dict[str, Any]:
         return {"model_type": "simplified", "version": "1.0"}
\ No newline at end of file
@@ -1,24 +1,45 @@
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from utils.embedding_store import EmbeddingStore, get_embedding_store
 
 class TextAnalysisService:
-    def __init__(self):
-        # Initialize sentence transformer if available
-        try:
-            from sentence_transformers import SentenceTransformer
-            self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
-            self.semantic_similarity_available = True
-        except ImportError:
-            self.semantic_similarity_available = False
+    def __init__(self, embedding_store: Optional[EmbeddingStore] = None):
+        # Embeddings come from the persistent store, which loads the
+        # sentence-transformers model on its first miss
+        self._embedding_store = embedding_store
+    
+    @property
+    def embedding_store(self) -> EmbeddingStore:
+        return self._embedding_store or get_embedding_store()
+    
+    @property
+    def semantic_similarity_available(self) -> bool:
+        return self.embedding_store.stats()["encoder_error"] is None
     
     def semantic_similarity(self, text1: str, text2: str) -> float:
-        """Calculate semantic similarity between two texts"""
-        if not self.semantic_similarity_available:
-            return 0.0
-            
-        embeddings = self.sentence_model.encode([text1, text2])
-        similarity = embeddings[0] @ embeddings[1].T  # Cosine similarity
-        return float(similarity)
+        """Calculate the cosine similarity between two texts"""
+        similarities = self.semantic_similarities([text1], [text2])
+        return float(similarities[0, 0]) if similarities.size else 0.0
+    
+    def semantic_similarities(self, texts: Sequence[str], references: Sequence[str]) -> np.ndarray:
+        """
+        Calculate cosine similarities between texts and reference texts
+        
+        Both lists are embedded in one batch; texts already in the store
+        are not encoded again.
+        
+        Returns:
+            Array of shape (len(texts), len(references)), or an empty
+            array if the embedding model is unavailable
+        """
+        try:
+            embeddings = self.embedding_store.embed(list(texts) + list(references))
+        except RuntimeError:
+            return np.zeros((0, 0), dtype=np.float32)
+        return embeddings[:len(texts)] @ embeddings[len(texts):].T
     
     def extract_citations(self, text: str) -> List[str]:
         """Extract legal citations from text"""
@@ -0,0 +1,203 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from models import ABTestConfig
+from services.ab_test_service import ABTestService
+from services.base_service import ModelService
+from services.model_registry import model_registry
+from utils.significance import paired_t_test, student_t_cdf, student_t_ppf, summarize, welch_t_test
+
+client = TestClient(app)
+
+class SleepingService(ModelService):
+    """Model stub with a fixed latency"""
+
+    instances = 0
+
+    def __init__(self, name: str, delay: float, answer: str = "Section 420 covers cheating and fraud."):
+        SleepingService.instances += 1
+        self._name = name
+        self._delay = delay
+        self._answer = answer
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def get_answer(self, question: str) -> str:
+        time.sleep(self._delay)
+        return self._answer
+
+model_registry.register("ab-fast", lambda: SleepingService("Fast stub", 0.005))
+model_registry.register("ab-slow", lambda: SleepingService("Slow stub", 0.04))
+model_registry.register("ab-fast-copy", lambda: SleepingService("Fast stub copy", 0.005))
+model_registry.register("ab-sleepy", lambda: SleepingService("Sleepy stub", 0.15))
+model_registry.register("ab-vague", lambda: SleepingService("Vague stub", 0.0, "It depends on the facts."))
+model_registry.register("ab-broken", lambda: SleepingService("Broken stub", 0.0, ""))
+
+def _unloadable():
+    raise ValueError("API key not set")
+
+model_registry.register("ab-unloadable", _unloadable)
+
+def run(config: ABTestConfig):
+    return asyncio.run(ABTestService().run_ab_test(config, "What is IPC 420?", ["cheating"]))
+
+def test_t_distribution_matches_reference_values():
+    """The t CDF and quantiles match published tables"""
+    assert student_t_cdf(2.0, 10) == pytest.approx(0.963306, abs=1e-6)
+    assert student_t_ppf(0.975, 4) == pytest.approx(2.776445, abs=1e-5)
+    assert welch_t_test([1, 2, 3, 4, 5], [3, 4, 5, 6, 7])["p_value"] == pytest.approx(0.0805, abs=1e-4)
+
+    summary = summarize([1, 2, 3, 4, 5])
+    assert summary["mean"] == 3.0
+    assert summary["ci_low"] == pytest.approx(3.0 - 2.776445 * summary["std"] / 5 ** 0.5, abs=1e-5)
+
+def test_constant_samples_are_not_decisive():
+    """Repeated identical values carry no evidence of a difference"""
+    assert welch_t_test([1, 1, 1], [1, 1, 1])["p_value"] == 1.0
+    assert welch_t_test([1, 1, 1], [2, 2, 2])["p_value"] is None
+    assert paired_t_test([1, 2, 3], [2, 3, 4])["p_value"] is None
+    assert paired_t_test([1, 2, 3, 4], [2, 2, 5, 6])["p_value"] == pytest.approx(0.0796, abs=1e-4)
+
+def test_lower_latency_wins_and_stops_early():
+    """response_time is direction-aware, and a clear winner ends the test before all repetitions"""
+    # Scoring imports its libraries on first use, which would stall the first trials
+    run(ABTestConfig(test_name="warm-up", model_variants=[{"name": "fast", "type": "ab-fast"}],
+                     evaluation_criteria=["confidence"], repetitions=1))
+    result = run(ABTestConfig(
+        test_name="latency",
+        model_variants=[{"name": "slow", "type": "ab-slow"}, {"name": "fast", "type": "ab-fast"}],
+        evaluation_criteria=["response_time", "keyword_match"],
+        questions=["What is IPC 420?", "What is cheating?", "Is fraud a crime?"],
+        repetitions=10,
+        min_repetitions=2,
+    ))
+
+    assert result.winning_variant == "fast"
+    assert result.primary_metric == "response_time"
+    assert result.performance_difference > 0
+    assert result.significant and result.p_value < 0.05
+    assert result.stopped_early and result.repetitions_completed == 2
+    assert result.variant_results["fast"]["trials"] == 6
+
+    latency = result.variant_results["slow"]["metrics"]["response_time"]
+    assert latency["n"] == 6
+    assert latency["ci_low"] <= latency["mean"] <= latency["ci_high"]
+    assert latency["p95"] >= latency["p50"]
+    assert result.comparisons["keyword_match"]["significant"] is False
+    assert result.comparisons["response_time"]["test"] == "paired"
+
+def test_deterministic_variants_do_not_stop_after_one_look():
+    """Identical repeated scores do not make a difference significant"""
+    result = run(ABTestConfig(
+        test_name="deterministic",
+        model_variants=[{"name": "vague", "type": "ab-vague"}, {"name": "fast", "type": "ab-fast"}],
+        evaluation_criteria=["keyword_match"],
+        repetitions=4,
+        min_repetitions=2,
+    ))
+
+    assert result.winning_variant == "fast"
+    assert result.p_value is None and not result.significant
+    assert not result.stopped_early and result.repetitions_completed == 4
+
+def test_failed_trials_are_left_out():
+    """Trials without an answer are counted but not scored"""
+    result = run(ABTestConfig(
+        test_name="failures",
+        model_variants=[{"name": "broken", "type": "ab-broken"}, {"name": "fast", "type": "ab-fast"}],
+        evaluation_criteria=["response_time"],
+        repetitions=2,
+        early_stopping=False,
+    ))
+
+    assert result.variant_results["broken"]["errors"] == 2
+    assert result.variant_results["broken"]["metrics"]["response_time"]["n"] == 0
+    assert result.winning_variant == "fast"
+
+def test_equivalent_variants_run_every_repetition():
+    """Without a significant difference the test uses its whole budget and reports no winner as significant"""
+    result = run(ABTestConfig(
+        test_name="tie",
+        model_variants=[{"name": "a", "type": "ab-fast"}, {"name": "b", "type": "ab-fast-copy"}],
+        evaluation_criteria=["keyword_match"],
+        repetitions=3,
+    ))
+
+    assert not result.stopped_early
+    assert result.repetitions_completed == 3
+    assert not result.significant
+    assert result.performance_difference == 0.0
+
+def test_variants_reuse_loaded_models():
+    """Repeated trials and repeated tests share the registry's model instances"""
+    config = ABTestConfig(
+        test_name="reuse",
+        model_variants=[{"name": "fast", "type": "ab-fast"}, {"name": "slow", "type": "ab-slow"}],
+        evaluation_criteria=["confidence"],
+        repetitions=2,
+        early_stopping=False,
+    )
+    run(config)
+    loaded = SleepingService.instances
+    run(config)
+
+    assert SleepingService.instances == loaded
+
+def test_variants_run_concurrently():
+    """In parallel mode all trials of a repetition run at once"""
+    def timed(mode: str) -> float:
+        start = time.perf_counter()
+        run(ABTestConfig(
+            test_name=mode,
+            model_variants=[{"name": "sleepy", "type": "ab-sleepy"}, {"name": "fast", "type": "ab-fast"}],
+            evaluation_criteria=["confidence"],
+            questions=["What is IPC 420?", "What is cheating?", "Is fraud a crime?"],
+            repetitions=1,
+            execution_mode=mode,
+        ))
+        return time.perf_counter() - start
+
+    timed("parallel")  # warm up scoring
+    assert timed("parallel") < 0.6 * timed("sequential")
+
+def test_ab_test_endpoint_rejects_unknown_criteria():
+    """Unsupported criteria are a client error"""
+    response = client.post("/ab-test", json={
+        "config": {
+            "test_name": "bad",
+            "model_variants": [{"name": "fast", "type": "ab-fast"}],
+            "evaluation_criteria": ["vibes"],
+        },
+        "request": {"question": "What is IPC 420?"},
+    })
+
+    assert response.status_code == 400
+    assert "vibes" in response.json()["detail"]
+
+def test_ab_test_endpoint_reports_unloadable_models():
+    """A variant whose model cannot be loaded is a 503, not a server error"""
+    response = client.post("/ab-test", json={
+        "config": {"test_name": "unloadable", "model_variants": [{"name": "x", "type": "ab-unloadable"}],
+                   "evaluation_criteria": ["confidence"]},
+        "request": {"question": "What is IPC 420?"},
+    })
+
+    assert response.status_code == 503
+    assert "API key not set" in response.json()["detail"]
+
+def test_ab_test_job_rejects_unknown_model_types():
+    """A queued test with an unregistered variant type is refused before it is enqueued"""
+    response = client.post("/jobs/ab-test", json={
+        "config": {"test_name": "bad", "model_variants": [{"name": "x", "type": "nonexistent"}],
+                   "evaluation_criteria": ["confidence"]},
+        "request": {"question": "What is IPC 420?"},
+    })
+
+    assert response.status_code == 400
+    assert "nonexistent" in response.json()["detail"]
@@ -80,4 +80,148 @@ def test_benchmark_invalid_json():
         "/benchmark",
         data="This is not JSON"
     )
-    assert response.status_code == 422
\ No newline at end of file
+    assert response.status_code == 422
+
+def test_benchmark_reuses_loaded_models():
+    """Models are loaded once and shared across benchmark requests"""
+    from services.model_registry import model_registry
+
+    client.post("/benchmark", json={"question": "What is IPC 420?", "expected_keywords": ["cheating"]})
+    first = model_registry.get("simplified")
+    client.post("/benchmark", json={"question": "What is IPC 302?", "expected_keywords": ["murder"]})
+    assert model_registry.get("simplified") is first
+
+def test_admin_models_endpoint():
+    """Test the admin endpoint reports load stats and can evict models"""
+    response = client.post("/admin/models/simplified/warmup")
+    assert response.status_code == 200
+    assert response.json()["loaded"] is True
+
+    response = client.get("/admin/models")
+    assert response.status_code == 200
+    stats = [m for m in response.json()["models"] if m["model_type"] == "simplified"]
+    assert stats and stats[0]["load_time_ms"] is not None
+
+    response = client.post("/admin/models/simplified/evict")
+    assert response.status_code == 200
+    assert response.json()["evicted"] == 1
+
+    response = client.post("/admin/models/unknown/reload")
+    assert response.status_code == 404
+
+def test_benchmark_sequential_mode():
+    """Test the benchmark endpoint in sequential execution mode"""
+    response = client.post(
+        "/benchmark?execution_mode=sequential",
+        json={"question": "What is IPC 420?", "expected_keywords": ["cheating"]}
+    )
+    assert response.status_code == 200
+    assert all(not m["timed_out"] for m in response.json()["models"])
+
+    response = client.post(
+        "/benchmark?execution_mode=bogus",
+        json={"question": "What is IPC 420?", "expected_keywords": ["cheating"]}
+    )
+    assert response.status_code == 400
+
+def test_model_timeout_returns_partial_evaluation():
+    """A model exceeding its timeout is reported as a partial evaluation"""
+    import asyncio
+    import time
+    from services.base_service import ModelService
+    from parallel_benchmarker import benchmark_executor
+
+    class SlowModelService(ModelService):
+        name = "Slow Model"
+
+        def get_answer(self, question: str) -> str:
+            time.sleep(0.5)
+            return "Too late"
+
+    result = asyncio.run(benchmark_executor.run_model("What is IPC 420?", SlowModelService(), ["cheating"], timeout=0.05))
+    assert result.timed_out is True
+    assert result.answer == ""
+    assert result.model_name == "Slow Model"
+
+def test_timed_out_call_keeps_its_slot_until_it_finishes():
+    """A timed-out call is reported as abandoned and holds its provider slot until it returns"""
+    import asyncio
+    import time
+    from services.base_service import ModelService
+    from parallel_benchmarker import BenchmarkExecutor
+
+    class SlowModelService(ModelService):
+        name = "Slow Model"
+
+        def get_answer(self, question: str) -> str:
+            time.sleep(0.3)
+            return "Too late"
+
+        def get_metadata(self):
+            return {"model_type": "slow"}
+
+    executor = BenchmarkExecutor(max_workers=2, provider_limits={"slow": 1})
+    result = asyncio.run(executor.run_model("What is IPC 420?", SlowModelService(), ["cheating"], timeout=0.05))
+    assert result.timed_out is True
+    assert executor.abandoned() == {"slow": 1}
+    assert executor.in_flight() == {"slow": 1}
+    assert not executor._semaphore_for("slow").acquire(blocking=False)
+
+    time.sleep(0.5)
+    assert executor.abandoned() == {"slow": 0}
+    assert executor.in_flight() == {"slow": 0}
+    assert executor.queue_depth() == 0
+    executor.shutdown()
+
+def test_benchmark_cache_hit_flag():
+    """Repeated questions to deterministic models are served from the cache"""
+    payload = {"question": "What does section 376 of IPC say?", "expected_keywords": ["imprisonment"]}
+    client.post("/benchmark?use_cache=false", json=payload)
+    first = client.post("/benchmark", json=payload).json()
+    second = client.post("/benchmark", json=payload).json()
+
+    simplified = [m for m in second["models"] if m["metadata"].get("model_type") == "simplified"]
+    assert simplified and simplified[0]["cache_hit"] is True
+    assert [m["answer"] for m in first["models"]] == [m["answer"] for m in second["models"]]
+
+    uncached = client.post("/benchmark?use_cache=false", json=payload).json()
+    assert all(m["cache_hit"] is False for m in uncached["models"])
+
+def test_batch_benchmark_preserves_order():
+    """Batch results come back in request order even though questions run concurrently"""
+    questions = ["What is IPC 420?", "What is IPC 302?", "What is section 34 of IPC?"]
+    response = client.post(
+        "/batch-benchmark",
+        json=[{"question": q, "expected_keywords": ["section"]} for q in questions]
+    )
+    assert response.status_code == 200
+    assert [r["question"] for r in response.json()] == questions
+
+def test_batch_benchmark_stream_ndjson():
+    """Streamed batch results arrive as one JSON line per question"""
+    import json
+
+    questions = ["What is IPC 420?", "What is IPC 302?", "Hi"]
+    response = client.post(
+        "/batch-benchmark/stream",
+        json=[{"question": q, "expected_keywords": ["section"]} for q in questions]
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    results = [e for e in events if e["event"] == "result"]
+    errors = [e for e in events if e["event"] == "error"]
+    assert sorted(e["index"] for e in results) == [0, 1]
+    assert [e["index"] for e in errors] == [2]
+    assert events[-1] == {"event": "done", "completed": 3, "total": 3}
+
+def test_batch_benchmark_stream_sse():
+    """Streamed batch results can be consumed as server-sent events"""
+    response = client.post(
+        "/batch-benchmark/stream?stream_format=sse",
+        json=[{"question": "What is IPC 420?", "expected_keywords": ["cheating"]}]
+    )
+    assert response.status_code == 200
+    assert "event: result" in response.text
+    assert response.text.rstrip().split("\n\n")[-1].startswith("event: done")
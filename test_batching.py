@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.batching import MicroBatcher
+from services.model_registry import ModelRegistry
+from services.simplified_service import SimplifiedModelService
+
+def test_micro_batcher_groups_concurrent_requests():
+    """Concurrent submissions are answered by shared batched calls"""
+    batch_sizes = []
+
+    def batch_fn(items):
+        batch_sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(batch_fn, name="test", max_batch_size=4, max_wait_ms=50)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(batcher, range(8)))
+
+    assert results == [item * 2 for item in range(8)]
+    assert max(batch_sizes) > 1
+    assert max(batch_sizes) <= 4
+
+    stats = batcher.stats()
+    assert stats["batch_size"]["count"] == len(batch_sizes)
+    assert stats["wait_time_ms"]["count"] == 8
+
+def test_micro_batcher_propagates_errors():
+    """A failing batch call raises in every waiting caller"""
+    def batch_fn(items):
+        raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher(batch_fn, name="failing", max_batch_size=2, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher("question")
+
+def test_micro_batcher_fails_callers_left_without_a_result():
+    """A batch function returning too few results fails the callers it skipped instead of hanging them"""
+    batcher = MicroBatcher(lambda items: items[:1], name="short", max_batch_size=3, max_wait_ms=50)
+    futures = [batcher.submit(item) for item in range(3)]
+    assert futures[0].result(timeout=5) == 0
+    for future in futures[1:]:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+
+def test_closing_stops_the_worker_and_fails_pending_requests():
+    """close() fails requests a stuck worker never reached, drops the batch function and rejects later submissions"""
+    release = threading.Event()
+
+    def batch_fn(items):
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(batch_fn, name="closing", max_batch_size=1, max_wait_ms=0)
+    running = batcher.submit("running")
+    time.sleep(0.05)
+    queued = batcher.submit("queued")
+    batcher.close(timeout=0.1)
+    with pytest.raises(RuntimeError):
+        queued.result(timeout=5)
+    with pytest.raises(RuntimeError):
+        batcher("late")
+
+    release.set()
+    assert running.result(timeout=5) == "running"
+    batcher._worker.join(5)
+    assert not batcher._worker.is_alive() and batcher._batch_fn is None
+
+def test_evicting_a_model_closes_it():
+    """The registry closes evicted instances so their batcher threads stop holding the model"""
+    closed = []
+
+    class ClosingService(SimplifiedModelService):
+        def close(self):
+            closed.append(self)
+
+    registry = ModelRegistry()
+    registry.register("closing", ClosingService)
+    first = registry.get("closing")
+    registry.reload("closing")
+    assert closed == [first] and registry.get("closing") is not first
@@ -0,0 +1,73 @@
+import time
+
+from utils.cache import ResponseCache, SQLiteCacheBackend, make_cache_key
+
+def test_cache_key_normalizes_question():
+    """Whitespace and case differences map to the same cache entry"""
+    key = make_cache_key("Model", {"version": "1"}, "What is  IPC 420?", {"temperature": 0})
+    assert key == make_cache_key("Model", {"version": "1"}, "what is IPC 420? ", {"temperature": 0})
+    assert key != make_cache_key("Model", {"version": "2"}, "What is IPC 420?", {"temperature": 0})
+
+def test_cache_evicts_least_recently_used():
+    """Entries beyond max_entries are evicted in LRU order"""
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "answer a")
+    cache.set("b", "answer b")
+    cache.get("a")
+    cache.set("c", "answer c")
+    assert cache.get("b") is None
+    assert cache.get("a") == "answer a"
+    assert cache.get("c") == "answer c"
+
+def test_cache_evicts_by_size():
+    """Total cached bytes stay under max_bytes"""
+    cache = ResponseCache(max_entries=100, max_bytes=50)
+    cache.set("a", "x" * 20)
+    cache.set("b", "y" * 20)
+    cache.set("c", "z" * 20)
+    assert cache.stats()["bytes"] <= 50
+    assert cache.get("a") is None
+
+def test_cache_expires_entries():
+    """Entries older than the TTL are not served"""
+    cache = ResponseCache(ttl_seconds=0.01)
+    cache.set("a", "answer a")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+def test_cache_disk_backend_persists(tmp_path):
+    """Answers stored on disk are served by a fresh cache instance"""
+    path = str(tmp_path / "cache.sqlite")
+    ResponseCache(disk_backend=SQLiteCacheBackend(path)).set("a", "answer a")
+
+    cache = ResponseCache(disk_backend=SQLiteCacheBackend(path))
+    assert cache.get("a") == "answer a"
+    assert cache.stats()["hits"] == 1
+
+def test_disk_hit_keeps_its_expiry(tmp_path):
+    """Promoting a disk hit into memory does not restart its TTL"""
+    path = str(tmp_path / "cache.sqlite")
+    ResponseCache(ttl_seconds=0.2, disk_backend=SQLiteCacheBackend(path)).set("a", "answer a")
+    _, expires_at = SQLiteCacheBackend(path).get("a")
+
+    time.sleep(0.1)
+    cache = ResponseCache(ttl_seconds=0.2, disk_backend=SQLiteCacheBackend(path))
+    assert cache.get("a") == "answer a"
+    assert cache._entries["a"][1] == expires_at
+    time.sleep(0.15)
+    assert cache.get("a") is None
+
+def test_disk_backend_prunes_expired_and_oldest_answers(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite"), max_entries=3, max_bytes=None, prune_interval=3600)
+    backend.set("expired", "old answer", time.time() - 1)
+    for key in "abcd":
+        backend.set(key, f"answer {key}", None)
+    assert len(backend) == 5
+
+    assert backend.prune() == 2
+    assert backend.get("expired") is None and backend.get("a") is None
+    assert backend.get("d") == ("answer d", None)
+
+    backend.max_entries, backend.max_bytes = None, 20
+    assert backend.prune() == 1
+    assert [backend.get(key) is not None for key in "bcd"] == [False, True, True]
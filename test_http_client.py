@@ -0,0 +1,239 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from parallel_benchmarker import BenchmarkExecutor, benchmark_single_model
+from services.http_client import AsyncHTTPPool
+from services.http_service import HTTPChatService
+from services.model_registry import ModelRegistry, register_http_providers
+from services.openai_service import OpenAIService
+from services.simplified_service import SimplifiedModelService
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions endpoint with scripted failures and delays"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append({"port": self.client_address[1], "body": body, "auth": self.headers.get("Authorization")})
+            attempt = len(server.requests)
+        delay = server.delays.get(attempt, 0)
+        if delay:
+            time.sleep(delay)
+
+        status = server.failures.get(attempt, 200)
+        if status == 200 and body.get("stream"):
+            question = body["messages"][-1]["content"]
+            events = [{"choices": [{"delta": {"role": "assistant"}}]}]
+            events += [{"choices": [{"delta": {"content": word}}]} for word in ["Answer ", "to: ", question]]
+            if body.get("stream_options", {}).get("include_usage"):
+                events.append({"choices": [], "usage": {"prompt_tokens": 20, "completion_tokens": 5}})
+            data = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+            data = data.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        if status == 200:
+            question = body["messages"][-1]["content"]
+            payload = {"choices": [{"message": {"role": "assistant", "content": f" Answer to: {question} "}}]}
+        else:
+            payload = {"error": {"message": "try again"}}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAIHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.failures = {}
+    server.delays = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def openai_service(stub_server, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    return OpenAIService(api_base=stub_server.url)
+
+def test_async_answer_reuses_pooled_connection(stub_server, openai_service):
+    """Consecutive async calls go over one kept-alive connection"""
+    async def ask_three():
+        return [await openai_service.aget_answer(f"Question {i}") for i in range(3)]
+
+    answers = asyncio.run(ask_three())
+
+    assert answers == ["Answer to: Question 0", "Answer to: Question 1", "Answer to: Question 2"]
+    assert len({request["port"] for request in stub_server.requests}) == 1
+    assert stub_server.requests[0]["auth"] == "Bearer test-key"
+    assert stub_server.requests[0]["body"]["temperature"] == 0
+
+def test_retries_rate_limits_and_server_errors(stub_server):
+    """429 and 5xx responses are retried until a success"""
+    stub_server.failures = {1: 429, 2: 503}
+    pool = AsyncHTTPPool(max_retries=3, backoff_base_ms=1)
+
+    response = asyncio.run(pool.post_json(f"{stub_server.url}/chat/completions", {"messages": [{"content": "Q"}]}))
+
+    assert response["choices"][0]["message"]["content"].strip() == "Answer to: Q"
+    assert len(stub_server.requests) == 3
+    assert pool.stats()["retries"] == 2
+
+def test_gives_up_after_max_retries(stub_server):
+    """The last error response is returned once retries are exhausted"""
+    stub_server.failures = {1: 500, 2: 500}
+    pool = AsyncHTTPPool(max_retries=1, backoff_base_ms=1)
+
+    response = asyncio.run(pool.request("POST", f"{stub_server.url}/chat/completions", json={"messages": [{"content": "Q"}]}))
+
+    assert response.status_code == 500
+    assert len(stub_server.requests) == 2
+
+def test_hedged_request_beats_slow_request(stub_server):
+    """A duplicate request sent after the hedge delay answers before a stalled one"""
+    stub_server.delays = {1: 2.0}
+    pool = AsyncHTTPPool(hedge_after_ms=50)
+
+    start = time.perf_counter()
+    response = asyncio.run(pool.post_json(f"{stub_server.url}/chat/completions", {"messages": [{"content": "Q"}]}))
+
+    assert time.perf_counter() - start < 1.5
+    assert response["choices"][0]["message"]["content"].strip() == "Answer to: Q"
+    assert pool.stats()["hedge_wins"] == 1
+
+def test_sync_services_are_wrapped():
+    """Services without a native async implementation run on the managed thread pool"""
+    service = SimplifiedModelService()
+    assert not service.is_async_native()
+
+    answer = asyncio.run(service.aget_answer("What is the punishment for cheating?"))
+    assert answer == service.get_answer("What is the punishment for cheating?")
+
+def test_executor_awaits_async_native_services(stub_server, openai_service):
+    """Async-native services are benchmarked without holding a worker thread"""
+    assert openai_service.is_async_native()
+    executor = BenchmarkExecutor(max_workers=2)
+    try:
+        results = asyncio.run(executor.benchmark("What is bail?", [openai_service], ["bail"], use_cache=False))
+    finally:
+        executor.shutdown()
+
+    assert results[0].answer == "Answer to: What is bail?"
+    assert results[0].keywords_found == ["bail"]
+    assert not results[0].timed_out
+
+def test_identical_concurrent_requests_share_one_upstream_call(stub_server):
+    """N concurrent calls for the same question send a single request"""
+    stub_server.delays = {1: 0.3}
+    service = HTTPChatService(base_url=stub_server.url, model_name="local-model")
+
+    async def ask_concurrently():
+        return await asyncio.gather(*[service.aget_answer("What is bail?") for _ in range(10)])
+
+    answers = asyncio.run(ask_concurrently())
+
+    assert set(answers) == {"Answer to: What is bail?"}
+    assert len(stub_server.requests) == 1
+    assert stub_server.requests[0]["body"]["model"] == "local-model"
+    assert service.get_load_stats()["coalesced_calls"] == 9
+
+def test_sync_callers_share_in_flight_requests(stub_server):
+    """Worker threads calling get_answer are coalesced on the pool's background loop"""
+    stub_server.delays = {1: 0.3}
+    service = HTTPChatService(base_url=stub_server.url, model_name="local-model", headers={"X-Team": "legal"})
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        answers = list(pool.map(service.get_answer, ["What is bail?"] * 5))
+
+    assert set(answers) == {"Answer to: What is bail?"}
+    assert len(stub_server.requests) == 1
+
+def test_in_flight_limit_and_sharing_span_event_loops(stub_server):
+    """Callers on separate event loops share one in-flight limit and one coalescer"""
+    stub_server.delays = {1: 0.3, 2: 0.3}
+    service = HTTPChatService(base_url=stub_server.url, model_name="local-model", max_in_flight=1)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        answers = list(pool.map(
+            lambda question: asyncio.run(service.aget_answer(question)),
+            ["What is bail?", "What is bail?", "What is an FIR?", "What is an FIR?"]
+        ))
+    elapsed = time.perf_counter() - started
+
+    assert answers == ["Answer to: What is bail?"] * 2 + ["Answer to: What is an FIR?"] * 2
+    assert len(stub_server.requests) == 2
+    # With max_in_flight=1 the two upstream calls ran one after the other
+    assert elapsed >= 0.55
+
+def test_provider_errors_are_reported_not_cached(stub_server):
+    """An upstream failure becomes an error answer that is never cached"""
+    stub_server.failures = {1: 400}
+    service = HTTPChatService(base_url=stub_server.url, model_name="local-model")
+
+    answer = asyncio.run(service.aget_answer("What is bail?"))
+
+    assert answer.startswith(service.error_prefix)
+    assert not service.is_cacheable_answer(answer)
+
+def test_providers_file_registers_named_providers(stub_server, tmp_path):
+    """Each configured provider becomes a model type, optionally in the benchmark set"""
+    path = tmp_path / "http_providers.json"
+    path.write_text(json.dumps({"providers": [
+        {"name": "cluster-model", "base_url": stub_server.url, "model_name": "m", "max_in_flight": 2, "benchmark": True}
+    ]}))
+    registry = ModelRegistry()
+    registry.register("llm", SimplifiedModelService)
+
+    assert register_http_providers(registry, str(path)) == ["cluster-model"]
+    service = registry.get("cluster-model")
+    assert service.name == "cluster-model"
+    assert [model.name for model in registry.get_benchmark_models()] == [SimplifiedModelService().name, "cluster-model"]
+    assert asyncio.run(service.aget_answer("Q")) == "Answer to: Q"
+
+def test_streams_chat_completion_deltas(stub_server):
+    """stream=True responses are parsed into content deltas, from async and sync callers"""
+    stub_server.failures = {1: 503}
+    service = HTTPChatService(base_url=stub_server.url, model_name="local-model")
+
+    async def collect():
+        return [chunk async for chunk in service.astream_answer("Q")]
+
+    chunks = asyncio.run(collect())
+    assert chunks == ["Answer ", "to: ", "Q", ""]
+    # The usage report after the last delta carries the completion token count
+    assert chunks[-1].tokens == 5
+    assert stub_server.requests[-1]["body"]["stream"] is True
+    assert list(service.stream_answer("Q")) == ["Answer ", "to: ", "Q", ""]
+
+def test_streamed_evaluation_reports_completion_tokens(stub_server):
+    """output_tokens is usage.completion_tokens rather than the number of deltas"""
+    service = HTTPChatService(base_url=stub_server.url, model_name="local-model", temperature=0.7)
+    received = []
+    evaluation = benchmark_single_model("Q", service, stream=True, on_token=received.append)
+
+    assert received == ["Answer ", "to: ", "Q"]
+    assert evaluation.output_chunks == 3
+    assert evaluation.output_tokens == 5
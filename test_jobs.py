@@ -0,0 +1,156 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from parallel_benchmarker import background_executor, benchmark_executor
+from services.base_service import ModelService
+from services.benchmark_jobs import JOB_HANDLERS, set_job_queue
+from services.job_queue import FINISHED_STATUSES, JobQueue, JobStore
+
+client = TestClient(app)
+
+class NappingService(ModelService):
+    """Model stub with a fixed latency"""
+
+    def __init__(self, delay: float):
+        self._delay = delay
+
+    @property
+    def name(self) -> str:
+        return "Napping stub"
+
+    def get_answer(self, question: str) -> str:
+        time.sleep(self._delay)
+        return "Section 420 covers cheating."
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite")), JOB_HANDLERS, max_workers=1)
+    set_job_queue(queue)
+    yield queue
+    queue.stop()
+    set_job_queue(None)
+
+def wait_for(queue: JobQueue, job_id: str, statuses=FINISHED_STATUSES, timeout: float = 30.0) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.store.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job stayed {queue.store.get(job_id)['status']}")
+
+def test_jobs_are_claimed_by_priority_and_survive_restarts(tmp_path):
+    """Higher priorities run first, and a job running in a stopped process is queued again"""
+    path = str(tmp_path / "jobs.sqlite")
+    store = JobStore(path)
+    low = store.create("benchmark", {}, priority=0)
+    high = store.create("benchmark", {}, priority=5)
+    later = store.create("benchmark", {}, priority=5)
+
+    assert store.claim_next()["id"] == high["id"]
+    reopened = JobStore(path)
+    assert reopened.requeue_running() == 1
+    assert [reopened.claim_next()["id"] for _ in range(3)] == [high["id"], later["id"], low["id"]]
+    assert reopened.claim_next() is None
+
+def test_benchmark_job_runs_in_the_background(queue):
+    """A submitted suite returns a job id at once; status, events and results are read separately"""
+    response = client.post("/jobs/benchmark?priority=3", json=[
+        {"question": "What is IPC 420?", "expected_keywords": ["cheating"]},
+        {"question": "What is IPC 302?"},
+        {"question": "What is section 34 of IPC?"},
+    ])
+
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["total"] == 3 and response.json()["priority"] == 3
+
+    events = client.get(f"/jobs/{job_id}/events?stream_format=ndjson").text.strip().splitlines()
+    final = json.loads(events[-1])
+    assert final["event"] == "done" and final["status"] == "succeeded"
+    assert final["completed"] == 3
+
+    results = client.get(f"/jobs/{job_id}/results").json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert results[0]["result"]["question"] == "What is IPC 420?"
+    assert results[0]["result"]["models"]
+    assert client.get(f"/jobs/{job_id}/results?offset=2").json()["results"][0]["index"] == 2
+    assert client.delete(f"/jobs/{job_id}").status_code == 409
+
+def test_interrupted_benchmark_job_resumes_after_finished_questions(queue):
+    """Questions stored before a restart are not run again"""
+    job = queue.store.create("benchmark", {
+        "requests": [{"question": "What is IPC 420?"}, {"question": "What is IPC 302?"}],
+        "execution_mode": "parallel", "timeout_seconds": None, "use_cache": True, "save_to_csv": False,
+    }, total=2)
+    queue.store.claim_next()
+    queue.store.save_result(job["id"], 0, {"question": "stored before the restart"}, 1)
+
+    assert queue.start() == 1
+    finished = wait_for(queue, job["id"])
+
+    assert finished["status"] == "succeeded" and finished["completed"] == 2
+    results = queue.store.results(job["id"])
+    assert results[0]["result"] == {"question": "stored before the restart"}
+    assert results[1]["result"]["question"] == "What is IPC 302?"
+
+def test_queued_and_running_jobs_can_be_cancelled(queue):
+    """Queued jobs are cancelled at once, running ones by their worker"""
+    async def sleep_forever(context):
+        context.progress(0, 1)
+        await asyncio.sleep(60)
+    queue.register("sleep", sleep_forever)
+
+    running = queue.submit("sleep", {})
+    wait_for(queue, running["id"], ("running",))
+    queued = queue.submit("sleep", {})
+
+    response = client.delete(f"/jobs/{queued['id']}")
+    assert response.status_code == 200 and response.json()["status"] == "cancelled"
+
+    assert client.delete(f"/jobs/{running['id']}").json()["cancel_requested"]
+    assert wait_for(queue, running["id"])["status"] == "cancelled"
+    assert queue.stats()["jobs"]["cancelled"] == 2
+
+def test_ab_test_job_reports_repetitions(queue):
+    """A/B tests run as jobs too, with progress counted in repetitions"""
+    response = client.post("/jobs/ab-test", json={
+        "config": {
+            "test_name": "job",
+            "model_variants": [{"name": "rules", "type": "simplified"}],
+            "evaluation_criteria": ["keyword_match"],
+            "repetitions": 2,
+        },
+        "request": {"question": "What is IPC 420?"},
+    })
+
+    job = wait_for(queue, response.json()["job_id"])
+    assert job["status"] == "succeeded" and job["completed"] == 2
+    assert queue.store.results(job["id"])[0]["result"]["repetitions_completed"] == 2
+    assert client.post("/jobs/ab-test", json={
+        "config": {"test_name": "bad", "model_variants": [{"type": "simplified"}], "evaluation_criteria": ["vibes"]},
+        "request": {"question": "What is IPC 420?"},
+    }).status_code == 400
+
+def test_interactive_calls_do_not_queue_behind_background_work():
+    """Background jobs have their own pool and provider slots"""
+    model = NappingService(0.2)
+
+    async def scenario():
+        await benchmark_executor.run_model("What is IPC 420?", model, use_cache=False)  # warm up scoring
+        background = [asyncio.ensure_future(background_executor.run_model("What is IPC 420?", model, use_cache=False))
+                      for _ in range(12)]
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        await benchmark_executor.run_model("What is IPC 420?", model, use_cache=False)
+        interactive = time.perf_counter() - start
+        await asyncio.gather(*background)
+        return interactive
+
+    # Sharing four slots with twelve 0.2s calls would take at least 0.8s
+    assert asyncio.run(scenario()) < 0.5
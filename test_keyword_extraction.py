@@ -0,0 +1,81 @@
+import pytest
+
+from benchmarker import benchmark_models
+from build_keyword_idf import corpus_questions
+from models import ModelEvaluation
+from services.simplified_service import SimplifiedModelService
+from utils.result_sink import evaluation_to_row
+from utils.results_store import ResultsStore
+from utils.scoring_profile import get_scoring_profile
+from utils.text_analysis import _extract_keywords, build_idf_table, extract_keywords, set_idf_table
+
+QUESTIONS = [
+    "How do I file an FIR for cheating?",
+    "What is the punishment for cheating under Section 420?",
+    "What is the punishment for murder under Section 302?",
+    "What is the punishment for theft under Section 379?",
+]
+
+@pytest.fixture
+def idf_table():
+    set_idf_table(build_idf_table(QUESTIONS, legal_terms=["FIR", "Indian Penal Code"]))
+    yield
+    set_idf_table(None)
+
+def test_extraction_is_memoized_across_models():
+    """Every model scored on a question reuses one extraction"""
+    question = "What is the punishment for dowry harassment under Section 498A?"
+    misses = _extract_keywords.cache_info().misses
+    benchmark_models(question, [SimplifiedModelService(), SimplifiedModelService()], use_cache=False)
+    benchmark_models(question, [SimplifiedModelService()], use_cache=False)
+    assert _extract_keywords.cache_info().misses == misses + 1
+
+    keywords = extract_keywords(question)
+    keywords.append("mutated")
+    assert "mutated" not in extract_keywords(question)
+
+def test_regex_tokenizer_needs_no_punkt():
+    assert extract_keywords("What is the punishment for cheating under Section 420?", tokenizer="regex") == [
+        "punishment", "cheating", "section", "420"
+    ]
+    with pytest.raises(ValueError):
+        extract_keywords("What is bail?", tokenizer="whitespace")
+    with pytest.raises(ValueError):
+        extract_keywords("What is bail?", mode="bm25")
+
+def test_tfidf_ranks_rare_and_legal_words_first(idf_table):
+    """Words common across the corpus sink; legal-domain words are weighted up"""
+    question = "What is the punishment for cheating under Section 420 and how do I file an FIR?"
+    assert extract_keywords(question, 3) == ["punishment", "cheating", "section"]
+    assert extract_keywords(question, 3, mode="tfidf") == ["fir", "420", "file"]
+
+def test_tfidf_without_a_table_ranks_by_frequency():
+    set_idf_table({"documents": 0, "default_idf": 1.0, "idf": {}, "weights": {}})
+    try:
+        assert extract_keywords(QUESTIONS[1], mode="tfidf") == extract_keywords(QUESTIONS[1])
+    finally:
+        set_idf_table(None)
+
+def test_idf_corpus_combines_files_and_store(tmp_path):
+    path = tmp_path / "questions.jsonl"
+    path.write_text("\n".join(f'{{"question": "{q}"}}' for q in QUESTIONS[:2]), encoding="utf-8")
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    evaluation = ModelEvaluation(model_name="A", answer="x", keyword_coverage=0.0, keywords_found=[],
+                                 length_category="too_short", response_time_ms=10, confidence_score=0.0)
+    store.add_rows([evaluation_to_row("2024-05-01T10:00:00", question, None, evaluation) for question in QUESTIONS[1:]])
+
+    corpus = list(corpus_questions([str(path)], store))
+    assert corpus[:2] == QUESTIONS[:2] and sorted(corpus[2:]) == sorted(QUESTIONS[2:])
+
+def test_extraction_settings_are_part_of_the_scorer_version(idf_table):
+    """Keywords extracted another way give another keyword coverage version; a new IDF table does too"""
+    profile = get_scoring_profile()
+    versions = {
+        profile.scorer_versions(keyword_extraction=mode, keyword_tokenizer="regex")["keyword_coverage"]
+        for mode in ("frequency", "tfidf")
+    }
+    assert len(versions) == 2
+    tfidf = profile.scorer_versions(keyword_extraction="tfidf")["keyword_coverage"]
+    set_idf_table(build_idf_table(QUESTIONS[:2]))
+    assert profile.scorer_versions(keyword_extraction="tfidf")["keyword_coverage"] != tfidf
+    assert profile.scorer_versions()["confidence_score"] == profile.scorer_versions(keyword_extraction="tfidf")["confidence_score"]
@@ -0,0 +1,29 @@
+from utils.keyword_matcher import KeywordMatcher, get_keyword_matcher
+from utils.text_analysis import calculate_keyword_coverage
+
+def test_word_mode_respects_boundaries():
+    """Word matching does not match keywords inside longer words"""
+    matcher = KeywordMatcher(["fee", "section 420", "34(b)"], mode="word")
+    assert matcher.find("I feel that Section 420 applies, see 34(b).") == ["section 420", "34(b)"]
+    assert KeywordMatcher(["fee"], mode="substring").find("I feel fine") == ["fee"]
+
+def test_keywords_nested_in_other_keywords_are_found():
+    """A keyword is found even when every occurrence sits inside a longer keyword"""
+    matcher = KeywordMatcher(["section 420", "420", "fir", "first information report"], mode="word")
+    assert matcher.find("File the first information report under section 420.") == ["section 420", "420", "first information report"]
+
+def test_stem_and_synonym_modes():
+    """Stemmed matching ignores inflection and synonym matching accepts alternatives"""
+    assert KeywordMatcher(["cheating"], mode="stem").find("He cheated the buyer") == ["cheating"]
+    assert KeywordMatcher(["imprisonment"], mode="stem").find("Punishable with jail") == []
+    assert KeywordMatcher(["imprisonment"], mode="synonym").find("Punishable with jail") == ["imprisonment"]
+
+def test_matcher_is_compiled_once_per_keyword_set():
+    """The same rubric reuses one compiled matcher"""
+    assert get_keyword_matcher(("fraud", "cheating"), "word") is get_keyword_matcher(("fraud", "cheating"), "word")
+
+def test_keyword_coverage_keeps_keyword_order():
+    """Coverage reports found keywords in the order they were given"""
+    coverage, found = calculate_keyword_coverage("Fraud and cheating are punishable.", ["cheating", "bail", "fraud"])
+    assert found == ["cheating", "fraud"]
+    assert round(coverage, 2) == 66.67
@@ -0,0 +1,71 @@
+import re
+
+from fastapi.testclient import TestClient
+
+from benchmarker import STAGE_DURATION
+from main import app
+from parallel_benchmarker import benchmark_single_model
+from services.simplified_service import SimplifiedModelService
+from utils.metrics import MetricsRegistry
+
+client = TestClient(app)
+
+SCORING_STAGES = {"keyword_coverage", "length", "confidence", "evaluation", "social_impact"}
+
+def sample(text: str, name: str, **labels) -> float:
+    """Value of the first sample of a metric whose labels include the given ones"""
+    for line in text.splitlines():
+        match = re.match(rf"{name}(?:\{{(.*)\}})? (\S+)$", line)
+        if match and all(f'{key}="{value}"' in (match.group(1) or "") for key, value in labels.items()):
+            return float(match.group(2))
+    raise AssertionError(f"no sample {name} {labels}")
+
+def test_registry_renders_prometheus_text():
+    """Histograms are cumulative, label values are escaped and a failing collector is skipped"""
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ["route"], buckets=[0.1, 1.0])
+    latency.labels('a"b').observe(0.05)
+    latency.labels('a"b').observe(0.5)
+    registry.counter("calls_total", "Calls").labels().inc(3)
+    registry.callback("broken", "Fails", lambda: 1 / 0)
+    registry.callback("depth", "Depth", lambda: [({"pool": "x"}, 2)])
+
+    text = registry.render()
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{route="a\\"b",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="a\\"b",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{route="a\\"b"} 2' in text
+    assert sample(text, "calls_total") == 3
+    assert sample(text, "depth", pool="x") == 2
+    assert registry.histogram("latency_seconds", "Again") is latency
+
+def test_evaluation_has_stage_breakdown():
+    """Each scoring stage is timed on the evaluation and recorded in the stage histogram"""
+    model = SimplifiedModelService()
+    before = STAGE_DURATION.labels(model.name, "social_impact").snapshot()["count"]
+    evaluation = benchmark_single_model("What is IPC 420?", model, use_cache=False, stage_timings={"queue": 1.5})
+
+    stages = evaluation.stage_timings_ms
+    assert SCORING_STAGES | {"answer", "queue"} <= set(stages)
+    assert stages["queue"] == 1.5
+    assert all(ms >= 0 for ms in stages.values())
+    assert STAGE_DURATION.labels(model.name, "social_impact").snapshot()["count"] == before + 1
+
+def test_metrics_endpoint_reports_requests_stages_and_process():
+    """After a benchmark, /metrics has its request, stage, executor, cache and memory metrics"""
+    response = client.post("/benchmark", json={"question": "What is IPC 420?"})
+    assert response.status_code == 200
+    evaluation = response.json()["models"][0]
+    assert "queue" in evaluation["stage_timings_ms"]
+    assert ("cache" if evaluation["cache_hit"] else "answer") in evaluation["stage_timings_ms"]
+
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain")
+    text = metrics.text
+    assert sample(text, "http_request_duration_seconds_count", endpoint="benchmark", status="200") >= 1
+    assert sample(text, "benchmark_stage_duration_seconds_count", model=evaluation["model_name"], stage="queue") >= 1
+    assert sample(text, "http_requests_in_flight") == 1  # the /metrics request itself
+    assert sample(text, "benchmark_executor_queue_depth", executor="interactive") >= 0
+    assert sample(text, "response_cache_misses_total") >= 0
+    assert sample(text, "process_resident_memory_bytes") > 0
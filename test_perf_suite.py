@@ -0,0 +1,31 @@
+import pytest
+
+from perf_suite import compare, run_suite
+from services.model_registry import ModelRegistry, model_registry
+
+def test_compare_flags_slowdowns_beyond_threshold():
+    """Only cases slower than the baseline by more than the threshold are regressions"""
+    baseline = {"results": {"a": {"median_s": 1.0}, "b": {"median_s": 1.0}, "c": {"median_s": 1.0}}}
+    current = {"results": {"a": {"median_s": 1.05}, "b": {"median_s": 1.5}, "c": {"median_s": 0.5}, "new": {"median_s": 9.0}}}
+
+    comparison = {entry["case"]: entry for entry in compare(current, baseline, threshold=0.1)}
+
+    assert set(comparison) == {"a", "b", "c"}
+    assert not comparison["a"]["regressed"]
+    assert comparison["b"]["regressed"] and comparison["b"]["change"] == pytest.approx(0.5)
+    assert not comparison["c"]["regressed"] and comparison["c"]["change"] == pytest.approx(-0.5)
+
+def test_run_suite_times_selected_cases():
+    """Micro and end-to-end cases report per-operation timings, and the endpoints get their models back"""
+    document = run_suite(["keyword_coverage", "benchmark_endpoint_latency_stub"], repeats=2, min_time=0.001)
+
+    assert set(document["results"]) == {"keyword_coverage", "benchmark_endpoint_latency_stub"}
+    endpoint = document["results"]["benchmark_endpoint_latency_stub"]
+    # Each request waits on the 20ms stub, so throughput cannot exceed 8 requests per 20ms
+    assert 0 < endpoint["ops_per_sec"] < 400
+    assert document["results"]["keyword_coverage"]["min_s"] <= document["results"]["keyword_coverage"]["median_s"]
+    assert "get_benchmark_models" not in vars(model_registry)
+    assert model_registry.get_benchmark_models.__func__ is ModelRegistry.get_benchmark_models
+
+    with pytest.raises(ValueError):
+        run_suite(["no_such_case"])
@@ -0,0 +1,107 @@
+import pytest
+
+from benchmarker import score_answer
+from models import ModelEvaluation
+from rescore import rescore
+from services.simplified_service import SimplifiedModelService
+from utils import scoring_profile
+from utils.result_sink import evaluation_to_row
+from utils.results_store import ResultsStore
+from utils.scoring_profile import CompiledScoringProfile, get_scoring_profile
+from utils.text_analysis import build_idf_table, calculate_keyword_coverage, extract_keywords, set_idf_table
+
+ANSWERS = [
+    "Section 420 deals with cheating. You should file an FIR at the police station.",
+    "It might be a crime, possibly under the IPC. Contact a lawyer for legal aid.",
+]
+
+@pytest.fixture
+def store(tmp_path):
+    """Store with four evaluations of two distinct answers, scored by the current scorers"""
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    model = SimplifiedModelService()
+    evaluations = [
+        score_answer("What is IPC 420?", model, answer, 100, ["cheating", "fir"])
+        for answer in ANSWERS * 2
+    ]
+    store.add_rows(
+        [evaluation_to_row("2024-05-01T10:00:00", "What is IPC 420?", ["cheating", "fir"], e) for e in evaluations],
+        [e.scorer_versions for e in evaluations]
+    )
+    return store
+
+def test_current_scores_are_not_rescored(store):
+    summary = rescore(store, processes=1)
+    assert all(result["stale_evaluations"] == 0 for result in summary.values())
+
+def test_only_the_changed_scorer_is_rescored(store, monkeypatch):
+    """Each distinct answer is scored once; new values sit next to the original ones"""
+    monkeypatch.setitem(scoring_profile.SCORER_CODE_VERSIONS, "confidence_score", "2")
+    summary = rescore(store, processes=1)
+    assert summary["confidence_score"]["stale_evaluations"] == 4
+    assert summary["confidence_score"]["inputs_scored"] == 2
+    assert summary["keyword_coverage"]["stale_evaluations"] == 0
+    assert summary["social_impact"]["stale_evaluations"] == 0
+
+    scores = store.evaluation_scores(1)
+    version = get_scoring_profile().scorer_versions()["confidence_score"]
+    assert scores["confidence_score"][version] == scores["confidence_score"]["original"]
+    assert list(scores["keyword_coverage"]) == ["original"]
+
+    # Nothing is left to do on a second run
+    assert rescore(store, processes=1)["confidence_score"]["stale_evaluations"] == 0
+
+def test_profile_change_rescores_social_impact_in_worker_processes(store):
+    """A lexicon edit changes only the social impact version; simplicity is reused"""
+    profile = get_scoring_profile().profile.copy(deep=True)
+    profile.lexicons[0].terms.append("cheating")
+    compiled = CompiledScoringProfile(profile)
+
+    summary = rescore(store, processes=2, profile=compiled)
+    assert summary["social_impact"]["stale_evaluations"] == 4
+    assert summary["language_simplicity"]["stale_evaluations"] == 0
+    assert summary["confidence_score"]["stale_evaluations"] == 0
+
+    version = compiled.scorer_versions()["social_impact"]
+    scores = store.evaluation_scores(1)
+    assert set(scores["overall_social_impact"]) == {"original", version}
+    assert scores["accessibility"][version] == pytest.approx(scores["accessibility"]["original"])
+    assert rescore(store, processes=2, profile=compiled)["social_impact"]["stale_evaluations"] == 0
+
+def test_unstamped_evaluations_are_rescored(tmp_path):
+    """Evaluations stored before scorer versions existed are stale for every scorer"""
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    evaluation = ModelEvaluation(model_name="A", answer=ANSWERS[0], keyword_coverage=0.0, keywords_found=[],
+                                 length_category="too_short", response_time_ms=10, confidence_score=0.0)
+    store.add_rows([evaluation_to_row("2024-05-01T10:00:00", "What is IPC 420?", ["cheating"], evaluation)])
+
+    summary = rescore(store, scorers=["keyword_coverage"], processes=1)
+    assert list(summary) == ["keyword_coverage"]
+    version = get_scoring_profile().scorer_versions()["keyword_coverage"]
+    scores = store.evaluation_scores(1)
+    assert scores["keyword_coverage"][version] == 100.0
+    assert scores["keywords_found"][version] == "cheating"
+    with pytest.raises(ValueError):
+        rescore(store, scorers=["vibes"])
+
+def test_keyword_extraction_settings_reach_the_workers(tmp_path):
+    """Questions without expected keywords are re-scored with the requested extraction mode and IDF table"""
+    question = "What is the punishment for cheating under Section 420 and how do I file an FIR?"
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    evaluation = score_answer(question, SimplifiedModelService(), ANSWERS[0], 100)
+    store.add_rows([evaluation_to_row("2024-05-01T10:00:00", question, None, evaluation)], [evaluation.scorer_versions])
+
+    set_idf_table(build_idf_table([question, "What is the punishment for murder?", "What is the punishment for theft?"]))
+    try:
+        summary = rescore(store, scorers=["keyword_coverage"], processes=2, keyword_extraction="tfidf")
+        keywords = extract_keywords(question, mode="tfidf")
+    finally:
+        set_idf_table(None)
+
+    assert summary["keyword_coverage"]["stale_evaluations"] == 1
+    version = summary["keyword_coverage"]["version"]
+    assert keywords != extract_keywords(question)
+    coverage, found = calculate_keyword_coverage(ANSWERS[0], keywords)
+    scores = store.evaluation_scores(1)
+    assert scores["keyword_coverage"][version] == coverage
+    assert scores["keywords_found"][version] == ",".join(found)
@@ -0,0 +1,103 @@
+import csv
+import json
+import math
+
+import numpy as np
+import pytest
+
+from models import ModelEvaluation
+from utils.result_sink import (
+    RESULT_SCHEMA, CSVResultBackend, JSONLResultBackend, ParquetResultBackend, ResultSink, load_results
+)
+from utils.results_store import ResultsStore
+
+def make_evaluation(model_name: str = "Test Model") -> ModelEvaluation:
+    return ModelEvaluation(
+        model_name=model_name,
+        answer="Section 420 deals with cheating.",
+        keyword_coverage=75.0,
+        keywords_found=["cheating"],
+        length_category="too_short",
+        response_time_ms=120,
+        confidence_score=65.0,
+        metadata={"model_type": "test"},
+        social_impact_metrics={"overall_social_impact": 42.5}
+    )
+
+@pytest.mark.parametrize("backend_class", [CSVResultBackend, JSONLResultBackend])
+def test_result_sink_writes_typed_columns(tmp_path, backend_class):
+    """Numeric metrics round-trip as numbers rather than formatted strings"""
+    sink = ResultSink(backend_class(directory=str(tmp_path)))
+    sink.submit("What is IPC 420?", [make_evaluation("A"), make_evaluation("B")], ["cheating"])
+    sink.close()
+
+    results = load_results(str(tmp_path))
+    assert list(results["model_name"]) == ["A", "B"]
+    assert results["keyword_coverage"].dtype == np.float64
+    assert results["keyword_coverage"][0] == 75.0
+    assert results["response_time_ms"][1] == 120
+    assert results["overall_social_impact"][0] == 42.5
+    assert sink.stats()["written"] == 2
+
+def test_result_sink_writes_parquet(tmp_path):
+    """The Parquet backend stores metrics as typed columns"""
+    pytest.importorskip("pyarrow")
+    sink = ResultSink(ParquetResultBackend(directory=str(tmp_path)))
+    sink.submit("What is IPC 420?", [make_evaluation()])
+    sink.close()
+
+    results = load_results(str(tmp_path), columns=["model_name", "confidence_score"])
+    assert results["confidence_score"].tolist() == [65.0]
+
+def test_result_backend_rotates_by_size(tmp_path):
+    """A new file is started once the current file exceeds max_bytes"""
+    sink = ResultSink(JSONLResultBackend(directory=str(tmp_path), max_bytes=1), batch_size=1)
+    sink.submit("What is IPC 420?", [make_evaluation("A"), make_evaluation("B")])
+    sink.close()
+
+    assert len(list(tmp_path.iterdir())) == 2
+    assert list(load_results(str(tmp_path))["model_name"]) == ["A", "B"]
+
+def test_csv_resume_starts_a_new_file_when_columns_changed(tmp_path):
+    """A file written before the schema grew is left alone rather than appended to under the new header"""
+    sink = ResultSink(CSVResultBackend(directory=str(tmp_path)))
+    sink.submit("What is IPC 420?", [make_evaluation("A")])
+    sink.close()
+    old_path = sink.backend.path
+    old_columns = [column for column in RESULT_SCHEMA if column not in ("ttft_ms", "scoring_profile_version")]
+    with open(old_path, newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    with open(old_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=old_columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+    sink = ResultSink(CSVResultBackend(directory=str(tmp_path)))
+    sink.submit("What is IPC 420?", [make_evaluation("B")])
+    sink.close()
+    assert sink.backend.path != old_path
+
+    results = load_results(str(tmp_path))
+    assert list(results["model_name"]) == ["A", "B"]
+    assert math.isnan(results["ttft_ms"][0])
+    assert results["scoring_profile_version"][0] is None
+
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    assert store.import_files(str(tmp_path)) == 2
+
+    # Appending continues in the file with the current header
+    sink = ResultSink(CSVResultBackend(directory=str(tmp_path)))
+    sink.submit("What is IPC 420?", [make_evaluation("C")])
+    sink.close()
+    assert len(list(tmp_path.glob("*.csv"))) == 2
+
+def test_jsonl_writes_missing_metrics_as_null(tmp_path):
+    sink = ResultSink(JSONLResultBackend(directory=str(tmp_path)))
+    sink.submit("What is IPC 420?", [make_evaluation()])
+    sink.close()
+
+    with open(sink.backend.path, encoding="utf-8") as file:
+        line = file.readline()
+    assert "NaN" not in line
+    assert json.loads(line)["ttft_ms"] is None
+    assert math.isnan(load_results(str(tmp_path))["ttft_ms"][0])
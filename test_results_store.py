@@ -0,0 +1,150 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from models import ModelEvaluation
+from utils.result_sink import JSONLResultBackend, ResultSink, evaluation_to_row
+from utils.results_store import ResultsStore, question_hash, set_results_store
+
+client = TestClient(app)
+
+def make_row(model_name: str, timestamp: str, coverage: float, response_time_ms: int = 100,
+             question: str = "What is IPC 420?", cache_hit: bool = False, profile: str = "v1",
+             answer: str = "Section 420 deals with cheating.") -> dict:
+    evaluation = ModelEvaluation(
+        model_name=model_name,
+        answer=answer,
+        keyword_coverage=coverage,
+        keywords_found=["cheating"],
+        length_category="too_short",
+        response_time_ms=response_time_ms,
+        confidence_score=50.0,
+        cache_hit=cache_hit,
+        social_impact_metrics={"overall_social_impact": 40.0, "language_simplicity": coverage, "accessibility": 30.0},
+        scoring_profile_version=profile
+    )
+    return evaluation_to_row(timestamp, question, ["cheating"], evaluation)
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    set_results_store(store)
+    yield store
+    set_results_store(None)
+
+def test_leaderboard_and_trend_read_incremental_aggregates(store):
+    """Aggregates are summed across batches; cache hits do not count towards latency"""
+    store.add_rows([
+        make_row("A", "2024-05-01T10:00:00", 80.0, 200),
+        make_row("B", "2024-05-01T10:00:00", 60.0, 50),
+    ])
+    store.add_rows([
+        make_row("A", "2024-05-02T09:00:00", 60.0, 0, cache_hit=True),
+        make_row("B", "2024-05-02T09:00:00", 100.0, 150, profile="v2"),
+    ])
+
+    leaderboard = store.leaderboard()
+    assert [(entry["rank"], entry["model_name"]) for entry in leaderboard] == [(1, "B"), (2, "A")]
+    a = leaderboard[1]
+    assert a["evaluations"] == 2 and a["mean_keyword_coverage"] == 70.0
+    assert a["mean_response_time_ms"] == 200.0 and a["cache_hit_rate"] == 0.5
+    assert a["mean_semantic_similarity"] is None and a["mean_social_impact"] == 40.0
+
+    assert [entry["model_name"] for entry in store.leaderboard("v1")] == ["A", "B"]
+    assert [entry["model_name"] for entry in store.leaderboard(sort_by="response_time_ms")] == ["B", "A"]
+    with pytest.raises(ValueError):
+        store.leaderboard(sort_by="vibes")
+
+    trend = store.trend(model_name="B")
+    assert [(point["period"], point["mean_keyword_coverage"]) for point in trend] == [("2024-05-01", 60.0), ("2024-05-02", 100.0)]
+    assert store.trend(bucket="month", since="2024-05-02")[0]["period"] == "2024-05"
+    assert store.stats()["evaluations"] == 4
+
+def test_question_comparison_shows_latest_answers(store):
+    """Questions are keyed by whitespace-normalized text; each model's latest answer is returned"""
+    store.add_rows([
+        make_row("A", "2024-05-01T10:00:00", 50.0, answer="old answer"),
+        make_row("A", "2024-05-03T10:00:00", 100.0, question="What  is IPC 420? ", answer="new answer"),
+        make_row("B", "2024-05-02T10:00:00", 25.0),
+        make_row("A", "2024-05-02T10:00:00", 10.0, question="What is IPC 302?"),
+    ])
+
+    key = question_hash("What is IPC 420?")
+    comparison = store.compare_question(key)
+    assert comparison["evaluations"] == 3
+    assert [model["model_name"] for model in comparison["models"]] == ["A", "B"]
+    assert comparison["models"][0]["mean_keyword_coverage"] == 75.0
+    assert comparison["models"][0]["latest"]["answer"] == "new answer"
+    assert store.compare_question("unknown") is None
+    assert [q["question"] for q in store.questions(contains="420")] == ["What is IPC 420?"]
+
+def test_saved_results_are_queryable_through_the_api(store, tmp_path):
+    """The result sink records its batches in the store, and the results endpoints read them back"""
+    sink = ResultSink(JSONLResultBackend(directory=str(tmp_path / "files")), record_history=True)
+    sink.submit("What is IPC 420?", [
+        ModelEvaluation(model_name=name, answer="Section 420 covers cheating.", keyword_coverage=coverage,
+                        keywords_found=[], length_category="too_short", response_time_ms=10, confidence_score=50.0)
+        for name, coverage in (("A", 20.0), ("B", 90.0))
+    ])
+    sink.close()
+    assert sink.stats()["history_errors"] == 0
+
+    leaderboard = client.get("/results/leaderboard").json()
+    assert [entry["model_name"] for entry in leaderboard["models"]] == ["B", "A"]
+    assert client.get("/results/leaderboard?sort_by=vibes").status_code == 400
+    assert len(client.get("/results/trend?bucket=week").json()["points"]) == 2
+    assert client.get("/results/trend?since=yesterday").status_code == 400
+
+    question = client.get("/results/questions").json()[0]
+    comparison = client.get(f"/results/questions/{question['question_hash']}").json()
+    assert comparison["models"][0]["latest"]["answer"] == "Section 420 covers cheating."
+    assert client.get("/results/questions/unknown").status_code == 404
+
+    # Result files from before the store existed can be loaded too
+    backfilled = ResultsStore(str(tmp_path / "backfill.sqlite"))
+    assert backfilled.import_files(str(tmp_path / "files")) == 2
+    assert backfilled.leaderboard()[0]["model_name"] == "B"
+
+def test_aggregates_are_bucketed_and_downsampled(store):
+    """Percentiles and histograms come from bucket counts; the series has at most max_points slots per model"""
+    store.add_rows(
+        [make_row("A", f"2024-05-01T{hour:02d}:00:00", 15.0 + hour, 100 + hour) for hour in range(20)]
+        + [make_row("B", "2024-05-01T10:00:00", 95.0, 3000, question="What is IPC 302?")]
+    )
+
+    aggregates = store.aggregate(max_points=4)
+    a, b = aggregates["models"]
+    assert aggregates["evaluations"] == 21 and a["evaluations"] == 20
+    assert 100 <= a["latency_percentiles_ms"]["p50"] <= 250
+    assert a["keyword_coverage_histogram"][1:4] == [5, 10, 5]
+    assert a["social_impact"]["accessibility"] == 30.0
+    assert a["social_impact"]["language_simplicity"] == pytest.approx(24.5)
+    assert b["keyword_coverage_histogram"][9] == 1
+    assert len([point for point in aggregates["series"]["points"] if point["model_name"] == "A"]) <= 4
+    assert sum(point["evaluations"] for point in aggregates["series"]["points"]) == 21
+
+    # A question set reads the matching evaluations instead of the per-day sums
+    only_302 = store.aggregate(question_hashes=[question_hash("What is IPC 302?")])
+    assert [model["model_name"] for model in only_302["models"]] == ["B"]
+    assert only_302["models"][0]["keyword_coverage_histogram"] == b["keyword_coverage_histogram"]
+    assert store.aggregate(since="2024-05-02")["models"] == []
+
+    assert store.aggregate(max_points=4) is aggregates
+    store.add_rows([make_row("A", "2024-05-02T10:00:00", 50.0)])
+    assert store.aggregate(max_points=4)["evaluations"] == 22
+
+def test_aggregates_endpoint_supports_conditional_requests(store):
+    """An unchanged store answers a matching If-None-Match with 304"""
+    store.add_rows([make_row("A", "2024-05-01T10:00:00", 80.0)])
+
+    response = client.get("/results/aggregates", params={"question": "What is  IPC 420?"})
+    assert response.status_code == 200
+    assert response.json()["models"][0]["model_name"] == "A"
+    etag = response.headers["etag"]
+
+    assert client.get("/results/aggregates", params={"question": "What is  IPC 420?"},
+                      headers={"If-None-Match": etag}).status_code == 304
+    store.add_rows([make_row("B", "2024-05-01T11:00:00", 80.0)])
+    changed = client.get("/results/aggregates", params={"question": "What is  IPC 420?"}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert client.get("/results/aggregates?max_points=0").status_code == 400
@@ -0,0 +1,118 @@
+import time
+
+import numpy as np
+
+import services.huggingface_service as huggingface_service
+from parallel_benchmarker import benchmark_single_model
+from utils.retrieval import (
+    FALLBACK_CONTEXT, DenseIndex, LegalRetriever, build_legal_retriever, chunk_section, load_corpus, tokenize
+)
+
+VOCABULARY = ["cheating", "fir", "police", "bail", "dowry", "information", "cheque", "murder"]
+
+def bag_of_words_encoder(texts):
+    """Tiny deterministic stand-in for a sentence-transformers model"""
+    return np.array([[tokenize(text).count(term) + 0.01 for term in VOCABULARY] for text in texts], dtype=np.float32)
+
+def test_long_sections_are_chunked_on_sentence_boundaries():
+    """A section longer than the chunk size becomes several passages of whole sentences"""
+    record = {"id": "x-1", "act": "Test Act", "section": "1", "title": "Test", "text": "One two three. Four five six. Seven eight."}
+    passages = chunk_section(record, max_words=4)
+
+    assert [p.id for p in passages] == ["x-1#0", "x-1#1", "x-1#2"]
+    assert passages[1].text == "Four five six."
+    assert chunk_section(record)[0].id == "x-1"
+
+def test_bm25_finds_the_relevant_section():
+    """Questions are matched on section numbers, titles and everyday keywords"""
+    retriever = LegalRetriever(load_corpus())
+
+    assert retriever.retrieve("What is the punishment under Section 420 IPC?").passages[0].id == "ipc-420"
+    assert retriever.retrieve("How do I file an FIR if the police refuse?").passages[0].id == "crpc-154"
+    assert retriever.retrieve("How long does an RTI reply take?").passages[0].id == "rti-7"
+    assert retriever.retrieve("What does Article 21 protect?").passages[0].id == "const-21"
+
+def test_unmatched_question_uses_fallback_context():
+    """With no shared terms, nothing is retrieved and the reader gets the generic context"""
+    retriever = LegalRetriever(load_corpus())
+    result = retriever.retrieve("zzzz qqqq")
+
+    assert result.passages == []
+    assert retriever.build_context(result.passages) == FALLBACK_CONTEXT
+
+def test_retrievals_are_cached_per_normalized_question():
+    """Repeated questions skip the index; whitespace and case do not matter"""
+    retriever = LegalRetriever(load_corpus())
+    first = retriever.retrieve("What is anticipatory bail?")
+    second = retriever.retrieve("what is   ANTICIPATORY bail?")
+
+    assert not first.cache_hit
+    assert second.cache_hit
+    assert second.passages == first.passages
+    assert retriever.stats()["cache_hits"] == 1
+
+def test_dense_embeddings_are_memory_mapped(tmp_path):
+    """Embeddings are written once, then memory-mapped and fused with BM25"""
+    passages = load_corpus()
+    path = str(tmp_path / "embeddings.npy")
+    dense = DenseIndex.build(passages, bag_of_words_encoder, path)
+
+    assert isinstance(dense.embeddings, np.memmap)
+    assert np.allclose(np.linalg.norm(dense.embeddings, axis=1), 1.0, atol=1e-5)
+
+    # A second build reuses the file instead of encoding again
+    def fail(texts):
+        raise AssertionError("passages encoded twice")
+    DenseIndex.build(passages, fail, path)
+
+    retriever = LegalRetriever(passages, dense_index=dense)
+    result = retriever.retrieve("Is giving dowry an offence?")
+    assert result.method == "hybrid"
+    assert "dpa-3" in [p.id for p in result.passages]
+
+def test_dense_index_is_skipped_when_over_budget(tmp_path):
+    """A dense index slower than the budget is skipped, leaving BM25 results"""
+    passages = load_corpus()
+    dense = DenseIndex.build(passages, bag_of_words_encoder, str(tmp_path / "embeddings.npy"))
+
+    def slow_encoder(texts):
+        time.sleep(0.05)
+        return bag_of_words_encoder(texts)
+    dense._encode = slow_encoder
+
+    retriever = LegalRetriever(passages, budget_ms=10, dense_index=dense)
+    first = retriever.retrieve("What is the punishment for murder?")
+    second = retriever.retrieve("What is the punishment for theft?")
+
+    assert first.method == "hybrid"
+    assert second.method == "bm25" and second.dense_skipped
+    assert second.retrieval_ms < 50
+    assert second.passages[0].id == "ipc-379"
+
+def test_missing_embedding_model_falls_back_to_bm25():
+    """An embedding model that cannot be loaded disables only the dense index"""
+    retriever = build_legal_retriever(embedding_model="does-not-exist/model")
+
+    assert retriever.stats()["dense_index"] is False
+    assert retriever.retrieve("What is Section 498A?").passages[0].id == "ipc-498a"
+
+def test_extractive_qa_reports_retrieval_and_reader_times(monkeypatch):
+    """The QA reader gets retrieved passages, and both stage timings reach the metadata"""
+    contexts = []
+
+    def fake_pipeline(task, model, tokenizer):
+        def answer(question, context, batch_size):
+            contexts.extend(context)
+            results = [{"answer": c.split(":")[0]} for c in context]
+            return results[0] if len(results) == 1 else results
+        return answer
+
+    monkeypatch.setattr(huggingface_service, "pipeline", fake_pipeline)
+    service = huggingface_service.HuggingFaceService()
+    evaluation = benchmark_single_model("What is the punishment for theft?", service, use_cache=False)
+
+    assert "Section 379" in contexts[0]
+    assert evaluation.metadata["retrieved_passages"][0] == "ipc-379"
+    assert evaluation.metadata["retrieval_ms"] >= 0
+    assert evaluation.metadata["reader_ms"] >= 0
+    assert evaluation.metadata["model_type"] == "huggingface"
@@ -0,0 +1,40 @@
+import json
+
+from run_benchmarks import load_checkpoint, run_benchmark_suite
+from services.simplified_service import SimplifiedModelService
+
+QUESTIONS = [
+    {"question": "What is IPC 420?", "expected_keywords": ["cheating"]},
+    {"question": "What is IPC 302?", "expected_keywords": ["murder"]},
+    {"question": "What is section 34 of IPC?", "expected_keywords": ["common intention"]},
+]
+
+def test_run_benchmark_suite_resumes_from_checkpoint(tmp_path):
+    """A rerun only benchmarks questions missing from the results file"""
+    input_path = tmp_path / "questions.jsonl"
+    input_path.write_text("\n".join(json.dumps(q) for q in QUESTIONS))
+    output_path = tmp_path / "results.jsonl"
+
+    # Simulate a crashed run: one finished question and a half-written line
+    finished = {"index": 1, "question": QUESTIONS[1]["question"], "expected_keywords": ["murder"], "models": []}
+    output_path.write_text(json.dumps(finished) + "\n" + '{"index": 2, "quest')
+
+    summary = run_benchmark_suite(str(input_path), str(output_path), [SimplifiedModelService()], workers=2)
+
+    assert summary["questions_resumed"] == 1
+    assert summary["questions_processed"] == 2
+    assert load_checkpoint(str(output_path)) == {0, 1, 2}
+    assert summary["models"]["Simplified Legal Model"]["answers"] == 2
+
+def test_run_benchmark_suite_reads_csv(tmp_path):
+    """CSV question sets use comma-separated expected keywords"""
+    input_path = tmp_path / "questions.csv"
+    input_path.write_text('question,expected_keywords\n"What is IPC 420?","cheating,fraud"\n')
+    output_path = tmp_path / "results.jsonl"
+
+    summary = run_benchmark_suite(str(input_path), str(output_path), [SimplifiedModelService()], workers=1)
+
+    result = json.loads(output_path.read_text().splitlines()[0])
+    assert summary["questions_processed"] == 1
+    assert result["expected_keywords"] == ["cheating", "fraud"]
+    assert result["models"][0]["keywords_found"] == ["cheating"]
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import signal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarker import compute_scores
+from main import app
+from parallel_benchmarker import BenchmarkExecutor
+from scoring_pool import ScoringPool, set_scoring_pool
+from services.simplified_service import SimplifiedModelService
+from utils.scoring_profile import CompiledScoringProfile, get_scoring_profile
+
+client = TestClient(app)
+
+ANSWERS = [
+    "Section 420 deals with cheating. You should file an FIR at the police station.",
+    "It might be a crime, possibly under the IPC. Contact a lawyer for legal aid.",
+    "Murder is punishable under Section 302 with death or imprisonment for life and a fine.",
+]
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ScoringPool(processes=2, max_batch_size=4, max_wait_ms=20)
+    assert pool.warm_up() == 2
+    yield pool
+    pool.shutdown()
+
+def test_pool_scores_batches_like_compute_scores(pool):
+    """Concurrent answers are batched; scores match scoring in this process, under each answer's profile"""
+    changed = get_scoring_profile().profile.copy(deep=True)
+    changed.lexicons[0].terms.append("cheating")
+    other = CompiledScoringProfile(changed)
+
+    futures = [pool.score("What is IPC 420?", answer, 120, ["cheating", "fir"]) for answer in ANSWERS * 2]
+    futures.append(pool.score("What is IPC 420?", ANSWERS[0], 120, None, other))
+    results = [future.result(timeout=30) for future in futures]
+
+    for answer, (fields, stages) in zip(ANSWERS * 2, results):
+        expected, _ = compute_scores("What is IPC 420?", answer, 120, ["cheating", "fir"])
+        assert fields == expected
+        assert set(stages) == {"keyword_coverage", "length", "confidence", "social_impact"}
+    expected, _ = compute_scores("What is IPC 420?", ANSWERS[0], 120, None, other)
+    assert results[-1][0] == expected
+
+    stats = pool.stats()
+    assert stats["errors"] == 0 and stats["batches_in_flight"] == 0
+    assert stats["batch_size"]["count"] < len(futures)
+
+def test_executor_scores_on_the_pool(pool):
+    """Sync models only wait on their answers in the thread pool; the scoring wait is a stage"""
+    executor = BenchmarkExecutor(max_workers=4)
+    model = SimplifiedModelService()
+    question = "What is the punishment for cheating?"
+    try:
+        set_scoring_pool(pool)
+        pooled = asyncio.run(executor.benchmark(question, [model], ["cheating"], use_cache=False))[0]
+        assert client.get("/admin/scoring-pool").json()["processes"] == 2
+    finally:
+        set_scoring_pool(None)
+    inline = asyncio.run(executor.benchmark(question, [model], ["cheating"], use_cache=False))[0]
+    executor.shutdown()
+
+    assert "scoring_wait" in pooled.stage_timings_ms and "scoring_wait" not in inline.stage_timings_ms
+    assert pooled.keyword_coverage == inline.keyword_coverage
+    assert pooled.social_impact_metrics["language_simplicity"] == inline.social_impact_metrics["language_simplicity"]
+    assert pooled.scorer_versions == inline.scorer_versions
+    assert client.get("/admin/scoring-pool").json() == {"enabled": False}
+
+def test_pool_recovers_after_a_worker_dies():
+    """A killed worker breaks its executor; the next batch starts a new pool instead of failing for good"""
+    pool = ScoringPool(processes=1, max_batch_size=4, max_wait_ms=5)
+    try:
+        pool.warm_up()
+        broken = pool._executor
+        for pid in list(broken._processes):
+            os.kill(pid, signal.SIGKILL)
+
+        fields, _ = pool.score("What is IPC 420?", ANSWERS[0], 120, ["cheating", "fir"]).result(timeout=60)
+        expected, _ = compute_scores("What is IPC 420?", ANSWERS[0], 120, ["cheating", "fir"])
+        assert fields == expected
+        assert pool._executor is not broken
+        stats = pool.stats()
+        assert stats["restarts"] == 1 and stats["errors"] == 0
+        assert "worker process died" in stats["last_error"]
+    finally:
+        pool.shutdown()
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.simplified_service import SimplifiedModelService
+from benchmarker import score_answer
+from utils.scoring_profile import DEFAULT_PROFILE_PATH, get_scoring_profile, load_scoring_profile, reload_scoring_profile
+from utils.social_impact import calculate_actionable_score
+from utils.text_analysis import calculate_confidence_score
+
+client = TestClient(app)
+
+ANSWER = "First, file a complaint under Section 420. You may also approach the court."
+
+def write_profile(tmp_path, **changes):
+    with open(DEFAULT_PROFILE_PATH) as file:
+        profile = json.load(file)
+    profile.update(changes)
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps(profile))
+    return str(path)
+
+@pytest.fixture
+def restore_profile():
+    yield
+    reload_scoring_profile(DEFAULT_PROFILE_PATH)
+
+def test_default_profile_keeps_original_confidence_rules():
+    """The shipped profile reproduces the original confidence formula"""
+    # base 50, "may" -10, one number +5, one citation +15
+    assert calculate_confidence_score(ANSWER) == 60
+
+def test_each_uncertainty_phrase_counts_once():
+    """Phrases count once each, even when one contains another"""
+    # "may" and "could be" once each despite repeats and "may" inside "maybe"
+    assert calculate_confidence_score("It may be, maybe it could be, it may.") == 30
+
+def test_evaluation_records_profile_version():
+    """Every evaluation records the profile version it was scored with"""
+    evaluation = score_answer("What is Section 420?", SimplifiedModelService(), ANSWER, 10, ["section"])
+    assert evaluation.scoring_profile_version == get_scoring_profile().version
+
+def test_reload_swaps_weights_and_version(tmp_path, restore_profile):
+    """Reloading a profile changes scores and version without a restart"""
+    before = calculate_actionable_score(ANSWER)
+    lexicons = [dict(lexicon, weight=lexicon["weight"] * 2) for lexicon in get_scoring_profile().profile.dict()["lexicons"]]
+
+    response = client.post("/admin/scoring-profile/reload", params={"path": write_profile(tmp_path, version="2.0", lexicons=lexicons)})
+    assert response.status_code == 200
+    assert response.json()["version"] == "2.0"
+
+    assert calculate_actionable_score(ANSWER) == min(100, before * 2)
+    evaluation = score_answer("What is Section 420?", SimplifiedModelService(), ANSWER, 10, ["section"])
+    assert evaluation.scoring_profile_version == "2.0"
+
+def test_invalid_profile_keeps_active_profile(tmp_path, restore_profile):
+    """A profile that fails validation is rejected and the old one stays active"""
+    version = get_scoring_profile().version
+    path = write_profile(tmp_path, overall_weights={"unknown_metric": 1.0})
+
+    response = client.post("/admin/scoring-profile/reload", params={"path": path})
+    assert response.status_code == 400
+    assert client.get("/admin/scoring-profile").json()["version"] == version
+
+def test_captured_profile_is_unaffected_by_reload(tmp_path, restore_profile):
+    """A profile captured for a request keeps scoring with its own weights"""
+    captured = get_scoring_profile()
+    reload_scoring_profile(write_profile(tmp_path, version="2.0", overall_weights={"accessibility": 1.0}))
+
+    evaluation = score_answer("What is Section 420?", SimplifiedModelService(), ANSWER, 10, ["section"], profile=captured)
+    assert evaluation.scoring_profile_version == captured.version
+    assert load_scoring_profile(DEFAULT_PROFILE_PATH).version == captured.version
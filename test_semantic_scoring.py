@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from parallel_benchmarker import benchmark_single_model
+from services.simplified_service import SimplifiedModelService
+from services.text_analysis_service import TextAnalysisService
+from utils.embedding_store import EmbeddingStore, get_embedding_store, set_embedding_store
+from utils.semantic_scoring import score_semantic_similarity
+
+client = TestClient(app)
+
+VOCABULARY = ["cheating", "property", "imprisonment", "murder", "bail", "tenant"]
+
+class CountingEncoder:
+    """Bag-of-words stand-in for a sentence-transformers model that records every call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array(
+            [[text.lower().count(term) + 0.1 for term in VOCABULARY] for text in texts], dtype=np.float32
+        ) * 3
+
+def test_store_encodes_each_text_once_across_instances(tmp_path):
+    """Embeddings persist on disk, so a new store only encodes texts it has never seen"""
+    encoder = CountingEncoder()
+    store = EmbeddingStore(str(tmp_path), "test-model", encoder)
+    first = store.embed(["cheating is a crime", "bail rules", "cheating is a crime"])
+
+    assert encoder.calls == [["cheating is a crime", "bail rules"]]
+    assert np.allclose(np.linalg.norm(first, axis=1), 1.0, atol=1e-5)
+    assert np.allclose(first[0], first[2])
+
+    def fail(texts):
+        raise AssertionError(f"encoded again: {texts}")
+    reopened = EmbeddingStore(str(tmp_path), "test-model", fail)
+    assert np.allclose(reopened.embed(["bail rules"]), first[1])
+    assert isinstance(reopened._vectors, np.memmap)
+
+    encoder.calls.clear()
+    store.embed(["bail rules", "tenant rights"])
+    assert encoder.calls == [["tenant rights"]]
+    assert store.stats()["stored"] == 3
+
+def test_stores_share_appends_between_instances(tmp_path):
+    """A store sees rows appended by another store (e.g. another worker process) before encoding"""
+    first = EmbeddingStore(str(tmp_path), "test-model", CountingEncoder())
+    second_encoder = CountingEncoder()
+    second = EmbeddingStore(str(tmp_path), "test-model", second_encoder)
+
+    first.embed(["murder"])
+    second.embed(["murder", "property"])
+    first.embed(["bail"])
+
+    assert second_encoder.calls == [["property"]]
+    assert np.allclose(first.embed(["property"]), second.embed(["property"]))
+    assert np.allclose(second.embed(["bail"]), first.embed(["bail"]))
+
+def test_run_is_embedded_in_one_batch(tmp_path):
+    """All answers and references of a run are encoded together and compared by cosine"""
+    encoder = CountingEncoder()
+    store = EmbeddingStore(str(tmp_path), "test-model", encoder)
+    model = SimplifiedModelService()
+    first = [benchmark_single_model("What is IPC 420?", model, use_cache=False)]
+    second = [benchmark_single_model("What is IPC 302?", model, use_cache=False)]
+    unscored = [benchmark_single_model("What is bail?", model, use_cache=False)]
+
+    assert score_semantic_similarity([
+        (first, [first[0].answer]),
+        (second, ["Murder is punishable with death or imprisonment for life.", "Tenant rights"]),
+        (unscored, None),
+    ], store)
+
+    assert len(encoder.calls) == 1
+    assert first[0].semantic_similarity == pytest.approx(1.0, abs=1e-3)
+    assert -1.0 <= second[0].semantic_similarity <= 1.0
+    assert unscored[0].semantic_similarity is None
+
+def test_unavailable_embedding_model_leaves_similarity_unset(tmp_path):
+    """Without sentence-transformers or the model files, scoring is skipped instead of failing"""
+    store = EmbeddingStore(str(tmp_path), "does-not-exist/model")
+    evaluation = benchmark_single_model("What is IPC 420?", SimplifiedModelService(), use_cache=False)
+
+    assert not score_semantic_similarity([([evaluation], ["Cheating"])], store)
+    assert evaluation.semantic_similarity is None
+    assert store.stats()["encoder_error"]
+    assert TextAnalysisService(store).semantic_similarity("a", "b") == 0.0
+
+def test_text_analysis_similarity_is_cosine(tmp_path):
+    """semantic_similarity compares normalized embeddings, and the service loads no model up front"""
+    service = TextAnalysisService(EmbeddingStore(str(tmp_path), "test-model", CountingEncoder()))
+
+    same = service.semantic_similarity("cheating", "cheating")
+    assert same == pytest.approx(1.0, abs=1e-5)
+    assert service.semantic_similarity("cheating", "cheating cheating") == pytest.approx(same, abs=0.05)
+    assert service.semantic_similarity("cheating", "murder") < same
+    assert service.semantic_similarities(["cheating", "bail"], ["bail"]).shape == (2, 1)
+
+def test_batch_benchmark_reports_semantic_similarity(tmp_path):
+    """Reference answers of every question in a batch are embedded in one call"""
+    encoder = CountingEncoder()
+    previous = get_embedding_store()
+    set_embedding_store(EmbeddingStore(str(tmp_path), "test-model", encoder))
+    try:
+        response = client.post("/batch-benchmark", json=[
+            {"question": "What is IPC 420?", "reference_answers": ["Cheating and dishonestly inducing delivery of property."]},
+            {"question": "What is IPC 302?", "reference_answers": ["Punishment for murder."]},
+            {"question": "What is section 34 of IPC?"},
+        ])
+    finally:
+        set_embedding_store(previous)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(encoder.calls) == 1
+    assert data[0]["reference_answers"] == ["Cheating and dishonestly inducing delivery of property."]
+    assert all(m["semantic_similarity"] is not None for m in data[0]["models"] if m["answer"])
+    assert all(m["semantic_similarity"] is None for m in data[2]["models"])
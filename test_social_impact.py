@@ -0,0 +1,58 @@
+import numpy as np
+
+from utils.scoring_profile import get_scoring_profile
+from utils.social_impact import (
+    calculate_actionable_score, calculate_cultural_relevance, score_social_impact, score_social_impact_batch
+)
+
+ANSWERS = [
+    "First, file an FIR at the police station. Then go to the High Court if the police refuse.",
+    "Submit the RTI form online with the fee; the Right to Information Act sets a 30 day deadline.",
+    "Section 420 of the Indian Penal Code deals with cheating.",
+    "",
+]
+
+def reference_score(text, metric):
+    text_lower = text.lower()
+    score = sum(
+        text_lower.count(term.lower()) * lexicon.weight
+        for lexicon in get_scoring_profile().profile.lexicons if lexicon.metric == metric
+        for term in lexicon.terms
+    )
+    return min(100, score)
+
+def reference_actionable_score(text):
+    return reference_score(text, "actionable_guidance")
+
+def reference_cultural_relevance(text):
+    return reference_score(text, "cultural_relevance")
+
+def test_single_pass_scores_match_per_term_counting():
+    """Lexicon counting gives the same scores as counting each term separately"""
+    for answer in ANSWERS:
+        assert calculate_actionable_score(answer) == reference_actionable_score(answer)
+        assert calculate_cultural_relevance(answer) == reference_cultural_relevance(answer)
+
+def test_batch_scoring_matches_individual_scoring():
+    """Batch scoring returns one score per answer for every metric"""
+    metrics = score_social_impact_batch(ANSWERS, [100, 2000, 500, 50])
+
+    assert set(metrics) == {
+        "language_simplicity", "actionable_guidance", "cultural_relevance",
+        "accessibility", "overall_social_impact"
+    }
+    assert metrics["actionable_guidance"].tolist() == [reference_actionable_score(a) for a in ANSWERS]
+    assert metrics["cultural_relevance"].tolist() == [reference_cultural_relevance(a) for a in ANSWERS]
+    assert np.all(metrics["overall_social_impact"] >= 0)
+
+def test_batch_scoring_reuses_precomputed_simplicity():
+    """Stored readability scores can be reused when only lexicons or weights change"""
+    metrics = score_social_impact_batch(ANSWERS[:2], [100, 100], language_simplicity=[10.0, 20.0])
+    assert metrics["language_simplicity"].tolist() == [10.0, 20.0]
+
+def test_single_answer_scoring_matches_batch_scoring():
+    """The scalar path used while benchmarking gives the batch path's scores"""
+    metrics = score_social_impact_batch(ANSWERS, [100, 2000, 500, 50], language_simplicity=[10.0, 20.0, 30.0, 0.0])
+    for i, (answer, response_time_ms) in enumerate(zip(ANSWERS, [100, 2000, 500, 50])):
+        scores = score_social_impact(answer, response_time_ms, metrics["language_simplicity"][i])
+        assert scores == {metric: float(values[i]) for metric, values in metrics.items()}
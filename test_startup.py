@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from main import app
+from utils.startup import lazy_import, startup_timings
+from utils.text_analysis import ENGLISH_STOPWORDS, extract_keywords
+
+client = TestClient(app)
+
+HEAVY_MODULES = ("torch", "transformers", "nltk", "textstat", "openai")
+
+def test_importing_app_skips_heavy_dependencies():
+    """The API process comes up without importing model or NLP libraries"""
+    code = (
+        "import sys, main; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == ""
+
+def test_lazy_import_records_timing():
+    """The first lazy import of a module is timed under its name"""
+    module = lazy_import("textstat")
+    assert lazy_import("textstat") is module
+    assert "import:textstat" in startup_timings.snapshot()["components"]
+
+def test_startup_endpoint():
+    """Startup timings are reported per component"""
+    response = client.get("/admin/startup")
+    assert response.status_code == 200
+    assert "app:import" in response.json()["components"]
+
+def test_extract_keywords_works_offline():
+    """Keyword extraction works whether or not NLTK data is installed"""
+    keywords = extract_keywords("What is the punishment for cheating under Section 420?")
+    assert keywords == ["punishment", "cheating", "section", "420"]
+    assert not ENGLISH_STOPWORDS.intersection(keywords)
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from parallel_benchmarker import BenchmarkExecutor, benchmark_single_model
+from services.base_service import ModelService
+from services.simplified_service import SimplifiedModelService
+from utils.timing import GenerationTimer, StreamChunk
+
+client = TestClient(app)
+
+CHUNKS = ["Section ", "420 ", "covers ", "cheating."]
+
+class FakeStreamingService(ModelService):
+    """Generative model stub that emits one chunk every 20ms"""
+
+    @property
+    def name(self) -> str:
+        return "Fake streaming model"
+
+    def get_answer(self, question: str) -> str:
+        return "".join(self.stream_answer(question))
+
+    def stream_answer(self, question: str):
+        for chunk in CHUNKS:
+            time.sleep(0.02)
+            yield chunk
+
+def test_streamed_benchmark_records_token_timings():
+    """Streaming records time to first token, token count and throughput"""
+    received = []
+    evaluation = benchmark_single_model(
+        "What is Section 420?", FakeStreamingService(), ["cheating"], stream=True, on_token=received.append
+    )
+
+    assert received == CHUNKS
+    assert evaluation.answer == "Section 420 covers cheating."
+    assert evaluation.output_chunks == 4
+    assert evaluation.mean_inter_chunk_ms > 0
+    # Plain string chunks say nothing about tokens
+    assert evaluation.output_tokens is None and evaluation.tokens_per_second is None
+    assert 15 <= evaluation.ttft_ms < evaluation.response_time_ms + 1
+    assert evaluation.started_at_ns < evaluation.first_token_at_ns < evaluation.finished_at_ns
+
+def test_unstreamed_benchmark_records_only_call_timings():
+    """Without streaming only the monotonic start and finish are recorded"""
+    evaluation = benchmark_single_model("What is Section 420?", FakeStreamingService(), ["cheating"])
+
+    assert evaluation.ttft_ms is None
+    assert evaluation.output_chunks is None
+    assert evaluation.started_at_ns < evaluation.finished_at_ns
+
+def test_non_generative_services_report_no_token_metrics():
+    """A service that only returns whole answers is not credited with a TTFT"""
+    service = SimplifiedModelService()
+    assert not service.supports_streaming()
+
+    evaluation = benchmark_single_model("What is the punishment for cheating?", service, ["cheating"], stream=True)
+    assert evaluation.ttft_ms is None
+
+def test_sync_streams_are_bridged_to_async_callers():
+    """astream_answer yields the chunks of a synchronous stream_answer as they are produced"""
+    async def collect():
+        return [chunk async for chunk in FakeStreamingService().astream_answer("Q")]
+
+    assert asyncio.run(collect()) == CHUNKS
+
+def test_executor_forwards_chunks_per_model():
+    """The executor tags every streamed chunk with its model"""
+    received = []
+    executor = BenchmarkExecutor(max_workers=2)
+    try:
+        results = asyncio.run(executor.benchmark(
+            "What is Section 420?", [FakeStreamingService()], ["cheating"],
+            on_token=lambda model, chunk: received.append((model.name, chunk))
+        ))
+    finally:
+        executor.shutdown()
+
+    assert received == [("Fake streaming model", chunk) for chunk in CHUNKS]
+    assert results[0].output_chunks == 4
+
+def test_benchmark_stream_endpoint():
+    """Partial answers, per-model results and a final response are streamed"""
+    response = client.post(
+        "/benchmark/stream",
+        params={"stream_format": "ndjson", "use_cache": False},
+        json={"question": "What is the punishment for cheating?", "expected_keywords": ["cheating"]}
+    )
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+
+    assert {event["event"] for event in events} == {"token", "result", "done"}
+    assert events[-1]["event"] == "done"
+    model_names = [model["model_name"] for model in events[-1]["models"]]
+    assert sorted(e["model_name"] for e in events if e["event"] == "result") == sorted(model_names)
+    streamed = "".join(e["text"] for e in events if e["event"] == "token" and e["model_name"] == model_names[0])
+    assert streamed.strip() == events[-1]["models"][0]["answer"]
+
+class FakeTokenizer:
+    """Decodes ids 1-4 to words; 0 is the end of sequence token"""
+    words = {1: "Section", 2: " 420", 3: " covers", 4: " cheating."}
+
+    def decode(self, ids, skip_special_tokens=True, **kwargs):
+        return "".join(self.words.get(i, "") for i in ids)
+
+def test_local_llm_chunks_count_generated_token_ids():
+    """Chunks carry the token ids they were decoded from, adding up to the generated length"""
+    torch = pytest.importorskip("torch")
+    from services.llm_service import TokenCountingStreamer
+
+    streamer = TokenCountingStreamer(FakeTokenizer(), skip_prompt=True, skip_special_tokens=True)
+    streamer.put(torch.tensor([[7, 8, 9]]))
+    for token in (1, 2, 3, 4, 0):
+        streamer.put(torch.tensor([token]))
+    streamer.end()
+
+    chunks = list(streamer)
+    assert "".join(chunks) == "Section 420 covers cheating."
+    # Pieces still buffered into a word come through as plain empty strings
+    assert sum(getattr(chunk, "tokens", 0) for chunk in chunks) == 5
+
+def test_token_rate_uses_reported_tokens():
+    timer = GenerationTimer().start()
+    timer.chunk(StreamChunk("Section 420", 2))
+    time.sleep(0.01)
+    timer.chunk(StreamChunk(" covers cheating.", 3))
+    timer.chunk(StreamChunk("", 1))
+    fields = timer.finish().as_fields()
+
+    assert fields["output_chunks"] == 2 and fields["output_tokens"] == 6
+    # Tokens after the first chunk over the time after it
+    assert 0 < fields["tokens_per_second"] < 4 / 0.01
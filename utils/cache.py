@@ -1,8 +1,298 @@
-from functools import lru_cache
-from typing import Dict, Tuple
-
-# Simple in-memory cache with LRU (Least Recently Used) strategy
-@lru_cache(maxsize=100)
-def get_cached_response(model_name: str, question: str) -> str:
-    """Cache decorator for model responses"""
-    pass 
\ No newline at end of file
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from utils.metrics import metrics_registry
+
+LOGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
+
+def normalize_question(question: str) -> str:
+    """Normalize a question so trivially different phrasings share a cache entry"""
+    return " ".join(question.split()).casefold()
+
+def make_cache_key(
+    model_name: str,
+    model_config: Dict[str, Any],
+    question: str,
+    generation_params: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build a cache key for a model answer
+
+    Args:
+        model_name: Display name of the model
+        model_config: Model version/configuration (e.g. its metadata)
+        question: The question asked
+        generation_params: Parameters that influence the generated answer
+
+    Returns:
+        Hex digest identifying the answer
+    """
+    payload = json.dumps(
+        [model_name, model_config, normalize_question(question), generation_params or {}],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class SQLiteCacheBackend:
+    """
+    On-disk cache store so answers survive across benchmark runs.
+
+    Expired answers are deleted when the store is opened and then at most
+    every prune_interval seconds on write, and the oldest answers are
+    deleted once the store holds more than max_entries or max_bytes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: Optional[int] = 100000,
+        max_bytes: Optional[int] = 512 * 1024 * 1024,
+        prune_interval: float = 300
+    ):
+        """
+        Open the store
+
+        Args:
+            path: SQLite file
+            max_entries: Maximum number of answers kept (None for no limit)
+            max_bytes: Maximum total size of keys and answers (None for no limit)
+            prune_interval: Seconds between deletions of expired and excess answers
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.prune_interval = prune_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._conn.commit()
+        self._next_prune = 0.0
+        self.prune()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        """Get an answer and its expiry time, or None if it is missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < time.time():
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return value, expires_at
+
+    def set(self, key: str, value: str, expires_at: Optional[float]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._conn.commit()
+            if time.time() >= self._next_prune:
+                self._prune()
+
+    def prune(self) -> int:
+        """
+        Delete expired answers and the oldest answers beyond max_entries and max_bytes
+
+        Returns:
+            Number of answers deleted
+        """
+        with self._lock:
+            return self._prune()
+
+    def _prune(self) -> int:
+        now = time.time()
+        self._next_prune = now + self.prune_interval
+        deleted = self._conn.execute(
+            "DELETE FROM response_cache WHERE expires_at < ?", (now,)
+        ).rowcount
+        limits = {"position": self.max_entries, "total": self.max_bytes}
+        limits = {column: limit for column, limit in limits.items() if limit is not None}
+        if limits:
+            # INSERT OR REPLACE gives a rewritten answer a new rowid, so rowid order is write order
+            deleted += self._conn.execute(
+                "DELETE FROM response_cache WHERE rowid IN ("
+                " SELECT rowid FROM ("
+                "  SELECT rowid, ROW_NUMBER() OVER newest AS position,"
+                "   SUM(LENGTH(CAST(key AS BLOB)) + LENGTH(CAST(value AS BLOB))) OVER newest AS total"
+                "  FROM response_cache WINDOW newest AS (ORDER BY rowid DESC)"
+                f" ) WHERE {' OR '.join(f'{column} > ?' for column in limits)}"
+                ")",
+                tuple(limits.values())
+            ).rowcount
+        self._conn.commit()
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+class ResponseCache:
+    """
+    Thread-safe answer cache with TTL and LRU eviction by entry count and size.
+
+    An optional disk backend acts as a second level: memory misses fall
+    through to disk and disk hits are promoted back into memory.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600,
+        disk_backend: Optional[SQLiteCacheBackend] = None
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of answers kept in memory
+            max_bytes: Maximum total size of answers kept in memory
+            ttl_seconds: Time after which an answer expires (None to never expire)
+            disk_backend: Optional persistent store
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_backend = disk_backend
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float], int]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Build the cache from MODEL_CACHE_* environment variables"""
+        ttl = float(os.environ.get("MODEL_CACHE_TTL_SECONDS", "3600"))
+        disk_path = os.environ.get("MODEL_CACHE_DISK", "")
+        if disk_path.lower() in ("1", "true", "yes"):
+            disk_path = os.path.join(LOGS_DIR, "response_cache.sqlite")
+        disk_max_entries = int(os.environ.get("MODEL_CACHE_DISK_MAX_ENTRIES", "100000"))
+        disk_max_bytes = int(os.environ.get("MODEL_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+        return cls(
+            max_entries=int(os.environ.get("MODEL_CACHE_SIZE", "100")),
+            max_bytes=int(os.environ.get("MODEL_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+            ttl_seconds=ttl if ttl > 0 else None,
+            disk_backend=SQLiteCacheBackend(
+                disk_path,
+                max_entries=disk_max_entries if disk_max_entries > 0 else None,
+                max_bytes=disk_max_bytes if disk_max_bytes > 0 else None
+            ) if disk_path else None
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached answer, or None if it is missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, size = entry
+                if expires_at is None or expires_at >= now:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                self._remove(key)
+
+        if self.disk_backend is not None:
+            found = self.disk_backend.get(key)
+            if found is not None:
+                # The promoted answer keeps the expiry it was stored with
+                value, expires_at = found
+                self._store(key, value, expires_at)
+                with self._lock:
+                    self._hits += 1
+                return value
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        """Store an answer in memory and, if configured, on disk"""
+        expires_at = self._expires_at(time.time())
+        self._store(key, value, expires_at)
+        if self.disk_backend is not None:
+            self.disk_backend.set(key, value, expires_at)
+
+    def clear(self):
+        """Drop every cached answer, including the disk store"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk_backend is not None:
+            self.disk_backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit-rate statistics"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "disk_path": self.disk_backend.path if self.disk_backend is not None else None,
+            }
+
+    def _expires_at(self, now: float) -> Optional[float]:
+        return now + self.ttl_seconds if self.ttl_seconds is not None else None
+
+    def _store(self, key: str, value: str, expires_at: Optional[float]):
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+response_cache = ResponseCache.from_env()
+
+metrics_registry.callback(
+    "response_cache_hits_total", "Model answers served from the response cache",
+    lambda: [({}, response_cache.stats()["hits"])], "counter"
+)
+metrics_registry.callback(
+    "response_cache_misses_total", "Response cache lookups that had to call the model",
+    lambda: [({}, response_cache.stats()["misses"])], "counter"
+)
+metrics_registry.callback(
+    "response_cache_entries", "Answers held in the in-memory response cache",
+    lambda: [({}, response_cache.stats()["entries"])]
+)
@@ -0,0 +1,223 @@
+"""
+Persistent, content-addressed store of normalized sentence embeddings.
+
+Each text is embedded once per embedding model: vectors are appended to a
+raw float32 file that is memory-mapped for reads, and an index file maps
+the SHA-256 of each text to its row. Reference answers and repeated
+answers are therefore encoded once across benchmark runs, and several
+worker processes can share the same pages.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.cache import LOGS_DIR
+from utils.metrics import metrics_registry
+from utils.startup import lazy_import
+
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_STORE_DIR = os.environ.get("EMBEDDING_STORE_DIR", os.path.join(LOGS_DIR, "embeddings"))
+
+def load_sentence_encoder(model_name: str) -> Callable[[List[str]], np.ndarray]:
+    """
+    Load a sentence-transformers model as an encode function
+
+    Raises:
+        ImportError: If sentence-transformers is not installed
+    """
+    model = lazy_import("sentence_transformers").SentenceTransformer(model_name)
+    return lambda texts: model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length, so dot products are cosine similarities"""
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+def content_hash(text: str) -> str:
+    """Key of a text in the store"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingStore:
+    """
+    On-disk embedding cache for one embedding model.
+
+    Files in the model's directory:
+        vectors.f32: Rows of float32 unit vectors, appended in one write per batch
+        index.tsv: "<sha256>\\t<row>" lines, appended after the rows they point to
+        meta.json: Model name and embedding dimension
+
+    Rows are located from the file size after an O_APPEND write, so
+    processes appending at the same time never overwrite each other; each
+    process picks up the others' index lines before encoding a miss.
+    """
+
+    def __init__(
+        self,
+        directory: str = EMBEDDING_STORE_DIR,
+        model_name: str = EMBEDDING_MODEL,
+        encoder: Optional[Callable[[List[str]], np.ndarray]] = None
+    ):
+        """
+        Initialize the store
+
+        Args:
+            directory: Root directory; each model gets its own subdirectory
+            model_name: sentence-transformers model name
+            encoder: Maps a list of texts to a 2-D array of embeddings;
+                by default the model is loaded on the first miss
+        """
+        self.model_name = model_name
+        self.path = os.path.join(directory, re.sub(r"[^\w.-]+", "_", model_name))
+        os.makedirs(self.path, exist_ok=True)
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+        self._index_path = os.path.join(self.path, "index.tsv")
+        self._meta_path = os.path.join(self.path, "meta.json")
+        self._encoder = encoder
+        self._encoder_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._index_offset = 0
+        self._vectors: Optional[np.ndarray] = None
+        self.dim: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.encode_calls = 0
+
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+        self._refresh()
+
+    def _refresh(self):
+        # Read index lines appended since the last refresh, by this or another process
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A line still being written; read it next time
+                    break
+                key, row = line.decode("utf-8").rstrip("\n").split("\t")
+                self._rows[key] = int(row)
+                self._index_offset += len(line)
+        self._map()
+
+    def _map(self):
+        if self.dim is None or not os.path.exists(self._vectors_path):
+            return
+        rows = os.path.getsize(self._vectors_path) // (self.dim * 4)
+        if rows and (self._vectors is None or len(self._vectors) != rows):
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        if self._encoder is None:
+            if self._encoder_error is not None:
+                raise RuntimeError(self._encoder_error)
+            try:
+                self._encoder = load_sentence_encoder(self.model_name)
+            except Exception as e:
+                # Do not retry a failed model load on every call
+                self._encoder_error = f"Could not load embedding model {self.model_name}: {str(e)}"
+                raise RuntimeError(self._encoder_error) from e
+        self.encode_calls += 1
+        return normalize_rows(np.asarray(self._encoder(texts), dtype=np.float32))
+
+    def _append(self, keys: List[str], embeddings: np.ndarray):
+        if self.dim is None:
+            self.dim = int(embeddings.shape[1])
+            with open(self._meta_path, "w", encoding="utf-8") as f:
+                json.dump({"model_name": self.model_name, "dim": self.dim}, f)
+        data = np.ascontiguousarray(embeddings, dtype=np.float32).tobytes()
+        fd = os.open(self._vectors_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            os.write(fd, data)
+            first_row = (os.lseek(fd, 0, os.SEEK_CUR) - len(data)) // (self.dim * 4)
+        finally:
+            os.close(fd)
+        with open(self._index_path, "ab") as f:
+            f.write("".join(f"{key}\t{first_row + i}\n" for i, key in enumerate(keys)).encode("utf-8"))
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Get unit-length embeddings, encoding only texts not already stored
+
+        All missing texts are encoded in a single batch.
+
+        Args:
+            texts: Texts to embed; duplicates are encoded once
+
+        Returns:
+            Array of shape (len(texts), dim), in the order of texts
+
+        Raises:
+            RuntimeError: If there are missing texts and the embedding model cannot be loaded
+        """
+        keys = [content_hash(text) for text in texts]
+        with self._lock:
+            if any(key not in self._rows for key in keys):
+                self._refresh()
+            missing = list(dict.fromkeys(key for key in keys if key not in self._rows))
+            self.misses += len(missing)
+            self.hits += len(keys) - len(missing)
+            if missing:
+                text_by_key = dict(zip(keys, texts))
+                self._append(missing, self._encode([text_by_key[key] for key in missing]))
+                self._refresh()
+            if not keys:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            return np.asarray(self._vectors[[self._rows[key] for key in keys]])
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store size and hit counters
+
+        Returns:
+            Dictionary of counters and store settings
+        """
+        with self._lock:
+            return {
+                "model_name": self.model_name,
+                "path": self.path,
+                "dim": self.dim,
+                "stored": len(self._rows),
+                "hits": self.hits,
+                "misses": self.misses,
+                "encode_calls": self.encode_calls,
+                "encoder_error": self._encoder_error,
+            }
+
+_embedding_store: Optional[EmbeddingStore] = None
+_embedding_store_lock = threading.Lock()
+
+def get_embedding_store() -> EmbeddingStore:
+    """Get the process-wide store for EMBEDDING_MODEL; the model itself loads on the first miss"""
+    global _embedding_store
+    with _embedding_store_lock:
+        if _embedding_store is None:
+            _embedding_store = EmbeddingStore()
+        return _embedding_store
+
+def set_embedding_store(store: Optional[EmbeddingStore]):
+    """Replace the process-wide store, e.g. with one using a different encoder"""
+    global _embedding_store
+    with _embedding_store_lock:
+        _embedding_store = store
+
+def _embedding_counters() -> List[Tuple[Dict[str, Any], float]]:
+    # Report on the store without creating it
+    store = _embedding_store
+    if store is None:
+        return []
+    stats = store.stats()
+    return [({"result": "hit"}, stats["hits"]), ({"result": "miss"}, stats["misses"])]
+
+metrics_registry.callback(
+    "embedding_store_lookups_total", "Texts looked up in the embedding store, by whether they were already embedded",
+    _embedding_counters, "counter"
+)
@@ -0,0 +1,146 @@
+"""
+Multi-pattern keyword matching with one compiled regular expression.
+
+A matcher is compiled once per keyword set and matching mode into a single
+alternation of every keyword (and, in synonym mode, every alternative), so
+the answer is scanned by the regex engine in C instead of once per keyword.
+"""
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from utils.startup import lazy_import
+
+MATCH_MODES = ("substring", "word", "stem", "synonym")
+DEFAULT_MATCH_MODE = os.environ.get("KEYWORD_MATCH_MODE", "word")
+
+# Alternative phrasings accepted for common rubric keywords in "synonym" mode
+LEGAL_SYNONYMS: Dict[str, List[str]] = {
+    "cheating": ["cheat", "deceive", "deception"],
+    "fraud": ["fraudulent", "deceit", "swindle"],
+    "dishonesty": ["dishonest", "dishonestly"],
+    "imprisonment": ["jail", "prison", "incarceration"],
+    "fine": ["penalty", "monetary penalty"],
+    "murder": ["homicide", "killing"],
+    "theft": ["stealing", "larceny"],
+    "tenant": ["lessee", "renter"],
+    "landlord": ["lessor", "owner"],
+    "eviction": ["evict", "dispossession"],
+    "complaint": ["fir", "first information report"],
+    "bail": ["release on bond"],
+}
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+@lru_cache(maxsize=1)
+def _get_stemmer():
+    return lazy_import("nltk.stem.porter").PorterStemmer()
+
+@lru_cache(maxsize=65536)
+def _stem_word(word: str) -> str:
+    # Answers share most of their vocabulary, so each word is stemmed once
+    return _get_stemmer().stem(word)
+
+def _stem_text(text: str) -> str:
+    return " ".join(_stem_word(word) for word in _WORD_PATTERN.findall(text.lower()))
+
+def _variant_pattern(variant: str, word_boundaries: bool) -> str:
+    pattern = re.escape(variant)
+    if not word_boundaries:
+        return pattern
+    # Boundaries only matter next to word characters of the keyword itself
+    if re.match(r"\w", variant):
+        pattern = r"\b" + pattern
+    if re.match(r"\w", variant[-1]):
+        pattern += r"\b"
+    return pattern
+
+class KeywordMatcher:
+    """
+    Compiled matcher for one set of expected keywords.
+
+    Modes:
+        substring: keyword appears anywhere, even inside another word
+        word: keyword appears on word boundaries ("fee" does not match "feel")
+        stem: words are compared by their Porter stem ("cheated" matches "cheating")
+        synonym: stem matching that also accepts LEGAL_SYNONYMS alternatives
+    """
+
+    def __init__(self, keywords: Sequence[str], mode: str = DEFAULT_MATCH_MODE, synonyms: Optional[Dict[str, List[str]]] = None):
+        """
+        Compile the matcher
+
+        Args:
+            keywords: Expected keywords, reported back in their original form
+            mode: One of MATCH_MODES
+            synonyms: Alternatives per keyword used in "synonym" mode
+        """
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unsupported keyword match mode: {mode}")
+        self.keywords = list(keywords)
+        self.mode = mode
+
+        # Normalized variant -> indexes of the keywords it stands for
+        self._variant_keywords: Dict[str, Set[int]] = {}
+        for index, keyword in enumerate(self.keywords):
+            alternatives = [keyword]
+            if mode == "synonym":
+                alternatives += (synonyms if synonyms is not None else LEGAL_SYNONYMS).get(keyword.lower(), [])
+            for alternative in alternatives:
+                variant = self._normalize(alternative)
+                if variant:
+                    self._variant_keywords.setdefault(variant, set()).add(index)
+
+        word_boundaries = mode != "substring"
+        # Longest first, so a keyword wins over a shorter one it starts with
+        variants = sorted(self._variant_keywords, key=len, reverse=True)
+        self._pattern = re.compile("|".join(_variant_pattern(variant, word_boundaries) for variant in variants)) if variants else None
+        # Matches do not overlap, so a variant inside a longer one ("420" in
+        # "section 420") is also looked for on its own when it was not seen
+        self._nested = [
+            (re.compile(_variant_pattern(variant, word_boundaries)), self._variant_keywords[variant])
+            for variant in variants
+            if any(variant != other and variant in other for other in variants)
+        ]
+
+    def _normalize(self, text: str) -> str:
+        if self.mode in ("stem", "synonym"):
+            return _stem_text(text)
+        return text.lower()
+
+    def find(self, text: str) -> List[str]:
+        """
+        Find which keywords occur in the text
+
+        Returns:
+            Keywords found, in the order they were given
+        """
+        if self._pattern is None:
+            return []
+        normalized = self._normalize(text)
+        found: Set[int] = set()
+
+        for match in self._pattern.finditer(normalized):
+            found.update(self._variant_keywords[match.group()])
+            if len(found) == len(self.keywords):
+                break
+        for pattern, keyword_indexes in self._nested:
+            if not keyword_indexes <= found and pattern.search(normalized):
+                found.update(keyword_indexes)
+
+        return [keyword for index, keyword in enumerate(self.keywords) if index in found]
+
+@lru_cache(maxsize=256)
+def get_keyword_matcher(keywords: Tuple[str, ...], mode: str = DEFAULT_MATCH_MODE) -> KeywordMatcher:
+    """
+    Get the compiled matcher for a keyword set, compiling it only once
+
+    Args:
+        keywords: Expected keywords as a tuple (so it can be cached)
+        mode: One of MATCH_MODES
+
+    Returns:
+        The shared compiled matcher
+    """
+    return KeywordMatcher(keywords, mode)
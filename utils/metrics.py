@@ -0,0 +1,344 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Histograms, counters and gauges are labeled families registered with a
+MetricsRegistry; callback gauges read values such as cache counters or
+queue depths only when the registry is rendered.
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed bucket upper bounds.
+
+    Bucket counts are cumulative, matching the Prometheus convention.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Initialize the histogram
+
+        Args:
+            buckets: Sorted bucket upper bounds; +Inf is added automatically
+        """
+        self._bounds = sorted(buckets)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Record a single observation"""
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the current bucket counts
+
+        Returns:
+            Dictionary with cumulative bucket counts, count, sum and mean
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        buckets = []
+        cumulative = 0
+        for bound, bucket_count in zip(self._bounds + [float("inf")], counts):
+            cumulative += bucket_count
+            buckets.append({"le": bound if bound != float("inf") else "+Inf", "count": cumulative})
+
+        return {
+            "buckets": buckets,
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0,
+        }
+
+# Latency buckets in seconds, from sub-millisecond scoring stages to slow model calls
+LATENCY_BUCKETS_SECONDS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+def _escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels.items()) + "}"
+
+class Value:
+    """Thread-safe number for one counter or gauge series"""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def get(self) -> float:
+        with self._lock:
+            return self._value
+
+class MetricFamily:
+    """
+    A named metric with one series per combination of label values.
+
+    Series are created on first use of labels() and live for the lifetime
+    of the process.
+    """
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = ()):
+        """
+        Initialize the family
+
+        Args:
+            name: Metric name
+            description: HELP text
+            label_names: Names of the labels every series has
+        """
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *label_values: Any) -> Any:
+        """Get the series for the given label values, in label_names order"""
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {list(self.label_names)}")
+        key = tuple(str(value) for value in label_values)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def series(self) -> List[Tuple[Dict[str, str], Any]]:
+        with self._lock:
+            items = sorted(self._series.items())
+        return [(dict(zip(self.label_names, key)), series) for key, series in items]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.metric_type}"]
+        for labels, series in self.series():
+            lines.extend(self._render_series(labels, series))
+        return lines
+
+    def _render_series(self, labels: Dict[str, str], series: Any) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(series.get())}"]
+
+class Counter(MetricFamily):
+    """Monotonically increasing count; series are Values"""
+
+    metric_type = "counter"
+
+    def _new_series(self) -> Value:
+        return Value()
+
+class Gauge(MetricFamily):
+    """Value that can go up and down; series are Values"""
+
+    metric_type = "gauge"
+
+    def _new_series(self) -> Value:
+        return Value()
+
+class HistogramFamily(MetricFamily):
+    """Distribution of observations; series are Histograms with shared buckets"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS_SECONDS):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(buckets)
+
+    def _new_series(self) -> Histogram:
+        return Histogram(self.buckets)
+
+    def _render_series(self, labels: Dict[str, str], series: Histogram) -> List[str]:
+        snapshot = series.snapshot()
+        lines = [
+            f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(float(bucket['le']))})} {bucket['count']}"
+            for bucket in snapshot["buckets"]
+        ]
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(snapshot['sum'])}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {snapshot['count']}")
+        return lines
+
+class CallbackMetric(MetricFamily):
+    """
+    Gauge or counter whose values are read from a callback at render time
+
+    The callback returns (labels, value) pairs, so values kept by other
+    components (cache counters, queue sizes) need no duplicate bookkeeping.
+    """
+
+    def __init__(self, name: str, description: str,
+                 collect: Callable[[], Iterable[Tuple[Dict[str, Any], float]]], metric_type: str = "gauge"):
+        super().__init__(name, description)
+        self.metric_type = metric_type
+        self._collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.metric_type}"]
+        try:
+            samples = list(self._collect())
+        except Exception as e:
+            # One broken collector must not take the whole endpoint down
+            print(f"Error collecting metric {self.name}: {str(e)}")
+            samples = []
+        for labels, value in samples:
+            if value is not None:
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+class MetricsRegistry:
+    """Named metric families rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, family: MetricFamily) -> Any:
+        with self._lock:
+            existing = self._families.get(family.name)
+            if existing is not None:
+                # Re-importing a module must not create a second family with the same name
+                return existing
+            self._families[family.name] = family
+            return family
+
+    def counter(self, name: str, description: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, description, label_names))
+
+    def gauge(self, name: str, description: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, description, label_names))
+
+    def histogram(self, name: str, description: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS_SECONDS) -> HistogramFamily:
+        return self._register(HistogramFamily(name, description, label_names, buckets))
+
+    def callback(self, name: str, description: str,
+                 collect: Callable[[], Iterable[Tuple[Dict[str, Any], float]]],
+                 metric_type: str = "gauge") -> CallbackMetric:
+        """Register a metric whose values come from collect at render time"""
+        return self._register(CallbackMetric(name, description, collect, metric_type))
+
+    def get(self, name: str) -> Optional[MetricFamily]:
+        with self._lock:
+            return self._families.get(name)
+
+    def render(self) -> str:
+        """Render every family in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            families = list(self._families.values())
+        lines: List[str] = []
+        for family in families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+metrics_registry = MetricsRegistry()
+
+HTTP_REQUESTS_IN_FLIGHT = metrics_registry.gauge(
+    "http_requests_in_flight", "HTTP requests being handled, including open streams"
+)
+HTTP_REQUEST_DURATION = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving an HTTP request until its response body is sent, by endpoint function",
+    ["method", "endpoint", "status"]
+)
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording in-flight requests and request durations
+
+    Durations run until the last body chunk is sent, so streamed responses
+    and response serialization are included. Requests are labeled with the
+    endpoint function rather than the path, so path parameters do not
+    create a series per job or model.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels()
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            endpoint = scope.get("endpoint")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], getattr(endpoint, "__name__", "unmatched"), status["code"]
+            ).observe(time.perf_counter() - start)
+
+def process_rss_bytes() -> Optional[int]:
+    """
+    Get the resident set size of this process
+
+    Reads /proc on Linux; elsewhere falls back to the peak RSS reported by
+    getrusage, which is an upper bound.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (ImportError, OSError, ValueError):
+        # No resource module on Windows
+        return None
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+metrics_registry.callback(
+    "process_resident_memory_bytes", "Resident memory size of the process",
+    lambda: [({}, process_rss_bytes())]
+)
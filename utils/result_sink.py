@@ -0,0 +1,473 @@
+"""
+Buffered result sink for benchmark results.
+
+Request handlers hand results to a bounded queue and return immediately; a
+background writer thread batches them into CSV, JSONL or Parquet files.
+Numeric metrics are stored as numbers (and as typed columns in Parquet) so
+analysis does not have to re-parse formatted strings. The same batches can
+also be recorded in the queryable results store (utils.results_store).
+"""
+import csv
+import glob
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import ModelEvaluation
+from utils.results_store import get_results_store
+
+LOGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
+
+SOCIAL_IMPACT_COLUMNS = [
+    "language_simplicity",
+    "actionable_guidance",
+    "cultural_relevance",
+    "accessibility",
+    "overall_social_impact",
+]
+
+# Column name -> type, in file order
+RESULT_SCHEMA = {
+    "timestamp": str,
+    "question": str,
+    "expected_keywords": str,
+    "model_name": str,
+    "answer": str,
+    "keyword_coverage": float,
+    "keywords_found": str,
+    "length_category": str,
+    "response_time_ms": int,
+    "confidence_score": float,
+    "cache_hit": bool,
+    "timed_out": bool,
+    "ttft_ms": float,
+    "output_tokens": float,
+    "tokens_per_second": float,
+    "semantic_similarity": float,
+    "metadata": str,
+    "scoring_profile_version": str,
+    **{column: float for column in SOCIAL_IMPACT_COLUMNS},
+}
+
+def _float_or_nan(value: Optional[float]) -> float:
+    return float("nan") if value is None else float(value)
+
+def evaluation_to_row(
+    timestamp: str,
+    question: str,
+    expected_keywords: Optional[List[str]],
+    evaluation: ModelEvaluation
+) -> Dict[str, Any]:
+    """
+    Flatten a model evaluation into a typed result row
+
+    Args:
+        timestamp: ISO timestamp of the benchmark
+        question: The benchmarked question
+        expected_keywords: Optional list of expected keywords
+        evaluation: The model evaluation
+
+    Returns:
+        Row matching RESULT_SCHEMA
+    """
+    social_impact = evaluation.social_impact_metrics or {}
+    row = {
+        "timestamp": timestamp,
+        "question": question,
+        "expected_keywords": ",".join(expected_keywords) if expected_keywords else "",
+        "model_name": evaluation.model_name,
+        "answer": evaluation.answer,
+        "keyword_coverage": float(evaluation.keyword_coverage),
+        "keywords_found": ",".join(evaluation.keywords_found),
+        "length_category": evaluation.length_category,
+        "response_time_ms": int(evaluation.response_time_ms),
+        "confidence_score": float(evaluation.confidence_score),
+        "cache_hit": evaluation.cache_hit,
+        "timed_out": evaluation.timed_out,
+        "ttft_ms": _float_or_nan(evaluation.ttft_ms),
+        "output_tokens": _float_or_nan(evaluation.output_tokens),
+        "tokens_per_second": _float_or_nan(evaluation.tokens_per_second),
+        "semantic_similarity": _float_or_nan(evaluation.semantic_similarity),
+        "metadata": json.dumps(evaluation.metadata, default=str),
+        "scoring_profile_version": evaluation.scoring_profile_version or "",
+    }
+    for column in SOCIAL_IMPACT_COLUMNS:
+        row[column] = float(social_impact.get(column, float("nan")))
+    return row
+
+class ResultBackend:
+    """
+    Base class for result file formats with size- and date-based rotation.
+
+    Files are named <prefix>-<YYYYMMDD>-<sequence>.<extension>; a new file is
+    started when the date changes or the current file exceeds max_bytes.
+    """
+
+    extension = ""
+    appendable = True
+
+    def __init__(self, directory: str = LOGS_DIR, prefix: str = "benchmark_results", max_bytes: int = 100 * 1024 * 1024):
+        """
+        Initialize the backend
+
+        Args:
+            directory: Directory the result files are written to
+            prefix: File name prefix
+            max_bytes: Size after which a new file is started
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.path: Optional[str] = None
+        self._date: Optional[str] = None
+        self._sequence = 0
+
+    def write_rows(self, rows: List[Dict[str, Any]]):
+        """Write rows to the current file, rotating first if needed"""
+        date = datetime.now().strftime("%Y%m%d")
+        if self.path is None or date != self._date:
+            self._rotate(date, resume=True)
+        elif self._size() >= self.max_bytes:
+            self._rotate(date, resume=False)
+        self._write(rows)
+
+    def close(self):
+        """Flush and close the current file"""
+        if self.path is not None:
+            self._close()
+
+    def _rotate(self, date: str, resume: bool):
+        if self.path is not None:
+            self._close()
+        if date != self._date:
+            self._date = date
+            existing = sorted(glob.glob(os.path.join(self.directory, f"{self.prefix}-{date}-*.{self.extension}")))
+            self._sequence = int(existing[-1].rsplit("-", 1)[1].split(".")[0]) if existing else 0
+            # Keep appending to today's last file after a restart if the format allows it
+            # and the file was written with the current columns
+            if not (existing and resume and self.appendable and self._can_append(existing[-1])):
+                self._sequence += 1
+        else:
+            self._sequence += 1
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{self.prefix}-{date}-{self._sequence:03d}.{self.extension}")
+        self._open(self.path)
+
+    def _can_append(self, path: str) -> bool:
+        return True
+
+    def _open(self, path: str):
+        raise NotImplementedError
+
+    def _write(self, rows: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def _size(self) -> int:
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+class CSVResultBackend(ResultBackend):
+    """Buffered CSV files with numeric metric columns"""
+
+    extension = "csv"
+
+    def _can_append(self, path: str) -> bool:
+        with open(path, newline="", encoding="utf-8") as file:
+            header = next(csv.reader(file), None)
+        # An empty file gets the header on open
+        return header is None or header == list(RESULT_SCHEMA)
+
+    def _open(self, path: str):
+        self._file = open(path, mode="a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=list(RESULT_SCHEMA))
+        if self._file.tell() == 0:
+            self._writer.writeheader()
+
+    def _write(self, rows: List[Dict[str, Any]]):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def _size(self) -> int:
+        return self._file.tell()
+
+    def _close(self):
+        self._file.close()
+
+class JSONLResultBackend(ResultBackend):
+    """Buffered newline-delimited JSON files"""
+
+    extension = "jsonl"
+
+    def _open(self, path: str):
+        self._file = open(path, mode="a", encoding="utf-8")
+
+    def _write(self, rows: List[Dict[str, Any]]):
+        # Missing metrics are null rather than NaN, which is not valid JSON
+        self._file.write("".join(
+            json.dumps({name: None if isinstance(value, float) and value != value else value for name, value in row.items()}) + "\n"
+            for row in rows
+        ))
+        self._file.flush()
+
+    def _size(self) -> int:
+        return self._file.tell()
+
+    def _close(self):
+        self._file.close()
+
+class ParquetResultBackend(ResultBackend):
+    """
+    Columnar Parquet files with typed metric columns (requires pyarrow).
+
+    Each batch is written as a row group; a file becomes readable once it
+    is closed by rotation or sink shutdown.
+    """
+
+    extension = "parquet"
+    appendable = False
+
+    def __init__(self, *args, **kwargs):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("The parquet result sink requires pyarrow. Install it with: pip install pyarrow") from e
+        super().__init__(*args, **kwargs)
+        self._pa = pa
+        self._pq = pq
+        arrow_types = {str: pa.string(), float: pa.float64(), int: pa.int64(), bool: pa.bool_()}
+        self._schema = pa.schema([(name, arrow_types[kind]) for name, kind in RESULT_SCHEMA.items()])
+
+    def _open(self, path: str):
+        self._writer = self._pq.ParquetWriter(path, self._schema)
+
+    def _write(self, rows: List[Dict[str, Any]]):
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def _size(self) -> int:
+        return os.path.getsize(self.path)
+
+    def _close(self):
+        self._writer.close()
+
+RESULT_BACKENDS = {
+    "csv": CSVResultBackend,
+    "jsonl": JSONLResultBackend,
+    "parquet": ParquetResultBackend,
+}
+
+class ResultSink:
+    """
+    Non-blocking result logger with a background writer thread.
+
+    submit() never blocks: if the bounded queue is full the results are
+    dropped and counted, so logging cannot stall request handling.
+    """
+
+    def __init__(
+        self,
+        backend: ResultBackend,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        record_history: bool = False
+    ):
+        """
+        Initialize the sink
+
+        Args:
+            backend: File format to write
+            max_queue_size: Maximum number of pending rows
+            batch_size: Maximum rows written per batch
+            flush_interval: Seconds to wait for more rows before writing a partial batch
+            record_history: Also add each batch to the process-wide results store
+        """
+        self.backend = backend
+        self.record_history = record_history
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[Tuple[Dict[str, Any], Optional[Dict[str, str]]]]]" = queue.Queue(maxsize=max_queue_size)
+        self._written = 0
+        self._dropped = 0
+        self._errors = 0
+        self._history_errors = 0
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResultSink":
+        """Build the sink from RESULT_SINK_* environment variables"""
+        backend_name = os.environ.get("RESULT_SINK_FORMAT", "csv")
+        if backend_name not in RESULT_BACKENDS:
+            raise ValueError(f"Unsupported result sink format: {backend_name}")
+        backend = RESULT_BACKENDS[backend_name](
+            directory=os.environ.get("RESULT_SINK_DIR", LOGS_DIR),
+            max_bytes=int(os.environ.get("RESULT_SINK_MAX_BYTES", str(100 * 1024 * 1024)))
+        )
+        return cls(
+            backend,
+            max_queue_size=int(os.environ.get("RESULT_SINK_QUEUE_SIZE", "10000")),
+            record_history=os.environ.get("RESULTS_STORE_ENABLED", "true").lower() in ("true", "1")
+        )
+
+    def submit(self, question: str, evaluations: List[ModelEvaluation], expected_keywords: Optional[List[str]] = None):
+        """
+        Queue benchmark results for writing
+
+        Args:
+            question: The benchmarked question
+            evaluations: List of model evaluation results
+            expected_keywords: Optional list of expected keywords
+        """
+        self._ensure_worker()
+        timestamp = datetime.now().isoformat()
+        for evaluation in evaluations:
+            try:
+                # Scorer versions are not a file column; only the results store keeps them
+                self._queue.put_nowait((
+                    evaluation_to_row(timestamp, question, expected_keywords, evaluation), evaluation.scorer_versions
+                ))
+            except queue.Full:
+                with self._worker_lock:
+                    self._dropped += 1
+
+    def close(self):
+        """Write every queued row and close the current file"""
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+        self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and write counters"""
+        return {
+            "format": self.backend.extension,
+            "path": self.backend.path,
+            "queue_depth": self._queue.qsize(),
+            "written": self._written,
+            "dropped": self._dropped,
+            "errors": self._errors,
+            "record_history": self.record_history,
+            "history_errors": self._history_errors,
+        }
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="result-sink", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            items = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                while item is not None:
+                    items.append(item)
+                    if len(items) >= self.batch_size:
+                        break
+                    item = self._queue.get_nowait()
+                stopping = item is None
+            except queue.Empty:
+                pass
+
+            if items:
+                rows = [row for row, _ in items]
+                try:
+                    self.backend.write_rows(rows)
+                    self._written += len(rows)
+                except Exception as e:
+                    self._errors += len(rows)
+                    print(f"Error writing benchmark results: {str(e)}")
+                if self.record_history:
+                    try:
+                        get_results_store().add_rows(rows, [versions for _, versions in items])
+                    except Exception as e:
+                        self._history_errors += len(rows)
+                        print(f"Error recording benchmark results in the results store: {str(e)}")
+
+def _parse_bool(value: str) -> bool:
+    return value in ("True", "true", "1")
+
+def _missing_column(column: str, count: int) -> np.ndarray:
+    if RESULT_SCHEMA[column] is float:
+        return np.full(count, np.nan)
+    return np.full(count, None, dtype=object)
+
+def load_results(path: str, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Load result files into typed NumPy columns
+
+    Parquet files are read column-wise without parsing strings; CSV and
+    JSONL files are converted using RESULT_SCHEMA. Columns a file predates
+    are filled with NaN, or None for non-numeric columns.
+
+    Args:
+        path: A result file, or a directory of result files
+        columns: Optional subset of columns to load
+
+    Returns:
+        Mapping of column name to array (object arrays for text columns)
+    """
+    if os.path.isdir(path):
+        files = sorted(
+            f for f in glob.glob(os.path.join(path, "*"))
+            if f.rsplit(".", 1)[-1] in RESULT_BACKENDS
+        )
+    else:
+        files = [path]
+    columns = columns or list(RESULT_SCHEMA)
+    numpy_types = {str: object, float: np.float64, int: np.int64, bool: np.bool_}
+
+    values: Dict[str, List[Any]] = {column: [] for column in columns}
+    for file_path in files:
+        if file_path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            present = set(pq.read_schema(file_path).names)
+            table = pq.read_table(file_path, columns=[column for column in columns if column in present])
+            for column in columns:
+                values[column].append(
+                    table.column(column).to_numpy(zero_copy_only=False) if column in present
+                    else _missing_column(column, table.num_rows)
+                )
+            continue
+
+        if file_path.endswith(".csv"):
+            with open(file_path, newline="", encoding="utf-8") as file:
+                reader = csv.DictReader(file)
+                rows = list(reader)
+                present = set(reader.fieldnames or ())
+            converters = {float: float, int: int, bool: _parse_bool, str: str}
+            for column in columns:
+                if column not in present:
+                    values[column].append(_missing_column(column, len(rows)))
+                    continue
+                convert = converters[RESULT_SCHEMA[column]]
+                values[column].append(np.array([convert(row[column]) for row in rows], dtype=numpy_types[RESULT_SCHEMA[column]]))
+            continue
+
+        with open(file_path, encoding="utf-8") as file:
+            rows = [json.loads(line) for line in file if line.strip()]
+        for column in columns:
+            if not any(column in row for row in rows):
+                values[column].append(_missing_column(column, len(rows)))
+                continue
+            values[column].append(np.array([row.get(column) for row in rows], dtype=numpy_types[RESULT_SCHEMA[column]]))
+
+    return {
+        column: np.concatenate(arrays) if arrays else np.array([], dtype=numpy_types[RESULT_SCHEMA[column]])
+        for column, arrays in values.items()
+    }
+
+result_sink = ResultSink.from_env()
@@ -0,0 +1,868 @@
+"""
+Historical results store with incrementally maintained aggregates.
+
+Saved benchmark results are written to SQLite next to the result files.
+Every evaluation is kept, indexed by model, question hash, timestamp and
+scoring profile version, and each batch also updates per-model,
+per-model-per-day, per-model-per-hour and per-question sums in the same
+transaction, plus per-model-per-day latency and keyword-coverage bucket
+counts. The
+leaderboard, trend, per-question and chart aggregate queries read those
+sums, so they cost the same whether the store holds a thousand
+evaluations or millions.
+
+Answers are stored once per content hash and each evaluation records the
+scorer versions it was scored with, so rescore.py can recompute stale
+metrics from stored answers; new scores are kept per scorer version in
+evaluation_scores, next to the original ones.
+"""
+import json
+import bisect
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.cache import LOGS_DIR
+from utils.metrics import LATENCY_BUCKETS_SECONDS
+
+RESULTS_STORE_PATH = os.environ.get("RESULTS_STORE_PATH", os.path.join(LOGS_DIR, "results.sqlite"))
+
+# Metric -> whether higher is better, for ranking the leaderboard
+LEADERBOARD_METRICS = {
+    "keyword_coverage": True,
+    "confidence_score": True,
+    "social_impact": True,
+    "semantic_similarity": True,
+    "response_time_ms": False,
+    "timeout_rate": False,
+}
+
+# Period expression per trend bucket, computed from the stored day
+TREND_BUCKETS = {
+    "day": "day",
+    "week": "date(day, 'weekday 1', '-7 days')",
+    "month": "substr(day, 1, 7)",
+}
+
+# Upper bounds of the latency buckets counted per model and day; the last bucket is unbounded
+LATENCY_BUCKETS_MS = tuple(bound * 1000 for bound in LATENCY_BUCKETS_SECONDS)
+# Keyword coverage is counted in ten 10-point buckets
+COVERAGE_BUCKET_WIDTH = 10
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+# Social impact dimensions averaged for the radar chart
+RADAR_METRICS = ("language_simplicity", "actionable_guidance", "cultural_relevance", "accessibility")
+
+# Sums kept per aggregate row; means are derived when reading
+_SUM_COLUMNS = (
+    "evaluations", "timeouts", "cache_hits",
+    "keyword_coverage_sum", "confidence_score_sum",
+    "social_impact_sum", "social_impact_count",
+    "semantic_similarity_sum", "semantic_similarity_count",
+    "response_time_ms_sum", "response_time_count",
+) + tuple(f"{metric}_sum" for metric in RADAR_METRICS)
+
+_AGGREGATE_TABLES = {
+    "model_totals": ("model_name", "scoring_profile_version"),
+    "model_daily": ("model_name", "scoring_profile_version", "day"),
+    # hour is the epoch second the hour starts at, for the chart time series
+    "model_hourly": ("model_name", "scoring_profile_version", "hour"),
+    "question_models": ("question_hash", "model_name", "scoring_profile_version"),
+}
+
+_SOCIAL_IMPACT_COLUMNS = (
+    "language_simplicity", "actionable_guidance", "cultural_relevance", "accessibility", "overall_social_impact"
+)
+
+_EVALUATION_COLUMNS = (
+    "question_hash", "model_name", "scoring_profile_version", "timestamp", "day", "answer_hash",
+    "keyword_coverage", "keywords_found", "expected_keywords", "length_category", "response_time_ms",
+    "confidence_score", "cache_hit", "timed_out", "semantic_similarity", "metadata",
+) + _SOCIAL_IMPACT_COLUMNS
+
+def question_hash(question: str) -> str:
+    """Key of a question in the store; whitespace differences do not make a new question"""
+    return hashlib.sha256(" ".join(question.split()).encode("utf-8")).hexdigest()
+
+def _number(value: Any) -> Optional[float]:
+    # Result rows use NaN for missing metrics
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+def _increments(values: Dict[str, Any]) -> Dict[str, float]:
+    """Amounts one evaluation adds to each aggregate sum"""
+    social_impact = values["overall_social_impact"]
+    semantic = values["semantic_similarity"]
+    # Cache hits and timeouts say nothing about how fast a model answers
+    timed = not values["cache_hit"] and not values["timed_out"]
+    increments = {
+        "evaluations": 1,
+        "timeouts": values["timed_out"],
+        "cache_hits": values["cache_hit"],
+        "keyword_coverage_sum": values["keyword_coverage"] or 0.0,
+        "confidence_score_sum": values["confidence_score"] or 0.0,
+        "social_impact_sum": social_impact or 0.0,
+        "social_impact_count": social_impact is not None,
+        "semantic_similarity_sum": semantic or 0.0,
+        "semantic_similarity_count": semantic is not None,
+        "response_time_ms_sum": values["response_time_ms"] if timed else 0,
+        "response_time_count": timed,
+    }
+    for metric in RADAR_METRICS:
+        increments[f"{metric}_sum"] = (values[metric] or 0.0) if social_impact is not None else 0.0
+    return increments
+
+def _buckets(values: Dict[str, Any]) -> List[Tuple[str, int]]:
+    """Distribution buckets one evaluation is counted in, as (metric, bucket index)"""
+    buckets = []
+    if not values["cache_hit"] and not values["timed_out"]:
+        buckets.append(("response_time_ms", bisect.bisect_left(LATENCY_BUCKETS_MS, values["response_time_ms"])))
+    if values["keyword_coverage"] is not None:
+        buckets.append(("keyword_coverage", min(int(values["keyword_coverage"] // COVERAGE_BUCKET_WIDTH), 100 // COVERAGE_BUCKET_WIDTH - 1)))
+    return buckets
+
+def _percentile(counts: Sequence[int], bounds: Sequence[float], percentile: float) -> Optional[float]:
+    """
+    Estimate a percentile from bucket counts, interpolating linearly within
+    the bucket it falls in (as Prometheus' histogram_quantile does)
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    rank = percentile / 100 * total
+    cumulative = 0
+    for index, count in enumerate(counts):
+        if count and cumulative + count >= rank:
+            if index >= len(bounds):
+                # Unbounded last bucket: report its lower bound
+                return bounds[-1]
+            lower = bounds[index - 1] if index else 0.0
+            return lower + (bounds[index] - lower) * (rank - cumulative) / count
+        cumulative += count
+    return bounds[-1]
+
+def _where(conditions: Sequence[Tuple[str, str, Any]]) -> Tuple[str, List[Any]]:
+    """Build a WHERE clause from (column, operator, value) conditions, skipping those without a value"""
+    clauses: List[str] = []
+    params: List[Any] = []
+    for column, operator, value in conditions:
+        if value is None:
+            continue
+        if operator == "IN":
+            clauses.append(f"{column} IN ({', '.join('?' for _ in value)})")
+            params.extend(value)
+        else:
+            clauses.append(f"{column} {operator} ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+def _day_start(day: str) -> float:
+    return datetime.strptime(day, "%Y-%m-%d").timestamp()
+
+def _summarize(sums: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a row of aggregate sums into means and rates"""
+    def mean(total: str, count: Any) -> Optional[float]:
+        return sums[total] / count if count else None
+
+    evaluations = int(sums["evaluations"])
+    return {
+        "evaluations": evaluations,
+        "mean_keyword_coverage": mean("keyword_coverage_sum", evaluations),
+        "mean_confidence_score": mean("confidence_score_sum", evaluations),
+        "mean_social_impact": mean("social_impact_sum", sums["social_impact_count"]),
+        "mean_semantic_similarity": mean("semantic_similarity_sum", sums["semantic_similarity_count"]),
+        "mean_response_time_ms": mean("response_time_ms_sum", sums["response_time_count"]),
+        "timeout_rate": sums["timeouts"] / evaluations if evaluations else None,
+        "cache_hit_rate": sums["cache_hits"] / evaluations if evaluations else None,
+        "first_at": sums["first_at"],
+        "last_at": sums["last_at"],
+    }
+
+_SUMMARY_METRIC = {
+    "keyword_coverage": "mean_keyword_coverage",
+    "confidence_score": "mean_confidence_score",
+    "social_impact": "mean_social_impact",
+    "semantic_similarity": "mean_semantic_similarity",
+    "response_time_ms": "mean_response_time_ms",
+    "timeout_rate": "timeout_rate",
+}
+
+class ResultsStore:
+    """SQLite store of every saved evaluation plus the aggregates queries read"""
+
+    def __init__(self, path: str = RESULTS_STORE_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._path = path
+        self._lock = threading.Lock()
+        self._aggregate_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # Readers in other processes (e.g. a second API worker) do not block the writer
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "question_hash TEXT PRIMARY KEY, question TEXT NOT NULL, "
+            "evaluations INTEGER NOT NULL, first_at REAL NOT NULL, last_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS questions_recent ON questions (last_at)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS answers (answer_hash TEXT PRIMARY KEY, answer TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS evaluations ("
+            "id INTEGER PRIMARY KEY, question_hash TEXT NOT NULL, model_name TEXT NOT NULL, "
+            "scoring_profile_version TEXT NOT NULL, timestamp REAL NOT NULL, day TEXT NOT NULL, "
+            "answer_hash TEXT NOT NULL, keyword_coverage REAL, keywords_found TEXT, expected_keywords TEXT, "
+            "length_category TEXT, response_time_ms INTEGER, confidence_score REAL, "
+            "cache_hit INTEGER NOT NULL, timed_out INTEGER NOT NULL, semantic_similarity REAL, metadata TEXT, "
+            + ", ".join(f"{column} REAL" for column in _SOCIAL_IMPACT_COLUMNS) + ", scorer_version_set INTEGER)"
+        )
+        if "scorer_version_set" not in {row[1] for row in self._conn.execute("PRAGMA table_info(evaluations)")}:
+            # Evaluations stored before scorer versions were recorded count as stale for every scorer
+            self._conn.execute("ALTER TABLE evaluations ADD COLUMN scorer_version_set INTEGER")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scorer_version_sets (id INTEGER PRIMARY KEY, versions TEXT NOT NULL UNIQUE)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS evaluation_scores ("
+            "evaluation_id INTEGER NOT NULL, metric TEXT NOT NULL, scorer_version TEXT NOT NULL, value, "
+            "scored_at REAL NOT NULL, PRIMARY KEY (evaluation_id, metric, scorer_version))"
+        )
+        for name, columns in (
+            ("evaluations_model", "model_name, timestamp"),
+            ("evaluations_question", "question_hash, model_name, timestamp"),
+            ("evaluations_timestamp", "timestamp"),
+            ("evaluations_profile", "scoring_profile_version, model_name"),
+        ):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON evaluations ({columns})")
+        for table, keys in _AGGREGATE_TABLES.items():
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                + "".join(f"{key} TEXT NOT NULL, " for key in keys)
+                + "".join(f"{column} REAL NOT NULL DEFAULT 0, " for column in _SUM_COLUMNS)
+                + f"first_at REAL NOT NULL, last_at REAL NOT NULL, PRIMARY KEY ({', '.join(keys)}))"
+            )
+            # Sums added after a store was created start counting from zero
+            existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for column in _SUM_COLUMNS:
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} REAL NOT NULL DEFAULT 0")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS model_daily_buckets ("
+            "model_name TEXT NOT NULL, scoring_profile_version TEXT NOT NULL, day TEXT NOT NULL, "
+            "metric TEXT NOT NULL, bucket INTEGER NOT NULL, count INTEGER NOT NULL, "
+            "PRIMARY KEY (model_name, scoring_profile_version, day, metric, bucket))"
+        )
+        self._conn.commit()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def add_rows(self, rows: Iterable[Dict[str, Any]], scorer_versions: Optional[Sequence[Optional[Dict[str, str]]]] = None) -> int:
+        """
+        Store result rows and update the aggregates in one transaction
+
+        Args:
+            rows: Rows as built by utils.result_sink.evaluation_to_row
+            scorer_versions: Each row's ModelEvaluation.scorer_versions;
+                rows without them are re-scored by every scorer
+
+        Returns:
+            Number of evaluations stored
+        """
+        evaluations = []
+        version_sets: List[Optional[str]] = []
+        questions: Dict[str, List[Any]] = {}
+        answers: Dict[str, str] = {}
+        aggregates: Dict[str, Dict[Tuple[str, ...], Dict[str, float]]] = {table: {} for table in _AGGREGATE_TABLES}
+        buckets: Dict[Tuple[Any, ...], int] = {}
+
+        for row in rows:
+            timestamp = datetime.fromisoformat(row["timestamp"]).timestamp()
+            values = {
+                "question_hash": question_hash(row["question"]),
+                "model_name": row["model_name"],
+                "scoring_profile_version": row.get("scoring_profile_version") or "",
+                "timestamp": timestamp,
+                "day": row["timestamp"][:10],
+                "hour": str(int(timestamp // 3600 * 3600)),
+                "answer_hash": hashlib.sha256(row["answer"].encode("utf-8")).hexdigest(),
+                "keyword_coverage": _number(row["keyword_coverage"]),
+                "keywords_found": row["keywords_found"],
+                "expected_keywords": row["expected_keywords"],
+                "length_category": row["length_category"],
+                "response_time_ms": int(row["response_time_ms"]),
+                "confidence_score": _number(row["confidence_score"]),
+                "cache_hit": int(bool(row["cache_hit"])),
+                "timed_out": int(bool(row["timed_out"])),
+                "semantic_similarity": _number(row.get("semantic_similarity")),
+                "metadata": row.get("metadata"),
+                **{column: _number(row.get(column)) for column in _SOCIAL_IMPACT_COLUMNS},
+            }
+            evaluations.append(tuple(values[column] for column in _EVALUATION_COLUMNS))
+            versions = scorer_versions[len(version_sets)] if scorer_versions else None
+            version_sets.append(json.dumps(versions, sort_keys=True) if versions else None)
+            answers[values["answer_hash"]] = row["answer"]
+
+            question = questions.setdefault(values["question_hash"], [row["question"], 0, timestamp, timestamp])
+            question[1] += 1
+            question[2] = min(question[2], timestamp)
+            question[3] = max(question[3], timestamp)
+
+            increments = _increments(values)
+            for table, keys in _AGGREGATE_TABLES.items():
+                key = tuple(values[name] for name in keys)
+                aggregate = aggregates[table].get(key)
+                if aggregate is None:
+                    aggregate = aggregates[table][key] = {column: 0.0 for column in _SUM_COLUMNS}
+                    aggregate["first_at"] = aggregate["last_at"] = timestamp
+                for column, amount in increments.items():
+                    aggregate[column] += amount
+                aggregate["first_at"] = min(aggregate["first_at"], timestamp)
+                aggregate["last_at"] = max(aggregate["last_at"], timestamp)
+            for metric, bucket in _buckets(values):
+                key = (values["model_name"], values["scoring_profile_version"], values["day"], metric, bucket)
+                buckets[key] = buckets.get(key, 0) + 1
+
+        if not evaluations:
+            return 0
+
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO scorer_version_sets (versions) VALUES (?)",
+                    [(versions,) for versions in set(version_sets) - {None}]
+                )
+                set_ids = dict(self._conn.execute("SELECT versions, id FROM scorer_version_sets").fetchall())
+                self._conn.executemany(
+                    f"INSERT INTO evaluations ({', '.join(_EVALUATION_COLUMNS)}, scorer_version_set) "
+                    f"VALUES ({', '.join('?' for _ in _EVALUATION_COLUMNS)}, ?)",
+                    [evaluation + (set_ids.get(versions),) for evaluation, versions in zip(evaluations, version_sets)]
+                )
+                self._conn.executemany("INSERT OR IGNORE INTO answers (answer_hash, answer) VALUES (?, ?)", answers.items())
+                self._conn.executemany(
+                    "INSERT INTO questions (question_hash, question, evaluations, first_at, last_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (question_hash) DO UPDATE SET evaluations = evaluations + excluded.evaluations, "
+                    "first_at = MIN(first_at, excluded.first_at), last_at = MAX(last_at, excluded.last_at)",
+                    [(key, *question) for key, question in questions.items()]
+                )
+                for table, keys in _AGGREGATE_TABLES.items():
+                    columns = keys + _SUM_COLUMNS + ("first_at", "last_at")
+                    self._conn.executemany(
+                        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+                        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET "
+                        + "".join(f"{column} = {column} + excluded.{column}, " for column in _SUM_COLUMNS)
+                        + "first_at = MIN(first_at, excluded.first_at), last_at = MAX(last_at, excluded.last_at)",
+                        [
+                            key + tuple(aggregate[column] for column in _SUM_COLUMNS + ("first_at", "last_at"))
+                            for key, aggregate in aggregates[table].items()
+                        ]
+                    )
+                self._conn.executemany(
+                    "INSERT INTO model_daily_buckets (model_name, scoring_profile_version, day, metric, bucket, count) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (model_name, scoring_profile_version, day, metric, bucket) "
+                    "DO UPDATE SET count = count + excluded.count",
+                    [key + (count,) for key, count in buckets.items()]
+                )
+        return len(evaluations)
+
+    def _sums(self, table: str, group_by: List[str], conditions: Sequence[Tuple[str, str, Any]]) -> List[Dict[str, Any]]:
+        # Add up aggregate rows, e.g. across scoring profile versions
+        names = [column.split(" AS ")[-1] for column in group_by]
+        where, params = _where(conditions)
+        query = (
+            f"SELECT {', '.join(group_by + [f'SUM({column})' for column in _SUM_COLUMNS])}, MIN(first_at), MAX(last_at) "
+            f"FROM {table}{where} GROUP BY {', '.join(names)}"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(zip(names + list(_SUM_COLUMNS) + ["first_at", "last_at"], row)) for row in rows]
+
+    def leaderboard(
+        self,
+        scoring_profile_version: Optional[str] = None,
+        sort_by: str = "keyword_coverage",
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank models by a mean metric over all their stored evaluations
+
+        Args:
+            scoring_profile_version: Only count evaluations scored with this
+                profile version; scores from different versions are not comparable
+            sort_by: One of LEADERBOARD_METRICS
+            limit: Maximum number of models
+
+        Returns:
+            One summary per model with its rank, best first; models without
+            a value for the metric come last
+
+        Raises:
+            ValueError: If sort_by is not a leaderboard metric
+        """
+        if sort_by not in LEADERBOARD_METRICS:
+            raise ValueError(f"sort_by must be one of {list(LEADERBOARD_METRICS)}")
+        entries = [
+            {"model_name": sums["model_name"], **_summarize(sums)}
+            for sums in self._sums("model_totals", ["model_name"], [("scoring_profile_version", "=", scoring_profile_version)])
+        ]
+        metric = _SUMMARY_METRIC[sort_by]
+        sign = -1 if LEADERBOARD_METRICS[sort_by] else 1
+        entries.sort(key=lambda entry: (entry[metric] is None, sign * (entry[metric] or 0.0), entry["model_name"]))
+        return [{"rank": rank, **entry} for rank, entry in enumerate(entries[:limit], start=1)]
+
+    def trend(
+        self,
+        model_name: Optional[str] = None,
+        scoring_profile_version: Optional[str] = None,
+        bucket: str = "day",
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get each model's summary per period
+
+        Args:
+            model_name: Only this model
+            scoring_profile_version: Only evaluations scored with this profile version
+            bucket: Period length, one of TREND_BUCKETS
+            since: First day to include, as YYYY-MM-DD
+            until: Last day to include, as YYYY-MM-DD
+
+        Returns:
+            Summaries with "period" and "model_name", oldest period first
+
+        Raises:
+            ValueError: If bucket is unknown
+        """
+        if bucket not in TREND_BUCKETS:
+            raise ValueError(f"bucket must be one of {list(TREND_BUCKETS)}")
+        rows = self._sums("model_daily", [f"{TREND_BUCKETS[bucket]} AS period", "model_name"], [
+            ("model_name", "=", model_name),
+            ("scoring_profile_version", "=", scoring_profile_version),
+            ("day", ">=", since),
+            ("day", "<=", until),
+        ])
+        points = [{"period": sums["period"], "model_name": sums["model_name"], **_summarize(sums)} for sums in rows]
+        points.sort(key=lambda point: (point["period"], point["model_name"]))
+        return points
+
+    def compare_question(self, question_hash: str, scoring_profile_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Compare every model's results on one question
+
+        Args:
+            question_hash: Key of the question (see question_hash())
+            scoring_profile_version: Only evaluations scored with this profile version
+
+        Returns:
+            The question with one entry per model: its summary and its most
+            recent evaluation including the answer; None if the question is unknown
+        """
+        with self._lock:
+            question = self._conn.execute(
+                "SELECT question, evaluations, first_at, last_at FROM questions WHERE question_hash = ?", (question_hash,)
+            ).fetchone()
+        if question is None:
+            return None
+
+        models = []
+        for sums in self._sums("question_models", ["model_name"], [
+            ("question_hash", "=", question_hash),
+            ("scoring_profile_version", "=", scoring_profile_version),
+        ]):
+            models.append({
+                "model_name": sums["model_name"],
+                **_summarize(sums),
+                "latest": self._latest_evaluation(question_hash, sums["model_name"], scoring_profile_version),
+            })
+        models.sort(key=lambda model: (-(model["mean_keyword_coverage"] or 0.0), model["model_name"]))
+        return {
+            "question_hash": question_hash,
+            "question": question[0],
+            "evaluations": question[1],
+            "first_at": question[2],
+            "last_at": question[3],
+            "models": models,
+        }
+
+    def _latest_evaluation(self, question_hash: str, model_name: str, scoring_profile_version: Optional[str]) -> Optional[Dict[str, Any]]:
+        columns = (
+            "timestamp", "scoring_profile_version", "keyword_coverage", "confidence_score",
+            "overall_social_impact", "semantic_similarity", "response_time_ms", "cache_hit", "timed_out", "answer"
+        )
+        query = (
+            f"SELECT {', '.join('e.' + column for column in columns[:-1])}, a.answer FROM evaluations e "
+            "JOIN answers a ON a.answer_hash = e.answer_hash WHERE e.question_hash = ? AND e.model_name = ?"
+        )
+        params: List[Any] = [question_hash, model_name]
+        if scoring_profile_version is not None:
+            query += " AND e.scoring_profile_version = ?"
+            params.append(scoring_profile_version)
+        with self._lock:
+            row = self._conn.execute(query + " ORDER BY e.timestamp DESC LIMIT 1", params).fetchone()
+        if row is None:
+            return None
+        latest = dict(zip(columns, row))
+        latest["cache_hit"] = bool(latest["cache_hit"])
+        latest["timed_out"] = bool(latest["timed_out"])
+        return latest
+
+    def questions(self, limit: int = 50, contains: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the most recently benchmarked questions with their hashes, optionally only those containing a text"""
+        query = "SELECT question_hash, question, evaluations, first_at, last_at FROM questions"
+        params: List[Any] = []
+        if contains:
+            query += " WHERE question LIKE ?"
+            params.append(f"%{contains}%")
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY last_at DESC LIMIT ?", params + [limit]).fetchall()
+        return [dict(zip(("question_hash", "question", "evaluations", "first_at", "last_at"), row)) for row in rows]
+
+    def version(self) -> int:
+        """Id of the newest evaluation; changes whenever results are added, by any process"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM evaluations").fetchone()[0]
+
+    def aggregate(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        model_names: Optional[List[str]] = None,
+        question_hashes: Optional[List[str]] = None,
+        scoring_profile_version: Optional[str] = None,
+        max_points: int = 200
+    ) -> Dict[str, Any]:
+        """
+        Get chart-ready aggregates over a time window and question set
+
+        Without a question set the distributions come from the per-day sums
+        and bucket counts and the series from the per-hour sums; with one,
+        only the evaluations of those questions are read, through the
+        question index. Results are cached until new
+        evaluations are stored.
+
+        Args:
+            since: First day to include, as YYYY-MM-DD
+            until: Last day to include, as YYYY-MM-DD
+            model_names: Only these models
+            question_hashes: Only these questions (see question_hash())
+            scoring_profile_version: Only evaluations scored with this profile version
+            max_points: Maximum points per model in the time series
+
+        Returns:
+            Dictionary with per-model summaries (latency percentiles, keyword
+            coverage histogram, social impact averages) and a time series
+            downsampled to at most max_points slots per model
+        """
+        key = (since, until, tuple(model_names or ()), tuple(question_hashes or ()),
+               scoring_profile_version, max_points, self.version())
+        with self._lock:
+            cached = self._aggregate_cache.get(key)
+            if cached is not None:
+                self._aggregate_cache.move_to_end(key)
+                return cached
+
+        conditions = [
+            ("model_name", "IN", model_names or None),
+            ("scoring_profile_version", "=", scoring_profile_version),
+            ("day", ">=", since),
+            ("day", "<=", until),
+        ]
+        if question_hashes:
+            sums, counts = self._question_distributions(conditions + [("question_hash", "IN", question_hashes)])
+        else:
+            sums = {row["model_name"]: row for row in self._sums("model_daily", ["model_name"], conditions)}
+            where, params = _where(conditions)
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT model_name, metric, bucket, SUM(count) FROM model_daily_buckets{where} "
+                    "GROUP BY model_name, metric, bucket", params
+                ).fetchall()
+            counts: Dict[Tuple[str, str], List[int]] = {}
+            for model_name, metric, bucket, count in rows:
+                self._bucket_list(counts, model_name, metric)[bucket] += count
+
+        models = []
+        for model_name in sorted(sums):
+            model_sums = sums[model_name]
+            latency = self._bucket_list(counts, model_name, "response_time_ms")
+            social_count = model_sums["social_impact_count"]
+            models.append({
+                "model_name": model_name,
+                **_summarize(model_sums),
+                "latency_percentiles_ms": {
+                    f"p{percentile}": _percentile(latency, LATENCY_BUCKETS_MS, percentile)
+                    for percentile in LATENCY_PERCENTILES
+                },
+                "keyword_coverage_histogram": self._bucket_list(counts, model_name, "keyword_coverage"),
+                "social_impact": {
+                    metric: model_sums[f"{metric}_sum"] / social_count if social_count else None
+                    for metric in RADAR_METRICS
+                },
+            })
+
+        result = {
+            "since": since,
+            "until": until,
+            "evaluations": sum(model["evaluations"] for model in models),
+            "keyword_coverage_bins": list(range(0, 101, COVERAGE_BUCKET_WIDTH)),
+            "models": models,
+            "series": self._series(since, until, model_names, question_hashes, scoring_profile_version, max_points),
+        }
+        with self._lock:
+            self._aggregate_cache[key] = result
+            while len(self._aggregate_cache) > 32:
+                self._aggregate_cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _bucket_list(counts: Dict[Tuple[str, str], List[int]], model_name: str, metric: str) -> List[int]:
+        size = len(LATENCY_BUCKETS_MS) + 1 if metric == "response_time_ms" else 100 // COVERAGE_BUCKET_WIDTH
+        return counts.setdefault((model_name, metric), [0] * size)
+
+    def _question_distributions(self, conditions: Sequence[Tuple[str, str, Any]]):
+        # Same sums and bucket counts as the per-day tables, from the evaluations of a question set
+        columns = (
+            "model_name", "timestamp", "cache_hit", "timed_out", "response_time_ms", "keyword_coverage",
+            "confidence_score", "semantic_similarity",
+        ) + _SOCIAL_IMPACT_COLUMNS
+        where, params = _where(conditions)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(columns)} FROM evaluations{where}", params).fetchall()
+
+        sums: Dict[str, Dict[str, Any]] = {}
+        counts: Dict[Tuple[str, str], List[int]] = {}
+        for row in rows:
+            values = dict(zip(columns, row))
+            model_name, timestamp = values["model_name"], values["timestamp"]
+            model_sums = sums.get(model_name)
+            if model_sums is None:
+                model_sums = sums[model_name] = {column: 0.0 for column in _SUM_COLUMNS}
+                model_sums["first_at"] = model_sums["last_at"] = timestamp
+            for column, amount in _increments(values).items():
+                model_sums[column] += amount
+            model_sums["first_at"] = min(model_sums["first_at"], timestamp)
+            model_sums["last_at"] = max(model_sums["last_at"], timestamp)
+            for metric, bucket in _buckets(values):
+                self._bucket_list(counts, model_name, metric)[bucket] += 1
+        return sums, counts
+
+    def _series(
+        self,
+        since: Optional[str],
+        until: Optional[str],
+        model_names: Optional[List[str]],
+        question_hashes: Optional[List[str]],
+        scoring_profile_version: Optional[str],
+        max_points: int
+    ) -> Dict[str, Any]:
+        # Average into at most max_points equal time slots per model. Without a
+        # question set the hourly sums are merged, so slots are at least an hour
+        window_start = _day_start(since) if since else None
+        window_end = _day_start(until) + timedelta(days=1).total_seconds() if until else None
+        if question_hashes:
+            table, time_column = "evaluations", "timestamp"
+            timed = "cache_hit = 0 AND timed_out = 0"
+            measures = (
+                f"COUNT(*), AVG(CASE WHEN {timed} THEN response_time_ms END), "
+                "AVG(keyword_coverage), AVG(overall_social_impact)"
+            )
+        else:
+            table, time_column = "model_hourly", "CAST(hour AS REAL)"
+            measures = (
+                "SUM(evaluations), SUM(response_time_ms_sum) / NULLIF(SUM(response_time_count), 0), "
+                "SUM(keyword_coverage_sum) / NULLIF(SUM(evaluations), 0), "
+                "SUM(social_impact_sum) / NULLIF(SUM(social_impact_count), 0)"
+            )
+        where, params = _where([
+            ("model_name", "IN", model_names or None),
+            ("question_hash", "IN", question_hashes or None),
+            ("scoring_profile_version", "=", scoring_profile_version),
+            (time_column, ">=", window_start),
+            (time_column, "<", window_end),
+        ])
+        with self._lock:
+            first, last = self._conn.execute(f"SELECT MIN({time_column}), MAX({time_column}) FROM {table}{where}", params).fetchone()
+        if first is None:
+            return {"slot_seconds": None, "points": []}
+
+        start = window_start if window_start is not None else first
+        end = max(window_end if window_end is not None else last, start)
+        slot_seconds = max((end - start) / max_points, 1.0)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT model_name, MIN(CAST(({time_column} - ?) / ? AS INTEGER), ?) AS slot, {measures} "
+                f"FROM {table}{where} GROUP BY model_name, slot ORDER BY slot, model_name",
+                [start, slot_seconds, max_points - 1] + params
+            ).fetchall()
+        return {
+            "slot_seconds": slot_seconds,
+            "points": [
+                {
+                    "model_name": model_name,
+                    "start": start + slot * slot_seconds,
+                    "evaluations": int(count),
+                    "mean_response_time_ms": mean_latency,
+                    "mean_keyword_coverage": coverage,
+                    "mean_social_impact": social_impact,
+                }
+                for model_name, slot, count, mean_latency, coverage, social_impact in rows
+            ],
+        }
+
+    def stale_evaluations(
+        self,
+        scorer: str,
+        version: str,
+        metric: str,
+        simplicity_version: Optional[str] = None,
+        after_id: int = 0,
+        limit: int = 10000
+    ) -> List[Dict[str, Any]]:
+        """
+        Get evaluations not yet scored by a scorer version, with what is needed to score them
+
+        An evaluation is stale unless it was originally scored with this
+        version or already has a re-scored value for metric at this version.
+
+        Args:
+            scorer: Scorer name, as in CompiledScoringProfile.scorer_versions()
+            version: Current version of the scorer
+            metric: A metric the scorer writes, used to find existing re-scores
+            simplicity_version: Current language simplicity version; its
+                value at that version is returned as "language_simplicity"
+                when already known
+            after_id: Only evaluations with a larger id, for paging
+            limit: Maximum number of evaluations
+
+        Returns:
+            Evaluations in id order with id, answer_hash, answer,
+            question_hash, question, expected_keywords, response_time_ms
+            and language_simplicity
+        """
+        columns = (
+            "id", "answer_hash", "answer", "question_hash", "question", "expected_keywords",
+            "response_time_ms", "language_simplicity",
+        )
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT e.id, e.answer_hash, a.answer, e.question_hash, q.question, e.expected_keywords, e.response_time_ms, "
+                "COALESCE("
+                "(SELECT value FROM evaluation_scores s WHERE s.evaluation_id = e.id "
+                "AND s.metric = 'language_simplicity' AND s.scorer_version = ?), "
+                "CASE WHEN json_extract(v.versions, '$.language_simplicity') = ? THEN e.language_simplicity END) "
+                "FROM evaluations e "
+                "JOIN answers a ON a.answer_hash = e.answer_hash "
+                "JOIN questions q ON q.question_hash = e.question_hash "
+                "LEFT JOIN scorer_version_sets v ON v.id = e.scorer_version_set "
+                "WHERE e.id > ? AND (v.versions IS NULL OR json_extract(v.versions, '$.' || ?) IS NOT ?) "
+                "AND NOT EXISTS (SELECT 1 FROM evaluation_scores s WHERE s.evaluation_id = e.id "
+                "AND s.metric = ? AND s.scorer_version = ?) "
+                "ORDER BY e.id LIMIT ?",
+                (simplicity_version, simplicity_version, after_id, scorer, version, metric, version, limit)
+            ).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def save_scores(self, scores: Iterable[Tuple[int, str, str, Any]]):
+        """Store re-scored values as (evaluation id, metric, scorer version, value), replacing earlier ones"""
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO evaluation_scores (evaluation_id, metric, scorer_version, value, scored_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [score + (now,) for score in scores]
+                )
+
+    def evaluation_scores(self, evaluation_id: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Get an evaluation's original and re-scored values side by side
+
+        Returns:
+            Metric -> {"original": value, <scorer version>: value, ...}
+        """
+        metrics = ("keyword_coverage", "keywords_found", "length_category", "confidence_score") + _SOCIAL_IMPACT_COLUMNS
+        with self._lock:
+            original = self._conn.execute(
+                f"SELECT {', '.join(metrics)} FROM evaluations WHERE id = ?", (evaluation_id,)
+            ).fetchone()
+            rescored = self._conn.execute(
+                "SELECT metric, scorer_version, value FROM evaluation_scores WHERE evaluation_id = ? ORDER BY scored_at",
+                (evaluation_id,)
+            ).fetchall()
+        if original is None:
+            return {}
+        scores: Dict[str, Dict[str, Any]] = {metric: {"original": value} for metric, value in zip(metrics, original)}
+        for metric, version, value in rescored:
+            scores.setdefault(metric, {})[version] = value
+        return scores
+
+    def import_files(self, path: str, batch_size: int = 5000) -> int:
+        """
+        Load result files written by the result sink, e.g. from before the store existed
+
+        Args:
+            path: A result file, or a directory of result files
+            batch_size: Rows stored per transaction
+
+        Returns:
+            Number of evaluations stored
+        """
+        from utils.result_sink import RESULT_SCHEMA, load_results
+
+        columns = load_results(path)
+        count = len(columns["timestamp"])
+        stored = 0
+        for start in range(0, count, batch_size):
+            stored += self.add_rows(
+                {column: columns[column][i].item() if hasattr(columns[column][i], "item") else columns[column][i]
+                 for column in RESULT_SCHEMA}
+                for i in range(start, min(start + batch_size, count))
+            )
+        return stored
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store size
+
+        Returns:
+            Dictionary with the path and the number of evaluations, questions, answers and models
+        """
+        with self._lock:
+            evaluations, models = self._conn.execute(
+                "SELECT COALESCE(SUM(evaluations), 0), COUNT(DISTINCT model_name) FROM model_totals"
+            ).fetchone()
+            questions = self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+            answers = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        return {
+            "path": self._path,
+            "evaluations": int(evaluations),
+            "questions": questions,
+            "distinct_answers": answers,
+            "models": models,
+        }
+
+_results_store: Optional[ResultsStore] = None
+_results_store_lock = threading.Lock()
+
+def get_results_store() -> ResultsStore:
+    """Get the process-wide results store, opening it on first use"""
+    global _results_store
+    with _results_store_lock:
+        if _results_store is None:
+            _results_store = ResultsStore()
+        return _results_store
+
+def set_results_store(store: Optional[ResultsStore]):
+    """Replace the process-wide results store, e.g. with one at a different path"""
+    global _results_store
+    with _results_store_lock:
+        _results_store = store
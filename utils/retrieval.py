@@ -0,0 +1,453 @@
+"""
+Local legal-corpus retrieval for the extractive QA services.
+
+The statute corpus is chunked into passages and indexed once per process.
+A BM25 index answers every query; when an embedding model is configured,
+a dense index over memory-mapped passage embeddings is fused in as long as
+the query stays within its latency budget. Retrievals are cached per
+question.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from utils.cache import LOGS_DIR, normalize_question
+from utils.embedding_store import load_sentence_encoder, normalize_rows
+from utils.metrics import metrics_registry
+from utils.text_analysis import ENGLISH_STOPWORDS
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+DEFAULT_CORPUS_PATH = os.environ.get("LEGAL_CORPUS_PATH", os.path.join(DATA_DIR, "legal_corpus.jsonl"))
+RETRIEVAL_TOP_K = int(os.environ.get("RETRIEVAL_TOP_K", "3"))
+RETRIEVAL_BUDGET_MS = float(os.environ.get("RETRIEVAL_BUDGET_MS", "50"))
+RETRIEVAL_CACHE_SIZE = int(os.environ.get("RETRIEVAL_CACHE_SIZE", "1024"))
+RETRIEVAL_EMBEDDING_MODEL = os.environ.get("RETRIEVAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+RETRIEVAL_INDEX_DIR = os.environ.get("RETRIEVAL_INDEX_DIR", os.path.join(LOGS_DIR, "retrieval"))
+CHUNK_MAX_WORDS = 120
+
+# Used when no passage matches the question at all
+FALLBACK_CONTEXT = (
+    "The Indian Penal Code (IPC) is the official criminal code of India. "
+    "It covers all substantive aspects of criminal law."
+)
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+_SENTENCE_PATTERN = re.compile(r"(?<=[.;:])\s+")
+_CITATION_PATTERN = re.compile(r"\b(?:section|sec|s|article|art)\.?\s*(\d+[a-z]*)\b", re.IGNORECASE)
+
+# Constant of reciprocal rank fusion; damps the weight of the very top ranks
+RRF_K = 60
+
+class Passage(NamedTuple):
+    """One chunk of a statute section"""
+    id: str
+    act: str
+    section: str
+    title: str
+    text: str
+    keywords: str = ""
+
+    @property
+    def heading(self) -> str:
+        section = self.section if self.section[:1].isalpha() else f"Section {self.section}"
+        return f"{self.act}, {section} ({self.title})"
+
+class RetrievalResult(NamedTuple):
+    """Passages retrieved for a question and how they were found"""
+    passages: List[Passage]
+    retrieval_ms: float
+    method: str
+    cache_hit: bool = False
+    dense_skipped: bool = False
+
+    def as_metadata(self) -> Dict[str, Any]:
+        """Get the retrieval fields reported in an evaluation's metadata"""
+        return {
+            "retrieval_ms": round(self.retrieval_ms, 3),
+            "retrieval_method": self.method,
+            "retrieval_cache_hit": self.cache_hit,
+            "retrieval_dense_skipped": self.dense_skipped,
+            "retrieved_passages": [passage.id for passage in self.passages],
+        }
+
+def cited_sections(text: str) -> Set[str]:
+    """Section and article numbers cited in the text, e.g. 420 and 21 in "Section 420 or Article 21?"."""
+    return {number.lower() for number in _CITATION_PATTERN.findall(text)}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords; section numbers such as "498a" are kept"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in ENGLISH_STOPWORDS]
+
+def chunk_section(record: Dict[str, str], max_words: int = CHUNK_MAX_WORDS) -> List[Passage]:
+    """
+    Split a statute section into passages of whole sentences
+
+    Args:
+        record: Section with id, act, section, title, text and optional
+            keywords (abbreviations and everyday terms that are indexed but
+            not shown to the reader)
+        max_words: Target passage length; a longer sentence is kept whole
+
+    Returns:
+        Passages; a short section is a single passage with the section id
+    """
+    chunks: List[List[str]] = [[]]
+    words = 0
+    for sentence in _SENTENCE_PATTERN.split(record["text"].strip()):
+        length = len(sentence.split())
+        if chunks[-1] and words + length > max_words:
+            chunks.append([])
+            words = 0
+        chunks[-1].append(sentence)
+        words += length
+
+    def passage_id(index: int) -> str:
+        return record["id"] if len(chunks) == 1 else f"{record['id']}#{index}"
+
+    return [
+        Passage(
+            passage_id(index), record["act"], record["section"], record["title"],
+            " ".join(sentences), record.get("keywords", "")
+        )
+        for index, sentences in enumerate(chunks)
+    ]
+
+def load_corpus(path: str = DEFAULT_CORPUS_PATH, max_words: int = CHUNK_MAX_WORDS) -> List[Passage]:
+    """
+    Load and chunk a JSONL corpus of statute sections
+
+    Args:
+        path: File with one {"id", "act", "section", "title", "keywords", "text"} object per line
+        max_words: Target passage length
+
+    Returns:
+        Passages in corpus order
+    """
+    passages: List[Passage] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                passages.extend(chunk_section(json.loads(line), max_words))
+    return passages
+
+def corpus_digest(passages: Sequence[Passage]) -> str:
+    """Short content hash of a chunked corpus, used to version answers and embedding files"""
+    return hashlib.sha256(json.dumps([list(passage) for passage in passages]).encode("utf-8")).hexdigest()[:16]
+
+def _top_k(scores: np.ndarray, k: int, positive_only: bool = True) -> List[Tuple[int, float]]:
+    candidates = np.flatnonzero(scores > 0) if positive_only else np.arange(len(scores))
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(int(index), float(scores[index])) for index in ranked]
+
+class BM25Index:
+    """
+    Okapi BM25 over tokenized passages.
+
+    The BM25 weight of every (term, passage) posting does not depend on the
+    query, so it is computed once at build time and a query only sums the
+    weights of its terms' postings.
+    """
+
+    def __init__(self, documents: Sequence[List[str]], k1: float = 1.5, b: float = 0.75):
+        """
+        Build the index
+
+        Args:
+            documents: Token lists, one per passage
+            k1: Term-frequency saturation
+            b: Length normalization
+        """
+        self.size = len(documents)
+        lengths = np.array([len(tokens) for tokens in documents], dtype=np.float32)
+        average_length = float(lengths.mean()) if self.size and lengths.any() else 1.0
+
+        collected: Dict[str, Tuple[List[int], List[int]]] = {}
+        for doc_id, tokens in enumerate(documents):
+            for term, count in Counter(tokens).items():
+                ids, counts = collected.setdefault(term, ([], []))
+                ids.append(doc_id)
+                counts.append(count)
+
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, (ids, counts) in collected.items():
+            doc_ids = np.array(ids, dtype=np.int32)
+            tf = np.array(counts, dtype=np.float32)
+            idf = math.log(1 + (self.size - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = k1 * (1 - b + b * lengths[doc_ids] / average_length)
+            self._postings[term] = (doc_ids, (idf * tf * (k1 + 1) / (tf + norm)).astype(np.float32))
+
+    def search(self, query_tokens: Sequence[str], k: int) -> List[Tuple[int, float]]:
+        """
+        Get the k best-scoring passages that share a term with the query
+
+        Returns:
+            List of (passage index, score), best first
+        """
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(query_tokens):
+            posting = self._postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+        return _top_k(scores, k)
+
+class DenseIndex:
+    """
+    Cosine-similarity search over normalized passage embeddings.
+
+    Embeddings are computed once per corpus and embedding model, saved as a
+    .npy file and memory-mapped, so every worker process shares the same
+    pages instead of holding its own copy.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], embeddings: np.ndarray):
+        self._encode = encode
+        self.embeddings = embeddings
+
+    @classmethod
+    def build(
+        cls,
+        passages: Sequence[Passage],
+        encode: Callable[[List[str]], np.ndarray],
+        path: str
+    ) -> "DenseIndex":
+        """
+        Load the passage embeddings from path, encoding and saving them first if needed
+
+        Args:
+            passages: Passages to index
+            encode: Maps a list of texts to a 2-D array of embeddings
+            path: .npy file for the embeddings
+        """
+        if not os.path.exists(path):
+            embeddings = normalize_rows(np.asarray(
+                encode([f"{passage.title}. {passage.text}" for passage in passages]), dtype=np.float32
+            ))
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            # Write then rename so concurrent workers never map a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, embeddings)
+            os.replace(tmp_path, path)
+
+        embeddings = np.load(path, mmap_mode="r")
+        if embeddings.shape[0] != len(passages):
+            raise ValueError(f"Embedding file {path} does not match the corpus")
+        return cls(encode, embeddings)
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Get the k passages closest to the query
+
+        Returns:
+            List of (passage index, cosine similarity), best first
+        """
+        query_embedding = normalize_rows(np.asarray(self._encode([query]), dtype=np.float32))[0]
+        return _top_k(self.embeddings @ query_embedding, k, positive_only=False)
+
+class LegalRetriever:
+    """
+    Picks the passages most relevant to a question within a latency budget.
+
+    Sections cited by number ("Section 420", "Article 21") come first. BM25
+    always runs. The dense index is only queried when the time spent so
+    far plus its recent cost fits in the budget; a skipped query lowers the
+    cost estimate so the dense index is retried once load drops.
+    """
+
+    def __init__(
+        self,
+        passages: List[Passage],
+        top_k: int = RETRIEVAL_TOP_K,
+        budget_ms: float = RETRIEVAL_BUDGET_MS,
+        dense_index: Optional[DenseIndex] = None,
+        cache_size: int = RETRIEVAL_CACHE_SIZE
+    ):
+        """
+        Initialize the retriever
+
+        Args:
+            passages: Corpus passages
+            top_k: Passages returned per question
+            budget_ms: Latency budget of one retrieval
+            dense_index: Optional dense index over the same passages
+            cache_size: Questions whose retrievals are cached
+        """
+        self.passages = passages
+        self.corpus_version = corpus_digest(passages)
+        self.top_k = max(1, top_k)
+        self.budget_ms = budget_ms
+        self._bm25 = BM25Index([tokenize(f"{p.act} {p.section} {p.title} {p.keywords} {p.text}") for p in passages])
+        self._sections: Dict[str, List[int]] = {}
+        for index, passage in enumerate(passages):
+            number = passage.section.lower().replace("article", "").strip()
+            self._sections.setdefault(number, []).append(index)
+        self._dense = dense_index
+        self._dense_cost_ms = 0.0
+        self._cache: "OrderedDict[str, Tuple[List[Passage], str, bool]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._counters = {"queries": 0, "cache_hits": 0, "dense_queries": 0, "dense_skipped": 0}
+
+    def retrieve(self, question: str) -> RetrievalResult:
+        """
+        Get the top-k passages for a question
+
+        Args:
+            question: The question to answer
+
+        Returns:
+            The passages (possibly none), with the time taken and the method used
+        """
+        start = time.perf_counter()
+        key = normalize_question(question)
+        with self._lock:
+            self._counters["queries"] += 1
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._counters["cache_hits"] += 1
+        if cached is not None:
+            passages, method, dense_skipped = cached
+            return RetrievalResult(passages, _elapsed_ms(start), method, True, dense_skipped)
+
+        # Over-fetch from each index so fusion has candidates to reorder
+        candidates = self.top_k * 3
+        rankings = [self._bm25.search(tokenize(question), candidates)]
+        method = "bm25"
+        dense_skipped = False
+        if self._dense is not None:
+            if _elapsed_ms(start) + self._dense_cost_ms <= self.budget_ms:
+                dense_start = time.perf_counter()
+                rankings.append(self._dense.search(question, candidates))
+                with self._lock:
+                    self._counters["dense_queries"] += 1
+                    # Exponentially weighted, so one slow query does not switch dense retrieval off for long
+                    self._dense_cost_ms = 0.8 * self._dense_cost_ms + 0.2 * _elapsed_ms(dense_start)
+                method = "hybrid"
+            else:
+                dense_skipped = True
+                with self._lock:
+                    self._counters["dense_skipped"] += 1
+                    self._dense_cost_ms *= 0.9
+
+        ranked = _fuse(rankings)
+        cited = [index for number in cited_sections(question) for index in self._sections.get(number, [])]
+        if cited:
+            # An explicitly cited section outranks anything that merely shares words with the question
+            order = {index: rank for rank, index in enumerate(ranked)}
+            cited_set = set(cited)
+            ranked = sorted(cited_set, key=lambda index: order.get(index, len(order))) + [
+                index for index in ranked if index not in cited_set
+            ]
+        passages = [self.passages[index] for index in ranked[:self.top_k]]
+        with self._lock:
+            self._cache[key] = (passages, method, dense_skipped)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return RetrievalResult(passages, _elapsed_ms(start), method, False, dense_skipped)
+
+    def build_context(self, passages: Sequence[Passage]) -> str:
+        """Join retrieved passages into a reader context, headed by their citations"""
+        if not passages:
+            return FALLBACK_CONTEXT
+        return "\n".join(f"{passage.heading}: {passage.text}" for passage in passages)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get retrieval counters and configuration
+
+        Returns:
+            Dictionary of counters, cache size and index settings
+        """
+        with self._lock:
+            return {
+                **self._counters,
+                "passages": len(self.passages),
+                "corpus_version": self.corpus_version,
+                "top_k": self.top_k,
+                "budget_ms": self.budget_ms,
+                "dense_index": self._dense is not None,
+                "dense_cost_ms": round(self._dense_cost_ms, 3),
+                "cached_questions": len(self._cache),
+            }
+
+def _fuse(rankings: List[List[Tuple[int, float]]]) -> List[int]:
+    # Reciprocal rank fusion: BM25 scores and cosine similarities are not on
+    # the same scale, but their ranks are
+    if len(rankings) == 1:
+        return [index for index, _ in rankings[0]]
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, (index, _) in enumerate(ranking):
+            fused[index] = fused.get(index, 0.0) + 1.0 / (RRF_K + rank + 1)
+    return sorted(fused, key=lambda index: -fused[index])
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+def build_legal_retriever(
+    corpus_path: str = DEFAULT_CORPUS_PATH,
+    embedding_model: Optional[str] = RETRIEVAL_EMBEDDING_MODEL,
+    index_dir: str = RETRIEVAL_INDEX_DIR
+) -> LegalRetriever:
+    """
+    Build a retriever over a corpus file
+
+    The dense index is added when embedding_model is set and can be
+    loaded; otherwise retrieval falls back to BM25 alone.
+
+    Args:
+        corpus_path: JSONL corpus of statute sections
+        embedding_model: sentence-transformers model name, or empty to use BM25 only
+        index_dir: Directory for the memory-mapped embedding files
+    """
+    passages = load_corpus(corpus_path)
+    dense_index = None
+    if embedding_model:
+        try:
+            encode = load_sentence_encoder(embedding_model)
+        except Exception as e:
+            print(f"Dense retrieval disabled, could not load {embedding_model}: {str(e)}")
+        else:
+            slug = re.sub(r"[^\w.-]+", "_", embedding_model)
+            path = os.path.join(index_dir, f"{corpus_digest(passages)}-{slug}.npy")
+            dense_index = DenseIndex.build(passages, encode, path)
+    return LegalRetriever(passages, dense_index=dense_index)
+
+_legal_retriever: Optional[LegalRetriever] = None
+_legal_retriever_lock = threading.Lock()
+
+def get_legal_retriever() -> LegalRetriever:
+    """Get the process-wide retriever, building it from the environment on first use"""
+    global _legal_retriever
+    with _legal_retriever_lock:
+        if _legal_retriever is None:
+            _legal_retriever = build_legal_retriever()
+        return _legal_retriever
+
+def peek_legal_retriever() -> Optional[LegalRetriever]:
+    """Get the process-wide retriever if it has been built, without building it"""
+    return _legal_retriever
+
+def _retrieval_counters() -> List[Tuple[Dict[str, Any], float]]:
+    retriever = peek_legal_retriever()
+    if retriever is None:
+        return []
+    stats = retriever.stats()
+    return [({"counter": name}, stats[name]) for name in ("queries", "cache_hits", "dense_queries", "dense_skipped")]
+
+metrics_registry.callback(
+    "retrieval_events_total", "Legal-corpus retrievals, retrieval cache hits and dense index use",
+    _retrieval_counters, "counter"
+)
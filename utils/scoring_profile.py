@@ -0,0 +1,192 @@
+"""
+Versioned scoring profiles.
+
+Lexicons, weights and confidence rules live in a JSON profile that is
+loaded and compiled into matchers once. The active profile can be swapped
+at runtime; every evaluation records the version it was scored with.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from utils.keyword_matcher import DEFAULT_MATCH_MODE, KeywordMatcher
+
+DEFAULT_PROFILE_PATH = os.environ.get(
+    "SCORING_PROFILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "scoring_profile.json")
+)
+
+LEXICON_METRICS = ("actionable_guidance", "cultural_relevance")
+SOCIAL_IMPACT_METRICS = ("language_simplicity", "actionable_guidance", "cultural_relevance", "accessibility")
+
+# Code version of each scorer. Bump one when its output changes for the same
+# answer, so rescore.py recomputes only that scorer's metrics
+SCORER_CODE_VERSIONS = {
+    "keyword_coverage": "1",
+    "length_category": "1",
+    "confidence_score": "1",
+    "language_simplicity": "1",
+    "social_impact": "1",
+}
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+class LexiconConfig(BaseModel):
+    """A list of terms whose occurrences add to a metric"""
+    name: str = Field(..., description="Name of the lexicon")
+    metric: str = Field(..., description="Metric the lexicon contributes to")
+    weight: float = Field(..., description="Points added per occurrence of a term")
+    terms: List[str] = Field(..., description="Terms to count (case-insensitive)")
+
+class ConfidenceConfig(BaseModel):
+    """Rules for calculate_confidence_score"""
+    base_score: float = 50
+    uncertainty_phrases: List[str] = Field(default_factory=list)
+    uncertainty_penalty: float = 10
+    detail_pattern: str = r"\d+"
+    detail_bonus: float = 5
+    citation_pattern: str = r"section \d+|article \d+"
+    citation_bonus: float = 15
+
+class ScoringProfile(BaseModel):
+    """Schema of a scoring profile file"""
+    version: str = Field(..., description="Version recorded on every evaluation scored with this profile")
+    description: str = ""
+    lexicons: List[LexiconConfig]
+    overall_weights: Dict[str, float] = Field(..., description="Weights of each metric in overall_social_impact")
+    confidence: ConfidenceConfig = Field(default_factory=ConfidenceConfig)
+
+class CompiledScoringProfile:
+    """A scoring profile with its matchers and weight vectors built once"""
+
+    def __init__(self, profile: ScoringProfile, path: Optional[str] = None):
+        """
+        Compile the profile
+
+        Args:
+            profile: Validated profile definition
+            path: File the profile was loaded from
+        """
+        for lexicon in profile.lexicons:
+            if lexicon.metric not in LEXICON_METRICS:
+                raise ValueError(f"Lexicon {lexicon.name} targets unknown metric: {lexicon.metric}")
+        for metric in profile.overall_weights:
+            if metric not in SOCIAL_IMPACT_METRICS:
+                raise ValueError(f"Overall weight given for unknown metric: {metric}")
+
+        self.profile = profile
+        self.version = profile.version
+        self.path = path
+        self.loaded_at = time.time()
+        self.overall_weights = dict(profile.overall_weights)
+
+        terms = [(term.lower(), lexicon) for lexicon in profile.lexicons for term in lexicon.terms]
+        self.lexicon_terms = tuple(term for term, _ in terms)
+        self.lexicon_weights = {
+            metric: np.array([lexicon.weight if lexicon.metric == metric else 0 for _, lexicon in terms], dtype=np.float64)
+            for metric in LEXICON_METRICS
+        }
+        # (term, weight) pairs per metric, for scoring one answer without NumPy
+        self.lexicon_term_weights = {
+            metric: tuple((term, lexicon.weight) for term, lexicon in terms if lexicon.metric == metric)
+            for metric in LEXICON_METRICS
+        }
+
+        confidence = profile.confidence
+        self.confidence = confidence
+        # One alternation over every phrase, like the detail and citation patterns
+        self.uncertainty_matcher = KeywordMatcher(confidence.uncertainty_phrases, mode="substring")
+        self.detail_pattern = re.compile(confidence.detail_pattern)
+        self.citation_pattern = re.compile(confidence.citation_pattern)
+
+        self._confidence_digest = _digest(confidence.dict())
+        self._lexicon_digest = _digest([[lexicon.dict() for lexicon in profile.lexicons], self.overall_weights])
+
+    def scorer_versions(
+        self,
+        keyword_match_mode: Optional[str] = None,
+        keyword_extraction: Optional[str] = None,
+        keyword_tokenizer: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Get the version of each scorer under this profile
+
+        A version combines the scorer's code version with the settings it
+        reads, so editing one lexicon changes only the social impact
+        version, and editing the confidence rules only the confidence one.
+
+        Args:
+            keyword_match_mode: Keyword match mode (default: KEYWORD_MATCH_MODE)
+            keyword_extraction: Keyword extraction mode for questions without
+                expected keywords (default: KEYWORD_EXTRACTION)
+            keyword_tokenizer: Keyword extraction tokenizer (default: KEYWORD_TOKENIZER)
+        """
+        # text_analysis imports this module
+        from utils.text_analysis import keyword_extraction_version
+
+        code = SCORER_CODE_VERSIONS
+        extraction = keyword_extraction_version(keyword_extraction, keyword_tokenizer)
+        return {
+            "keyword_coverage": f"{code['keyword_coverage']}:{keyword_match_mode or DEFAULT_MATCH_MODE}:{extraction}",
+            "length_category": code["length_category"],
+            "confidence_score": f"{code['confidence_score']}:{self._confidence_digest}",
+            "language_simplicity": code["language_simplicity"],
+            # The overall score weighs in language simplicity, so its version is part of this one
+            "social_impact": f"{code['social_impact']}:{self._lexicon_digest}:{code['language_simplicity']}",
+        }
+
+    def describe(self) -> Dict[str, object]:
+        """Get a summary of the profile for the admin API"""
+        return {
+            "version": self.version,
+            "description": self.profile.description,
+            "path": self.path,
+            "loaded_at": self.loaded_at,
+            "lexicons": {lexicon.name: len(lexicon.terms) for lexicon in self.profile.lexicons},
+            "overall_weights": self.overall_weights,
+        }
+
+def load_scoring_profile(path: str = DEFAULT_PROFILE_PATH) -> CompiledScoringProfile:
+    """
+    Load and compile a scoring profile file
+
+    Raises:
+        ValueError: If the profile is invalid
+    """
+    return CompiledScoringProfile(ScoringProfile.parse_file(path), path)
+
+_active_profile: Optional[CompiledScoringProfile] = None
+_profile_lock = threading.Lock()
+
+def get_scoring_profile() -> CompiledScoringProfile:
+    """Get the active scoring profile, loading the default on first use"""
+    global _active_profile
+    if _active_profile is None:
+        with _profile_lock:
+            if _active_profile is None:
+                _active_profile = load_scoring_profile()
+    return _active_profile
+
+def reload_scoring_profile(path: Optional[str] = None) -> CompiledScoringProfile:
+    """
+    Swap in a new scoring profile without restarting
+
+    The new profile is compiled before it replaces the active one, so an
+    invalid file leaves the current profile in place.
+
+    Args:
+        path: Profile file to load; defaults to the active profile's file
+    """
+    global _active_profile
+    profile = load_scoring_profile(path or (_active_profile.path if _active_profile else DEFAULT_PROFILE_PATH))
+    with _profile_lock:
+        _active_profile = profile
+    return profile
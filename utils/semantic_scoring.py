@@ -0,0 +1,55 @@
+"""
+Semantic similarity of model answers to reference (gold) answers.
+
+Every answer and reference in a benchmark run is embedded in one batch
+through the embedding store, so each reference is encoded once across
+runs, and every evaluation gets the cosine similarity to its closest
+reference.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+from models import ModelEvaluation
+from utils.embedding_store import EmbeddingStore, get_embedding_store
+
+def score_semantic_similarity(
+    runs: Sequence[Tuple[Sequence[ModelEvaluation], Optional[Sequence[str]]]],
+    store: Optional[EmbeddingStore] = None
+) -> bool:
+    """
+    Set semantic_similarity on every evaluation of questions with reference answers
+
+    Args:
+        runs: (evaluations, reference answers) per question; questions
+            without references are skipped
+        store: Embedding store (default: the process-wide store)
+
+    Returns:
+        False if the embedding model could not be loaded, in which case
+        semantic_similarity is left unset
+    """
+    runs = [(evaluations, [r for r in references or [] if r.strip()]) for evaluations, references in runs]
+    runs = [(evaluations, references) for evaluations, references in runs if references]
+    texts: List[str] = []
+    for evaluations, references in runs:
+        texts.extend(references)
+        # Empty answers (e.g. timed-out models) have no meaning to compare
+        texts.extend(e.answer for e in evaluations if e.answer.strip())
+    if not texts:
+        return True
+
+    try:
+        embeddings = (store or get_embedding_store()).embed(texts)
+    except RuntimeError as e:
+        print(f"Semantic similarity skipped: {str(e)}")
+        return False
+
+    offset = 0
+    for evaluations, references in runs:
+        reference_embeddings = embeddings[offset:offset + len(references)]
+        offset += len(references)
+        for evaluation in evaluations:
+            if not evaluation.answer.strip():
+                continue
+            evaluation.semantic_similarity = round(float((reference_embeddings @ embeddings[offset]).max()), 4)
+            offset += 1
+    return True
@@ -0,0 +1,159 @@
+"""
+Summary statistics and significance tests for comparing benchmark samples.
+
+Implements Student's t distribution through the regularized incomplete
+beta function, so confidence intervals and the paired and Welch's t-tests
+need nothing beyond the standard library and numpy.
+"""
+import math
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+def _beta_continued_fraction(a: float, b: float, x: float) -> float:
+    # Lentz's method for the continued fraction of the incomplete beta function
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 300):
+        numerator = m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m))
+        for step in (numerator, -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + step * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + step / c
+            c = c if abs(c) > tiny else tiny
+            result *= d * c
+        if abs(d * c - 1.0) < 1e-12:
+            break
+    return result
+
+def regularized_incomplete_beta(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta function I_x(a, b) for 0 <= x <= 1"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1.0 - x)
+    # The continued fraction converges fastest on this side of the mean
+    if x < (a + 1.0) / (a + b + 2.0):
+        return math.exp(log_front) * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+def student_t_cdf(t: float, df: float) -> float:
+    """Cumulative distribution function of Student's t distribution"""
+    tail = 0.5 * regularized_incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+    return 1.0 - tail if t > 0 else tail
+
+def student_t_ppf(q: float, df: float) -> float:
+    """Quantile function of Student's t distribution, found by bisection"""
+    low, high = -1e6, 1e6
+    for _ in range(200):
+        mid = (low + high) / 2.0
+        if student_t_cdf(mid, df) < q:
+            low = mid
+        else:
+            high = mid
+        if high - low < 1e-9:
+            break
+    return (low + high) / 2.0
+
+def summarize(values: Sequence[float], confidence: float = 0.95) -> Dict[str, Any]:
+    """
+    Describe a sample with its mean, spread, percentiles and confidence interval
+
+    Args:
+        values: Sample values
+        confidence: Coverage of the t-based confidence interval of the mean
+
+    Returns:
+        Dictionary with n, mean, std, min, max, p50, p95, ci_low and ci_high;
+        the interval collapses to the mean for fewer than two values
+    """
+    sample = np.asarray(values, dtype=float)
+    n = int(sample.size)
+    if n == 0:
+        return {"n": 0, "mean": None, "std": None, "min": None, "max": None,
+                "p50": None, "p95": None, "ci_low": None, "ci_high": None}
+
+    mean = float(sample.mean())
+    std = float(sample.std(ddof=1)) if n > 1 else 0.0
+    margin = student_t_ppf(0.5 + confidence / 2.0, n - 1) * std / math.sqrt(n) if n > 1 else 0.0
+    return {
+        "n": n,
+        "mean": mean,
+        "std": std,
+        "min": float(sample.min()),
+        "max": float(sample.max()),
+        "p50": float(np.percentile(sample, 50)),
+        "p95": float(np.percentile(sample, 95)),
+        "ci_low": mean - margin,
+        "ci_high": mean + margin,
+    }
+
+def welch_t_test(a: Sequence[float], b: Sequence[float]) -> Dict[str, Any]:
+    """
+    Two-sided Welch's t-test for a difference in means
+
+    Does not assume equal variances, which rarely hold between models.
+
+    Args:
+        a: First sample
+        b: Second sample
+
+    Returns:
+        Dictionary with t, df and p_value; p_value is None when either
+        sample has fewer than two values, or when both are constant and
+        differ, since repeated identical values say nothing about noise
+    """
+    first, second = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    if first.size < 2 or second.size < 2:
+        return {"t": None, "df": None, "p_value": None}
+
+    var_first = first.var(ddof=1) / first.size
+    var_second = second.var(ddof=1) / second.size
+    difference = float(first.mean() - second.mean())
+    if var_first + var_second == 0:
+        return {"t": None, "df": None, "p_value": 1.0 if difference == 0 else None}
+
+    t = difference / math.sqrt(var_first + var_second)
+    df = (var_first + var_second) ** 2 / (
+        var_first ** 2 / (first.size - 1) + var_second ** 2 / (second.size - 1)
+    )
+    p_value = 2.0 * student_t_cdf(-abs(t), df)
+    return {"t": float(t), "df": float(df), "p_value": float(min(1.0, p_value))}
+
+def paired_t_test(a: Sequence[float], b: Sequence[float]) -> Dict[str, Any]:
+    """
+    Two-sided paired t-test for a difference in means
+
+    Each pair is measured on the same unit, e.g. two models' mean score on
+    one question, so differences between units do not count as noise.
+
+    Args:
+        a: First sample
+        b: Second sample, in the same order as the first
+
+    Returns:
+        Dictionary with t, df and p_value; p_value is None for fewer than
+        two pairs, or when every pair differs by the same nonzero amount
+
+    Raises:
+        ValueError: If the samples have different lengths
+    """
+    first, second = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    if first.size != second.size:
+        raise ValueError("Paired samples must have the same length")
+    if first.size < 2:
+        return {"t": None, "df": None, "p_value": None}
+
+    differences = first - second
+    difference = float(differences.mean())
+    variance = differences.var(ddof=1) / differences.size
+    if variance == 0:
+        return {"t": None, "df": None, "p_value": 1.0 if difference == 0 else None}
+
+    t = difference / math.sqrt(variance)
+    df = differences.size - 1
+    p_value = 2.0 * student_t_cdf(-abs(t), df)
+    return {"t": float(t), "df": float(df), "p_value": float(min(1.0, p_value))}
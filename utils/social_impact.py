@@ -3,8 +3,12 @@ Utility functions for evaluating the social impact of legal AI models
 in terms of access to justice metrics.
 """
 import re
-from textstat import flesch_reading_ease, syllable_count
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from utils.scoring_profile import CompiledScoringProfile, get_scoring_profile
+from utils.startup import lazy_import
 
 def calculate_simplicity_score(text: str) -> float:
     """
@@ -13,7 +17,7 @@ def calculate_simplicity_score(text: str) -> float:
     Returns a score between 0-100 where higher is more simple/accessible.
     """
     try:
-        score = flesch_reading_ease(text)
+        score = lazy_import("textstat").flesch_reading_ease(text)
         return min(100, max(0, score))
     except:
         words = text.split()
@@ -26,43 +30,55 @@ def calculate_simplicity_score(text: str) -> float:
         
         return max(0, min(100, 100 - (avg_word_length * 3 + avg_sentence_length * 0.8)))
 
-def calculate_actionable_score(text: str) -> float:
+def count_lexicon_terms(answers: Sequence[str], profile: Optional[CompiledScoringProfile] = None) -> np.ndarray:
     """
-    Calculate how actionable the information is, based on presence of 
-    procedural steps, concrete instructions, and action verbs.
+    Count every lexicon term in a batch of answers
     
-    Returns a score between 0-100.
-    """
-    action_verbs = ["file", "submit", "apply", "complete", "contact", "visit", "call", 
-                   "request", "fill", "sign", "pay", "go", "send", "obtain"]
-    procedural_indicators = ["first", "second", "third", "finally", "next", "then", "step"]
-    concrete_indicators = ["form", "document", "office", "court", "police", "fee", "deadline", 
-                          "date", "number", "address", "website", "online"]
+    Terms are counted with str.count, like scoring one answer at a time.
+    Each term is first looked for in the whole batch at once, so only the
+    terms that occur somewhere are counted per answer.
     
-    text_lower = text.lower()
+    Args:
+        answers: The answers to scan
+        profile: Scoring profile whose lexicons are counted (default: active profile)
     
-    action_score = sum(text_lower.count(verb) for verb in action_verbs) * 5
-    procedural_score = sum(text_lower.count(indicator) for indicator in procedural_indicators) * 8
-    concrete_score = sum(text_lower.count(indicator) for indicator in concrete_indicators) * 4
+    Returns:
+        Count matrix of shape (len(answers), number of lexicon terms)
+    """
+    profile = profile or get_scoring_profile()
+    terms = profile.lexicon_terms
+    counts = np.zeros((len(answers), len(terms)), dtype=np.int64)
+    if not answers:
+        return counts
+    
+    lowered = [answer.lower() for answer in answers]
+    # A separator that never occurs in a term keeps a match inside one answer
+    batch = "\x00".join(lowered)
+    for column, term in enumerate(terms):
+        if term in batch:
+            counts[:, column] = [answer.count(term) for answer in lowered]
+    return counts
 
-    total_score = action_score + procedural_score + concrete_score
+def _lexicon_score(text_lower: str, metric: str, profile: CompiledScoringProfile) -> float:
+    return float(min(100, sum(text_lower.count(term) * weight for term, weight in profile.lexicon_term_weights[metric])))
 
-    return min(100, total_score)
+def calculate_actionable_score(text: str, profile: Optional[CompiledScoringProfile] = None) -> float:
+    """
+    Calculate how actionable the information is, based on presence of 
+    procedural steps, concrete instructions, and action verbs.
+    
+    Returns a score between 0-100.
+    """
+    return _lexicon_score(text.lower(), "actionable_guidance", profile or get_scoring_profile())
 
-def calculate_cultural_relevance(text: str) -> float:
+def calculate_cultural_relevance(text: str, profile: Optional[CompiledScoringProfile] = None) -> float:
     """
     Evaluate cultural relevance through mention of Indian legal terms,
     local processes, and contextual appropriateness.
     
     Returns a score between 0-100.
     """
-    indian_legal_terms = ["IPC", "CrPC", "Indian Penal Code", "panchayat", "lok adalat", 
-                        "RTI", "Right to Information", "FIR", "PIL", "High Court", "Supreme Court"]
-
-    text_lower = text.lower()
-    relevance_score = sum(text_lower.count(term.lower()) for term in indian_legal_terms) * 10
-
-    return min(100, relevance_score)
+    return _lexicon_score(text.lower(), "cultural_relevance", profile or get_scoring_profile())
 
 def calculate_accessibility_score(model_result) -> float:
     """
@@ -71,10 +87,11 @@ def calculate_accessibility_score(model_result) -> float:
     
     Returns a score between 0-100.
     """
-    response_time_ms = getattr(model_result, 'response_time_ms', 5000) 
+    return _accessibility(getattr(model_result, 'response_time_ms', 5000), len(getattr(model_result, 'answer', '')))
+
+def _accessibility(response_time_ms: float, answer_length: int) -> float:
     time_factor = max(0, 100 - (response_time_ms / 100))
 
-    answer_length = len(getattr(model_result, 'answer', ''))
     if answer_length < 50:
         length_factor = answer_length * 2
     elif answer_length > 1000:
@@ -84,28 +101,128 @@ def calculate_accessibility_score(model_result) -> float:
 
     return (time_factor * 0.3) + (length_factor * 0.7)
 
-def evaluate_social_impact(model_results) -> Dict[str, float]:
+def evaluate_social_impact(model_results, profile: Optional[CompiledScoringProfile] = None) -> Dict[str, float]:
     """
     Evaluate models based on factors relevant to access to justice
     
     Args:
         model_results: The model evaluation results containing the answer
+        profile: Scoring profile to use (default: active profile)
         
     Returns:
         Dictionary with social impact metrics
     """
+    return score_social_impact(model_results.answer, getattr(model_results, 'response_time_ms', 5000), profile=profile)
+
+def score_social_impact(
+    answer: str,
+    response_time_ms: float,
+    language_simplicity: Optional[float] = None,
+    profile: Optional[CompiledScoringProfile] = None
+) -> Dict[str, float]:
+    """
+    Score one answer; the same scores as score_social_impact_batch without its array overhead
+    
+    Args:
+        answer: The answer to score
+        response_time_ms: Response time of the answer
+        language_simplicity: Precomputed simplicity score
+        profile: Scoring profile to use (default: active profile)
+        
+    Returns:
+        Dictionary of metric name to score
+    """
+    profile = profile or get_scoring_profile()
+    answer_lower = answer.lower()
     metrics = {
-        "language_simplicity": calculate_simplicity_score(model_results.answer),
-        "actionable_guidance": calculate_actionable_score(model_results.answer),
-        "cultural_relevance": calculate_cultural_relevance(model_results.answer),
-        "accessibility": calculate_accessibility_score(model_results)
+        "language_simplicity": float(
+            calculate_simplicity_score(answer) if language_simplicity is None else language_simplicity
+        ),
+        "actionable_guidance": _lexicon_score(answer_lower, "actionable_guidance", profile),
+        "cultural_relevance": _lexicon_score(answer_lower, "cultural_relevance", profile),
+        "accessibility": float(_accessibility(response_time_ms, len(answer))),
     }
+    metrics["overall_social_impact"] = float(sum(
+        metrics[metric] * weight for metric, weight in profile.overall_weights.items()
+    ))
+    return metrics
 
-    metrics["overall_social_impact"] = (
-        metrics["language_simplicity"] * 0.3 +
-        metrics["actionable_guidance"] * 0.4 +
-        metrics["cultural_relevance"] * 0.2 +
-        metrics["accessibility"] * 0.1
+def score_social_impact_batch(
+    answers: Sequence[str],
+    response_times_ms: Sequence[float],
+    language_simplicity: Optional[Sequence[float]] = None,
+    profile: Optional[CompiledScoringProfile] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Score a whole batch of answers at once
+    
+    Lexicon terms are counted for the whole batch and the remaining metrics
+    are computed as array operations.
+    
+    Args:
+        answers: The answers to score
+        response_times_ms: Response time of each answer
+        language_simplicity: Precomputed simplicity scores; readability does
+            not depend on the lexicons or weights, so re-scoring a log after a
+            lexicon change can reuse the stored values
+        profile: Scoring profile to use (default: active profile)
+        
+    Returns:
+        Dictionary of metric name to array of scores, one per answer
+    """
+    profile = profile or get_scoring_profile()
+    counts = count_lexicon_terms(answers, profile)
+    
+    if language_simplicity is None:
+        simplicity = np.array([calculate_simplicity_score(answer) for answer in answers], dtype=np.float64)
+    else:
+        simplicity = np.asarray(language_simplicity, dtype=np.float64)
+    
+    response_times = np.asarray(response_times_ms, dtype=np.float64)
+    time_factor = np.maximum(0, 100 - response_times / 100)
+    lengths = np.array([len(answer) for answer in answers], dtype=np.float64)
+    length_factor = np.where(
+        lengths < 50,
+        lengths * 2,
+        np.where(lengths > 1000, np.maximum(0, 100 - (lengths - 1000) / 20), 100)
+    )
+    
+    metrics = {
+        "language_simplicity": simplicity,
+        "actionable_guidance": np.minimum(100, counts @ profile.lexicon_weights["actionable_guidance"]),
+        "cultural_relevance": np.minimum(100, counts @ profile.lexicon_weights["cultural_relevance"]),
+        "accessibility": (time_factor * 0.3) + (length_factor * 0.7),
+    }
+    
+    metrics["overall_social_impact"] = sum(
+        metrics[metric] * weight for metric, weight in profile.overall_weights.items()
     )
     
-    return metrics
\ No newline at end of file
+    return metrics
+
+def rescore_result_log(
+    path: str,
+    recompute_simplicity: bool = False,
+    profile: Optional[CompiledScoringProfile] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Re-score a historical result log produced by the result sink
+    
+    Args:
+        path: Result file or directory of result files
+        recompute_simplicity: Recompute readability instead of reusing the logged values
+        profile: Scoring profile to use (default: active profile)
+        
+    Returns:
+        Dictionary of metric name to array of scores, one per logged answer
+    """
+    from utils.result_sink import load_results
+    
+    columns = ["answer", "response_time_ms"] + ([] if recompute_simplicity else ["language_simplicity"])
+    results = load_results(path, columns=columns)
+    return score_social_impact_batch(
+        list(results["answer"]),
+        results["response_time_ms"],
+        None if recompute_simplicity else results["language_simplicity"],
+        profile
+    )
\ No newline at end of file
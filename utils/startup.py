@@ -0,0 +1,80 @@
+"""
+Startup and lazy-import timing.
+
+Heavy dependencies (NLTK, textstat, torch, transformers, openai) are imported
+on first use through lazy_import, which records how long each import took so
+cold-start cost can be inspected per component at /admin/startup.
+"""
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Dict, Iterator
+
+# Set when the first application module is imported, as close to process
+# start as the application can observe
+PROCESS_START = time.perf_counter()
+
+class StartupTimings:
+    """Thread-safe record of how long each startup component took"""
+
+    def __init__(self):
+        self._timings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, component: str, duration_ms: float):
+        """Record the duration of a component, replacing any earlier value"""
+        with self._lock:
+            self._timings[component] = round(duration_ms, 3)
+
+    def mark(self, component: str):
+        """Record the time elapsed since process start under a component name"""
+        self.record(component, (time.perf_counter() - PROCESS_START) * 1000)
+
+    @contextmanager
+    def timed(self, component: str) -> Iterator[None]:
+        """Time the enclosed block and record it under a component name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(component, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the recorded timings
+
+        Returns:
+            Dictionary with the uptime and each component's duration in milliseconds
+        """
+        with self._lock:
+            components = dict(self._timings)
+        return {
+            "uptime_ms": round((time.perf_counter() - PROCESS_START) * 1000, 3),
+            "components": components,
+        }
+
+startup_timings = StartupTimings()
+
+_imported_modules = set()
+
+def lazy_import(module_name: str) -> ModuleType:
+    """
+    Import a module on first use, recording how long the import took
+
+    Args:
+        module_name: Dotted module name
+
+    Returns:
+        The imported module
+    """
+    # Only trust sys.modules once our own import finished; another thread may
+    # still be initializing the module
+    if module_name in _imported_modules:
+        return sys.modules[module_name]
+    with startup_timings.timed(f"import:{module_name}"):
+        module = importlib.import_module(module_name)
+    _imported_modules.add(module_name)
+    return module
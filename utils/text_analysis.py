@@ -1,27 +1,173 @@
-from typing import List, Tuple, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Tuple, Optional
+import hashlib
+import json
+import math
+import os
 import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-
-# Download necessary NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
-
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
-
-def calculate_keyword_coverage(text: str, keywords: List[str]) -> Tuple[float, List[str]]:
+
+from utils.keyword_matcher import get_keyword_matcher, DEFAULT_MATCH_MODE
+from utils.scoring_profile import CompiledScoringProfile, get_scoring_profile
+from utils.startup import lazy_import
+
+# NLTK's English stopword list, vendored so keyword extraction works on
+# workers without the NLTK corpora and without downloading anything
+ENGLISH_STOPWORDS = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your yours
+yourself yourselves he him his himself she she's her hers herself it it's its
+itself they them their theirs themselves what which who whom this that that'll
+these those am is are was were be been being have has had having do does did
+doing a an the and but if or because as until while of at by for with about
+against between into through during before after above below to from up down
+in out on off over under again further then once here there when where why how
+all any both each few more most other some such no nor not only own same so
+than too very s t can will just don don't should should've now d ll m o re ve
+y ain aren aren't couldn couldn't didn didn't doesn doesn't hadn hadn't hasn
+hasn't haven haven't isn isn't ma mightn mightn't mustn mustn't needn needn't
+shan shan't shouldn shouldn't wasn wasn't weren weren't won won't wouldn wouldn't
+""".split())
+
+_WORD_PATTERN = re.compile(r"[^\W_]+")
+
+# "auto" uses NLTK's tokenizer when its data is installed, "regex" never needs punkt
+TOKENIZER_MODES = ("auto", "nltk", "regex")
+KEYWORD_TOKENIZER = os.environ.get("KEYWORD_TOKENIZER", "auto")
+# "frequency" ranks a question's words by count, "tfidf" also by how rare they are across questions
+EXTRACTION_MODES = ("frequency", "tfidf")
+KEYWORD_EXTRACTION = os.environ.get("KEYWORD_EXTRACTION", "frequency")
+KEYWORD_IDF_PATH = os.environ.get(
+    "KEYWORD_IDF_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "keyword_idf.json")
+)
+KEYWORD_CACHE_SIZE = int(os.environ.get("KEYWORD_CACHE_SIZE", "4096"))
+
+@lru_cache(maxsize=1)
+def nltk_resources_available() -> bool:
+    """
+    Check whether the NLTK punkt and stopwords data are installed locally
+    
+    Never downloads anything; install them at build time with
+    `python -m nltk.downloader punkt stopwords`.
+    """
+    nltk = lazy_import("nltk")
+    for resource in ("tokenizers/punkt", "corpora/stopwords"):
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            return False
+    return True
+
+@lru_cache(maxsize=len(TOKENIZER_MODES))
+def _get_text_processing(tokenizer: str = KEYWORD_TOKENIZER) -> Tuple[FrozenSet[str], Callable[[str], List[str]]]:
+    # Use NLTK's tokenizer and stopwords when asked for and its data is
+    # installed, else the vendored stopwords and a regex tokenizer
+    if tokenizer not in TOKENIZER_MODES:
+        raise ValueError(f"Unknown keyword tokenizer: {tokenizer}; choose from {list(TOKENIZER_MODES)}")
+    if tokenizer != "regex" and nltk_resources_available():
+        stop_words = frozenset(lazy_import("nltk.corpus").stopwords.words('english'))
+        return stop_words, lazy_import("nltk.tokenize").word_tokenize
+    if tokenizer == "nltk":
+        print("NLTK punkt/stopwords data not installed; extracting keywords with the regex tokenizer")
+    return ENGLISH_STOPWORDS, _WORD_PATTERN.findall
+
+def _content_words(text: str, tokenizer: str) -> List[str]:
+    stop_words, tokenize = _get_text_processing(tokenizer)
+    return [w for w in tokenize(text.lower()) if w.isalnum() and w not in stop_words]
+
+def build_idf_table(
+    questions: Iterable[str],
+    legal_terms: Iterable[str] = (),
+    legal_term_weight: float = 2.0,
+    tokenizer: str = KEYWORD_TOKENIZER
+) -> Dict[str, Any]:
+    """
+    Build the IDF table used by tfidf keyword extraction
+
+    Args:
+        questions: The question corpus
+        legal_terms: Legal-domain words weighted up in extracted keywords;
+            multi-word terms contribute each of their words
+        legal_term_weight: Multiplier applied to legal-domain words
+        tokenizer: Tokenizer mode, as for extract_keywords
+
+    Returns:
+        Table with the number of questions, the smoothed IDF of every word
+        seen, the IDF of unseen words and the legal-domain weights
+    """
+    document_frequency: Dict[str, int] = {}
+    documents = 0
+    for question in questions:
+        documents += 1
+        for word in set(_content_words(question, tokenizer)):
+            document_frequency[word] = document_frequency.get(word, 0) + 1
+
+    # Smoothed as in scikit-learn, so words in every question still count a little
+    return {
+        "documents": documents,
+        "default_idf": math.log(1 + documents) + 1,
+        "idf": {word: math.log((1 + documents) / (1 + count)) + 1 for word, count in sorted(document_frequency.items())},
+        "weights": {
+            word: legal_term_weight
+            for term in legal_terms
+            for word in _content_words(term, tokenizer)
+        },
+    }
+
+_idf_table: Optional[Dict[str, Any]] = None
+_idf_digest: Optional[str] = None
+
+def get_idf_table() -> Dict[str, Any]:
+    """Get the IDF table, loading KEYWORD_IDF_PATH on first use (empty if the file is missing)"""
+    global _idf_table
+    if _idf_table is None:
+        try:
+            with open(KEYWORD_IDF_PATH, "r", encoding="utf-8") as f:
+                _idf_table = json.load(f)
+        except FileNotFoundError:
+            print(f"No keyword IDF table at {KEYWORD_IDF_PATH}; tfidf extraction ranks by frequency only")
+            _idf_table = {"documents": 0, "default_idf": 1.0, "idf": {}, "weights": {}}
+    return _idf_table
+
+def set_idf_table(table: Optional[Dict[str, Any]]):
+    """Replace the IDF table; None reloads KEYWORD_IDF_PATH on next use"""
+    global _idf_table, _idf_digest
+    _idf_table = table
+    _idf_digest = None
+    _extract_keywords.cache_clear()
+
+def keyword_extraction_version(mode: Optional[str] = None, tokenizer: Optional[str] = None) -> str:
+    """
+    Identify the settings keywords are extracted with, for the keyword coverage scorer version
+
+    Args:
+        mode: "frequency" or "tfidf"; defaults to KEYWORD_EXTRACTION
+        tokenizer: "auto", "nltk" or "regex"; defaults to KEYWORD_TOKENIZER
+
+    Returns:
+        The mode, the tokenizer actually used and, in tfidf mode, a digest
+        of the IDF table
+    """
+    global _idf_digest
+    mode = mode or KEYWORD_EXTRACTION
+    tokenizer = tokenizer or KEYWORD_TOKENIZER
+    # "auto" and "nltk" fall back to the regex tokenizer without the NLTK data
+    tokenizer = "nltk" if tokenizer != "regex" and nltk_resources_available() else "regex"
+    if mode != "tfidf":
+        return f"{mode}:{tokenizer}"
+    if _idf_digest is None:
+        table = json.dumps(get_idf_table(), sort_keys=True).encode("utf-8")
+        _idf_digest = hashlib.sha256(table).hexdigest()[:12]
+    return f"{mode}:{tokenizer}:{_idf_digest}"
+
+def calculate_keyword_coverage(text: str, keywords: List[str], mode: Optional[str] = None) -> Tuple[float, List[str]]:
     """
     Calculate what percentage of expected keywords are found in the text
     
     Args:
         text: The text to analyze
         keywords: List of keywords to look for
+        mode: Matching mode ("substring", "word", "stem" or "synonym");
+            defaults to KEYWORD_MATCH_MODE
         
     Returns:
         Tuple of (coverage percentage, list of found keywords)
@@ -29,44 +175,78 @@ def calculate_keyword_coverage(text: str, keywords: List[str]) -> Tuple[float, L
     if not keywords:
         return 0.0, []
     
-    text_lower = text.lower()
-    found_keywords = []
-    
-    for keyword in keywords:
-        # Look for the keyword in the text
-        if keyword.lower() in text_lower:
-            found_keywords.append(keyword)
+    # The compiled matcher is shared by every answer scored against this keyword set
+    matcher = get_keyword_matcher(tuple(keywords), mode or DEFAULT_MATCH_MODE)
+    found_keywords = matcher.find(text)
     
     coverage = len(found_keywords) / len(keywords) * 100
     return coverage, found_keywords
 
-def extract_keywords(text: str, max_keywords: int = 5) -> List[str]:
+def extract_keywords(
+    text: str,
+    max_keywords: int = 5,
+    mode: Optional[str] = None,
+    tokenizer: Optional[str] = None
+) -> List[str]:
     """
     Extract potential keywords from text using simple NLP techniques
     
+    Results are memoized, so every model scored on a question, and every
+    repeat of the question, reuses one extraction.
+    
     Args:
         text: Text to extract keywords from
         max_keywords: Maximum number of keywords to extract
+        mode: "frequency" or "tfidf"; defaults to KEYWORD_EXTRACTION
+        tokenizer: "auto", "nltk" or "regex"; defaults to KEYWORD_TOKENIZER
         
     Returns:
         List of potential keywords
+        
+    Raises:
+        ValueError: If mode or tokenizer is unknown
     """
-    stop_words = set(stopwords.words('english'))
-    word_tokens = word_tokenize(text.lower())
+    mode = mode or KEYWORD_EXTRACTION
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown keyword extraction mode: {mode}; choose from {list(EXTRACTION_MODES)}")
+    return list(_extract_keywords(text, max_keywords, mode, tokenizer or KEYWORD_TOKENIZER))
 
-    filtered_words = [w for w in word_tokens if w.isalnum() and w not in stop_words]
+@lru_cache(maxsize=KEYWORD_CACHE_SIZE)
+def _extract_keywords(text: str, max_keywords: int, mode: str, tokenizer: str) -> Tuple[str, ...]:
+    word_freq: Dict[str, float] = {}
+    for word in _content_words(text, tokenizer):
+        word_freq[word] = word_freq.get(word, 0) + 1
 
-    word_freq = {}
-    for word in filtered_words:
-        if word in word_freq:
-            word_freq[word] += 1
-        else:
-            word_freq[word] = 1
+    if mode == "tfidf":
+        table = get_idf_table()
+        idf, default_idf, weights = table["idf"], table["default_idf"], table["weights"]
+        word_freq = {
+            word: freq * idf.get(word, default_idf) * weights.get(word, 1.0)
+            for word, freq in word_freq.items()
+        }
 
+    # Stable sort: equally ranked words keep the order they appear in
     sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-    keywords = [word for word, freq in sorted_words[:max_keywords]]
-    
-    return keywords
+    return tuple(word for word, _ in sorted_words[:max_keywords])
+
+def load_keyword_extraction():
+    """Load the stopwords, tokenizer and (in tfidf mode) IDF table ahead of the first question"""
+    _get_text_processing(KEYWORD_TOKENIZER)
+    if KEYWORD_EXTRACTION == "tfidf":
+        get_idf_table()
+
+def keyword_extraction_stats() -> Dict[str, Any]:
+    """Get the keyword extraction settings and memoization counters"""
+    info = _extract_keywords.cache_info()
+    return {
+        "mode": KEYWORD_EXTRACTION,
+        "tokenizer": KEYWORD_TOKENIZER,
+        "idf_documents": _idf_table["documents"] if _idf_table is not None else None,
+        "cache_size": info.currsize,
+        "cache_max_size": info.maxsize,
+        "cache_hits": info.hits,
+        "cache_misses": info.misses,
+    }
 
 def assess_length(text: str) -> str:
     """
@@ -87,26 +267,35 @@ def assess_length(text: str) -> str:
     else:
         return "good"
     
-def calculate_confidence_score(answer: str) -> float:
+def calculate_confidence_score(answer: str, profile: Optional[CompiledScoringProfile] = None) -> float:
     """
     Calculate a confidence score based on answer characteristics:
     - Presence of uncertainty phrases ("might be", "possibly")
     - Number of specifics/details provided
     - Presence of legal citations
+    
+    The phrases, patterns and weights come from the scoring profile.
     """
-    uncertainty_phrases = ["may", "might", "possibly", "perhaps", "could be"]
+    profile = profile or get_scoring_profile()
+    rules = profile.confidence
+    answer_lower = answer.lower()
     
-    # Lower score for uncertain answers
-    uncertainty_score = sum(phrase in answer.lower() for phrase in uncertainty_phrases)
+    # Lower score for uncertain answers (each phrase counts once)
+    uncertainty_score = len(profile.uncertainty_matcher.find(answer_lower))
     
     # Higher score for specific details
-    detail_score = len(re.findall(r'\d+', answer))  # Count numbers as details
+    detail_score = len(profile.detail_pattern.findall(answer))  # Count numbers as details
     
     # Higher score for legal citations
-    citation_score = len(re.findall(r'section \d+|article \d+', answer.lower()))
+    citation_score = len(profile.citation_pattern.findall(answer_lower))
     
     # Calculate final score (0-100)
-    confidence = 50 - (uncertainty_score * 10) + (detail_score * 5) + (citation_score * 15)
+    confidence = (
+        rules.base_score
+        - (uncertainty_score * rules.uncertainty_penalty)
+        + (detail_score * rules.detail_bonus)
+        + (citation_score * rules.citation_bonus)
+    )
     
     # Clamp between 0-100
     return max(0, min(100, confidence))
\ No newline at end of file
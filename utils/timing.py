@@ -0,0 +1,102 @@
+"""
+Monotonic timing for model answers.
+
+GenerationTimer records perf_counter_ns timestamps for the start of a call,
+every streamed chunk and the end of the call, and derives time to first
+token, inter-chunk latency and throughput from them. A chunk is whatever
+piece of text the model streams; services that know how many tokens their
+chunks hold report it with StreamChunk, so token counts and rates are real
+tokens rather than chunks.
+"""
+import time
+from typing import Any, Dict, Optional
+
+class StreamChunk(str):
+    """
+    A streamed text chunk that carries the number of tokens it was decoded from.
+
+    An empty chunk can carry tokens that produced no text, such as the end
+    of sequence token or a usage report sent after the last delta.
+    """
+
+    tokens: Optional[int]
+
+    def __new__(cls, text: str, tokens: Optional[int] = None) -> "StreamChunk":
+        chunk = super().__new__(cls, text)
+        chunk.tokens = tokens
+        return chunk
+
+class GenerationTimer:
+    """Timestamps of one model call, with per-chunk timing when the answer is streamed"""
+
+    def __init__(self):
+        self.started_at_ns: Optional[int] = None
+        self.first_token_at_ns: Optional[int] = None
+        self.last_token_at_ns: Optional[int] = None
+        self.finished_at_ns: Optional[int] = None
+        self.output_chunks = 0
+        # None until the service reports token counts
+        self.output_tokens: Optional[int] = None
+        self._first_chunk_tokens: Optional[int] = None
+
+    def start(self) -> "GenerationTimer":
+        """Mark the start of the call"""
+        self.started_at_ns = time.perf_counter_ns()
+        return self
+
+    def chunk(self, chunk: str):
+        """Record a streamed chunk; empty chunks only add the tokens they carry"""
+        tokens = getattr(chunk, "tokens", None)
+        if tokens is not None:
+            self.output_tokens = (self.output_tokens or 0) + tokens
+        if not chunk:
+            return
+        now = time.perf_counter_ns()
+        if self.first_token_at_ns is None:
+            self.first_token_at_ns = now
+            self._first_chunk_tokens = tokens
+        self.last_token_at_ns = now
+        self.output_chunks += 1
+
+    def finish(self) -> "GenerationTimer":
+        """Mark the end of the call"""
+        self.finished_at_ns = time.perf_counter_ns()
+        return self
+
+    @property
+    def elapsed_ms(self) -> int:
+        """Wall-clock duration of the call in whole milliseconds"""
+        return int((self.finished_at_ns - self.started_at_ns) / 1_000_000)
+
+    def as_fields(self, streamed: bool = True) -> Dict[str, Any]:
+        """
+        Get the timing fields of a ModelEvaluation
+
+        Args:
+            streamed: Whether the chunks were real streamed output; if not,
+                only the start and finish timestamps are reported
+
+        Returns:
+            Dictionary of ModelEvaluation timing fields
+        """
+        fields: Dict[str, Any] = {
+            "started_at_ns": self.started_at_ns,
+            "finished_at_ns": self.finished_at_ns,
+        }
+        if not streamed or self.first_token_at_ns is None:
+            return fields
+
+        fields["first_token_at_ns"] = self.first_token_at_ns
+        fields["ttft_ms"] = (self.first_token_at_ns - self.started_at_ns) / 1_000_000
+        fields["output_chunks"] = self.output_chunks
+        fields["output_tokens"] = self.output_tokens
+        # Rates are measured after the first chunk, so prompt processing is not counted twice
+        decode_ns = self.last_token_at_ns - self.first_token_at_ns
+        if self.output_chunks > 1:
+            fields["mean_inter_chunk_ms"] = decode_ns / (self.output_chunks - 1) / 1_000_000
+        if self.output_tokens is not None and decode_ns:
+            # A usage report only gives the total; count the first chunk as one token then
+            decoded = self.output_tokens - (self._first_chunk_tokens or 1)
+            if decoded > 0:
+                fields["tokens_per_second"] = decoded / (decode_ns / 1e9)
+        return fields